@@ -40,6 +40,9 @@ $ProgressKey = "SetupProgress"
 $SerialKey = "Serial"
 $PCNameKey = "PCName"
 
+# 未送信ログのバッファファイル
+$LogBufferPath = "C:\Setup\Logs\log-buffer.json"
+
 # グローバル変数
 $global:Config = $null
 $global:APIServer = ""
@@ -339,6 +342,9 @@ function Step5-Reboot1 {
         Write-SetupLog "PC名とODJの適用のため、60秒後に再起動します..." -Level WARNING
         Start-Sleep -Seconds 10
 
+        # 再起動前に未送信ログを送信（失敗してもバッファファイルに残る）
+        Send-SetupLogBuffer -APIServer $global:APIServer | Out-Null
+
         Restart-Computer -Force
         return $true
     }
@@ -454,7 +460,7 @@ function Send-ProgressLog {
             logs      = $Message
         }
 
-        Send-SetupLog -APIServer $global:APIServer -LogData $logData | Out-Null
+        Add-SetupLogToBuffer -APIServer $global:APIServer -LogData $logData | Out-Null
     }
     catch {
         Write-ErrorLog -ErrorRecord $_ -Context "Send-ProgressLog"
@@ -479,7 +485,8 @@ function Send-ErrorLog {
             logs      = $Message
         }
 
-        Send-SetupLog -APIServer $global:APIServer -LogData $logData | Out-Null
+        # 順序を保つため、バッファ済みログと一緒に即時送信
+        Add-SetupLogToBuffer -APIServer $global:APIServer -LogData $logData -FlushSize 1 | Out-Null
     }
     catch {
         Write-ErrorLog -ErrorRecord $_ -Context "Send-ErrorLog"
@@ -547,6 +554,10 @@ try {
     # ログ設定の適用
     Set-LogConfiguration -ConfigPath $ConfigPath
 
+    # ログバッファの初期化（再起動前の未送信ログを復元）
+    Initialize-SetupLogBuffer -BufferPath $LogBufferPath
+    Send-SetupLogBuffer -APIServer $global:APIServer | Out-Null
+
     # システム情報のログ出力
     Write-SystemInfoLog
 
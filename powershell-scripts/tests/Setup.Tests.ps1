@@ -204,6 +204,42 @@ Describe "API.psm1 Tests" {
             $result | Should -Be $true
         }
     }
+
+    Context "Send-SetupLogBatch" {
+        It "Should send all entries in one request with idempotency keys" {
+            Mock Invoke-RestMethod -ModuleName API {
+                return @{ result = "ok"; created = 2; duplicates = 0; invalid = 0; results = @() }
+            }
+
+            $entries = @(
+                @{ serial = "ABC123"; pcname = "20251116M"; status = "in_progress"; timestamp = "2025-11-16 12:00:00" },
+                @{ serial = "ABC123"; pcname = "20251116M"; status = "completed"; timestamp = "2025-11-16 12:30:00" }
+            )
+
+            $result = Send-SetupLogBatch -APIServer "http://192.168.1.100:5000" -Entries $entries
+            $result | Should -Be $true
+            Should -Invoke Invoke-RestMethod -ModuleName API -Times 1 -Exactly
+            $entries[0].ContainsKey('idempotency_key') | Should -Be $true
+        }
+    }
+
+    Context "Add-SetupLogToBuffer" {
+        It "Should buffer progress logs and flush on completion" {
+            Mock Invoke-RestMethod -ModuleName API {
+                return @{ result = "ok"; created = 2; duplicates = 0; invalid = 0; results = @() }
+            }
+
+            Initialize-SetupLogBuffer
+
+            $logData = @{ serial = "ABC123"; pcname = "20251116M"; status = "in_progress"; timestamp = "2025-11-16 12:00:00" }
+            Add-SetupLogToBuffer -APIServer "http://192.168.1.100:5000" -LogData $logData | Should -Be $true
+            Should -Invoke Invoke-RestMethod -ModuleName API -Times 0 -Exactly
+
+            $logData = @{ serial = "ABC123"; pcname = "20251116M"; status = "completed"; timestamp = "2025-11-16 12:30:00" }
+            Add-SetupLogToBuffer -APIServer "http://192.168.1.100:5000" -LogData $logData | Should -Be $true
+            Should -Invoke Invoke-RestMethod -ModuleName API -Times 1 -Exactly
+        }
+    }
 }
 
 Describe "Domain.psm1 Tests" {
@@ -9,8 +9,13 @@ from . import log  # noqa: F401, E402
 from . import pc_crud  # noqa: F401, E402
 from . import import_export  # noqa: F401, E402
 from . import odj  # noqa: F401, E402
+from . import provision  # noqa: F401, E402
 from . import images  # noqa: F401, E402
 from . import deployment  # noqa: F401, E402
 from . import settings  # noqa: F401, E402
+from . import jobs  # noqa: F401, E402
+from . import events  # noqa: F401, E402
+from . import search  # noqa: F401, E402
+from . import admission  # noqa: F401, E402
 
 __all__ = ['api_bp']
@@ -0,0 +1,31 @@
+"""Admission control status endpoint.
+
+GET /api/admission
+Returns the admission limits, slots in use and admitted/shed counters.
+"""
+from flask import jsonify
+from . import api_bp
+from utils.admission import admission
+
+
+@api_bp.route('/admission', methods=['GET'])
+def get_admission_stats():
+    """Get admission control statistics of this worker process.
+
+    Returns:
+        JSON response with limits and per-lane counters
+        {
+            "enabled": true,
+            "in_flight": 3,
+            "lanes": {
+                "agent": {"in_flight": 2, "admitted": 950, "shed": {"rate": 0, "concurrency": 0}},
+                "heavy": {"in_flight": 1, "admitted": 12, "shed": {"rate": 0, "concurrency": 4}},
+                ...
+            },
+            ...
+        }
+
+    Status Codes:
+        200: Success
+    """
+    return jsonify(admission.stats()), 200
@@ -7,8 +7,15 @@ from flask import request, jsonify, current_app
 from . import api_bp
 from models import db
 from models.deployment import Deployment
+from models.deployment_target import DeploymentTarget, normalize_mac
+from models.job import Job
 from models.pc_master import PCMaster
+from models.session_metric import SessionMetric
 from utils.drbl_client import DRBLClient, DRBLException
+from utils.deployment_scheduler import deployment_scheduler
+from utils.job_queue import job_runner
+from utils.process_supervisor import deployment_session, process_supervisor
+from utils.session_tuner import SessionTuner, detect_compression
 
 logger = logging.getLogger(__name__)
 
@@ -74,22 +81,20 @@ def create_deployment():
                 'image_name': image_name
             }), 404
 
-        # Process target serials
+        # Process target serials (duplicates collapse to one target)
         target_serials = data.get('target_serials', [])
-        if isinstance(target_serials, list):
-            target_serials_str = ','.join(target_serials)
-            target_count = len(target_serials)
-        else:
-            target_serials_str = ''
-            target_count = 0
+        if not isinstance(target_serials, list):
+            target_serials = []
+        target_serials = list(dict.fromkeys(target_serials))
 
-        # Validate target PCs exist
+        # Validate target PCs exist (one IN query)
+        pcs = {}
         if target_serials:
-            invalid_serials = []
-            for serial in target_serials:
-                pc = PCMaster.find_by_serial(serial)
-                if not pc:
-                    invalid_serials.append(serial)
+            pcs = {
+                pc.serial: pc for pc in
+                PCMaster.query.filter(PCMaster.serial.in_(target_serials)).all()
+            }
+            invalid_serials = [s for s in target_serials if s not in pcs]
 
             if invalid_serials:
                 return jsonify({
@@ -102,12 +107,21 @@ def create_deployment():
             name=name,
             image_name=image_name,
             mode=mode,
-            target_serials=target_serials_str,
-            target_count=target_count,
+            target_count=len(target_serials),
             status='pending',
             created_by=data.get('created_by', ''),
             notes=data.get('notes', '')
         )
+        deployment.targets = [
+            DeploymentTarget(
+                serial=serial,
+                mac_address=pcs[serial].mac_address,
+                state=DeploymentTarget.STATE_PENDING,
+                percentage=0.0,
+                bytes_transferred=0
+            )
+            for serial in target_serials
+        ]
 
         db.session.add(deployment)
         db.session.commit()
@@ -213,17 +227,18 @@ def get_deployment(deployment_id):
                 'deployment_id': deployment_id
             }), 404
 
-        # Get target PC details
-        target_pcs = []
-        if deployment.target_serials:
-            serials = deployment.target_serials.split(',')
-            for serial in serials:
-                pc = PCMaster.find_by_serial(serial)
-                if pc:
-                    target_pcs.append(pc.to_dict())
+        # Get target PC details (one IN query)
+        serials = deployment.serials
+        pcs = {
+            pc.serial: pc for pc in
+            PCMaster.query.filter(PCMaster.serial.in_(serials)).all()
+        } if serials else {}
+        target_pcs = [pcs[serial].to_dict() for serial in serials if serial in pcs]
 
         deployment_dict = deployment.to_dict()
         deployment_dict['target_pcs'] = target_pcs
+        deployment_dict['targets'] = [t.to_dict() for t in deployment.targets]
+        deployment_dict['target_states'] = DeploymentTarget.state_counts(deployment.id)
 
         return jsonify({
             'success': True,
@@ -258,16 +273,33 @@ def get_deployment_status(deployment_id):
             }), 404
 
         # Get real-time status from DRBL/Clonezilla
-        drbl_status = drbl_client.get_deployment_status()
+        # (only running deployments are tracked by the progress follower)
+        is_running = deployment.status == 'running'
+        drbl_status = drbl_client.get_deployment_status(
+            deployment_id=deployment.id if is_running else None,
+            started_at=deployment.started_at if is_running else None,
+            scope=deployment.progress_scope() if is_running else None
+        )
+
+        # Read-only: the deployment scheduler tick persists DRBL progress
+        progress_data = drbl_status.get('progress', {})
+        progress = deployment.progress
+        if drbl_status.get('running') and 'percentage' in progress_data:
+            progress = progress_data['percentage']
 
         status_info = {
             'deployment_id': deployment.id,
             'status': deployment.status,
-            'progress': deployment.progress,
+            'progress': progress,
             'started_at': deployment.started_at.isoformat() if deployment.started_at else None,
             'elapsed_seconds': None,
             'drbl_running': drbl_status.get('running', False),
-            'drbl_progress': drbl_status.get('progress', {})
+            'drbl_progress': progress_data,
+            'clients': progress_data.get('clients', []),
+            'processes': [
+                proc.to_dict()
+                for proc in process_supervisor.processes(deployment_session(deployment.id))
+            ]
         }
 
         if deployment.started_at:
@@ -278,12 +310,7 @@ def get_deployment_status(deployment_id):
             duration = deployment.completed_at - deployment.started_at
             status_info['duration_seconds'] = int(duration.total_seconds())
 
-        # Update progress from DRBL if available
-        if drbl_status.get('running') and 'progress' in drbl_status:
-            progress_data = drbl_status['progress']
-            if 'percentage' in progress_data:
-                deployment.progress = progress_data['percentage']
-                db.session.commit()
+        status_info['target_states'] = DeploymentTarget.state_counts(deployment.id)
 
         return jsonify({
             'success': True,
@@ -298,6 +325,67 @@ def get_deployment_status(deployment_id):
         }), 500
 
 
+@api_bp.route('/deployment/<int:deployment_id>/targets', methods=['GET'])
+def get_deployment_targets(deployment_id):
+    """List per-client targets of a deployment.
+
+    Args:
+        deployment_id: Deployment ID
+
+    Query parameters:
+        - below: Only targets with percentage below this value (optional)
+        - state: Only targets in this state (optional)
+
+    Returns:
+        JSON response with targets ordered by percentage
+    """
+    try:
+        deployment = Deployment.query.get(deployment_id)
+
+        if not deployment:
+            return jsonify({
+                'error': 'Deployment not found',
+                'deployment_id': deployment_id
+            }), 404
+
+        state = request.args.get('state')
+        if state and state not in DeploymentTarget.STATES:
+            return jsonify({
+                'error': 'Invalid state',
+                'allowed_values': list(DeploymentTarget.STATES)
+            }), 400
+
+        below = request.args.get('below')
+        try:
+            below = float(below) if below not in (None, '') else None
+        except ValueError:
+            return jsonify({
+                'error': 'below must be a number'
+            }), 400
+
+        # Served by the (deployment_id, percentage) / (deployment_id, state) indexes
+        query = DeploymentTarget.query.filter_by(deployment_id=deployment.id)
+        if below is not None:
+            query = query.filter(DeploymentTarget.percentage < below)
+        if state:
+            query = query.filter(DeploymentTarget.state == state)
+        targets = query.order_by(DeploymentTarget.percentage, DeploymentTarget.id).all()
+
+        return jsonify({
+            'success': True,
+            'deployment_id': deployment.id,
+            'count': len(targets),
+            'targets': [t.to_dict() for t in targets]
+        }), 200
+
+    except Exception as e:
+        logger.error(f'Error getting deployment targets: {e}')
+        return jsonify({
+            'error': 'Failed to get deployment targets',
+            'details': str(e)
+        }), 500
+
+
 @api_bp.route('/deployment/<int:deployment_id>/start', methods=['POST'])
 def start_deployment(deployment_id):
     """Start a deployment.
@@ -324,6 +412,12 @@ def start_deployment(deployment_id):
                 'allowed_status': ['pending']
             }), 400
 
+        if deployment.mode == 'unicast' and _unicast_target_mac(deployment) is None:
+            return jsonify({
+                'error': 'Unicast deployment requires a target PC with a MAC address',
+                'target_serials': deployment.serials
+            }), 400
+
         # Update status
         deployment.status = 'running'
         deployment.started_at = datetime.utcnow()
@@ -333,60 +427,250 @@ def start_deployment(deployment_id):
 
         logger.info(f'Starting deployment: {deployment.name} (ID: {deployment.id})')
 
-        # Start actual DRBL deployment
-        try:
-            if deployment.mode == 'multicast':
-                # Start multicast deployment
-                result = drbl_client.start_multicast_deployment(
-                    image_name=deployment.image_name,
-                    clients_to_wait=deployment.target_count or 10,
-                    max_wait_time=300
-                )
-            else:
-                # Start unicast deployment
-                # Get first target PC MAC address (would need to be stored in DB)
-                if deployment.target_serials:
-                    serials = deployment.target_serials.split(',')
-                    first_pc = PCMaster.find_by_serial(serials[0])
-                    # Note: MAC address would need to be stored in PCMaster model
-                    target_mac = getattr(first_pc, 'mac_address', '00:00:00:00:00:00')
-                else:
-                    target_mac = '00:00:00:00:00:00'
-
-                result = drbl_client.start_unicast_deployment(
-                    image_name=deployment.image_name,
-                    target_mac=target_mac
-                )
-
-            logger.info(f'DRBL deployment started: {result}')
+        # Run DRBL deployment in the background job runner
+        job = job_runner.submit(
+            'deployment.start',
+            params={'mode': deployment.mode, 'image_name': deployment.image_name},
+            deployment_id=deployment.id
+        )
+
+        return jsonify({
+            'success': True,
+            'message': 'Deployment start queued',
+            'deployment': deployment.to_dict(),
+            'job': job.to_dict()
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error starting deployment: {e}')
+        return jsonify({
+            'error': 'Failed to start deployment',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/deployment/<int:deployment_id>/enqueue', methods=['POST'])
+def enqueue_deployment(deployment_id):
+    """Queue a pending deployment for the multi-session scheduler.
+
+    Args:
+        deployment_id: Deployment ID
 
+    Request JSON (optional):
+        - priority: Higher priorities start first (default: 0)
+
+    Returns:
+        JSON response with the deployment and its queue estimate
+    """
+    try:
+        deployment = Deployment.query.get(deployment_id)
+
+        if not deployment:
             return jsonify({
-                'success': True,
-                'message': 'Deployment started successfully',
-                'deployment': deployment.to_dict(),
-                'drbl_result': result
-            }), 200
+                'error': 'Deployment not found',
+                'deployment_id': deployment_id
+            }), 404
 
-        except DRBLException as e:
-            # Rollback status on DRBL error
-            deployment.status = 'failed'
-            deployment.completed_at = datetime.utcnow()
-            db.session.commit()
+        if deployment.status not in ['pending']:
+            return jsonify({
+                'error': 'Deployment cannot be queued',
+                'current_status': deployment.status,
+                'allowed_status': ['pending']
+            }), 400
 
-            logger.error(f'DRBL deployment failed: {str(e)}')
+        if deployment.mode == 'unicast' and _unicast_target_mac(deployment) is None:
+            return jsonify({
+                'error': 'Unicast deployment requires a target PC with a MAC address',
+                'target_serials': deployment.serials
+            }), 400
 
+        data = request.get_json(silent=True) or {}
+        try:
+            priority = int(data.get('priority', 0))
+        except (TypeError, ValueError):
             return jsonify({
-                'success': False,
-                'error': 'Failed to start DRBL deployment',
-                'details': str(e),
-                'deployment': deployment.to_dict()
-            }), 500
+                'error': 'priority must be an integer',
+                'field': 'priority'
+            }), 400
+
+        deployment.status = 'queued'
+        deployment.priority = priority
+        deployment.queued_at = datetime.utcnow()
+        db.session.commit()
+
+        logger.info(f'Deployment queued: {deployment.name} (ID: {deployment.id})')
+        deployment_scheduler.wake()
+
+        queue = deployment_scheduler.status()['queue']
+        estimate = next((q for q in queue if q['deployment_id'] == deployment.id), None)
+
+        return jsonify({
+            'success': True,
+            'message': 'Deployment queued',
+            'deployment': deployment.to_dict(),
+            'queue': estimate
+        }), 202
 
     except Exception as e:
         db.session.rollback()
-        logger.error(f'Error starting deployment: {e}')
+        logger.error(f'Error queueing deployment: {e}')
         return jsonify({
-            'error': 'Failed to start deployment',
+            'error': 'Failed to queue deployment',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/deployment/<int:deployment_id>/dequeue', methods=['POST'])
+def dequeue_deployment(deployment_id):
+    """Take a queued deployment out of the scheduler queue.
+
+    Args:
+        deployment_id: Deployment ID
+
+    Returns:
+        JSON response with the deployment (status pending again)
+    """
+    try:
+        # Atomic: the scheduler may be starting it right now
+        updated = Deployment.query.filter_by(
+            id=deployment_id,
+            status='queued'
+        ).update({'status': 'pending', 'queued_at': None}, synchronize_session=False)
+        db.session.commit()
+
+        deployment = Deployment.query.get(deployment_id)
+
+        if not deployment:
+            return jsonify({
+                'error': 'Deployment not found',
+                'deployment_id': deployment_id
+            }), 404
+
+        if not updated:
+            return jsonify({
+                'error': 'Deployment is not queued',
+                'current_status': deployment.status
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'message': 'Deployment removed from queue',
+            'deployment': deployment.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error dequeueing deployment: {e}')
+        return jsonify({
+            'error': 'Failed to dequeue deployment',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/deployment/queue', methods=['GET'])
+def get_deployment_queue():
+    """Get scheduler queue depth, running sessions, budgets and ETA.
+
+    Returns:
+        JSON response with scheduler status
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'scheduler': deployment_scheduler.status()
+        }), 200
+
+    except Exception as e:
+        logger.error(f'Error getting deployment queue: {e}')
+        return jsonify({
+            'error': 'Failed to get deployment queue',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/deployment/<int:deployment_id>/tuning', methods=['GET'])
+def get_deployment_tuning(deployment_id):
+    """Get recommended multicast settings for a deployment.
+
+    Args:
+        deployment_id: Deployment ID
+
+    Returns:
+        JSON response with the session tuner's recommendation
+    """
+    try:
+        deployment = Deployment.query.get(deployment_id)
+
+        if not deployment:
+            return jsonify({
+                'error': 'Deployment not found',
+                'deployment_id': deployment_id
+            }), 404
+
+        image = drbl_client.get_image_info(deployment.image_name) or {}
+        size = image.get('size_bytes') or 0
+        tuner = SessionTuner.from_config(current_app.config)
+        recommendation = tuner.recommend(size, deployment.target_count or 0,
+                                         deployment.image_name)
+        recommendation['image_compression'] = (
+            detect_compression(image['path']) if image.get('path') else None
+        )
+
+        return jsonify({
+            'success': True,
+            'deployment_id': deployment.id,
+            'image_name': deployment.image_name,
+            'image_size_bytes': size,
+            'auto_tune': bool(current_app.config.get('DEPLOYMENT_AUTO_TUNE')),
+            'recommendation': recommendation
+        }), 200
+
+    except Exception as e:
+        logger.error(f'Error getting deployment tuning: {e}')
+        return jsonify({
+            'error': 'Failed to get deployment tuning',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/deployment/sessions', methods=['GET'])
+def get_deployment_sessions():
+    """List recorded session metrics, newest first.
+
+    Query parameters:
+        - image_name: Only sessions of this image (optional)
+        - limit: Maximum number of sessions (default: 50, max: 500)
+
+    Returns:
+        JSON response with predicted vs actual durations and throughput
+    """
+    try:
+        try:
+            limit = int(request.args.get('limit', 50))
+        except ValueError:
+            return jsonify({
+                'error': 'limit must be an integer'
+            }), 400
+        limit = min(max(limit, 1), 500)
+
+        query = SessionMetric.query
+        image_name = request.args.get('image_name')
+        if image_name:
+            query = query.filter(SessionMetric.image_name == image_name)
+        sessions = query.order_by(SessionMetric.started_at.desc(),
+                                  SessionMetric.id.desc()).limit(limit).all()
+
+        return jsonify({
+            'success': True,
+            'count': len(sessions),
+            'sessions': [s.to_dict() for s in sessions]
+        }), 200
+
+    except Exception as e:
+        logger.error(f'Error getting deployment sessions: {e}')
+        return jsonify({
+            'error': 'Failed to get deployment sessions',
             'details': str(e)
         }), 500
 
@@ -416,13 +700,18 @@ def stop_deployment(deployment_id):
                 'current_status': deployment.status
             }), 400
 
+        # Cancel pending/running start jobs (DRBL is stopped below)
+        for job in Job.get_active_for_deployment(deployment.id):
+            job_runner.cancel(job.id, invoke_handler=False)
+
         # Stop actual DRBL deployment
         try:
-            result = drbl_client.stop_deployment()
+            result = drbl_client.stop_deployment(deployment_id=deployment.id)
 
             # Update status
             deployment.status = 'failed'
             deployment.completed_at = datetime.utcnow()
+            SessionMetric.finish(deployment)
             db.session.commit()
 
             logger.warning(f'Stopping deployment: {deployment.name} (ID: {deployment.id})')
@@ -440,6 +729,7 @@ def stop_deployment(deployment_id):
             # Update status anyway
             deployment.status = 'failed'
             deployment.completed_at = datetime.utcnow()
+            SessionMetric.finish(deployment)
             db.session.commit()
 
             return jsonify({
@@ -504,6 +794,10 @@ def update_deployment(deployment_id):
                 deployment.completed_at = datetime.utcnow()
                 deployment.progress = 100
 
+            if deployment.status in ['completed', 'failed']:
+                SessionMetric.finish(deployment)
+                drbl_client.progress.end(deployment.id)
+
         if 'progress' in data:
             deployment.progress = int(data['progress'])
 
@@ -569,3 +863,157 @@ def delete_deployment(deployment_id):
             'error': 'Failed to delete deployment',
             'details': str(e)
         }), 500
+
+
+def _unicast_target_mac(deployment):
+    """Get the MAC address of the first target of a unicast deployment.
+
+    Args:
+        deployment: Deployment object
+
+    Returns:
+        MAC address or None if the first target has none
+    """
+    if not deployment.targets:
+        return None
+    target = deployment.targets[0]
+    if not target.mac_address and target.serial:
+        # PC MAC registered after the deployment was created
+        pc = PCMaster.find_by_serial(target.serial)
+        target.mac_address = normalize_mac(pc.mac_address) if pc else None
+    return target.mac_address
+
+
+def _session_settings(deployment):
+    """Get the DRBL settings of a deployment's next session.
+
+    The session tuner's recommendation is used if DEPLOYMENT_AUTO_TUNE is
+    set; otherwise the fixed defaults, with the tuner's prediction for them.
+
+    Args:
+        deployment: Deployment object
+
+    Returns:
+        Dictionary with clients_to_wait, max_wait_time, compression,
+        image_size_bytes, predicted_seconds and auto_tuned
+    """
+    image = drbl_client.get_image_info(deployment.image_name) or {}
+    size = image.get('size_bytes') or 0
+    compression = detect_compression(image['path']) if image.get('path') else None
+    tuner = SessionTuner.from_config(current_app.config)
+
+    if deployment.mode != 'multicast':
+        model = tuner.fit(deployment.image_name, mode=deployment.mode)
+        return {
+            'clients_to_wait': 1,
+            'max_wait_time': None,
+            'compression': compression,
+            'image_size_bytes': size,
+            'predicted_seconds': round(model.wave_seconds(size, 1), 1),
+            'auto_tuned': False
+        }
+
+    if current_app.config.get('DEPLOYMENT_AUTO_TUNE'):
+        recommendation = tuner.recommend(size, deployment.target_count or 0,
+                                         deployment.image_name)
+        clients = recommendation['clients_to_wait']
+        max_wait = recommendation['max_wait_time']
+        predicted = recommendation['predicted_seconds']
+    else:
+        clients = deployment.target_count or 10
+        max_wait = 300
+        model = tuner.fit(deployment.image_name)
+        predicted = round(model.wave_seconds(size, clients, max_wait), 1)
+
+    return {
+        'clients_to_wait': clients,
+        'max_wait_time': max_wait,
+        'compression': compression,
+        'image_size_bytes': size,
+        'predicted_seconds': predicted,
+        'auto_tuned': bool(current_app.config.get('DEPLOYMENT_AUTO_TUNE'))
+    }
+
+
+def run_start_deployment(job):
+    """Job handler: start the DRBL deployment for job.deployment_id.
+
+    Args:
+        job: Job object
+
+    Returns:
+        DRBL command result dictionary
+
+    Raises:
+        DRBLException: If the DRBL command fails (deployment marked failed)
+    """
+    deployment = db.session.get(Deployment, job.deployment_id)
+
+    if not deployment:
+        raise ValueError(f'Deployment not found: {job.deployment_id}')
+
+    # Record the session settings and prediction for the tuner
+    settings = _session_settings(deployment)
+    SessionMetric.begin(deployment, settings)
+    db.session.commit()
+
+    # Follow progress logs of this deployment's targets from this point on
+    drbl_client.progress.begin(deployment.id, **deployment.progress_scope())
+
+    try:
+        if deployment.mode == 'multicast':
+            # Start multicast deployment
+            result = drbl_client.start_multicast_deployment(
+                image_name=deployment.image_name,
+                clients_to_wait=settings['clients_to_wait'],
+                max_wait_time=settings['max_wait_time'],
+                compression=settings['compression'],
+                deployment_id=deployment.id,
+                mcast_port=deployment.mcast_port
+            )
+        else:
+            # Start unicast deployment to the first target
+            target_mac = _unicast_target_mac(deployment)
+            if target_mac is None:
+                raise DRBLException('Unicast deployment requires a target PC with a MAC address')
+
+            result = drbl_client.start_unicast_deployment(
+                image_name=deployment.image_name,
+                target_mac=target_mac,
+                deployment_id=deployment.id
+            )
+
+    except DRBLException as e:
+        # Rollback status on DRBL error
+        deployment.status = 'failed'
+        deployment.completed_at = datetime.utcnow()
+        SessionMetric.finish(deployment)
+        db.session.commit()
+        drbl_client.progress.end(deployment.id)
+
+        logger.error(f'DRBL deployment failed: {str(e)}')
+        raise
+
+    logger.info(f'DRBL deployment started: {result}')
+    return result
+
+
+def cancel_start_deployment(job):
+    """Job cancel handler: stop the DRBL session of the job's deployment.
+
+    Args:
+        job: Job object
+    """
+    try:
+        drbl_client.stop_deployment(deployment_id=job.deployment_id)
+    except DRBLException as e:
+        logger.error(f'Error stopping DRBL deployment: {str(e)}')
+
+
+job_runner.register(
+    'deployment.start',
+    run_start_deployment,
+    cancel=cancel_start_deployment
+)
+
+deployment_scheduler.register_client(drbl_client)
@@ -0,0 +1,131 @@
+"""Server-Sent Events API endpoints.
+
+GET /api/logs/stream
+GET /api/deployment/<id>/events
+Push setup-log and deployment progress deltas to dashboards instead of
+having every browser poll.
+"""
+import logging
+import queue
+from flask import Response, jsonify
+from . import api_bp
+from utils.event_stream import (
+    LOGS_CHANNEL,
+    deployment_channel,
+    event_broker,
+    format_sse
+)
+
+logger = logging.getLogger(__name__)
+
+# Reconnect delay sent to EventSource clients (milliseconds)
+SSE_RETRY_MS = 3000
+
+# Retry-After (seconds) when this worker has no stream slot left
+STREAM_RETRY_AFTER = 30
+
+
+def _streams_full():
+    """Build a 503 response for a worker at EVENT_MAX_STREAMS."""
+    response = jsonify({
+        'error': 'Service Unavailable',
+        'message': 'Too many event streams open, poll the REST API instead',
+        'retry_after': STREAM_RETRY_AFTER
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(STREAM_RETRY_AFTER)
+    return response
+
+
+def _event_stream(sub, initial=None):
+    """Create a streaming SSE response for a subscription.
+
+    Args:
+        sub: Subscription object
+        initial: Optional (event, data) sent immediately
+
+    Returns:
+        Flask streaming Response
+    """
+    heartbeat = event_broker.heartbeat
+
+    def generate():
+        try:
+            yield f'retry: {SSE_RETRY_MS}\n\n'
+            if initial is not None:
+                yield format_sse(*initial)
+            while True:
+                try:
+                    event, data = sub.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing the connection
+                    yield ': keepalive\n\n'
+                    continue
+                yield format_sse(event, data)
+        finally:
+            event_broker.unsubscribe(sub)
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@api_bp.route('/logs/stream', methods=['GET'])
+def stream_logs():
+    """Stream new setup log entries.
+
+    Events:
+        log: Setup log entry (same fields as SetupLog.to_dict())
+        resync: Client fell behind; reload current state
+
+    Returns:
+        text/event-stream response, or 503 JSON if EVENT_MAX_STREAMS
+        streams are open in this worker
+    """
+    sub = event_broker.subscribe(LOGS_CHANNEL)
+    if sub is None:
+        return _streams_full()
+
+    logger.info(f'SSE subscriber added - channel={LOGS_CHANNEL}')
+
+    return _event_stream(sub)
+
+
+@api_bp.route('/deployment/<int:deployment_id>/events', methods=['GET'])
+def stream_deployment_events(deployment_id):
+    """Stream status and progress changes of a deployment.
+
+    Args:
+        deployment_id: Deployment ID
+
+    Events:
+        status: Deployment status, progress, target summary and DRBL progress
+            (sent on connect and whenever it changes)
+        log: Setup log entry of one of the deployment's target PCs
+        resync: Client fell behind; reload current state
+
+    Returns:
+        text/event-stream response, 404 JSON, or 503 JSON if
+        EVENT_MAX_STREAMS streams are open in this worker
+    """
+    snapshot = event_broker.deployment_snapshot(deployment_id)
+
+    if snapshot is None:
+        return jsonify({
+            'error': 'Deployment not found',
+            'deployment_id': deployment_id
+        }), 404
+
+    channel = deployment_channel(deployment_id)
+    sub = event_broker.subscribe(channel)
+    if sub is None:
+        return _streams_full()
+
+    logger.info(f'SSE subscriber added - channel={channel}')
+
+    return _event_stream(sub, initial=('status', snapshot))
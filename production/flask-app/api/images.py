@@ -1,12 +1,20 @@
 """Clonezilla Master Image Management API endpoints."""
 import os
+import json
 import logging
 import shutil
+import threading
 from pathlib import Path
 from datetime import datetime
 from flask import request, jsonify, current_app
 from . import api_bp
+from models import db
+from models.deployment import Deployment
+from models.job import Job
 from utils.drbl_client import DRBLClient
+from utils.image_scanner import ImageScanner, ScanCancelled
+from utils.image_trash import ImageTrash, PurgeCancelled
+from utils.job_queue import JobCancelled, job_runner
 
 logger = logging.getLogger(__name__)
 
@@ -139,7 +147,8 @@ def get_image_details(image_name):
             'filesystems': clonezilla_info.get('filesystems', ''),
             'metadata': clonezilla_info.get('metadata', ''),
             'files': files,
-            'file_count': len(files)
+            'file_count': len(files),
+            'verification': drbl_client.catalog.get_verification(image_name)
         }
 
         return jsonify({
@@ -155,6 +164,94 @@ def get_image_details(image_name):
         }), 500
 
 
+@api_bp.route('/images/<image_name>/verify', methods=['POST'])
+def verify_image(image_name):
+    """Start verification of an image's sizes and checksums.
+
+    Chunk files are hashed in parallel by a background job and checked
+    against the image's checksum lists (MD5SUMS, SHA1SUMS, ...) if any.
+    The result is stored in the image catalog.
+
+    Args:
+        image_name: Name of the image directory
+
+    Returns:
+        JSON response with the queued job
+
+    Status Codes:
+        202: Verification queued
+        404: Image not found
+        409: Verification already running
+    """
+    try:
+        if not drbl_client.get_image_info(image_name):
+            return jsonify({
+                'error': 'Image not found',
+                'image_name': image_name
+            }), 404
+
+        active = Job.query.filter(
+            Job.job_type == 'image.verify',
+            Job.status.in_(Job.ACTIVE_STATUSES),
+            Job.params == _verify_params(image_name)
+        ).first()
+        if active:
+            return jsonify({
+                'error': 'Verification already running',
+                'job': active.to_dict()
+            }), 409
+
+        job = job_runner.submit('image.verify', params={'image_name': image_name})
+        db.session.refresh(job)
+
+        return jsonify({
+            'success': True,
+            'message': 'Image verification queued',
+            'job': job.to_dict()
+        }), 202
+
+    except Exception as e:
+        logger.error(f'Error starting image verification: {e}')
+        return jsonify({
+            'error': 'Failed to start image verification',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/images/<image_name>/verify', methods=['GET'])
+def get_image_verification(image_name):
+    """Get the last verification result of an image.
+
+    Args:
+        image_name: Name of the image directory
+
+    Returns:
+        JSON response with the verification result
+
+    Status Codes:
+        200: Success
+        404: Image not found or not verified since it last changed
+    """
+    if not drbl_client.get_image_info(image_name):
+        return jsonify({
+            'error': 'Image not found',
+            'image_name': image_name
+        }), 404
+
+    verification = drbl_client.catalog.get_verification(image_name)
+    if verification is None:
+        return jsonify({
+            'error': 'Image not verified',
+            'image_name': image_name
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'image_name': image_name,
+        'verification': verification
+    }), 200
+
+
 @api_bp.route('/images', methods=['POST'])
 def register_image():
     """Register a new master image.
@@ -355,6 +452,7 @@ def upload_image():
                 }), 409
 
             shutil.move(str(source_dir), str(target_path))
+            drbl_client.catalog.invalidate(image_name)
 
             logger.info(f"Image extracted to: {target_path}")
 
@@ -393,13 +491,22 @@ def upload_image():
 def delete_image(image_name):
     """Delete a master image.
 
-    WARNING: This will permanently delete the image directory and all its contents.
+    The image directory is moved into the trash (an atomic rename) and the
+    response is returned immediately; the disk space is reclaimed by a
+    throttled background job (poll it with GET /api/jobs/<id>).
+
+    WARNING: This permanently deletes the image directory and all its contents.
 
     Args:
         image_name: Name of the image directory
 
     Returns:
-        JSON response with deletion result
+        JSON response with the queued purge job
+
+    Status Codes:
+        202: Image moved to trash, purge queued
+        404: Image not found
+        409: Image is used by a pending or running deployment
     """
     try:
         # Get image info using DRBL client
@@ -411,20 +518,35 @@ def delete_image(image_name):
                 'image_name': image_name
             }), 404
 
-        image_path = Path(image_info['path'])
-        size_bytes = image_info['size_bytes']
+        in_use = Deployment.query.filter(
+            Deployment.image_name == image_name,
+            Deployment.status.in_(['pending', 'queued', 'running'])
+        ).all()
+        if in_use:
+            return jsonify({
+                'error': 'Image is used by an active deployment',
+                'image_name': image_name,
+                'deployments': [d.id for d in in_use]
+            }), 409
 
-        # Delete directory and all contents
-        shutil.rmtree(image_path)
+        trash_path = ImageTrash(drbl_client.image_home).move(image_name)
+        drbl_client.catalog.invalidate(image_name)
 
-        logger.warning(f"Image deleted: {image_name} ({image_info['size_human']})")
+        logger.warning(f"Image moved to trash: {image_name} ({image_info['size_human']})")
+
+        job = job_runner.submit('image.purge', params={
+            'image_name': image_name,
+            'trash_name': trash_path.name
+        })
+        db.session.refresh(job)
 
         return jsonify({
             'success': True,
-            'message': 'Image deleted successfully',
+            'message': 'Image deleted, space is reclaimed in the background',
             'image_name': image_name,
-            'size_freed': image_info['size_human']
-        }), 200
+            'size_freed': image_info['size_human'],
+            'job': job.to_dict()
+        }), 202
 
     except Exception as e:
         logger.error(f'Error deleting image: {e}')
@@ -432,3 +554,171 @@ def delete_image(image_name):
             'error': 'Failed to delete image',
             'details': str(e)
         }), 500
+
+
+# Cancellation flags of running verification jobs (job ID -> event)
+_verify_cancel_events = {}
+
+
+def _verify_params(image_name):
+    """JSON params of a verification job (as stored by job_runner.submit)."""
+    return json.dumps({'image_name': image_name})
+
+
+def run_verify_image(job):
+    """Job handler: scan and verify an image.
+
+    Args:
+        job: Job object
+
+    Returns:
+        Verification summary dictionary
+
+    Raises:
+        ValueError: If the image does not exist
+        JobCancelled: If the job was cancelled
+    """
+    image_name = job.get_params().get('image_name')
+    image_info = drbl_client.get_image_info(image_name)
+    if not image_info:
+        raise ValueError(f'Image not found: {image_name}')
+
+    signature = drbl_client.catalog.signature(image_name)
+    scanner = ImageScanner(workers=current_app.config.get('IMAGE_SCAN_WORKERS', 4))
+    cancel_event = _verify_cancel_events.setdefault(job.id, threading.Event())
+
+    # The scan runs for minutes: do not hold a database connection meanwhile
+    db.session.commit()
+
+    try:
+        result = scanner.scan(image_info['path'], cancel_event=cancel_event)
+    except ScanCancelled as e:
+        raise JobCancelled(str(e))
+    finally:
+        _verify_cancel_events.pop(job.id, None)
+
+    stored = drbl_client.catalog.set_verification(image_name, result, signature)
+
+    logger.info(
+        f"Image verified: {image_name} verified={result['verified']} "
+        f"{result['throughput_mb_s']} MB/s ({result['workers']} workers)"
+    )
+
+    return {
+        'image_name': image_name,
+        'verified': result['verified'],
+        'mismatches': result['mismatches'],
+        'missing': result['missing'],
+        'size_bytes': result['size_bytes'],
+        'hashed_bytes': result['hashed_bytes'],
+        'duration_seconds': result['duration_seconds'],
+        'throughput_mb_s': result['throughput_mb_s'],
+        'stored': stored
+    }
+
+
+def cancel_verify_image(job):
+    """Job cancel handler: stop the running scan.
+
+    Args:
+        job: Job object
+    """
+    cancel_event = _verify_cancel_events.get(job.id)
+    if cancel_event is not None:
+        cancel_event.set()
+
+
+job_runner.register(
+    'image.verify',
+    run_verify_image,
+    cancel=cancel_verify_image
+)
+
+
+# Cancellation flags of running purge jobs (job ID -> event)
+_purge_cancel_events = {}
+
+
+def _deployment_running():
+    """Whether a deployment is running (reads the image disk)."""
+    running = Deployment.query.filter_by(status='running').count() > 0
+    db.session.commit()
+    return running
+
+
+def run_purge_image(job):
+    """Job handler: reclaim the space of a trashed image.
+
+    Files are removed at IMAGE_PURGE_RATE_MB and reclamation waits while a
+    deployment is running. Without trash_name the whole trash is purged.
+
+    Args:
+        job: Job object
+
+    Returns:
+        Purge statistics dictionary
+
+    Raises:
+        JobCancelled: If the job was cancelled
+    """
+    params = job.get_params()
+    trash = ImageTrash(drbl_client.image_home)
+
+    if params.get('trash_name'):
+        path = trash.resolve(params['trash_name'])
+        paths = [path] if path else []
+    else:
+        paths = trash.entries()
+
+    rate_bytes = current_app.config.get('IMAGE_PURGE_RATE_MB', 100) * 1024 * 1024
+    pause_poll = current_app.config.get('IMAGE_PURGE_DEFER_POLL', 10)
+    cancel_event = _purge_cancel_events.setdefault(job.id, threading.Event())
+    job_id = job.id
+    totals = {'bytes_freed': 0, 'files_removed': 0, 'paused_seconds': 0.0}
+
+    try:
+        for path in paths:
+            stats = ImageTrash.purge(
+                path,
+                rate_bytes=rate_bytes,
+                cancel_event=cancel_event,
+                progress=lambda p, name=path.name: job_runner.report_progress(
+                    job_id, {**p, 'trash_name': name}
+                ),
+                pause=_deployment_running,
+                pause_poll=pause_poll
+            )
+            for key in totals:
+                totals[key] += stats[key]
+            logger.info(
+                f"Image trash purged: {path.name} ({stats['bytes_freed']} bytes "
+                f"in {stats['duration_seconds']}s, deferred {stats['paused_seconds']}s)"
+            )
+    except PurgeCancelled as e:
+        raise JobCancelled(str(e))
+    finally:
+        _purge_cancel_events.pop(job_id, None)
+
+    return {
+        'image_name': params.get('image_name'),
+        'purged': [path.name for path in paths],
+        **totals
+    }
+
+
+def cancel_purge_image(job):
+    """Job cancel handler: stop reclamation (the image stays in the trash).
+
+    Args:
+        job: Job object
+    """
+    cancel_event = _purge_cancel_events.get(job.id)
+    if cancel_event is not None:
+        cancel_event.set()
+
+
+job_runner.register(
+    'image.purge',
+    run_purge_image,
+    cancel=cancel_purge_image
+)
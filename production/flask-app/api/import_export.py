@@ -1,15 +1,13 @@
 """CSV Import/Export API endpoints."""
 import csv
-import io
 import logging
-from datetime import datetime
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from sqlalchemy.exc import IntegrityError
 from . import api_bp
 from models import db
-from models.pc_master import PCMaster
-from api.validators import validate_serial, validate_pcname
+from utils.csv_import import CSVEncodingError, import_rows, iter_csv_lines
+from utils.export import ExportOptions, iter_export
 
 logger = logging.getLogger(__name__)
 
@@ -48,9 +46,8 @@ def import_csv():
                 'field': 'file'
             }), 400
 
-        # Read and parse CSV
-        stream = io.StringIO(file.stream.read().decode('UTF-8'), newline=None)
-        csv_reader = csv.DictReader(stream)
+        # Decode and parse CSV incrementally
+        csv_reader = csv.DictReader(iter_csv_lines(file.stream))
 
         # Validate CSV headers
         required_headers = {'serial', 'pcname'}
@@ -64,113 +61,42 @@ def import_csv():
                 'found_headers': list(headers)
             }), 400
 
-        # Process CSV rows
-        success_count = 0
-        error_count = 0
-        errors = []
-        duplicates = []
-        imported_records = []
-
-        for row_num, row in enumerate(csv_reader, start=2):  # Start from 2 (1 is header)
-            try:
-                serial = row.get('serial', '').strip()
-                pcname = row.get('pcname', '').strip()
-                odj_path = row.get('odj_path', '').strip() or None
-
-                # Validate data
-                if not serial:
-                    errors.append({
-                        'row': row_num,
-                        'error': 'Serial number is required',
-                        'data': row
-                    })
-                    error_count += 1
-                    continue
-
-                if not pcname:
-                    errors.append({
-                        'row': row_num,
-                        'error': 'PC name is required',
-                        'data': row
-                    })
-                    error_count += 1
-                    continue
-
-                # Validate serial format
-                if not validate_serial(serial):
-                    errors.append({
-                        'row': row_num,
-                        'error': 'Invalid serial number format',
-                        'data': row
-                    })
-                    error_count += 1
-                    continue
-
-                # Validate PC name format
-                if not validate_pcname(pcname):
-                    errors.append({
-                        'row': row_num,
-                        'error': 'Invalid PC name format (expected: YYYYMMDDM)',
-                        'data': row
-                    })
-                    error_count += 1
-                    continue
-
-                # Check for duplicates in database
-                existing = PCMaster.find_by_serial(serial)
-                if existing:
-                    duplicates.append({
-                        'row': row_num,
-                        'serial': serial,
-                        'existing_pcname': existing.pcname,
-                        'new_pcname': pcname
-                    })
-                    error_count += 1
-                    continue
-
-                # Create new PC record
-                pc = PCMaster(
-                    serial=serial,
-                    pcname=pcname,
-                    odj_path=odj_path
-                )
-
-                db.session.add(pc)
-                imported_records.append({
-                    'row': row_num,
-                    'serial': serial,
-                    'pcname': pcname
-                })
-                success_count += 1
-
-            except Exception as e:
-                logger.error(f'Error processing row {row_num}: {e}')
-                errors.append({
-                    'row': row_num,
-                    'error': str(e),
-                    'data': row
-                })
-                error_count += 1
-
-        # Commit transaction if any records were added
-        if success_count > 0:
-            try:
-                db.session.commit()
-                logger.info(f'CSV import completed: {success_count} records imported')
-            except IntegrityError as e:
-                db.session.rollback()
-                logger.error(f'Database integrity error during CSV import: {e}')
-                return jsonify({
-                    'error': 'Database integrity error. Some records may have duplicate serial numbers.',
-                    'details': str(e)
-                }), 500
-            except Exception as e:
-                db.session.rollback()
-                logger.error(f'Error committing CSV import: {e}')
-                return jsonify({
-                    'error': 'Failed to save imported records',
-                    'details': str(e)
-                }), 500
+        # Validate and bulk insert in batches
+        try:
+            result = import_rows(csv_reader)
+            if result.success_count > 0:
+                logger.info(f'CSV import completed: {result.success_count} records imported')
+        except CSVEncodingError as e:
+            db.session.rollback()
+            logger.warning(f'CSV import rejected: {e}')
+            return jsonify({
+                'error': str(e),
+                'field': 'file',
+                'row': e.row
+            }), 400
+        except IntegrityError as e:
+            db.session.rollback()
+            logger.error(f'Database integrity error during CSV import: {e}')
+            return jsonify({
+                'error': 'Database integrity error. Some records may have duplicate serial numbers.',
+                'details': str(e)
+            }), 500
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'Error committing CSV import: {e}')
+            return jsonify({
+                'error': 'Failed to save imported records',
+                'details': str(e)
+            }), 500
+
+        success_count = result.success_count
+        error_count = result.error_count
+        errors = result.errors
+        duplicates = [
+            {key: value for key, value in duplicate.items() if key != 'data'}
+            for duplicate in result.duplicates[:10]
+        ]
+        imported_records = result.imported
 
         # Return results
         return jsonify({
@@ -179,7 +105,7 @@ def import_csv():
                 'total_rows': success_count + error_count,
                 'success_count': success_count,
                 'error_count': error_count,
-                'duplicate_count': len(duplicates)
+                'duplicate_count': len(result.duplicates)
             },
             'imported_records': imported_records[:10],  # Show first 10
             'errors': errors[:10],  # Show first 10 errors
@@ -197,44 +123,52 @@ def import_csv():
 
 
 @api_bp.route('/export/csv', methods=['GET'])
+@api_bp.route('/pcs/export', methods=['GET'])
 def export_csv():
-    """Export PC data to CSV format.
+    """Export PC data as a streamed CSV or NDJSON file.
+
+    Rows are streamed from a server-side cursor, so memory use does not
+    grow with the number of PCs.
+
+    Query Parameters:
+        format (str): csv (default) or ndjson
+        columns (str): Comma separated columns (default:
+            serial,pcname,odj_path,created_at). Also available: id,
+            updated_at, latest_status, latest_step, latest_timestamp,
+            latest_error
+        compress (str): gzip to compress on the fly
+        odj (str): missing or present
+        status (str): Latest setup status (pending/in_progress/completed/
+            failed) or none for PCs without logs
+        serial (str): Serial number prefix
+        pcname (str): PC name prefix
+        order (str): asc (default) or desc by registration
 
     Returns:
-        CSV file with PC data
+        Streamed export file
     """
     try:
-        # Get all PC records
-        pcs = PCMaster.query.order_by(PCMaster.created_at.desc()).all()
-
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header
-        writer.writerow(['serial', 'pcname', 'odj_path', 'created_at'])
-
-        # Write data
-        for pc in pcs:
-            writer.writerow([
-                pc.serial,
-                pc.pcname,
-                pc.odj_path or '',
-                pc.created_at.isoformat() if pc.created_at else ''
-            ])
-
-        # Prepare response
-        output.seek(0)
-        response = current_app.make_response(output.getvalue())
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = f'attachment; filename=pc_master_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-
-        logger.info(f'CSV export completed: {len(pcs)} records')
-        return response
-
-    except Exception as e:
-        logger.error(f'CSV export error: {e}')
+        options = ExportOptions(request.args)
+    except ValueError as e:
         return jsonify({
-            'error': 'Failed to export CSV',
+            'error': 'Invalid export options',
             'details': str(e)
-        }), 500
+        }), 400
+
+    logger.info(
+        f'Export started: format={options.format} columns={",".join(options.columns)} '
+        f'compress={options.compress} odj={options.odj} status={options.status}'
+    )
+
+    response = Response(
+        stream_with_context(iter_export(
+            options,
+            chunk_size=current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+        )),
+        mimetype=options.mimetype
+    )
+    response.headers['Content-Type'] = options.mimetype
+    response.headers['Content-Disposition'] = f'attachment; filename={options.filename()}'
+    # Let nginx pass chunks through instead of buffering the whole file
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
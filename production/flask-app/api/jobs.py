@@ -0,0 +1,131 @@
+"""Background Job API endpoints.
+
+GET /api/jobs/<id>
+Poll the status of a long-running operation started by another endpoint
+(e.g. POST /api/deployment/<id>/start).
+"""
+import logging
+from flask import request, jsonify
+from . import api_bp
+from models import db
+from models.job import Job
+from utils.job_queue import job_runner
+
+logger = logging.getLogger(__name__)
+
+
+@api_bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """List background jobs.
+
+    Query parameters:
+        - status: Filter by status (optional)
+        - deployment_id: Filter by deployment ID (optional)
+        - limit: Number of records to return (default: 50)
+
+    Returns:
+        JSON response with list of jobs and queue statistics
+    """
+    try:
+        status = request.args.get('status', '').strip()
+        deployment_id = request.args.get('deployment_id', type=int)
+        limit = int(request.args.get('limit', 50))
+
+        query = Job.query
+
+        if status:
+            query = query.filter_by(status=status)
+
+        if deployment_id is not None:
+            query = query.filter_by(deployment_id=deployment_id)
+
+        jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+
+        return jsonify({
+            'success': True,
+            'count': len(jobs),
+            'jobs': [job.to_dict() for job in jobs],
+            'stats': job_runner.stats()
+        }), 200
+
+    except Exception as e:
+        logger.error(f'Error listing jobs: {e}')
+        return jsonify({
+            'error': 'Failed to list jobs',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get background job status.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        JSON response with job details
+
+    Status Codes:
+        200: Success
+        404: Job not found
+    """
+    job = db.session.get(Job, job_id)
+
+    if not job:
+        return jsonify({
+            'error': 'Job not found',
+            'job_id': job_id
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'job': job.to_dict()
+    }), 200
+
+
+@api_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        JSON response with updated job
+
+    Status Codes:
+        200: Cancellation requested
+        400: Job already finished
+        404: Job not found
+    """
+    try:
+        job = db.session.get(Job, job_id)
+
+        if not job:
+            return jsonify({
+                'error': 'Job not found',
+                'job_id': job_id
+            }), 404
+
+        if not job.is_active:
+            return jsonify({
+                'error': 'Job is not active',
+                'current_status': job.status
+            }), 400
+
+        job = job_runner.cancel(job_id)
+
+        return jsonify({
+            'success': True,
+            'message': 'Job cancellation requested',
+            'job': job.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error cancelling job: {e}')
+        return jsonify({
+            'error': 'Failed to cancel job',
+            'details': str(e)
+        }), 500
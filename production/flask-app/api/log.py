@@ -1,14 +1,22 @@
 """Setup Log API endpoint.
 
 POST /api/log
+POST /api/log/batch
 Records setup progress logs.
+
+GET /api/log/archive
+Reads setup logs moved to the archive by retention.
 """
+import json
 import logging
 import re
 from datetime import datetime
 from flask import request, jsonify, current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from . import api_bp
-from models import db, SetupLog
+from models import db, SetupLog, PCStatus, LogIdempotencyKey, DeploymentTarget
+from utils.log_retention import log_retention
 
 logger = logging.getLogger(__name__)
 
@@ -195,3 +203,311 @@ def create_log():
             'error': 'Internal Server Error',
             'message': 'An unexpected error occurred while creating log entry'
         }), 500
+
+
+def parse_batch_body():
+    """Parse a batch request body (JSON array or NDJSON).
+
+    Accepted formats:
+        - JSON array of log entries
+        - JSON object with a "logs" array
+        - NDJSON (application/x-ndjson), one log entry per line
+
+    Returns:
+        tuple: (entries, error_message) where entries is a list of
+        (entry, parse_error) tuples
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        entries = []
+        for line_num, line in enumerate(request.get_data(as_text=True).splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append((json.loads(line), None))
+            except ValueError:
+                entries.append((None, f"Invalid JSON on line {line_num}"))
+        return entries, None
+
+    data = request.get_json(silent=True)
+
+    if isinstance(data, dict):
+        data = data.get('logs')
+
+    if not isinstance(data, list):
+        return None, 'Request body must be a JSON array, {"logs": [...]} or NDJSON'
+
+    return [(entry, None) for entry in data], None
+
+
+def _insert_log_batch(pending, results):
+    """Insert validated log entries with one bulk statement.
+
+    Entries whose idempotency key is already stored (earlier request) or
+    repeated within the batch are reported as duplicates instead.
+
+    Args:
+        pending: List of (index, validated_data, idempotency_key)
+        results: Per-item result list to fill in
+
+    Raises:
+        IntegrityError: If a concurrent request stored one of the keys
+    """
+    keys = [key for _, _, key in pending if key]
+    existing = LogIdempotencyKey.find_existing(keys) if keys else {}
+
+    to_insert = []
+    first_index = {}
+    for index, validated_data, key in pending:
+        if key in existing:
+            results[index] = {
+                'index': index,
+                'status': 'duplicate',
+                'log_id': existing[key]
+            }
+        elif key and key in first_index:
+            results[index] = {
+                'index': index,
+                'status': 'duplicate',
+                'duplicate_of': first_index[key]
+            }
+        else:
+            if key:
+                first_index[key] = index
+            to_insert.append((index, validated_data, key))
+
+    if to_insert:
+        log_ids = db.session.execute(
+            insert(SetupLog).returning(SetupLog.id, sort_by_parameter_order=True),
+            [validated_data for _, validated_data, _ in to_insert]
+        ).scalars().all()
+
+        key_rows = [
+            {'key': key, 'log_id': log_id}
+            for (_, _, key), log_id in zip(to_insert, log_ids)
+            if key
+        ]
+        if key_rows:
+            db.session.execute(insert(LogIdempotencyKey), key_rows)
+
+        # Bulk inserts bypass mapper events: maintain pc_status and
+        # deployment targets explicitly
+        PCStatus.record(db.session.connection(), [
+            {
+                'serial': validated_data['serial'],
+                'pcname': validated_data['pcname'],
+                'status': validated_data['status'],
+                'step': validated_data['step'],
+                'timestamp': validated_data['timestamp'],
+                'log_id': log_id,
+                'error_message': validated_data['error_message']
+            }
+            for (_, validated_data, _), log_id in zip(to_insert, log_ids)
+        ])
+        DeploymentTarget.record_setup_logs(db.session.connection(), [
+            {
+                'serial': validated_data['serial'],
+                'status': validated_data['status'],
+                'timestamp': validated_data['timestamp']
+            }
+            for _, validated_data, _ in to_insert
+        ])
+
+        for (index, _, _), log_id in zip(to_insert, log_ids):
+            results[index] = {
+                'index': index,
+                'status': 'created',
+                'log_id': log_id
+            }
+
+    db.session.commit()
+
+    # Resolve in-batch duplicates to the log created for the first entry
+    for result in results:
+        if result and 'duplicate_of' in result:
+            result['log_id'] = results[result.pop('duplicate_of')].get('log_id')
+
+
+@api_bp.route('/log/batch', methods=['POST'])
+def create_log_batch():
+    """Create multiple setup log entries in one transaction.
+
+    Request Body (JSON array, {"logs": [...]} or NDJSON):
+        [
+            {
+                "serial": "ABC123456",
+                "pcname": "20251116M",
+                "status": "in_progress",
+                "timestamp": "2025-11-16 12:30:00",
+                "step": "windows_update",
+                "idempotency_key": "3f1c...-0001"   # Optional, up to 64 chars
+            },
+            ...
+        ]
+
+    Headers:
+        Idempotency-Key (optional): Batch key; entries without their own
+            key use "<Idempotency-Key>:<index>"
+
+    Entries are validated with validate_log_data(); valid entries are
+    inserted with a single bulk statement. Resending an entry with the
+    same idempotency key returns its existing log_id as a duplicate.
+
+    Returns:
+        JSON response with per-item results
+        {
+            "result": "ok",
+            "received": 2,
+            "created": 1,
+            "duplicates": 1,
+            "invalid": 0,
+            "results": [
+                {"index": 0, "status": "created", "log_id": 124},
+                {"index": 1, "status": "duplicate", "log_id": 123}
+            ]
+        }
+
+    Status Codes:
+        200: Batch processed (see per-item results)
+        400: Bad Request - Body is not a JSON array or NDJSON
+        413: Payload Too Large - More than LOG_BATCH_MAX_ITEMS entries
+        500: Internal Server Error
+    """
+    entries, error_message = parse_batch_body()
+
+    if entries is None:
+        logger.warning(f"Invalid batch body - IP={request.remote_addr} - error={error_message}")
+        return jsonify({
+            'error': 'Bad Request',
+            'message': error_message
+        }), 400
+
+    max_items = current_app.config.get('LOG_BATCH_MAX_ITEMS', 1000)
+    if len(entries) > max_items:
+        return jsonify({
+            'error': 'Payload Too Large',
+            'message': f'Batch must contain at most {max_items} entries'
+        }), 413
+
+    logger.info(f"POST /api/log/batch - entries={len(entries)} - IP={request.remote_addr}")
+
+    batch_key = request.headers.get('Idempotency-Key')
+    results = [None] * len(entries)
+    pending = []
+
+    # Validate all entries in one pass
+    for index, (entry, parse_error) in enumerate(entries):
+        if parse_error is None and not isinstance(entry, dict):
+            parse_error = "Log entry must be a JSON object"
+
+        if parse_error:
+            results[index] = {'index': index, 'status': 'invalid', 'message': parse_error}
+            continue
+
+        is_valid, error_message, validated_data = validate_log_data(entry)
+
+        key = entry.get('idempotency_key')
+        if key is None and batch_key:
+            key = f'{batch_key}:{index}'
+
+        if is_valid and key is not None and (
+                not isinstance(key, str) or not 1 <= len(key) <= 64):
+            is_valid = False
+            error_message = "Idempotency key must be a string between 1 and 64 characters"
+
+        if not is_valid:
+            results[index] = {'index': index, 'status': 'invalid', 'message': error_message}
+            continue
+
+        pending.append((index, validated_data, key))
+
+    try:
+        try:
+            _insert_log_batch(pending, results)
+        except IntegrityError:
+            # A concurrent retry stored some of the keys first: re-resolve
+            db.session.rollback()
+            _insert_log_batch(pending, results)
+
+    except Exception as e:
+        db.session.rollback()
+
+        logger.error(f"Failed to create log batch - entries={len(entries)} - error={str(e)}",
+                     exc_info=True)
+
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'An unexpected error occurred while creating log entries'
+        }), 500
+
+    counts = {'created': 0, 'duplicate': 0, 'invalid': 0}
+    for result in results:
+        counts[result['status']] += 1
+
+    logger.info(
+        f"Log batch processed - created={counts['created']} "
+        f"duplicates={counts['duplicate']} invalid={counts['invalid']}"
+    )
+
+    return jsonify({
+        'result': 'ok',
+        'received': len(entries),
+        'created': counts['created'],
+        'duplicates': counts['duplicate'],
+        'invalid': counts['invalid'],
+        'results': results
+    }), 200
+
+
+@api_bp.route('/log/archive', methods=['GET'])
+def get_archived_logs():
+    """Get archived setup logs of a PC.
+
+    Query Parameters:
+        serial (str): PC serial number (required)
+        limit (int): Return only the newest entries (default: 1000, max: 10000)
+
+    Returns:
+        JSON response with archived log entries ordered by timestamp
+        {
+            "serial": "ABC123456",
+            "count": 2,
+            "logs": [...]
+        }
+
+    Status Codes:
+        200: Success
+        400: Bad Request - Missing serial or invalid limit
+        500: Internal Server Error
+    """
+    serial = request.args.get('serial', '').strip()
+    if not serial:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'serial is required'
+        }), 400
+
+    try:
+        limit = int(request.args.get('limit', 1000))
+        if limit < 1 or limit > 10000:
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'limit must be an integer between 1 and 10000'
+        }), 400
+
+    try:
+        logs = log_retention.read(serial, limit=limit)
+
+        return jsonify({
+            'serial': serial,
+            'count': len(logs),
+            'logs': logs
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Failed to read archived logs - serial={serial} error={str(e)}", exc_info=True)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'An unexpected error occurred while reading archived logs'
+        }), 500
@@ -2,18 +2,20 @@
 import os
 import logging
 from pathlib import Path
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, send_file
 from werkzeug.utils import secure_filename
 from . import api_bp
+from .pcinfo import validate_serial
 from models import db
+from models.odj_file import OdjFile
 from models.pc_master import PCMaster
 from utils.drbl_client import DRBLClient
+from utils.odj_blob_cache import odj_blob_cache, read_blob, refresh_hash, stored_hash
+from utils.odj_ingest import IngestError, OdjIngest
+from utils.pcinfo_cache import pcinfo_cache
 
 logger = logging.getLogger(__name__)
 
-# Initialize DRBL client
-drbl_client = DRBLClient()
-
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'txt', 'odj'}
 
@@ -93,6 +95,9 @@ def upload_odj():
         # Save file
         file_path = odj_dir / filename
         file.save(str(file_path))
+        odj_blob_cache.invalidate(str(file_path))
+        OdjFile.record(file_path)
+        db.session.commit()
 
         logger.info(f'ODJ file uploaded: {filename} ({file_size} bytes)')
 
@@ -144,21 +149,102 @@ def upload_odj():
         }), 500
 
 
+@api_bp.route('/odj/bulk', methods=['POST'])
+def bulk_upload_odj():
+    """Ingest a zip or tar archive of ODJ files and associate them with PCs.
+
+    The archive is the raw request body (or the 'file' field of a multipart
+    form) and is read as a stream. Files are matched to PCs by their name
+    without extension; all associations are applied in one transaction.
+
+    Query parameters:
+        - format: zip or tar (optional, detected from the content)
+        - match: Comma-separated PCMaster fields to match file names
+          against, in order (default: ODJ_INGEST_MATCH)
+        - dry_run: true to validate and match without writing (optional)
+
+    Returns:
+        JSON response with a summary and a report per archive entry
+    """
+    try:
+        if request.mimetype == 'multipart/form-data':
+            if 'file' not in request.files:
+                return jsonify({
+                    'error': 'No file provided',
+                    'field': 'file'
+                }), 400
+            stream = request.files['file'].stream
+        else:
+            stream = request.stream
+
+        archive_format = request.args.get('format') or None
+        if archive_format not in (None, 'zip', 'tar'):
+            return jsonify({
+                'error': 'Invalid format',
+                'allowed_values': ['zip', 'tar']
+            }), 400
+
+        match = request.args.get('match') or current_app.config.get(
+            'ODJ_INGEST_MATCH', 'pcname,serial'
+        )
+        rules = [rule.strip() for rule in match.split(',') if rule.strip()]
+        try:
+            ingest = OdjIngest(
+                current_app.config['ODJ_FILES_PATH'],
+                workers=current_app.config.get('ODJ_INGEST_WORKERS', 4),
+                rules=rules,
+                max_entries=current_app.config.get('ODJ_INGEST_MAX_ENTRIES', 5000)
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'field': 'match'
+            }), 400
+
+        dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+        result = ingest.ingest(stream, archive_format, dry_run=dry_run)
+        for entry in result['files']:
+            if entry.get('path'):
+                odj_blob_cache.invalidate(entry['path'])
+
+        return jsonify({
+            'success': True,
+            'summary': result['summary'],
+            'files': result['files']
+        }), 200
+
+    except IngestError as e:
+        logger.warning(f'ODJ archive rejected: {e}')
+        return jsonify({
+            'error': 'Invalid archive',
+            'details': str(e)
+        }), 400
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'ODJ bulk upload error: {e}')
+        return jsonify({
+            'error': 'Failed to ingest ODJ archive',
+            'details': str(e)
+        }), 500
+
+
 @api_bp.route('/odj/list', methods=['GET'])
 def list_odj_files():
     """List all ODJ files in the directory.
 
+    The inventory is synced with the directory first (files are only
+    re-hashed when changed), then files and their PCs are read in one join.
+
     Returns:
         JSON response with list of ODJ files
     """
     try:
-        # Use DRBL client to list ODJ files
-        odj_files = drbl_client.list_odj_files()
+        OdjFile.sync(current_app.config['ODJ_FILES_PATH'], ALLOWED_EXTENSIONS)
 
-        # Get associated PCs for each ODJ file
+        odj_files = OdjFile.inventory()
         for odj_file in odj_files:
-            pc = PCMaster.query.filter_by(odj_path=odj_file['path']).first()
-            odj_file['associated_pc'] = pc.to_dict() if pc else None
+            odj_file['size_human'] = DRBLClient._format_bytes(odj_file['size_bytes'])
 
         return jsonify({
             'success': True,
@@ -291,8 +377,11 @@ def delete_odj(filename):
             db.session.commit()
             logger.info(f'Removed ODJ associations for {len(associated_pcs)} PCs')
 
-        # Delete file
+        # Delete file and its inventory row
         file_path.unlink()
+        odj_blob_cache.invalidate(str(file_path))
+        OdjFile.remove(filename)
+        db.session.commit()
 
         logger.info(f'ODJ file deleted: {filename}')
 
@@ -310,3 +399,110 @@ def delete_odj(filename):
             'error': 'Failed to delete ODJ file',
             'details': str(e)
         }), 500
+
+
+def _blob_response(data, sha256, filename):
+    """Build a conditional in-memory blob response with a strong ETag."""
+    response = current_app.response_class(data, mimetype='application/octet-stream')
+    response.set_etag(sha256)
+    response.cache_control.no_cache = True
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response.make_conditional(request)
+
+
+@api_bp.route('/odj/blob/<serial>', methods=['GET'])
+def get_odj_blob(serial):
+    """Download the ODJ blob of a PC.
+
+    Small blobs are served from an in-memory cache after the first request
+    (no disk read); larger ones are sent with sendfile. The strong ETag is
+    the file's SHA-256 from the ODJ inventory, so agents revalidate with
+    If-None-Match and get 304 Not Modified while the blob is unchanged.
+
+    Args:
+        serial: PC serial number
+
+    Returns:
+        ODJ file contents (application/octet-stream), 304 or JSON error
+
+    Status Codes:
+        200: Blob returned
+        304: Not Modified (If-None-Match matches)
+        400: Invalid serial
+        404: PC not found, no ODJ file associated or file missing
+    """
+    is_valid, error_message = validate_serial(serial)
+    if not is_valid:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': error_message
+        }), 400
+
+    try:
+        cached = pcinfo_cache.get(serial)
+        if cached is not None:
+            odj_path = cached[1]
+        else:
+            generation = pcinfo_cache.generation
+            pc = PCMaster.find_by_serial(serial)
+            if pc is None:
+                return jsonify({
+                    'error': 'Not Found',
+                    'message': f'PC with serial number "{serial}" not found'
+                }), 404
+            pcinfo_cache.put(pc.serial, pc.pcname, pc.odj_path, generation=generation)
+            odj_path = pc.odj_path
+
+        if not odj_path:
+            return jsonify({
+                'error': 'Not Found',
+                'message': f'No ODJ file associated with serial number "{serial}"'
+            }), 404
+
+        filename = os.path.basename(odj_path)
+        odj_dir = current_app.config['ODJ_FILES_PATH']
+        blob = odj_blob_cache.get(odj_path)
+        if blob is None:
+            try:
+                st = os.stat(odj_path)
+            except FileNotFoundError:
+                st = None
+            if st is not None and not odj_blob_cache.cacheable(st.st_size):
+                response = send_file(
+                    odj_path,
+                    mimetype='application/octet-stream',
+                    as_attachment=True,
+                    download_name=filename,
+                    etag=stored_hash(odj_path, st) or refresh_hash(odj_path, odj_dir),
+                    conditional=True
+                )
+                response.cache_control.no_cache = True
+                return response
+            blob = read_blob(odj_path, odj_dir) if st is not None else None
+
+        if blob is None:
+            return jsonify({
+                'error': 'Not Found',
+                'message': 'ODJ file not found',
+                'odj_path': odj_path
+            }), 404
+
+        return _blob_response(blob.data, blob.sha256, filename)
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f'Error serving ODJ blob for {serial}: {e}')
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to serve ODJ blob'
+        }), 500
+
+
+@api_bp.route('/odj/blob/cache', methods=['GET'])
+def get_odj_blob_cache_stats():
+    """Get ODJ blob cache statistics.
+
+    Returns:
+        JSON response with cached bytes and hit/miss counters
+    """
+    return jsonify(odj_blob_cache.stats()), 200
@@ -7,16 +7,16 @@ DELETE /api/pcs/<id> - Delete PC
 """
 import logging
 import csv
-import io
 from flask import request, jsonify, current_app
 from sqlalchemy.exc import IntegrityError
 from . import api_bp
 from .validators import (
     validate_pc_data,
-    validate_pagination,
-    validate_csv_row
+    validate_pagination
 )
 from models import db, PCMaster
+from utils.csv_import import CSVEncodingError, import_rows, iter_csv_lines
+from utils.pagination import keyset_page, prefix_filter
 
 logger = logging.getLogger(__name__)
 
@@ -25,11 +25,19 @@ logger = logging.getLogger(__name__)
 def list_pcs():
     """List all PCs with pagination support.
 
+    Pages are ordered by (created_at, id) descending. Pass the
+    ``next_cursor`` of a response as ``after`` to get the following page;
+    this costs the same on every page, unlike ``page`` (OFFSET).
+
     Query Parameters:
-        page (int): Page number (default: 1)
+        page (int): Page number (default: 1, ignored with after)
         per_page (int): Items per page (default: 20, max: 100)
-        serial (str): Filter by serial number (partial match)
-        pcname (str): Filter by PC name (partial match)
+        after (str): Cursor of the previous page (next_cursor)
+        serial (str): Filter by serial number
+        pcname (str): Filter by PC name
+        match (str): Filter mode - contains (default), prefix or exact.
+            prefix and exact use the serial/pcname indexes (case-sensitive)
+        count (bool): Compute total/pages (default: true)
 
     Returns:
         JSON response with paginated PC list
@@ -38,12 +46,13 @@ def list_pcs():
             "total": 100,
             "page": 1,
             "per_page": 20,
-            "pages": 5
+            "pages": 5,
+            "next_cursor": "WyIyMDI1LTExLTE2VDEy..."
         }
 
     Status Codes:
         200: Success
-        400: Bad Request - Invalid pagination parameters
+        400: Bad Request - Invalid pagination parameters or cursor
         500: Internal Server Error
     """
     logger.info(f"GET /api/pcs - IP={request.remote_addr}")
@@ -51,6 +60,8 @@ def list_pcs():
     # Get pagination parameters
     page = request.args.get('page', 1)
     per_page = request.args.get('per_page', 20)
+    after = request.args.get('after')
+    with_count = request.args.get('count', 'true').lower() not in ('false', '0')
 
     # Validate pagination
     is_valid, error_msg, page, per_page = validate_pagination(page, per_page)
@@ -60,44 +71,63 @@ def list_pcs():
             'message': error_msg
         }), 400
 
+    match = request.args.get('match', 'contains')
+    if match not in ('contains', 'prefix', 'exact'):
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'match must be one of: contains, prefix, exact'
+        }), 400
+
     try:
         # Build query
         query = PCMaster.query
 
         # Apply filters
-        serial_filter = request.args.get('serial')
-        if serial_filter:
-            query = query.filter(PCMaster.serial.ilike(f'%{serial_filter}%'))
-
-        pcname_filter = request.args.get('pcname')
-        if pcname_filter:
-            query = query.filter(PCMaster.pcname.ilike(f'%{pcname_filter}%'))
+        for column, value in (
+            (PCMaster.serial, request.args.get('serial')),
+            (PCMaster.pcname, request.args.get('pcname'))
+        ):
+            if not value:
+                continue
+            if match == 'exact':
+                query = query.filter(column == value)
+            elif match == 'prefix':
+                query = query.filter(prefix_filter(column, value))
+            else:
+                query = query.filter(column.ilike(f'%{value}%'))
 
         # Order by created_at descending
-        query = query.order_by(PCMaster.created_at.desc())
-
-        # Paginate
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        items, next_cursor = keyset_page(
+            query,
+            (PCMaster.created_at, PCMaster.id),
+            per_page,
+            after=after,
+            offset=(page - 1) * per_page
         )
 
-        # Convert to dict
-        items = [pc.to_dict() for pc in pagination.items]
+        total = query.order_by(None).count() if with_count else None
+        pages = (total + per_page - 1) // per_page if total is not None else None
 
         logger.info(
-            f"PCs listed - page={page} per_page={per_page} total={pagination.total}"
+            f"PCs listed - page={page} per_page={per_page} total={total} "
+            f"cursor={'yes' if after else 'no'}"
         )
 
         return jsonify({
-            'items': items,
-            'total': pagination.total,
-            'page': pagination.page,
-            'per_page': pagination.per_page,
-            'pages': pagination.pages
+            'items': [pc.to_dict() for pc in items],
+            'total': total,
+            'page': None if after else page,
+            'per_page': per_page,
+            'pages': pages,
+            'next_cursor': next_cursor
         }), 200
 
+    except ValueError as e:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e)
+        }), 400
+
     except Exception as e:
         logger.error(f"Failed to list PCs - error={str(e)}", exc_info=True)
         return jsonify({
@@ -115,7 +145,8 @@ def create_pc():
         {
             "serial": "ABC123456",
             "pcname": "20251116M",
-            "odj_path": "/srv/odj/20251116M.txt"
+            "odj_path": "/srv/odj/20251116M.txt",
+            "mac_address": "aa:bb:cc:dd:ee:ff"
         }
 
         CSV Import (multipart/form-data):
@@ -171,7 +202,8 @@ def create_pc():
         pc = PCMaster(
             serial=validated_data['serial'],
             pcname=validated_data['pcname'],
-            odj_path=validated_data.get('odj_path')
+            odj_path=validated_data.get('odj_path'),
+            mac_address=validated_data.get('mac_address')
         )
 
         db.session.add(pc)
@@ -225,57 +257,23 @@ def handle_csv_import():
         }), 400
 
     try:
-        # Read CSV file
-        stream = io.StringIO(file.stream.read().decode('utf-8'), newline=None)
-        csv_reader = csv.DictReader(stream)
-
-        imported = 0
-        failed = 0
-        errors = []
-
-        for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (1 is header)
-            # Validate row
-            is_valid, error_msg, validated_data = validate_csv_row(row)
-            if not is_valid:
-                failed += 1
-                errors.append({
-                    'row': row_num,
-                    'error': error_msg,
-                    'data': row
-                })
-                continue
-
-            # Check if PC already exists
-            existing_pc = PCMaster.find_by_serial(validated_data['serial'])
-            if existing_pc:
-                failed += 1
-                errors.append({
-                    'row': row_num,
-                    'error': f'PC with serial "{validated_data["serial"]}" already exists',
-                    'data': row
-                })
-                continue
-
-            try:
-                # Create PC
-                pc = PCMaster(
-                    serial=validated_data['serial'],
-                    pcname=validated_data['pcname'],
-                    odj_path=validated_data.get('odj_path')
-                )
-                db.session.add(pc)
-                imported += 1
-
-            except Exception as e:
-                failed += 1
-                errors.append({
-                    'row': row_num,
-                    'error': str(e),
-                    'data': row
-                })
-
-        # Commit all changes
-        db.session.commit()
+        # Decode CSV file incrementally
+        csv_reader = csv.DictReader(iter_csv_lines(file.stream))
+
+        # Validate and bulk insert in batches
+        result = import_rows(csv_reader)
+
+        errors = result.errors + [
+            {
+                'row': duplicate['row'],
+                'error': f'PC with serial "{duplicate["serial"]}" already exists',
+                'data': duplicate['data']
+            }
+            for duplicate in result.duplicates
+        ]
+        errors.sort(key=lambda error: error['row'])
+        imported = result.success_count
+        failed = result.error_count
 
         logger.info(f"CSV import completed - imported={imported} failed={failed}")
 
@@ -286,6 +284,15 @@ def handle_csv_import():
             'errors': errors if errors else None
         }), 201
 
+    except CSVEncodingError as e:
+        db.session.rollback()
+        logger.warning(f"CSV import rejected - error={str(e)}")
+        return jsonify({
+            'error': 'Bad Request',
+            'message': str(e),
+            'row': e.row
+        }), 400
+
     except Exception as e:
         db.session.rollback()
         logger.error(f"CSV import failed - error={str(e)}", exc_info=True)
@@ -305,7 +312,8 @@ def update_pc(pc_id):
     Request Body (JSON):
         {
             "pcname": "20251117M",
-            "odj_path": "/srv/odj/20251117M.txt"
+            "odj_path": "/srv/odj/20251117M.txt",
+            "mac_address": "aa:bb:cc:dd:ee:ff"
         }
 
     Returns:
@@ -359,6 +367,9 @@ def update_pc(pc_id):
         if 'odj_path' in validated_data:
             pc.odj_path = validated_data['odj_path']
 
+        if 'mac_address' in validated_data:
+            pc.mac_address = validated_data['mac_address']
+
         db.session.commit()
 
         logger.info(
@@ -9,6 +9,7 @@ import re
 from flask import request, jsonify, current_app
 from . import api_bp
 from models import PCMaster
+from utils.pcinfo_cache import pcinfo_cache
 
 logger = logging.getLogger(__name__)
 
@@ -78,7 +79,22 @@ def get_pc_info():
         }), 400
 
     try:
+        # Serve from the in-process cache when possible
+        cached = pcinfo_cache.get(serial)
+        if cached is not None:
+            pcname, odj_path = cached
+            elapsed_time = (time.time() - start_time) * 1000
+            logger.info(
+                f"PC info retrieved (cache) - serial={serial} pcname={pcname} "
+                f"elapsed={elapsed_time:.2f}ms"
+            )
+            return jsonify({
+                'pcname': pcname,
+                'odj_path': odj_path
+            }), 200
+
         # Query database for PC information
+        generation = pcinfo_cache.generation
         pc = PCMaster.find_by_serial(serial)
 
         if pc is None:
@@ -97,6 +113,9 @@ def get_pc_info():
             f"elapsed={elapsed_time:.2f}ms"
         )
 
+        # Skipped if the serial may have been invalidated during the query
+        pcinfo_cache.put(pc.serial, pc.pcname, pc.odj_path, generation=generation)
+
         # Warn if response time exceeds target
         if elapsed_time > 200:
             logger.warning(
@@ -121,3 +140,22 @@ def get_pc_info():
             'error': 'Internal Server Error',
             'message': 'An unexpected error occurred while retrieving PC information'
         }), 500
+
+
+@api_bp.route('/pcinfo/cache', methods=['GET'])
+def get_pc_info_cache_stats():
+    """Get PC info lookup cache statistics.
+
+    Returns:
+        JSON response with cache size and hit/miss counters
+        {
+            "size": 100,
+            "hits": 950,
+            "misses": 50,
+            ...
+        }
+
+    Status Codes:
+        200: Success
+    """
+    return jsonify(pcinfo_cache.stats()), 200
@@ -0,0 +1,168 @@
+"""Provisioning bundle API endpoint.
+
+GET /api/provision/<serial>
+Returns everything a PC needs on first boot in one response: its name,
+the ODJ blob, the domain settings and the Windows Update settings.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+from flask import request, jsonify, current_app
+from . import api_bp
+from .pcinfo import validate_serial
+from models import PCMaster
+from utils.odj_blob_cache import load_blob
+from utils.pcinfo_cache import pcinfo_cache
+from utils.provision_cache import ProvisionBundle, provision_cache
+
+logger = logging.getLogger(__name__)
+
+# Incremented on incompatible changes to the bundle layout
+BUNDLE_VERSION = 1
+
+
+def _settings():
+    """Get the deployment settings embedded in every bundle."""
+    config = current_app.config
+    return (
+        config['DOMAIN_NAME'],
+        config['DOMAIN_OU'],
+        config['WINDOWS_UPDATE_RETRY'],
+        config['WINDOWS_UPDATE_TIMEOUT']
+    )
+
+
+def _build_bundle(serial, pcname, odj_path, blob, settings, key):
+    """Serialize a provisioning bundle.
+
+    The body contains no timestamps, so every worker process builds the
+    same bytes (and ETag) for the same inputs.
+
+    Args:
+        serial: PC serial number
+        pcname: PC name
+        odj_path: ODJ file path (may be None)
+        blob: CachedBlob of the ODJ file or None
+        settings: Tuple from _settings()
+        key: Inputs the bundle is built from
+
+    Returns:
+        ProvisionBundle
+    """
+    domain_name, domain_ou, wu_retry, wu_timeout = settings
+    odj = None
+    if blob is not None:
+        odj = {
+            'filename': os.path.basename(odj_path),
+            'sha256': blob.sha256,
+            'encoding': 'base64',
+            'content': base64.b64encode(blob.data).decode('ascii')
+        }
+
+    body = json.dumps({
+        'version': BUNDLE_VERSION,
+        'serial': serial,
+        'pcname': pcname,
+        'odj': odj,
+        'domain': {'name': domain_name, 'ou': domain_ou},
+        'windows_update': {'retry': wu_retry, 'timeout': wu_timeout}
+    }, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    return ProvisionBundle(body, hashlib.sha256(body).hexdigest(), key)
+
+
+@api_bp.route('/provision/<serial>', methods=['GET'])
+def get_provision_bundle(serial):
+    """Get the provisioning bundle of a PC.
+
+    The bundle is serialized once per PC and served from memory until the
+    PC's name or ODJ file (or the embedded settings) change. The strong
+    ETag lets agents revalidate with If-None-Match.
+
+    Args:
+        serial: PC serial number
+
+    Returns:
+        Compact JSON bundle
+        {
+            "version": 1,
+            "serial": "ABC123",
+            "pcname": "20251116M",
+            "odj": {"filename": "20251116M.txt", "sha256": "...",
+                    "encoding": "base64", "content": "..."},
+            "domain": {"name": "example.com", "ou": "OU=Computers,DC=example,DC=com"},
+            "windows_update": {"retry": 3, "timeout": 3600}
+        }
+        "odj" is null if no ODJ file is associated or the file is missing.
+
+    Status Codes:
+        200: Bundle returned
+        304: Not Modified (If-None-Match matches)
+        400: Invalid serial
+        404: PC not found
+        500: Internal server error
+    """
+    is_valid, error_message = validate_serial(serial)
+    if not is_valid:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': error_message
+        }), 400
+
+    try:
+        cached = pcinfo_cache.get(serial)
+        if cached is not None:
+            pcname, odj_path = cached
+        else:
+            generation = pcinfo_cache.generation
+            pc = PCMaster.find_by_serial(serial)
+            if pc is None:
+                provision_cache.invalidate(serial)
+                return jsonify({
+                    'error': 'Not Found',
+                    'message': f'PC with serial number "{serial}" not found'
+                }), 404
+            pcinfo_cache.put(pc.serial, pc.pcname, pc.odj_path, generation=generation)
+            pcname, odj_path = pc.pcname, pc.odj_path
+
+        blob = None
+        if odj_path:
+            blob = load_blob(odj_path, current_app.config['ODJ_FILES_PATH'])
+            if blob is None:
+                logger.warning(f'ODJ file missing for provisioning - serial={serial} path={odj_path}')
+
+        settings = _settings()
+        key = (pcname, odj_path, blob.sha256 if blob else None, settings)
+        bundle = provision_cache.get(serial, key)
+        if bundle is None:
+            bundle = _build_bundle(serial, pcname, odj_path, blob, settings, key)
+            provision_cache.put(serial, bundle)
+            logger.info(f'Provisioning bundle built - serial={serial} size={len(bundle.body)}')
+
+        response = current_app.response_class(bundle.body, mimetype='application/json')
+        response.set_etag(bundle.etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    except Exception as e:
+        logger.error(f'Error building provisioning bundle - serial={serial}: {str(e)}', exc_info=True)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'Failed to build provisioning bundle',
+            'details': str(e)
+        }), 500
+
+
+@api_bp.route('/provision/cache', methods=['GET'])
+def get_provision_cache_stats():
+    """Get provisioning bundle cache statistics.
+
+    Returns:
+        JSON response with cache size and hit/miss/rebuild counters
+
+    Status Codes:
+        200: Success
+    """
+    return jsonify(provision_cache.stats()), 200
@@ -0,0 +1,100 @@
+"""Search API endpoint.
+
+GET /api/search?q=<query>
+Ranked substring search across PCs (serial, PC name) and setup logs
+(serial, PC name, step, log text, error message).
+"""
+import logging
+import time
+from datetime import datetime
+from flask import request, jsonify
+from . import api_bp
+from models.search_index import SearchIndex, MIN_TERM_LENGTH
+
+logger = logging.getLogger(__name__)
+
+SEARCH_KINDS = ('pcs', 'logs')
+
+
+@api_bp.route('/search', methods=['GET'])
+def search():
+    """Search PCs and setup logs.
+
+    Query Parameters:
+        q (str): Search terms separated by spaces, all must match
+            (each at least 3 characters, case-insensitive substring)
+        type (str): all (default), pcs or logs
+        limit (int): Maximum hits per type (default: 20, max: 100)
+
+    Returns:
+        JSON response with ranked hits
+        {
+            "query": "0x80070005",
+            "engine": "fts5",
+            "took_ms": 1.8,
+            "pcs": [{"id": 1, "serial": "...", "pcname": "...", "score": 3.2}],
+            "logs": [{"id": 10, "serial": "...", "snippet": "...[0x80070005]...", ...}]
+        }
+
+    Status Codes:
+        200: Success
+        400: Bad Request - Missing/short query or invalid parameters
+        500: Internal Server Error
+    """
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('type', 'all')
+
+    if not SearchIndex.terms(query):
+        return jsonify({
+            'error': 'Bad Request',
+            'message': f'q must contain a term of at least {MIN_TERM_LENGTH} characters'
+        }), 400
+
+    if kind != 'all' and kind not in SEARCH_KINDS:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': f"type must be one of: all, {', '.join(SEARCH_KINDS)}"
+        }), 400
+
+    try:
+        limit = int(request.args.get('limit', 20))
+        if limit < 1 or limit > 100:
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'error': 'Bad Request',
+            'message': 'limit must be an integer between 1 and 100'
+        }), 400
+
+    try:
+        start = time.perf_counter()
+        result = SearchIndex.search(
+            query,
+            kinds=SEARCH_KINDS if kind == 'all' else (kind,),
+            limit=limit
+        )
+        took_ms = round((time.perf_counter() - start) * 1000, 2)
+
+        for hit in result['logs']:
+            if isinstance(hit['timestamp'], datetime):
+                hit['timestamp'] = hit['timestamp'].isoformat()
+
+        logger.info(
+            f"Search - q={query!r} engine={result['engine']} "
+            f"pcs={len(result['pcs'])} logs={len(result['logs'])} took_ms={took_ms}"
+        )
+
+        return jsonify({
+            'query': query,
+            'engine': result['engine'],
+            'took_ms': took_ms,
+            'pcs': result['pcs'],
+            'logs': result['logs']
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Search failed - q={query!r} error={str(e)}", exc_info=True)
+        return jsonify({
+            'error': 'Internal Server Error',
+            'message': 'An unexpected error occurred while searching'
+        }), 500
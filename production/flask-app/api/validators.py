@@ -74,6 +74,27 @@ def validate_odj_path(odj_path):
     return True, None
 
 
+def validate_mac_address(mac_address):
+    """Validate MAC address format.
+
+    Args:
+        mac_address: MAC address string (aa:bb:cc:dd:ee:ff or aa-bb-...)
+
+    Returns:
+        tuple: (is_valid, error_message)
+    """
+    if mac_address is None:
+        return True, None  # MAC address is optional
+
+    if not isinstance(mac_address, str):
+        return False, "MAC address must be a string"
+
+    if not re.match(r'^[0-9A-Fa-f]{2}([:-][0-9A-Fa-f]{2}){5}$', mac_address.strip()):
+        return False, "MAC address must be in aa:bb:cc:dd:ee:ff format"
+
+    return True, None
+
+
 def validate_status(status):
     """Validate setup status.
 
@@ -199,6 +220,16 @@ def validate_pc_data(data, is_update=False):
             return False, error_msg, None
         validated_data['odj_path'] = odj_path
 
+    # Validate mac_address (optional, stored normalized)
+    if 'mac_address' in data:
+        mac_address = data.get('mac_address') or None
+        is_valid, error_msg = validate_mac_address(mac_address)
+        if not is_valid:
+            return False, error_msg, None
+        validated_data['mac_address'] = (
+            mac_address.strip().lower().replace('-', ':') if mac_address else None
+        )
+
     return True, None, validated_data
 
 
@@ -236,3 +267,27 @@ def validate_csv_row(row):
     validated_data['odj_path'] = odj_path
 
     return True, None, validated_data
+
+
+def validate_required_csv_row(row):
+    """Check only that a CSV row has a serial and a pcname.
+
+    The Web UI import pages accept any non-empty serial and pcname, unlike
+    the API (:func:`validate_csv_row`).
+
+    Args:
+        row: Dictionary representing a CSV row
+
+    Returns:
+        tuple: (is_valid, error_message, validated_data)
+    """
+    serial = row.get('serial', '').strip()
+    pcname = row.get('pcname', '').strip()
+    if not serial or not pcname:
+        return False, "serial and pcname are required", None
+
+    return True, None, {
+        'serial': serial,
+        'pcname': pcname,
+        'odj_path': row.get('odj_path', '').strip() or None
+    }
@@ -2,10 +2,26 @@
 import os
 import logging
 from pathlib import Path
+import click
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.schema import CreateColumn
 from flask import Flask
 from flask_cors import CORS
 from config import config
-from models import db
+from models import db, PCStatus, SearchIndex, DeploymentTarget
+from utils.pcinfo_cache import init_app as init_pcinfo_cache
+from utils.odj_blob_cache import init_app as init_odj_blob_cache
+from utils.provision_cache import init_app as init_provision_cache
+from utils.admission import init_app as init_admission
+from utils.job_queue import job_runner
+from utils.image_catalog import get_catalog
+from utils.image_trash import ImageTrash
+from utils.event_stream import event_broker
+from utils.sqlite_tuning import configure_sqlite
+from utils.log_retention import log_retention
+from utils.process_supervisor import process_supervisor
+from utils.deployment_scheduler import deployment_scheduler
+from utils.background import background_services
 
 
 def create_app(config_name=None):
@@ -36,9 +52,35 @@ def create_app(config_name=None):
     # Register blueprints
     register_blueprints(app)
 
+    # Per-client rate limit and priority lanes for agent endpoints
+    init_admission(app)
+
     # Create database tables
-    with app.app_context():
-        db.create_all()
+    init_database(app)
+
+    # Warm PC info lookup cache
+    init_pcinfo_cache(app)
+
+    # Hot ODJ blobs for booting PCs
+    init_odj_blob_cache(app)
+
+    # Precomputed first-boot provisioning bundles
+    init_provision_cache(app)
+
+    # Background job runner
+    job_runner.init_app(app)
+
+    # Server-Sent Events fan-out
+    event_broker.init_app(app)
+
+    # DRBL/Clonezilla process supervision
+    process_supervisor.init_app(app)
+
+    # Archive old setup logs (background thread if LOG_RETENTION_INTERVAL)
+    log_retention.init_app(app)
+
+    # Run queued deployments as concurrent sessions
+    deployment_scheduler.init_app(app)
 
     # Register error handlers
     register_error_handlers(app)
@@ -46,9 +88,109 @@ def create_app(config_name=None):
     # Register CLI commands
     register_commands(app)
 
+    # Background threads run in one worker process only
+    background_services.init_app(app, start_background_services)
+
     return app
 
 
+def start_background_services(app):
+    """Start the job runner and the background threads.
+
+    Called once in the process elected by utils.background.
+
+    Args:
+        app: Flask application instance
+    """
+    job_runner.start()
+
+    log_retention.start()
+
+    deployment_scheduler.start()
+
+    # Keep image catalog warm
+    if app.config.get('IMAGE_CATALOG_WATCH'):
+        get_catalog(app.config['CLONEZILLA_IMAGE_PATH']).start_watcher(
+            app.config.get('IMAGE_CATALOG_WATCH_INTERVAL', 30)
+        )
+
+
+def add_missing_columns(engine):
+    """Add nullable model columns missing from existing tables.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        List of added "table.column" names
+    """
+    inspector = sa_inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+                added.append(f'{table.name}.{column.name}')
+
+    return added
+
+
+def init_database(app):
+    """Tune SQLite connections and create database tables.
+
+    Args:
+        app: Flask application instance
+    """
+    with app.app_context():
+        configure_sqlite(db.engine, app.config)
+
+        db.create_all()
+
+        # create_all() skips existing tables; add nullable columns and
+        # indexes introduced later
+        add_missing_columns(db.engine)
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+
+        # Backfill latest-status-per-PC table for existing databases
+        PCStatus.backfill()
+
+        # Move legacy comma-separated deployment targets into their table
+        DeploymentTarget.backfill()
+
+
+def prepare_database(config_name=None):
+    """Initialize the database without starting background services.
+
+    Called once by the gunicorn master before workers are forked, so that
+    workers do not race on CREATE TABLE and WAL mode is already enabled.
+
+    Args:
+        config_name: Configuration name (development/production/testing)
+    """
+    if config_name is None:
+        config_name = os.getenv('FLASK_ENV', 'development')
+
+    app = Flask(__name__)
+    app.config.from_object(config[config_name])
+    db.init_app(app)
+
+    init_database(app)
+
+    # Do not hand inherited connections to forked workers
+    with app.app_context():
+        db.engine.dispose()
+
+
 def setup_logging(app):
     """Setup application logging.
 
@@ -118,6 +260,72 @@ def register_commands(app):
         db.create_all()
         print('Database initialized.')
 
+    @app.cli.command()
+    def rebuild_pc_status():
+        """Recompute latest status per PC from setup logs."""
+        count = PCStatus.rebuild()
+        print(f'PC status rebuilt: {count} PCs.')
+
+    @app.cli.command()
+    def rebuild_search_index():
+        """Rebuild the full-text search index of PCs and setup logs."""
+        if SearchIndex.rebuild():
+            print('Search index rebuilt.')
+        else:
+            print('Full-text search unavailable (SQLite FTS5 required); using LIKE scans.')
+
+    @app.cli.command()
+    @click.option('--keep', type=int, help='Entries kept per serial.')
+    @click.option('--min-age-days', type=int, help='Never archive younger entries.')
+    @click.option('--max-batches', type=int, help='Stop after this many batches.')
+    @click.option('--vacuum', is_flag=True, help='Shrink the database file afterwards.')
+    def archive_logs(keep, min_age_days, max_batches, vacuum):
+        """Move old setup logs to compressed monthly archives."""
+        if keep is not None:
+            log_retention.keep = max(1, keep)
+        if min_age_days is not None:
+            log_retention.min_age_days = min_age_days
+
+        stats = log_retention.run(max_batches=max_batches)
+        if stats['skipped']:
+            print('Another process is archiving logs, skipped.')
+            return
+        print(
+            f"Setup logs archived: {stats['archived']} rows in {stats['batches']} "
+            f"batches to {log_retention.archive_dir}."
+        )
+
+        if vacuum:
+            log_retention.compact()
+            print('Database compacted.')
+
+    @app.cli.command()
+    @click.option('--rate-mb', type=int, help='MB freed per second (0: unlimited).')
+    def purge_image_trash(rate_mb):
+        """Reclaim the space of deleted images left in the trash."""
+        from api.images import drbl_client, _deployment_running
+
+        if rate_mb is None:
+            rate_mb = app.config['IMAGE_PURGE_RATE_MB']
+
+        for path in ImageTrash(drbl_client.image_home).entries():
+            stats = ImageTrash.purge(
+                path,
+                rate_bytes=rate_mb * 1024 * 1024,
+                pause=_deployment_running,
+                pause_poll=app.config['IMAGE_PURGE_DEFER_POLL']
+            )
+            print(f"Purged {path.name}: {stats['bytes_freed']} bytes, {stats['files_removed']} files.")
+
+    @app.cli.command()
+    def schedule_deployments():
+        """Run one deployment scheduler tick (finish and start sessions)."""
+        result = deployment_scheduler.tick()
+        if result['skipped']:
+            print('Another process is scheduling.')
+        else:
+            print(f"Finished: {result['finished']}, started: {result['started']}.")
+
     @app.cli.command()
     def drop_db():
         """Drop all database tables."""
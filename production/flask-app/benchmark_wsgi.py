@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Load benchmark of the production WSGI setup.
+
+Starts gunicorn (gunicorn.conf.py, wsgi:app) against a throwaway SQLite
+database for each worker count and measures throughput and latency of the
+two endpoints hit by every PC during setup:
+
+- ``GET /api/pcinfo?serial=...`` (read path)
+- ``POST /api/log`` (write path)
+
+Usage:
+    python benchmark_wsgi.py --workers 1,2,4 --requests 2000 --concurrency 32
+
+Load is generated by separate client processes with keep-alive
+connections, so the Python client is not the bottleneck.
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from statistics import median, quantiles
+
+project_root = Path(__file__).resolve().parent
+
+PC_COUNT = 500
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Benchmark gunicorn worker scaling')
+    parser.add_argument('--workers', default='1,2,4',
+                        help='Comma separated worker counts (default: 1,2,4)')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='Threads per worker (default: 4)')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Requests per endpoint and worker count (default: 2000)')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='Concurrent client connections (default: 32)')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='Port to bind gunicorn to (default: 8765)')
+    parser.add_argument('--journal-mode', default='WAL',
+                        help='SQLITE_JOURNAL_MODE of the benchmark database (default: WAL)')
+    return parser.parse_args()
+
+
+def request(conn, method, path, body=None):
+    """Send one request and return (status, seconds)."""
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    start = time.perf_counter()
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status, time.perf_counter() - start
+
+
+def client_worker(port, endpoint, count, seed):
+    """Client process body: send count requests over one connection.
+
+    Returns:
+        tuple: (latencies, errors)
+    """
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies = []
+    errors = 0
+
+    for _ in range(count):
+        n = rng.randrange(PC_COUNT)
+        if endpoint == 'pcinfo':
+            args = ('GET', f'/api/pcinfo?serial=BENCH{n:06d}')
+            ok = (200,)
+        else:
+            body = json.dumps({
+                'serial': f'BENCH{n:06d}',
+                'pcname': f'BENCHPC{n:06d}',
+                'status': 'in_progress',
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'step': 'benchmark',
+                'logs': 'benchmark log entry'
+            })
+            args = ('POST', '/api/log', body)
+            ok = (200, 201)
+
+        try:
+            status, seconds = request(conn, *args)
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            errors += 1
+            continue
+
+        if status in ok:
+            latencies.append(seconds)
+        else:
+            errors += 1
+
+    conn.close()
+    return latencies, errors
+
+
+def run_load(port, endpoint, total, concurrency):
+    """Run one load phase and compute statistics."""
+    per_client = [total // concurrency] * concurrency
+    for i in range(total % concurrency):
+        per_client[i] += 1
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(concurrency) as pool:
+        results = pool.starmap(
+            client_worker,
+            [(port, endpoint, count, i) for i, count in enumerate(per_client)]
+        )
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for lat, _ in results for latency in lat)
+    errors = sum(err for _, err in results)
+
+    return {
+        'requests': total,
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': median(latencies) * 1000 if latencies else 0.0,
+        'p95_ms': quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else 0.0
+    }
+
+
+def wait_ready(port, timeout=30.0):
+    """Wait until the server answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/pcinfo?serial=BENCH000000')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('Server did not start in time')
+
+
+def seed(port):
+    """Register the benchmark PCs."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    for n in range(PC_COUNT):
+        body = json.dumps({
+            'serial': f'BENCH{n:06d}',
+            'pcname': f'BENCHPC{n:06d}',
+            'odj_path': f'/srv/odj/BENCHPC{n:06d}.txt'
+        })
+        request(conn, 'POST', '/api/pcs', body)
+    conn.close()
+
+
+def start_server(args, workers, env):
+    """Start gunicorn with the production configuration."""
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--config', str(project_root / 'gunicorn.conf.py'),
+        '--chdir', str(project_root),
+        '--bind', f'127.0.0.1:{args.port}',
+        '--workers', str(workers),
+        '--threads', str(args.threads),
+        'wsgi:app'
+    ]
+    return subprocess.Popen(
+        command,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def main():
+    """Run the benchmark for each worker count and print a summary."""
+    args = parse_args()
+
+    if shutil.which('gunicorn') is None:
+        print('gunicorn is not installed (pip install -r requirements.txt)')
+        return 1
+
+    worker_counts = [int(w) for w in args.workers.split(',') if w]
+    temp_dir = Path(tempfile.mkdtemp(prefix='wsgi-bench-'))
+
+    env = dict(
+        os.environ,
+        FLASK_ENV='production',
+        DATABASE_URL=f'sqlite:///{temp_dir / "bench.db"}',
+        SQLITE_JOURNAL_MODE=args.journal_mode,
+        LOG_FILE=str(temp_dir / 'app.log'),
+        LOG_LEVEL='WARNING',
+        GUNICORN_ACCESS_LOG=os.devnull,
+        CLONEZILLA_IMAGE_PATH=str(temp_dir / 'images'),
+        ODJ_FILES_PATH=str(temp_dir / 'odj')
+    )
+
+    rows = []
+    seeded = False
+
+    try:
+        for workers in worker_counts:
+            server = start_server(args, workers, env)
+            try:
+                wait_ready(args.port)
+                if not seeded:
+                    seed(args.port)
+                    seeded = True
+
+                for endpoint in ('pcinfo', 'log'):
+                    stats = run_load(args.port, endpoint, args.requests, args.concurrency)
+                    rows.append((workers, endpoint, stats))
+                    print(
+                        f"workers={workers} endpoint={endpoint} "
+                        f"rps={stats['rps']:.0f} errors={stats['errors']}"
+                    )
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=60)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print()
+    print(f"threads/worker={args.threads} concurrency={args.concurrency} "
+          f"journal_mode={args.journal_mode}")
+    print(f"{'workers':>7}  {'endpoint':<8}  {'req/s':>8}  {'p50 ms':>7}  "
+          f"{'p95 ms':>7}  {'errors':>6}")
+    for workers, endpoint, stats in rows:
+        print(
+            f"{workers:>7}  {endpoint:<8}  {stats['rps']:>8.0f}  "
+            f"{stats['p50_ms']:>7.1f}  {stats['p95_ms']:>7.1f}  {stats['errors']:>6}"
+        )
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,6 +24,12 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
 
+    # SQLite connection tuning (PRAGMAs applied on connect, None: default)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_CACHE_SIZE = None
+
     # API
     API_HOST = os.getenv('API_HOST', '0.0.0.0')
     API_PORT = int(os.getenv('API_PORT', 5000))
@@ -31,12 +37,166 @@ class Config:
     # ODJ Files
     ODJ_FILES_PATH = os.getenv('ODJ_FILES_PATH', '/srv/odj/')
 
+    # Bulk ODJ ingest (POST /api/odj/bulk); file names are matched to PCs by
+    # these PCMaster fields in order (pcname, serial)
+    ODJ_INGEST_WORKERS = int(os.getenv('ODJ_INGEST_WORKERS', 4))
+    ODJ_INGEST_MATCH = os.getenv('ODJ_INGEST_MATCH', 'pcname,serial')
+    ODJ_INGEST_MAX_ENTRIES = int(os.getenv('ODJ_INGEST_MAX_ENTRIES', 5000))
+
     # Clonezilla Images
     CLONEZILLA_IMAGE_PATH = os.getenv(
         'CLONEZILLA_IMAGE_PATH',
         '/home/partimag/'
     )
 
+    # Image catalog (cached /api/images metadata)
+    IMAGE_CATALOG_WATCH = os.getenv(
+        'IMAGE_CATALOG_WATCH',
+        'false'
+    ).lower() == 'true'
+    IMAGE_CATALOG_WATCH_INTERVAL = int(os.getenv(
+        'IMAGE_CATALOG_WATCH_INTERVAL',
+        30
+    ))
+
+    # Image verification (POST /api/images/<name>/verify, files hashed concurrently)
+    IMAGE_SCAN_WORKERS = int(os.getenv('IMAGE_SCAN_WORKERS', 4))
+
+    # Image deletion (space reclaimed by a background job, paused during deployments)
+    IMAGE_PURGE_RATE_MB = int(os.getenv('IMAGE_PURGE_RATE_MB', 100))  # MB/s, 0: unlimited
+    IMAGE_PURGE_DEFER_POLL = int(os.getenv('IMAGE_PURGE_DEFER_POLL', 10))  # seconds
+
+    # PC info lookup cache (GET /api/pcinfo); changes are published to the
+    # other worker processes through PCINFO_CACHE_JOURNAL, the TTL is a
+    # safety net
+    PCINFO_CACHE_ENABLED = os.getenv(
+        'PCINFO_CACHE_ENABLED',
+        'true'
+    ).lower() == 'true'
+    PCINFO_CACHE_SIZE = int(os.getenv('PCINFO_CACHE_SIZE', 10000))
+    PCINFO_CACHE_TTL = int(os.getenv('PCINFO_CACHE_TTL', 300))
+    PCINFO_CACHE_JOURNAL = os.getenv(
+        'PCINFO_CACHE_JOURNAL',
+        str(basedir / 'run' / 'pcinfo_cache.journal')
+    )
+
+    # ODJ blob cache (GET /api/odj/blob/<serial>); entries are revalidated
+    # with one stat() after TTL seconds, larger blobs are sent with sendfile
+    ODJ_BLOB_CACHE_ENABLED = os.getenv(
+        'ODJ_BLOB_CACHE_ENABLED',
+        'true'
+    ).lower() == 'true'
+    ODJ_BLOB_CACHE_MB = int(os.getenv('ODJ_BLOB_CACHE_MB', 16))
+    ODJ_BLOB_CACHE_MAX_BLOB_KB = int(os.getenv('ODJ_BLOB_CACHE_MAX_BLOB_KB', 256))
+    ODJ_BLOB_CACHE_TTL = int(os.getenv('ODJ_BLOB_CACHE_TTL', 30))
+
+    # Provisioning bundle cache (GET /api/provision/<serial>); bundles are
+    # rebuilt when the PC, its ODJ file or the embedded settings change
+    PROVISION_CACHE_ENABLED = os.getenv(
+        'PROVISION_CACHE_ENABLED',
+        'true'
+    ).lower() == 'true'
+    PROVISION_CACHE_SIZE = int(os.getenv('PROVISION_CACHE_SIZE', 5000))
+
+    # Admission control (per worker process). Each client is rate limited
+    # with a token bucket refilled at API_RATE_LIMIT ("N per second|minute|
+    # hour|day", empty: unlimited). Agent endpoints may use every slot,
+    # including ADMISSION_AGENT_RESERVED slots other requests cannot take;
+    # heavy admin endpoints are limited per route. Requests over a limit
+    # get 429 with Retry-After. Clients are identified through
+    # ADMISSION_TRUSTED_PROXIES reverse proxies (1: the shipped nginx, with
+    # gunicorn bound to 127.0.0.1; set 0 when gunicorn is exposed directly).
+    ADMISSION_ENABLED = os.getenv(
+        'ADMISSION_ENABLED',
+        'true'
+    ).lower() == 'true'
+    API_RATE_LIMIT = os.getenv('API_RATE_LIMIT', '1000 per hour')
+    ADMISSION_BURST = int(os.getenv('ADMISSION_BURST', 100))
+    ADMISSION_MAX_CONCURRENT = int(os.getenv(
+        'ADMISSION_MAX_CONCURRENT',
+        os.getenv('GUNICORN_THREADS', 8)
+    ))
+    ADMISSION_AGENT_RESERVED = int(os.getenv('ADMISSION_AGENT_RESERVED', 2))
+    ADMISSION_HEAVY_CONCURRENCY = int(os.getenv('ADMISSION_HEAVY_CONCURRENCY', 1))
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 2))
+    ADMISSION_TRUSTED_PROXIES = int(os.getenv('ADMISSION_TRUSTED_PROXIES', 1))
+    ADMISSION_AGENT_ENDPOINTS = os.getenv(
+        'ADMISSION_AGENT_ENDPOINTS',
+        'api.get_pc_info,api.create_log,api.create_log_batch,'
+        'api.get_odj_blob,api.get_provision_bundle'
+    )
+    ADMISSION_HEAVY_ENDPOINTS = os.getenv(
+        'ADMISSION_HEAVY_ENDPOINTS',
+        'api.list_images,api.get_image_details,api.upload_image,api.verify_image,'
+        'api.export_csv,api.import_csv,api.list_odj_files,api.bulk_upload_odj,'
+        'api.get_archived_logs,views.csv_import_process,views.import_csv_legacy'
+    )
+    # Long-lived streams would pin slots; health checks must always answer
+    ADMISSION_EXEMPT_ENDPOINTS = os.getenv(
+        'ADMISSION_EXEMPT_ENDPOINTS',
+        'static,views.health_check,api.stream_logs,api.stream_deployment_events'
+    )
+
+    # Server-Sent Events (dashboard push updates)
+    EVENT_PRODUCER_ENABLED = True
+    EVENT_POLL_INTERVAL = float(os.getenv('EVENT_POLL_INTERVAL', 1.0))
+    EVENT_HEARTBEAT = float(os.getenv('EVENT_HEARTBEAT', 15.0))
+    # Open streams per worker process; each holds a request thread
+    # (GUNICORN_THREADS), further streams get 503 and dashboards poll
+    EVENT_MAX_STREAMS = int(os.getenv(
+        'EVENT_MAX_STREAMS',
+        max(1, int(os.getenv('GUNICORN_THREADS', 8)) // 2)
+    ))
+
+    # Setup log batch ingestion (POST /api/log/batch)
+    LOG_BATCH_MAX_ITEMS = int(os.getenv('LOG_BATCH_MAX_ITEMS', 1000))
+
+    # PC export streaming (GET /api/pcs/export, rows per chunk)
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+
+    # Setup log retention (flask archive-logs)
+    LOG_ARCHIVE_PATH = os.getenv('LOG_ARCHIVE_PATH', str(basedir / 'archive' / 'setup_logs'))
+    LOG_RETENTION_KEEP = int(os.getenv('LOG_RETENTION_KEEP', 200))
+    LOG_RETENTION_MIN_AGE_DAYS = int(os.getenv('LOG_RETENTION_MIN_AGE_DAYS', 30))
+    LOG_RETENTION_BATCH_SIZE = int(os.getenv('LOG_RETENTION_BATCH_SIZE', 5000))
+    LOG_RETENTION_INTERVAL = int(os.getenv('LOG_RETENTION_INTERVAL', 0))  # seconds, 0: off
+
+    # Job recovery, deployment scheduler, log retention and image catalog
+    # watcher run in the worker process holding this lock (None: in every
+    # process); the other workers retry every BACKGROUND_LEADER_RETRY seconds
+    BACKGROUND_LOCK_PATH = os.getenv(
+        'BACKGROUND_LOCK_PATH',
+        str(basedir / 'run' / 'background.lock')
+    )
+    BACKGROUND_LEADER_RETRY = float(os.getenv('BACKGROUND_LEADER_RETRY', 30))
+
+    # DRBL process supervision (per-process state shared between workers)
+    DRBL_RUN_PATH = os.getenv('DRBL_RUN_PATH', str(basedir / 'run' / 'drbl'))
+    DRBL_OUTPUT_LINES = int(os.getenv('DRBL_OUTPUT_LINES', 1000))  # per stream
+    DRBL_KILL_GRACE = float(os.getenv('DRBL_KILL_GRACE', 10.0))  # SIGTERM -> SIGKILL
+
+    # Multi-session deployment scheduler (POST /api/deployment/<id>/enqueue);
+    # every session holds a job worker while dcs runs (JOB_WORKERS)
+    DEPLOYMENT_MAX_SESSIONS = int(os.getenv('DEPLOYMENT_MAX_SESSIONS', 2))
+    DEPLOYMENT_SESSION_RATE_MB = float(os.getenv('DEPLOYMENT_SESSION_RATE_MB', 100))  # MB/s
+    DEPLOYMENT_NIC_BUDGET_MB = float(os.getenv('DEPLOYMENT_NIC_BUDGET_MB', 0))  # 0: unlimited
+    DEPLOYMENT_DISK_BUDGET_MB = float(os.getenv('DEPLOYMENT_DISK_BUDGET_MB', 0))  # 0: unlimited
+    DEPLOYMENT_MCAST_PORT_BASE = int(os.getenv('DEPLOYMENT_MCAST_PORT_BASE', 2232))
+    DEPLOYMENT_MCAST_PORT_STEP = int(os.getenv('DEPLOYMENT_MCAST_PORT_STEP', 10))
+    DEPLOYMENT_SESSION_OVERHEAD = int(os.getenv('DEPLOYMENT_SESSION_OVERHEAD', 300))  # seconds
+    DEPLOYMENT_SESSION_TIMEOUT = int(os.getenv('DEPLOYMENT_SESSION_TIMEOUT', 0))  # seconds, 0: off
+    DEPLOYMENT_SCHEDULER_INTERVAL = int(os.getenv('DEPLOYMENT_SCHEDULER_INTERVAL', 15))  # 0: off
+
+    # Multicast session tuning from recorded session metrics
+    # (GET /api/deployment/<id>/tuning); applied to dcs when auto-tune is on
+    DEPLOYMENT_AUTO_TUNE = os.getenv('DEPLOYMENT_AUTO_TUNE', 'false').lower() == 'true'
+    DEPLOYMENT_TUNING_HISTORY = int(os.getenv('DEPLOYMENT_TUNING_HISTORY', 50))  # sessions
+
+    # Background Job Settings
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 4))  # threads of the background leader
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 5))  # seconds, backs up the wake file
+    JOB_RUNNER_EAGER = False
+
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'logs/app.log')
@@ -80,6 +240,11 @@ class Config:
         100 * 1024 * 1024  # 100MB default
     ))
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', '/tmp/uploads/')
+    CSV_IMPORT_BATCH_SIZE = int(os.getenv('CSV_IMPORT_BATCH_SIZE', 1000))
+    IMPORT_STAGING_MAX_AGE_HOURS = int(os.getenv(
+        'IMPORT_STAGING_MAX_AGE_HOURS',
+        24
+    ))
     ALLOWED_EXTENSIONS = {
         'csv': ['text/csv', 'application/vnd.ms-excel'],
         'txt': ['text/plain'],
@@ -101,6 +266,18 @@ class ProductionConfig(Config):
     TESTING = False
     SESSION_COOKIE_SECURE = True
 
+    # Concurrent readers across gunicorn workers
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -20000))  # 20MB
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('SQLALCHEMY_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 30)),
+        'pool_recycle': 3600,
+        'pool_pre_ping': True
+    }
+
 
 class TestingConfig(Config):
     """Testing configuration."""
@@ -111,6 +288,14 @@ class TestingConfig(Config):
     SQLALCHEMY_ECHO = False
     WTF_CSRF_ENABLED = False
     LOG_LEVEL = 'DEBUG'
+    JOB_RUNNER_EAGER = True
+    EVENT_PRODUCER_ENABLED = False
+    LOG_RETENTION_INTERVAL = 0
+    DRBL_RUN_PATH = None
+    PCINFO_CACHE_JOURNAL = None
+    BACKGROUND_LOCK_PATH = None
+    DEPLOYMENT_SCHEDULER_INTERVAL = 0
+    ADMISSION_ENABLED = False
 
 
 # Configuration dictionary
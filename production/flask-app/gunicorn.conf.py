@@ -0,0 +1,63 @@
+"""Gunicorn configuration for the production Flask app.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Reload code and configuration without dropping requests:
+    kill -HUP <master pid>   (systemctl reload flask-app)
+
+All values can be overridden with GUNICORN_* environment variables or on
+the command line.
+"""
+import multiprocessing
+import os
+
+# Server socket: loopback only, behind the shipped nginx. X-Forwarded-For is
+# trusted from one proxy (ADMISSION_TRUSTED_PROXIES); to expose gunicorn
+# directly, set GUNICORN_BIND=0.0.0.0:8000 and ADMISSION_TRUSTED_PROXIES=0.
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:8000')
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# Worker processes
+# Threaded workers: SSE streams (/api/logs/stream) hold a thread each, so a
+# sync worker would be blocked by a single dashboard.
+worker_class = 'gthread'
+workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    min(multiprocessing.cpu_count() * 2 + 1, 8)
+))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# The app is loaded in each worker: the job runner pool, event producer and
+# image catalog watcher are threads, which do not survive fork(). Jobs, the
+# deployment scheduler, log retention and the catalog watcher run in one
+# worker only (BACKGROUND_LOCK_PATH); SSE streams are limited to
+# EVENT_MAX_STREAMS threads per worker.
+preload_app = False
+
+# Logging
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+proc_name = 'pc-setup-flask'
+
+
+def on_starting(server):
+    """Create tables and enable WAL once, before any worker starts."""
+    from app import prepare_database
+
+    prepare_database(os.getenv('FLASK_ENV', 'production'))
+    server.log.info('Database prepared')
+
+
+def worker_int(worker):
+    """Log worker interruption (SIGINT/SIGQUIT)."""
+    worker.log.info(f'Worker interrupted (pid: {worker.pid})')
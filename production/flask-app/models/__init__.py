@@ -7,5 +7,18 @@ db = SQLAlchemy()
 from .pc_master import PCMaster  # noqa: F401, E402
 from .setup_log import SetupLog  # noqa: F401, E402
 from .deployment import Deployment  # noqa: F401, E402
+from .import_staging import ImportStaging  # noqa: F401, E402
+from .job import Job  # noqa: F401, E402
+from .pc_status import PCStatus  # noqa: F401, E402
+from .log_idempotency import LogIdempotencyKey  # noqa: F401, E402
+from .log_archive import LogArchiveSegment, LogArchiveEntry  # noqa: F401, E402
+from .search_index import SearchIndex  # noqa: F401, E402
+from .deployment_target import DeploymentTarget  # noqa: F401, E402
+from .session_metric import SessionMetric  # noqa: F401, E402
+from .odj_file import OdjFile  # noqa: F401, E402
 
-__all__ = ['db', 'PCMaster', 'SetupLog', 'Deployment']
+__all__ = [
+    'db', 'PCMaster', 'SetupLog', 'Deployment', 'ImportStaging', 'Job',
+    'PCStatus', 'LogIdempotencyKey', 'LogArchiveSegment', 'LogArchiveEntry',
+    'SearchIndex', 'DeploymentTarget', 'SessionMetric', 'OdjFile'
+]
@@ -11,14 +11,19 @@ class Deployment(db.Model):
         name: Deployment name
         image_name: Clonezilla image name
         mode: Deployment mode (multicast/unicast)
-        target_serials: Comma-separated list of target PC serials
-        status: Deployment status (pending/running/completed/failed)
+        target_serials: Legacy comma-separated target serials (read only by
+            DeploymentTarget.backfill; targets live in deployment_targets)
+        status: Deployment status (pending/queued/running/completed/failed)
         started_at: Deployment start timestamp
         completed_at: Deployment completion timestamp
         created_at: Record creation timestamp
         updated_at: Record update timestamp
         created_by: User who created the deployment
         notes: Additional notes
+        priority: Scheduler priority (higher starts first)
+        queued_at: When the deployment was queued for the scheduler
+            (None: started manually)
+        mcast_port: Multicast port base assigned by the scheduler
     """
 
     __tablename__ = 'deployment'
@@ -51,6 +56,18 @@ class Deployment(db.Model):
     )
     created_by = db.Column(db.String(50), nullable=True)
     notes = db.Column(db.Text, nullable=True)
+    priority = db.Column(db.Integer, nullable=True, default=0)
+    queued_at = db.Column(db.DateTime, nullable=True)
+    mcast_port = db.Column(db.Integer, nullable=True)
+
+    # Per-client targets (deployment_targets table)
+    targets = db.relationship(
+        'DeploymentTarget',
+        backref='deployment',
+        lazy='selectin',
+        cascade='all, delete-orphan',
+        order_by='DeploymentTarget.id'
+    )
 
     def __repr__(self):
         """String representation."""
@@ -63,7 +80,7 @@ class Deployment(db.Model):
             'name': self.name,
             'image_name': self.image_name,
             'mode': self.mode,
-            'target_serials': self.target_serials.split(',') if self.target_serials else [],
+            'target_serials': self.serials,
             'target_count': self.target_count,
             'status': self.status,
             'progress': self.progress,
@@ -72,18 +89,46 @@ class Deployment(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'created_by': self.created_by,
-            'notes': self.notes
+            'notes': self.notes,
+            'priority': self.priority or 0,
+            'queued_at': self.queued_at.isoformat() if self.queued_at else None,
+            'mcast_port': self.mcast_port
         }
 
+    @property
+    def serials(self):
+        """Serials of the registered targets, in creation order."""
+        return [t.serial for t in self.targets if t.serial]
+
+    def progress_scope(self):
+        """Identifiers of this deployment's lines in shared DRBL logs.
+
+        Returns:
+            dict: macs, ips and port keyword arguments for LogFollower
+        """
+        from .pc_master import PCMaster
+
+        macs = {t.mac_address for t in self.targets if t.mac_address}
+        ips = {t.ip_address for t in self.targets if t.ip_address}
+        unknown = [t.serial for t in self.targets if t.serial and not t.mac_address]
+        if unknown:
+            rows = db.session.query(PCMaster.mac_address).filter(
+                PCMaster.serial.in_(unknown),
+                PCMaster.mac_address.isnot(None)
+            ).all()
+            macs.update(mac for mac, in rows)
+
+        return {'macs': macs, 'ips': ips, 'port': self.mcast_port}
+
     @classmethod
     def get_active_deployments(cls):
         """Get all active deployments.
 
         Returns:
-            List of Deployment objects with status 'running'
+            List of Deployment objects with status pending, queued or running
         """
         return cls.query.filter(
-            cls.status.in_(['pending', 'running'])
+            cls.status.in_(['pending', 'queued', 'running'])
         ).order_by(cls.created_at.desc()).all()
 
     @classmethod
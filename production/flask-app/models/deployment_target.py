@@ -0,0 +1,353 @@
+"""Deployment target database model (per-client deployment state)."""
+import re
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, event, select
+from . import db
+from .setup_log import SetupLog
+
+# partclone/clonezilla-jobs rate: "5.12GB/min", "830.5 MB/min"
+RATE_RE = re.compile(r'(?P<value>[\d.]+)\s*(?P<unit>[KMGT]?)B/min', re.IGNORECASE)
+UNIT_FACTORS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def normalize_mac(mac):
+    """Normalize a MAC address to lowercase, colon-separated form."""
+    return mac.strip().lower().replace('-', ':') if mac else None
+
+
+def _elapsed_seconds(elapsed):
+    """Parse '00:01:23' (partclone) or '432' (clonezilla-jobs) to seconds."""
+    if not elapsed:
+        return None
+    seconds = 0
+    try:
+        for part in str(elapsed).split(':'):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return None
+    return seconds
+
+
+def rate_bytes_per_second(rate):
+    """Parse a partclone rate such as '5.12GB/min' to bytes per second."""
+    match = RATE_RE.search(rate or '')
+    if not match:
+        return None
+    return float(match.group('value')) * UNIT_FACTORS[match.group('unit').upper()] / 60
+
+
+def _estimate_bytes(rate, elapsed):
+    """Estimate transferred bytes from an average rate and elapsed time."""
+    per_second = rate_bytes_per_second(rate)
+    seconds = _elapsed_seconds(elapsed)
+    if per_second is None or seconds is None:
+        return None
+    return int(round(per_second * seconds))
+
+
+class DeploymentTarget(db.Model):
+    """Deployment target table - one row per client of a deployment.
+
+    Imaging state is fed by the DRBL progress parser (:meth:`sync_progress`);
+    the setup status of the PC after imaging is fed by ``/api/log`` (SetupLog
+    insert hook). Clients seen by DRBL that are not registered targets are
+    recorded with serial None.
+
+    Attributes:
+        id: Primary key
+        deployment_id: Deployment ID
+        serial: PC serial number (None: unknown client seen by DRBL)
+        mac_address: Client MAC address (aa:bb:cc:dd:ee:ff)
+        ip_address: Client IP address during imaging
+        state: Imaging state (pending/connected/running/completed/failed)
+        percentage: Imaging progress (0-100)
+        bytes_transferred: Estimated bytes restored
+        rate: Last reported transfer rate
+        setup_status: Latest /api/log status of the PC during the deployment
+        started_at: First progress report
+        completed_at: Imaging end (completed or failed)
+        updated_at: Last update
+    """
+
+    __tablename__ = 'deployment_targets'
+    __table_args__ = (
+        db.UniqueConstraint('deployment_id', 'serial', name='uq_deployment_targets_serial'),
+        # "clients of deployment N below X%" and per-state counts
+        db.Index('ix_deployment_targets_deployment_percentage', 'deployment_id', 'percentage'),
+        db.Index('ix_deployment_targets_deployment_state', 'deployment_id', 'state'),
+    )
+
+    STATE_PENDING = 'pending'
+    STATE_CONNECTED = 'connected'
+    STATE_RUNNING = 'running'
+    STATE_COMPLETED = 'completed'
+    STATE_FAILED = 'failed'
+
+    STATES = (STATE_PENDING, STATE_CONNECTED, STATE_RUNNING, STATE_COMPLETED, STATE_FAILED)
+    FINAL_STATES = (STATE_COMPLETED, STATE_FAILED)
+
+    id = db.Column(db.Integer, primary_key=True)
+    deployment_id = db.Column(
+        db.Integer,
+        db.ForeignKey('deployment.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    serial = db.Column(db.String(100), nullable=True, index=True)
+    mac_address = db.Column(db.String(17), nullable=True, index=True)
+    ip_address = db.Column(db.String(45), nullable=True)
+    state = db.Column(db.String(20), nullable=False, default=STATE_PENDING)
+    percentage = db.Column(db.Float, nullable=False, default=0.0)
+    bytes_transferred = db.Column(db.BigInteger, nullable=False, default=0)
+    rate = db.Column(db.String(30), nullable=True)
+    setup_status = db.Column(db.String(20), nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+    def __repr__(self):
+        """String representation."""
+        return f'<DeploymentTarget {self.deployment_id}:{self.serial or self.mac_address} ({self.state})>'
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'id': self.id,
+            'deployment_id': self.deployment_id,
+            'serial': self.serial,
+            'mac_address': self.mac_address,
+            'ip_address': self.ip_address,
+            'state': self.state,
+            'percentage': self.percentage,
+            'bytes_transferred': self.bytes_transferred,
+            'rate': self.rate,
+            'setup_status': self.setup_status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    @classmethod
+    def new(cls, deployment_id, serial=None, mac_address=None):
+        """Create a pending target and add it to the session.
+
+        Args:
+            deployment_id: Deployment ID
+            serial: PC serial number
+            mac_address: Client MAC address
+
+        Returns:
+            DeploymentTarget
+        """
+        target = cls(
+            deployment_id=deployment_id,
+            serial=serial,
+            mac_address=normalize_mac(mac_address),
+            state=cls.STATE_PENDING,
+            percentage=0.0,
+            bytes_transferred=0
+        )
+        db.session.add(target)
+        return target
+
+    @classmethod
+    def backfill(cls):
+        """Create target rows from legacy ``Deployment.target_serials``.
+
+        Only deployments without any target rows are converted, so this is
+        a no-op once every deployment has been migrated.
+
+        Returns:
+            int: Number of target rows created
+        """
+        from .deployment import Deployment
+        from .pc_master import PCMaster
+
+        deployments = Deployment.query.filter(
+            Deployment.target_serials.isnot(None),
+            Deployment.target_serials != '',
+            ~Deployment.targets.any()
+        ).all()
+
+        created = 0
+        for deployment in deployments:
+            serials = list(dict.fromkeys(
+                s for s in deployment.target_serials.split(',') if s
+            ))
+            macs = dict(
+                db.session.query(PCMaster.serial, PCMaster.mac_address).filter(
+                    PCMaster.serial.in_(serials)
+                ).all()
+            )
+            for serial in serials:
+                cls.new(deployment.id, serial, macs.get(serial))
+            created += len(serials)
+
+        if created:
+            db.session.commit()
+        return created
+
+    @classmethod
+    def state_counts(cls, deployment_id):
+        """Get number of targets per state of a deployment.
+
+        Args:
+            deployment_id: Deployment ID
+
+        Returns:
+            dict: {state: count} including all states
+        """
+        counts = dict.fromkeys(cls.STATES, 0)
+        rows = db.session.query(cls.state, db.func.count()).filter(
+            cls.deployment_id == deployment_id
+        ).group_by(cls.state).all()
+        counts.update(dict(rows))
+        return counts
+
+    @classmethod
+    def sync_progress(cls, deployment_id, clients):
+        """Apply per-client DRBL progress to the target rows.
+
+        Clients are matched by MAC address, then by IP address. Only rows
+        whose values changed are written, so this is cheap to call on every
+        scheduler tick. Commits the session if anything changed.
+
+        Args:
+            deployment_id: Deployment ID
+            clients: Client dictionaries of DeploymentProgress.to_dict()
+
+        Returns:
+            int: Number of rows inserted or updated
+        """
+        if not clients:
+            return 0
+
+        targets = cls.query.filter_by(deployment_id=deployment_id).all()
+        by_mac = {t.mac_address: t for t in targets if t.mac_address}
+        by_ip = {t.ip_address: t for t in targets if t.ip_address}
+        by_serial = {t.serial: t for t in targets if t.serial}
+        now = datetime.utcnow()
+        changed = 0
+
+        for client in clients:
+            mac = normalize_mac(client.get('mac'))
+            ip = client.get('ip')
+            target = by_mac.get(mac) if mac else None
+            if target is None and ip:
+                target = by_ip.get(ip)
+
+            if target is None and mac:
+                # Registered PC whose MAC was unknown when the target was created
+                from .pc_master import PCMaster
+                pc = PCMaster.query.filter_by(mac_address=mac).first()
+                if pc is not None:
+                    target = by_serial.get(pc.serial)
+                    if target is None:
+                        target = by_serial[pc.serial] = cls.new(deployment_id, pc.serial)
+
+            if target is None:
+                target = cls.new(deployment_id)
+
+            values = {
+                'mac_address': mac or target.mac_address,
+                'ip_address': ip or target.ip_address,
+                'state': client.get('status') or target.state,
+                'percentage': float(client.get('percentage') or 0.0),
+                'rate': client.get('rate') or target.rate
+            }
+            estimate = _estimate_bytes(client.get('rate'), client.get('elapsed'))
+            if estimate is not None:
+                values['bytes_transferred'] = max(estimate, target.bytes_transferred or 0)
+            # Imaging never goes backwards once finished
+            if target.state in cls.FINAL_STATES and values['state'] not in cls.FINAL_STATES:
+                continue
+
+            updates = {k: v for k, v in values.items() if getattr(target, k) != v}
+            if not updates and target.id is not None:
+                continue
+
+            for key, value in updates.items():
+                setattr(target, key, value)
+            if target.started_at is None and target.state != cls.STATE_PENDING:
+                target.started_at = now
+            if target.state in cls.FINAL_STATES and target.completed_at is None:
+                target.completed_at = now
+            if target.mac_address:
+                by_mac[target.mac_address] = target
+            if target.ip_address:
+                by_ip[target.ip_address] = target
+            changed += 1
+
+        if changed:
+            db.session.commit()
+        return changed
+
+    @classmethod
+    def record_setup_logs(cls, connection, values):
+        """Mirror setup logs onto the PCs' targets of running deployments.
+
+        A setup log written after a deployment started means the PC booted
+        the restored image, so imaging of that target is complete. Logs of
+        PCs in queued deployments, or written before the deployment
+        started, are ignored.
+
+        Args:
+            connection: SQLAlchemy connection (same transaction as the insert)
+            values: List of dicts with serial, status and timestamp, oldest first
+        """
+        if not values:
+            return
+
+        from .deployment import Deployment
+
+        running = select(Deployment.id, Deployment.started_at).where(
+            Deployment.status == 'running',
+            Deployment.started_at.isnot(None)
+        )
+        started = connection.execute(running).all()
+        if not started:
+            return
+
+        now = datetime.utcnow()
+
+        # Latest log per serial
+        latest = {}
+        for v in values:
+            timestamp = v.get('timestamp') or now
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            latest[v['serial']] = (v['status'], timestamp)
+
+        table = cls.__table__
+        base = table.update().where(
+            table.c.serial == bindparam('b_serial'),
+            table.c.deployment_id.in_(bindparam('b_ids', expanding=True))
+        )
+        status_stmt = base.values(setup_status=bindparam('b_status'), updated_at=now)
+        complete_stmt = base.where(table.c.state.notin_(cls.FINAL_STATES)).values(
+            state=cls.STATE_COMPLETED,
+            percentage=100.0,
+            completed_at=now,
+            updated_at=now
+        )
+
+        for serial, (status, timestamp) in latest.items():
+            ids = [deployment_id for deployment_id, started_at in started
+                   if started_at <= timestamp]
+            if not ids:
+                continue
+            connection.execute(status_stmt, {'b_serial': serial, 'b_ids': ids,
+                                             'b_status': status})
+            connection.execute(complete_stmt, {'b_serial': serial, 'b_ids': ids})
+
+
+@event.listens_for(SetupLog, 'after_insert')
+def _setup_log_inserted(mapper, connection, target):
+    """Feed deployment targets in the same transaction as the log insert."""
+    DeploymentTarget.record_setup_logs(connection, [
+        {'serial': target.serial, 'status': target.status, 'timestamp': target.timestamp}
+    ])
@@ -0,0 +1,104 @@
+"""CSV import staging database model."""
+from datetime import datetime, timedelta
+from . import db
+
+
+class ImportStaging(db.Model):
+    """Import staging table - holds uploaded CSV rows until import is executed.
+
+    Rows are written by the preview step (``POST /import/upload``) and read
+    back in chunks by the execute step, so the full dataset never travels
+    through the browser.
+
+    Attributes:
+        id: Primary key
+        token: Import token returned by the preview step
+        row_num: Row number in the uploaded CSV (1 is the header)
+        serial: Raw serial value
+        pcname: Raw PC name value
+        odj_path: Raw ODJ path value
+        error: Validation error found during preview (None if valid)
+        created_at: Record creation timestamp
+    """
+
+    __tablename__ = 'import_staging'
+    __table_args__ = (
+        db.Index('ix_import_staging_token_row', 'token', 'row_num'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    token = db.Column(db.String(64), nullable=False)
+    row_num = db.Column(db.Integer, nullable=False)
+    serial = db.Column(db.String(255), nullable=True)
+    pcname = db.Column(db.String(255), nullable=True)
+    odj_path = db.Column(db.String(255), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        index=True
+    )
+
+    def __repr__(self):
+        """String representation."""
+        return f'<ImportStaging {self.token}:{self.row_num}>'
+
+    def to_row(self):
+        """Convert to a CSV row dictionary."""
+        return {
+            'serial': self.serial or '',
+            'pcname': self.pcname or '',
+            'odj_path': self.odj_path or ''
+        }
+
+    @classmethod
+    def iter_chunks(cls, token, chunk_size=1000):
+        """Iterate staged rows for a token in row order, one chunk at a time.
+
+        Args:
+            token: Import token
+            chunk_size: Number of rows per query
+
+        Yields:
+            Lists of ImportStaging objects
+        """
+        last_row = 0
+        while True:
+            chunk = cls.query.filter(
+                cls.token == token,
+                cls.row_num > last_row
+            ).order_by(cls.row_num).limit(chunk_size).all()
+
+            if not chunk:
+                return
+
+            last_row = chunk[-1].row_num
+            yield chunk
+
+    @classmethod
+    def delete_token(cls, token):
+        """Delete all staged rows for a token.
+
+        Args:
+            token: Import token
+
+        Returns:
+            int: Number of deleted rows
+        """
+        return cls.query.filter_by(token=token).delete(synchronize_session=False)
+
+    @classmethod
+    def purge_expired(cls, max_age_hours=24):
+        """Delete staged rows of abandoned imports.
+
+        Args:
+            max_age_hours: Age after which staged rows are removed
+
+        Returns:
+            int: Number of deleted rows
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        return cls.query.filter(
+            cls.created_at < cutoff
+        ).delete(synchronize_session=False)
@@ -0,0 +1,102 @@
+"""Background job database model."""
+import json
+from datetime import datetime
+from . import db
+
+
+class Job(db.Model):
+    """Job table - stores background jobs run by the local job runner.
+
+    Attributes:
+        id: Primary key
+        job_type: Registered handler name (e.g. 'deployment.start')
+        status: Job status (queued/running/completed/failed/cancelled)
+        deployment_id: Related deployment ID (optional)
+        params: JSON encoded handler parameters
+        result: JSON encoded handler result
+        error: Error message if failed
+        cancel_requested: Whether cancellation was requested
+        created_at: Record creation timestamp
+        started_at: Execution start timestamp
+        completed_at: Execution end timestamp
+    """
+
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False, index=True)
+    status = db.Column(
+        db.String(20),
+        nullable=False,
+        default='queued',
+        index=True
+    )
+    deployment_id = db.Column(db.Integer, nullable=True, index=True)
+    params = db.Column(db.Text, nullable=True)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow
+    )
+    started_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    # Valid status values
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+
+    ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+    def __repr__(self):
+        """String representation."""
+        return f'<Job {self.id} {self.job_type} ({self.status})>'
+
+    @property
+    def is_active(self):
+        """Whether the job is queued or running."""
+        return self.status in self.ACTIVE_STATUSES
+
+    def get_params(self):
+        """Decode handler parameters."""
+        return json.loads(self.params) if self.params else {}
+
+    def get_result(self):
+        """Decode handler result."""
+        return json.loads(self.result) if self.result else None
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'deployment_id': self.deployment_id,
+            'params': self.get_params(),
+            'result': self.get_result(),
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    @classmethod
+    def get_active_for_deployment(cls, deployment_id):
+        """Get queued or running jobs for a deployment.
+
+        Args:
+            deployment_id: Deployment ID
+
+        Returns:
+            List of Job objects
+        """
+        return cls.query.filter(
+            cls.deployment_id == deployment_id,
+            cls.status.in_(cls.ACTIVE_STATUSES)
+        ).order_by(cls.created_at.desc()).all()
@@ -0,0 +1,77 @@
+"""Setup log archive index database models."""
+from datetime import datetime
+from . import db
+
+
+class LogArchiveSegment(db.Model):
+    """Archive segment table - one compressed frame in a monthly archive file.
+
+    Each retention batch appends one independently compressed frame per
+    month to ``setup_logs-YYYY-MM.ndjson.<codec>``. The byte range is kept
+    here so a frame can be read without decompressing the whole file.
+
+    Attributes:
+        id: Primary key
+        month: Month of the archived log timestamps (YYYY-MM)
+        file_name: Archive file name (relative to LOG_ARCHIVE_PATH)
+        offset: Byte offset of the frame in the file
+        length: Compressed frame length in bytes
+        record_count: Number of archived log entries
+        first_log_id: Smallest archived SetupLog ID
+        last_log_id: Largest archived SetupLog ID
+        created_at: Archive timestamp
+    """
+
+    __tablename__ = 'log_archive_segments'
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), nullable=False, index=True)
+    file_name = db.Column(db.String(255), nullable=False)
+    offset = db.Column(db.BigInteger, nullable=False)
+    length = db.Column(db.BigInteger, nullable=False)
+    record_count = db.Column(db.Integer, nullable=False)
+    first_log_id = db.Column(db.Integer, nullable=False)
+    last_log_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        """String representation."""
+        return f'<LogArchiveSegment {self.file_name}@{self.offset} ({self.record_count})>'
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'id': self.id,
+            'month': self.month,
+            'file_name': self.file_name,
+            'offset': self.offset,
+            'length': self.length,
+            'record_count': self.record_count,
+            'first_log_id': self.first_log_id,
+            'last_log_id': self.last_log_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class LogArchiveEntry(db.Model):
+    """Archive index table - which segments hold logs of a serial.
+
+    Attributes:
+        serial: PC serial number
+        segment_id: LogArchiveSegment ID
+        record_count: Number of this serial's entries in the segment
+    """
+
+    __tablename__ = 'log_archive_entries'
+
+    serial = db.Column(db.String(100), primary_key=True)
+    segment_id = db.Column(
+        db.Integer,
+        db.ForeignKey('log_archive_segments.id'),
+        primary_key=True
+    )
+    record_count = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        """String representation."""
+        return f'<LogArchiveEntry {self.serial} in {self.segment_id}>'
@@ -0,0 +1,68 @@
+"""Setup log idempotency key database model."""
+from datetime import datetime, timedelta
+from . import db
+
+
+class LogIdempotencyKey(db.Model):
+    """Idempotency key table - maps client-generated keys to setup logs.
+
+    Setup agents attach a key to every buffered log entry and resend the
+    same key on retry, so a batch that was stored but whose response was
+    lost is not inserted twice.
+
+    Attributes:
+        key: Client-generated idempotency key (primary key)
+        log_id: ID of the SetupLog created for this key
+        created_at: Record creation timestamp
+    """
+
+    __tablename__ = 'setup_log_keys'
+
+    key = db.Column(db.String(64), primary_key=True)
+    log_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        index=True
+    )
+
+    def __repr__(self):
+        """String representation."""
+        return f'<LogIdempotencyKey {self.key} -> {self.log_id}>'
+
+    @classmethod
+    def find_existing(cls, keys, chunk_size=500):
+        """Look up keys that were already stored.
+
+        Args:
+            keys: Iterable of idempotency keys
+            chunk_size: Maximum number of keys per IN query
+
+        Returns:
+            dict: {key: log_id} for keys that exist
+        """
+        keys = list(keys)
+        existing = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            rows = db.session.query(cls.key, cls.log_id).filter(
+                cls.key.in_(chunk)
+            ).all()
+            existing.update(dict(rows))
+        return existing
+
+    @classmethod
+    def purge_expired(cls, max_age_hours=168):
+        """Delete keys older than the client retry window.
+
+        Args:
+            max_age_hours: Age after which keys are removed
+
+        Returns:
+            int: Number of deleted keys
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+        return cls.query.filter(
+            cls.created_at < cutoff
+        ).delete(synchronize_session=False)
@@ -0,0 +1,236 @@
+"""ODJ file inventory database model."""
+import hashlib
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .pc_master import PCMaster
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """Compute the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OdjFile(db.Model):
+    """ODJ file table - inventory of the ODJ blobs in ODJ_FILES_PATH.
+
+    Kept in sync with the directory by sync() (one scandir, files are only
+    re-hashed when their size or mtime changed) and by the upload/delete
+    endpoints. The associated PC is the PCMaster row whose odj_path is the
+    file's path, joined through the pc_master.odj_path index.
+
+    Attributes:
+        id: Primary key
+        filename: File name (unique)
+        path: Full file path (matches PCMaster.odj_path)
+        size_bytes: File size
+        sha256: SHA-256 of the file contents
+        mtime_ns: File modification time in nanoseconds (change detection)
+        modified_at: File modification time
+        created_at: File creation (ctime) when first seen
+        synced_at: Last time the row was checked against the file
+    """
+
+    __tablename__ = 'odj_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), unique=True, nullable=False)
+    path = db.Column(db.String(255), nullable=False, index=True)
+    size_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    sha256 = db.Column(db.String(64), nullable=True)
+    mtime_ns = db.Column(db.BigInteger, nullable=False, default=0)
+    modified_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=True)
+    synced_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+    def __repr__(self):
+        """String representation."""
+        return f'<OdjFile {self.filename} ({self.size_bytes} bytes)>'
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'filename': self.filename,
+            'path': self.path,
+            'size_bytes': self.size_bytes,
+            'sha256': self.sha256,
+            'modified': self.modified_at.isoformat() if self.modified_at else None,
+            'created': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
+        }
+
+    def _apply_stat(self, path, st):
+        """Update size, times and hash from a stat result."""
+        self.path = str(path)
+        self.size_bytes = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self.modified_at = datetime.fromtimestamp(st.st_mtime)
+        if self.created_at is None:
+            self.created_at = datetime.fromtimestamp(st.st_ctime)
+        self.sha256 = file_sha256(path)
+
+    @classmethod
+    def record(cls, path):
+        """Add or refresh the row of one file (not committed).
+
+        Args:
+            path: File path
+
+        Returns:
+            OdjFile or None if the file does not exist
+        """
+        path = Path(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+
+        odj_file = cls.query.filter_by(filename=path.name).first()
+        if odj_file is None:
+            odj_file = cls(filename=path.name)
+            db.session.add(odj_file)
+        odj_file._apply_stat(path, st)
+        return odj_file
+
+    @classmethod
+    def remove(cls, filename):
+        """Delete the row of a file (not committed).
+
+        Returns:
+            bool: True if a row was deleted
+        """
+        return cls.query.filter_by(filename=filename).delete() > 0
+
+    @classmethod
+    def sync(cls, odj_dir, extensions=('txt',)):
+        """Bring the inventory in line with the ODJ directory.
+
+        Args:
+            odj_dir: ODJ files directory
+            extensions: File extensions to include (lowercase, without dot)
+
+        Returns:
+            dict: Numbers of added, updated, removed and unchanged files
+        """
+        counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        odj_dir = str(odj_dir)
+
+        files = {}
+        try:
+            with os.scandir(odj_dir) as entries:
+                for entry in entries:
+                    if ('.' in entry.name
+                            and entry.name.rsplit('.', 1)[1].lower() in extensions
+                            and entry.is_file()):
+                        files[entry.name] = (entry.path, entry.stat())
+        except FileNotFoundError:
+            logger.warning(f'ODJ directory not found: {odj_dir}')
+
+        # Compare on plain columns; only new and changed files load a row
+        known = {
+            filename: (row_id, size, mtime_ns, path)
+            for row_id, filename, size, mtime_ns, path in db.session.query(
+                cls.id, cls.filename, cls.size_bytes, cls.mtime_ns, cls.path
+            )
+        }
+
+        removed = [row[0] for filename, row in known.items() if filename not in files]
+        if removed:
+            cls.query.filter(cls.id.in_(removed)).delete(synchronize_session=False)
+            counts['removed'] = len(removed)
+
+        for filename, (path, st) in files.items():
+            current = known.get(filename)
+            if current is None:
+                row = cls(filename=filename)
+                db.session.add(row)
+                counts['added'] += 1
+            elif current[1:] == (st.st_size, st.st_mtime_ns, path):
+                counts['unchanged'] += 1
+                continue
+            else:
+                row = db.session.get(cls, current[0])
+                counts['updated'] += 1
+            try:
+                row._apply_stat(path, st)
+            except OSError as e:
+                # Deleted between scandir and hashing; next sync removes it
+                logger.warning(f'Could not read ODJ file {path}: {e}')
+                row.sha256 = None
+
+        if counts['added'] or counts['updated'] or counts['removed']:
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another worker synced the same files concurrently
+                db.session.rollback()
+                logger.info('ODJ inventory synced concurrently, keeping their rows')
+            else:
+                logger.info(
+                    f"ODJ inventory synced: added={counts['added']} "
+                    f"updated={counts['updated']} removed={counts['removed']}"
+                )
+
+        return counts
+
+    @classmethod
+    def inventory(cls):
+        """List files with their associated PC in one join.
+
+        Plain columns are selected (no ORM objects), so thousands of files
+        are listed in tens of milliseconds.
+
+        Returns:
+            List of file dictionaries (see to_dict) ordered by filename, each
+            with an associated_pc dictionary or None; if several PCs share a
+            file, the first created one is returned
+        """
+        rows = db.session.query(
+            cls.id, cls.filename, cls.path, cls.size_bytes, cls.sha256,
+            cls.modified_at, cls.created_at,
+            PCMaster.id, PCMaster.serial, PCMaster.pcname, PCMaster.mac_address,
+            PCMaster.created_at, PCMaster.updated_at
+        ).outerjoin(
+            PCMaster, PCMaster.odj_path == cls.path
+        ).order_by(cls.filename, PCMaster.id).all()
+
+        inventory = []
+        last_id = None
+        for (file_id, filename, path, size, sha256, modified, created,
+             pc_id, serial, pcname, mac_address, pc_created, pc_updated) in rows:
+            if file_id == last_id:
+                continue
+            last_id = file_id
+            inventory.append({
+                'filename': filename,
+                'path': path,
+                'size_bytes': size,
+                'sha256': sha256,
+                'modified': modified.isoformat() if modified else None,
+                'created': created.strftime('%Y-%m-%d %H:%M:%S') if created else None,
+                'associated_pc': {
+                    'id': pc_id,
+                    'serial': serial,
+                    'pcname': pcname,
+                    'odj_path': path,
+                    'mac_address': mac_address,
+                    'created_at': pc_created.isoformat() if pc_created else None,
+                    'updated_at': pc_updated.isoformat() if pc_updated else None
+                } if pc_id is not None else None
+            })
+        return inventory
@@ -11,16 +11,23 @@ class PCMaster(db.Model):
         serial: PC serial number (unique)
         pcname: PC name in YYYYMMDDM format
         odj_path: Path to ODJ file
+        mac_address: MAC address of the PC (aa:bb:cc:dd:ee:ff)
         created_at: Record creation timestamp
         updated_at: Record update timestamp
     """
 
     __tablename__ = 'pc_master'
+    __table_args__ = (
+        # Matches the listing order (created_at DESC, id DESC) for keyset pages
+        db.Index('ix_pc_master_created_at_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     serial = db.Column(db.String(100), unique=True, nullable=False, index=True)
     pcname = db.Column(db.String(50), nullable=False, index=True)
-    odj_path = db.Column(db.String(255), nullable=True)
+    # Indexed for the ODJ inventory join and association lookups
+    odj_path = db.Column(db.String(255), nullable=True, index=True)
+    mac_address = db.Column(db.String(17), nullable=True, index=True)
     created_at = db.Column(
         db.DateTime,
         nullable=False,
@@ -53,6 +60,7 @@ class PCMaster(db.Model):
             'serial': self.serial,
             'pcname': self.pcname,
             'odj_path': self.odj_path,
+            'mac_address': self.mac_address,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -0,0 +1,212 @@
+"""PC Status database model (latest setup status per PC)."""
+from datetime import datetime
+from sqlalchemy import event, func, insert, select
+from . import db
+from .setup_log import SetupLog
+
+
+class PCStatus(db.Model):
+    """PC status table - latest setup log state per serial.
+
+    Maintained incrementally on every SetupLog insert, so dashboards read
+    one row per PC instead of scanning the whole setup_logs history.
+
+    Attributes:
+        serial: PC serial number (primary key)
+        pcname: PC name of the latest log
+        status: Latest setup status
+        step: Latest setup step
+        timestamp: Timestamp of the latest log
+        log_id: ID of the latest SetupLog row
+        error_message: Error message of the latest log
+        updated_at: Record update timestamp
+    """
+
+    __tablename__ = 'pc_status'
+
+    serial = db.Column(db.String(100), primary_key=True)
+    pcname = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, index=True)
+    step = db.Column(db.String(50), nullable=True)
+    timestamp = db.Column(db.DateTime, nullable=False, index=True)
+    log_id = db.Column(db.Integer, nullable=False)
+    error_message = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+    def __repr__(self):
+        """String representation."""
+        return f'<PCStatus {self.serial} - {self.status}>'
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'serial': self.serial,
+            'pcname': self.pcname,
+            'status': self.status,
+            'step': self.step,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'log_id': self.log_id,
+            'error_message': self.error_message
+        }
+
+    @classmethod
+    def status_counts(cls):
+        """Get number of PCs per latest status.
+
+        Returns:
+            dict: {status: count} including all SetupLog statuses
+        """
+        counts = dict.fromkeys([
+            SetupLog.STATUS_PENDING,
+            SetupLog.STATUS_IN_PROGRESS,
+            SetupLog.STATUS_COMPLETED,
+            SetupLog.STATUS_FAILED
+        ], 0)
+
+        rows = db.session.query(cls.status, func.count()).group_by(cls.status).all()
+        counts.update(dict(rows))
+        return counts
+
+    @classmethod
+    def record(cls, connection, values):
+        """Upsert latest status rows, keeping the newest log per serial.
+
+        A log with an older timestamp than the stored one (late delivery)
+        does not overwrite the newer state.
+
+        Args:
+            connection: SQLAlchemy connection (same transaction as the insert)
+            values: List of dicts with serial, pcname, status, step,
+                timestamp, log_id and error_message
+        """
+        if not values:
+            return
+
+        now = datetime.utcnow()
+        table = cls.__table__
+        rows = [dict(v, updated_at=now) for v in values]
+        dialect = connection.dialect.name
+
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as upsert
+
+            stmt = upsert(table)
+            excluded = stmt.excluded
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.serial],
+                set_={
+                    'pcname': excluded.pcname,
+                    'status': excluded.status,
+                    'step': excluded.step,
+                    'timestamp': excluded.timestamp,
+                    'log_id': excluded.log_id,
+                    'error_message': excluded.error_message,
+                    'updated_at': excluded.updated_at
+                },
+                where=(
+                    (excluded.timestamp > table.c.timestamp)
+                    | ((excluded.timestamp == table.c.timestamp)
+                       & (excluded.log_id > table.c.log_id))
+                )
+            )
+            for row in rows:
+                connection.execute(stmt, row)
+            return
+
+        # Generic fallback: read-compare-write
+        for row in rows:
+            current = connection.execute(
+                select(table.c.timestamp, table.c.log_id)
+                .where(table.c.serial == row['serial'])
+            ).first()
+            if current is None:
+                connection.execute(table.insert(), row)
+            elif (row['timestamp'], row['log_id']) > tuple(current):
+                connection.execute(
+                    table.update().where(table.c.serial == row['serial']),
+                    row
+                )
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute the whole table from setup_logs.
+
+        Returns:
+            int: Number of PCs
+        """
+        ranked = select(
+            SetupLog.serial,
+            SetupLog.pcname,
+            SetupLog.status,
+            SetupLog.step,
+            SetupLog.timestamp,
+            SetupLog.id.label('log_id'),
+            SetupLog.error_message,
+            func.row_number().over(
+                partition_by=SetupLog.serial,
+                order_by=(SetupLog.timestamp.desc(), SetupLog.id.desc())
+            ).label('rn')
+        ).subquery()
+
+        columns = ['serial', 'pcname', 'status', 'step', 'timestamp',
+                   'log_id', 'error_message', 'updated_at']
+
+        db.session.query(cls).delete(synchronize_session=False)
+        db.session.execute(
+            insert(cls).from_select(
+                columns,
+                select(
+                    ranked.c.serial,
+                    ranked.c.pcname,
+                    ranked.c.status,
+                    ranked.c.step,
+                    ranked.c.timestamp,
+                    ranked.c.log_id,
+                    ranked.c.error_message,
+                    func.current_timestamp()
+                ).where(ranked.c.rn == 1)
+            )
+        )
+        db.session.commit()
+
+        return cls.query.count()
+
+    @classmethod
+    def backfill(cls):
+        """Populate an empty table from existing setup_logs.
+
+        Returns:
+            int: Number of PCs backfilled (0 if nothing to do)
+        """
+        if db.session.query(cls.serial).first() is not None:
+            return 0
+        if db.session.query(SetupLog.id).first() is None:
+            return 0
+        return cls.rebuild()
+
+
+def _status_values(log):
+    """Build PCStatus upsert values from a SetupLog."""
+    return {
+        'serial': log.serial,
+        'pcname': log.pcname,
+        'status': log.status,
+        'step': log.step,
+        'timestamp': log.timestamp,
+        'log_id': log.id,
+        'error_message': log.error_message
+    }
+
+
+@event.listens_for(SetupLog, 'after_insert')
+def _setup_log_inserted(mapper, connection, target):
+    """Maintain pc_status in the same transaction as the log insert."""
+    PCStatus.record(connection, [_status_values(target)])
@@ -0,0 +1,249 @@
+"""Full-text search index over PCs and setup logs.
+
+Two SQLite FTS5 external-content tables mirror the searchable columns of
+``pc_master`` and ``setup_logs``. They use the trigram tokenizer, so any
+substring of three or more characters (partial serials, PC names, error
+fragments) is an index lookup instead of an ``ILIKE '%x%'`` full scan.
+
+The index is kept in sync by SQL triggers rather than ORM events, so bulk
+Core inserts (CSV import, log batches) and raw deletes are covered too.
+The tables and triggers are created/dropped together with the ORM tables
+(``db.create_all()``/``db.drop_all()``). On databases without FTS5 (or
+not SQLite) search falls back to ``ILIKE`` scans.
+"""
+import logging
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from . import db
+from .pc_master import PCMaster
+from .setup_log import SetupLog
+
+logger = logging.getLogger(__name__)
+
+MIN_TERM_LENGTH = 3
+
+# (fts table, source table, indexed columns)
+INDEXES = (
+    ('pc_master_fts', 'pc_master', ('serial', 'pcname')),
+    ('setup_logs_fts', 'setup_logs', ('serial', 'pcname', 'step', 'logs', 'error_message')),
+)
+
+# bm25 column weights: identifiers rank above free text, errors above logs
+LOG_WEIGHTS = '5.0, 5.0, 1.0, 1.0, 2.0'
+
+
+def _ddl(fts, source, columns):
+    """Build CREATE statements of one FTS table and its sync triggers."""
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    insert = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{source}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+class SearchIndex:
+    """Search PCs and setup logs (FTS5 with ILIKE fallback)."""
+
+    @staticmethod
+    def create(connection):
+        """Create FTS tables and triggers if missing.
+
+        A newly created index is filled from the existing rows.
+
+        Args:
+            connection: SQLAlchemy connection
+
+        Returns:
+            bool: True if the FTS index is available
+        """
+        if connection.dialect.name != 'sqlite':
+            return False
+
+        for fts, source, columns in INDEXES:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+                {'name': fts}
+            ).first() is not None
+
+            try:
+                for statement in _ddl(fts, source, columns):
+                    connection.execute(text(statement))
+            except OperationalError as e:
+                # SQLite built without FTS5 or older than 3.34 (trigram)
+                logger.warning(f'Full-text search index unavailable: {e}')
+                return False
+
+            if not exists:
+                connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+                logger.info(f'Search index {fts} built')
+
+        return True
+
+    @staticmethod
+    def drop(connection):
+        """Drop FTS tables (triggers go with their source tables).
+
+        Args:
+            connection: SQLAlchemy connection
+        """
+        if connection.dialect.name != 'sqlite':
+            return
+        for fts, _, _ in INDEXES:
+            connection.execute(text(f'DROP TABLE IF EXISTS {fts}'))
+
+    @staticmethod
+    def is_available():
+        """Check whether the FTS tables exist in the current database."""
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        count = db.session.execute(text(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type='table' "
+            "AND name IN ('pc_master_fts', 'setup_logs_fts')"
+        )).scalar()
+        return count == len(INDEXES)
+
+    @classmethod
+    def rebuild(cls):
+        """Rebuild the FTS index from the source tables.
+
+        Returns:
+            bool: True if the FTS index is available
+        """
+        connection = db.session.connection()
+        available = cls.create(connection)
+        if available:
+            for fts, _, _ in INDEXES:
+                connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        db.session.commit()
+        return available
+
+    @staticmethod
+    def terms(query):
+        """Split a query into searchable terms.
+
+        Args:
+            query: User query string
+
+        Returns:
+            list: Terms of at least MIN_TERM_LENGTH characters
+        """
+        return [t for t in (query or '').split() if len(t) >= MIN_TERM_LENGTH]
+
+    @classmethod
+    def search(cls, query, kinds=('pcs', 'logs'), limit=20):
+        """Search PCs and setup logs.
+
+        All terms must match (AND); hits are ranked by bm25.
+
+        Args:
+            query: User query string
+            kinds: Result kinds to search ('pcs', 'logs')
+            limit: Maximum hits per kind
+
+        Returns:
+            dict: {'engine': 'fts5'|'like', 'pcs': [...], 'logs': [...]}
+        """
+        terms = cls.terms(query)
+        if cls.is_available():
+            engine = 'fts5'
+            # Quoted strings: no FTS5 operators/column filters from user input
+            match = ' '.join('"' + t.replace('"', '""') + '"' for t in terms)
+            search_pcs, search_logs = cls._fts_pcs, cls._fts_logs
+        else:
+            engine = 'like'
+            match = terms
+            search_pcs, search_logs = cls._like_pcs, cls._like_logs
+
+        return {
+            'engine': engine,
+            'pcs': search_pcs(match, limit) if 'pcs' in kinds else [],
+            'logs': search_logs(match, limit) if 'logs' in kinds else []
+        }
+
+    @staticmethod
+    def _fts_pcs(match, limit):
+        """Ranked PC hits from the FTS index."""
+        rows = db.session.execute(text(
+            "SELECT p.id, p.serial, p.pcname, p.odj_path, "
+            "bm25(pc_master_fts) AS score "
+            "FROM pc_master_fts JOIN pc_master p ON p.id = pc_master_fts.rowid "
+            "WHERE pc_master_fts MATCH :match "
+            "ORDER BY score LIMIT :limit"
+        ), {'match': match, 'limit': limit}).mappings().all()
+
+        return [dict(row, score=round(-row['score'], 4)) for row in rows]
+
+    @staticmethod
+    def _fts_logs(match, limit):
+        """Ranked setup log hits from the FTS index."""
+        rows = db.session.execute(text(
+            "SELECT l.id, l.serial, l.pcname, l.status, l.step, l.timestamp, "
+            "snippet(setup_logs_fts, -1, '[', ']', '...', 16) AS snippet, "
+            f"bm25(setup_logs_fts, {LOG_WEIGHTS}) AS score "
+            "FROM setup_logs_fts JOIN setup_logs l ON l.id = setup_logs_fts.rowid "
+            "WHERE setup_logs_fts MATCH :match "
+            "ORDER BY score LIMIT :limit"
+        ).columns(timestamp=db.DateTime), {'match': match, 'limit': limit}).mappings().all()
+
+        return [dict(row, score=round(-row['score'], 4)) for row in rows]
+
+    @staticmethod
+    def _like_pcs(terms, limit):
+        """PC hits via ILIKE scans (no FTS5)."""
+        query = PCMaster.query
+        for term in terms:
+            pattern = f'%{term}%'
+            query = query.filter(
+                PCMaster.serial.ilike(pattern) | PCMaster.pcname.ilike(pattern)
+            )
+        return [
+            {'id': pc.id, 'serial': pc.serial, 'pcname': pc.pcname,
+             'odj_path': pc.odj_path, 'score': None}
+            for pc in query.order_by(PCMaster.id.desc()).limit(limit)
+        ]
+
+    @staticmethod
+    def _like_logs(terms, limit):
+        """Setup log hits via ILIKE scans (no FTS5)."""
+        query = SetupLog.query
+        for term in terms:
+            pattern = f'%{term}%'
+            query = query.filter(
+                SetupLog.serial.ilike(pattern)
+                | SetupLog.pcname.ilike(pattern)
+                | SetupLog.step.ilike(pattern)
+                | SetupLog.logs.ilike(pattern)
+                | SetupLog.error_message.ilike(pattern)
+            )
+        return [
+            {'id': log.id, 'serial': log.serial, 'pcname': log.pcname,
+             'status': log.status, 'step': log.step, 'timestamp': log.timestamp,
+             'snippet': log.error_message or log.logs, 'score': None}
+            for log in query.order_by(SetupLog.id.desc()).limit(limit)
+        ]
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_search_index(target, connection, **kw):
+    """Create the search index together with the ORM tables."""
+    SearchIndex.create(connection)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    """Drop the search index before its content tables."""
+    SearchIndex.drop(connection)
@@ -0,0 +1,203 @@
+"""Deployment session metric database model."""
+from datetime import datetime
+from . import db
+from .deployment_target import DeploymentTarget, rate_bytes_per_second
+
+MB = 1024 * 1024
+
+
+class SessionMetric(db.Model):
+    """Session metric table - settings and measured throughput of one session.
+
+    A row is created when the DRBL session of a deployment starts (with the
+    settings used and the predicted duration) and completed when the
+    deployment finishes, from the per-client progress parsed from the
+    Clonezilla logs (deployment_targets).
+
+    Attributes:
+        id: Primary key
+        deployment_id: Deployment ID (None once the deployment is deleted)
+        image_name: Clonezilla image name
+        mode: Deployment mode (multicast/unicast)
+        compression: Compression of the image chunks (zst, gz, lz4, ...)
+        image_size_bytes: Image size on disk
+        clients_to_wait: Clients DRBL waited for before sending
+        max_wait_time: Seconds DRBL waited for clients at most
+        auto_tuned: Settings were chosen by the session tuner
+        predicted_seconds: Predicted session duration
+        status: running/completed/failed
+        started_at: Session start
+        completed_at: Session end
+        client_count: Clients that joined the session
+        clients_completed: Clients that completed imaging
+        wait_seconds: Start until the first client started imaging
+        transfer_seconds: First client start until the last client finished
+        duration_seconds: Session start until end
+        throughput_mb_s: Mean parsed client rate (MB/s)
+    """
+
+    __tablename__ = 'deployment_session_metrics'
+
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    deployment_id = db.Column(
+        db.Integer,
+        db.ForeignKey('deployment.id', ondelete='SET NULL'),
+        nullable=True,
+        index=True
+    )
+    image_name = db.Column(db.String(100), nullable=False, index=True)
+    mode = db.Column(db.String(20), nullable=False, default='multicast')
+    compression = db.Column(db.String(20), nullable=True)
+    image_size_bytes = db.Column(db.BigInteger, nullable=True)
+    clients_to_wait = db.Column(db.Integer, nullable=True)
+    max_wait_time = db.Column(db.Integer, nullable=True)
+    auto_tuned = db.Column(db.Boolean, nullable=False, default=False)
+    predicted_seconds = db.Column(db.Float, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_RUNNING, index=True)
+    started_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    client_count = db.Column(db.Integer, nullable=True)
+    clients_completed = db.Column(db.Integer, nullable=True)
+    wait_seconds = db.Column(db.Float, nullable=True)
+    transfer_seconds = db.Column(db.Float, nullable=True)
+    duration_seconds = db.Column(db.Float, nullable=True)
+    throughput_mb_s = db.Column(db.Float, nullable=True)
+
+    def __repr__(self):
+        """String representation."""
+        return f'<SessionMetric {self.deployment_id} {self.image_name} ({self.status})>'
+
+    @property
+    def prediction_error_pct(self):
+        """Actual vs predicted duration in percent (positive: slower)."""
+        if not self.predicted_seconds or self.duration_seconds is None:
+            return None
+        return round((self.duration_seconds - self.predicted_seconds)
+                     / self.predicted_seconds * 100, 1)
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'id': self.id,
+            'deployment_id': self.deployment_id,
+            'image_name': self.image_name,
+            'mode': self.mode,
+            'compression': self.compression,
+            'image_size_bytes': self.image_size_bytes,
+            'clients_to_wait': self.clients_to_wait,
+            'max_wait_time': self.max_wait_time,
+            'auto_tuned': self.auto_tuned,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'client_count': self.client_count,
+            'clients_completed': self.clients_completed,
+            'wait_seconds': self.wait_seconds,
+            'transfer_seconds': self.transfer_seconds,
+            'throughput_mb_s': self.throughput_mb_s,
+            'predicted_seconds': self.predicted_seconds,
+            'actual_seconds': self.duration_seconds,
+            'prediction_error_pct': self.prediction_error_pct
+        }
+
+    @classmethod
+    def begin(cls, deployment, settings):
+        """Record the start of a deployment's session (not committed).
+
+        Args:
+            deployment: Deployment object
+            settings: Dictionary with clients_to_wait, max_wait_time,
+                compression, image_size_bytes, predicted_seconds and
+                auto_tuned
+
+        Returns:
+            SessionMetric
+        """
+        metric = cls(
+            deployment_id=deployment.id,
+            image_name=deployment.image_name,
+            mode=deployment.mode,
+            compression=settings.get('compression'),
+            image_size_bytes=settings.get('image_size_bytes'),
+            clients_to_wait=settings.get('clients_to_wait'),
+            max_wait_time=settings.get('max_wait_time'),
+            auto_tuned=bool(settings.get('auto_tuned')),
+            predicted_seconds=settings.get('predicted_seconds'),
+            status=cls.STATUS_RUNNING,
+            started_at=deployment.started_at or datetime.utcnow()
+        )
+        db.session.add(metric)
+        return metric
+
+    @classmethod
+    def finish(cls, deployment):
+        """Complete the running metric of a finished deployment (not committed).
+
+        Args:
+            deployment: Deployment object (status completed or failed)
+
+        Returns:
+            SessionMetric or None if the session was not recorded
+        """
+        metric = cls.query.filter_by(
+            deployment_id=deployment.id,
+            status=cls.STATUS_RUNNING
+        ).order_by(cls.id.desc()).first()
+        if metric is None:
+            return None
+
+        end = deployment.completed_at or datetime.utcnow()
+        targets = DeploymentTarget.query.filter_by(deployment_id=deployment.id).all()
+        joined = [t for t in targets if t.started_at is not None]
+        completed = [t for t in targets if t.state == DeploymentTarget.STATE_COMPLETED]
+        started = [t.started_at for t in joined]
+        ended = [t.completed_at for t in completed if t.completed_at]
+
+        metric.status = (
+            cls.STATUS_FAILED if deployment.status == 'failed' else cls.STATUS_COMPLETED
+        )
+        metric.completed_at = end
+        metric.duration_seconds = max(0.0, (end - metric.started_at).total_seconds())
+        metric.client_count = len(joined)
+        metric.clients_completed = len(completed)
+        if started:
+            metric.wait_seconds = max(0.0, (min(started) - metric.started_at).total_seconds())
+        if started and ended:
+            metric.transfer_seconds = max(0.0, (max(ended) - min(started)).total_seconds())
+
+        # Clients of one multicast session share the sender's rate
+        rates = [rate_bytes_per_second(t.rate) for t in joined]
+        rates = [r for r in rates if r]
+        if rates:
+            metric.throughput_mb_s = round(sum(rates) / len(rates) / MB, 2)
+        elif metric.transfer_seconds and metric.image_size_bytes:
+            metric.throughput_mb_s = round(
+                metric.image_size_bytes / MB / metric.transfer_seconds, 2
+            )
+
+        return metric
+
+    @classmethod
+    def history(cls, mode='multicast', image_name=None, limit=50):
+        """Get completed sessions with a measured throughput, newest first.
+
+        Args:
+            mode: Deployment mode
+            image_name: Only sessions of this image (optional)
+            limit: Maximum number of sessions
+
+        Returns:
+            List of SessionMetric objects
+        """
+        query = cls.query.filter(
+            cls.status == cls.STATUS_COMPLETED,
+            cls.mode == mode,
+            cls.throughput_mb_s.isnot(None)
+        )
+        if image_name:
+            query = query.filter(cls.image_name == image_name)
+        return query.order_by(cls.completed_at.desc()).limit(limit).all()
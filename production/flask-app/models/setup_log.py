@@ -18,6 +18,13 @@ class SetupLog(db.Model):
     """
 
     __tablename__ = 'setup_logs'
+    __table_args__ = (
+        # Match the listing orders (timestamp DESC, id DESC) for keyset pages
+        db.Index('ix_setup_logs_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_setup_logs_status_timestamp_id', 'status', 'timestamp', 'id'),
+        # Per-serial history, newest first (latest log, retention ranking)
+        db.Index('ix_setup_logs_serial_timestamp_id', 'serial', 'timestamp', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     serial = db.Column(db.String(100), nullable=False, index=True)
@@ -1,38 +1,100 @@
 #!/usr/bin/env python3
 """本番環境用Flaskアプリケーション起動スクリプト"""
 
+import argparse
 import os
+import shutil
 import sys
 from pathlib import Path
 
 # プロジェクトルートをPythonパスに追加
-project_root = Path(__file__).parent
+project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
 # 本番環境設定を読み込み
 os.environ['FLASK_ENV'] = 'production'
 os.environ['FLASK_APP'] = 'app.py'
 
-# アプリケーションファクトリーパターンでアプリ作成
-from app import create_app
 
-if __name__ == '__main__':
+def parse_args():
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='本番環境用Flask Webアプリケーション起動')
+    parser.add_argument('--bind', default=os.environ.get('GUNICORN_BIND', '127.0.0.1:8000'),
+                        help='待ち受けアドレス（デフォルト: 127.0.0.1:8000、nginx経由。'
+                             '直接公開時はADMISSION_TRUSTED_PROXIES=0も設定）')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='ワーカープロセス数（デフォルト: gunicorn.conf.py）')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='ワーカーあたりのスレッド数（デフォルト: gunicorn.conf.py）')
+    parser.add_argument('--dev-server', action='store_true',
+                        help='Gunicornを使わずFlask開発サーバで起動（単一プロセス）')
+    return parser.parse_args()
+
+
+def run_gunicorn(args):
+    """Gunicorn（マルチプロセス）で起動
+
+    プロセスをgunicornに置き換えるため、SIGHUPによるグレースフルリロードや
+    systemdからのシグナルがそのままマスタープロセスに届く。
+    """
+    gunicorn = shutil.which('gunicorn')
+    if gunicorn is None:
+        return False
+
+    command = [
+        gunicorn,
+        '--config', str(project_root / 'gunicorn.conf.py'),
+        '--chdir', str(project_root),
+        '--bind', args.bind,
+    ]
+    if args.workers:
+        command += ['--workers', str(args.workers)]
+    if args.threads:
+        command += ['--threads', str(args.threads)]
+    command.append('wsgi:app')
+
+    print("=" * 60)
+    print("🚀 本番環境用Flask Webアプリケーション起動中（Gunicorn）...")
+    print("=" * 60)
+    print("環境: 本番（Production）")
+    print(f"待ち受け: {args.bind}")
+    print(f"ワーカー数: {args.workers or 'gunicorn.conf.py'}")
+    print(f"スレッド数: {args.threads or 'gunicorn.conf.py'}")
+    print("リロード: kill -HUP <master pid>")
+    print("=" * 60)
+
+    os.execv(gunicorn, command)
+
+
+def run_dev_server(args):
+    """Flask開発サーバで起動（Gunicorn未インストール時のフォールバック）"""
+    from app import create_app
+
+    host, _, port = args.bind.rpartition(':')
+
     # 本番環境アプリケーション作成
     app = create_app('production')
 
-    # 本番環境用ポート8000で起動
     print("=" * 60)
-    print("🚀 本番環境用Flask Webアプリケーション起動中...")
+    print("🚀 本番環境用Flask Webアプリケーション起動中（開発サーバ）...")
     print("=" * 60)
-    print(f"環境: 本番（Production）")
-    print(f"ポート: 8000")
-    print(f"URL: http://192.168.3.135:8000/")
-    print(f"デバッグモード: OFF")
+    print("環境: 本番（Production）")
+    print(f"待ち受け: {args.bind}")
+    print("デバッグモード: OFF")
+    print("⚠️  単一プロセスで動作します。本番運用ではGunicornをインストールしてください")
     print("=" * 60)
 
     app.run(
-        host='0.0.0.0',
-        port=8000,
+        host=host or '127.0.0.1',
+        port=int(port),
         debug=False,
-        use_reloader=False
+        use_reloader=False,
+        threaded=True
     )
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    if args.dev_server or run_gunicorn(args) is False:
+        run_dev_server(args)
@@ -139,7 +139,7 @@ function initializeImportForm() {
     }
 
     function executeImport() {
-        if (!uploadedData || !uploadedData.data) {
+        if (!uploadedData || !(uploadedData.import_token || uploadedData.data)) {
             alert('インポートするデータがありません');
             return;
         }
@@ -156,9 +156,9 @@ function initializeImportForm() {
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({
-                rows: uploadedData.data
-            })
+            body: JSON.stringify(uploadedData.import_token
+                ? { import_token: uploadedData.import_token }
+                : { rows: uploadedData.data })
         })
         .then(response => response.json())
         .then(data => {
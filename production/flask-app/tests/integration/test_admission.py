@@ -0,0 +1,199 @@
+"""Integration tests for admission control."""
+import pytest
+
+from utils.admission import AdmissionController, admission, parse_rate
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Enable the application's admission controller with test limits."""
+    def apply(**values):
+        monkeypatch.setattr(admission, 'enabled', True)
+        for name, value in values.items():
+            monkeypatch.setattr(admission, name, value)
+        admission.reset()
+        return admission
+
+    yield apply
+    admission.reset()
+
+
+class TestAdmissionController:
+    """Test token buckets and lanes."""
+
+    def test_parse_rate(self):
+        """Test rate limit strings."""
+        # Assert
+        assert parse_rate('1000 per hour') == pytest.approx(1000 / 3600)
+        assert parse_rate('10/second') == 10
+        assert parse_rate('60 per minutes') == 1
+        assert parse_rate('') == 0.0
+        with pytest.raises(ValueError):
+            parse_rate('lots per hour')
+
+    def test_token_bucket_refills(self):
+        """Test the per-client bucket.
+
+        This test verifies that:
+        1. A client may send a burst of requests
+        2. The next request is refused with the time until a token is available
+        3. Tokens are refilled at the configured rate, per client
+        """
+        # Arrange
+        clock = FakeClock()
+        controller = AdmissionController(rate=0.5, burst=2, clock=clock)
+
+        # Act
+        burst = [controller.take_token('10.0.0.1') for _ in range(2)]
+        refused = controller.take_token('10.0.0.1')
+        other = controller.take_token('10.0.0.2')
+        clock.now += 2
+        refilled = controller.take_token('10.0.0.1')
+
+        # Assert
+        assert burst == [(True, 0), (True, 0)]
+        assert refused == (False, 2)
+        assert other == (True, 0)
+        assert refilled == (True, 0)
+        assert controller.stats()['lanes']['default']['shed']['rate'] == 1
+
+    def test_agent_lane_keeps_reserved_slots(self):
+        """Test concurrency slots.
+
+        This test verifies that:
+        1. Non-agent requests cannot take the reserved slots
+        2. Agent requests are admitted while the other lanes are saturated
+        3. Each heavy route is limited individually
+        4. Released slots are available again
+        """
+        # Arrange
+        controller = AdmissionController(max_concurrent=4, agent_reserved=2,
+                                         heavy_concurrency=1, retry_after=3)
+
+        # Act
+        heavy = controller.acquire('heavy', 'api.list_images')
+        same_route = controller.acquire('heavy', 'api.list_images')
+        other_route = controller.acquire('heavy', 'api.export_csv')
+        default = controller.acquire('default', 'api.list_pcs')
+        agents = [controller.acquire('agent', 'api.get_pc_info') for _ in range(3)]
+        controller.release('heavy', 'api.list_images')
+        controller.release('agent', 'api.get_pc_info')
+        after_release = controller.acquire('default', 'api.list_pcs')
+
+        # Assert
+        assert heavy == (True, 0)
+        assert same_route == (False, 3)
+        assert other_route == (True, 0)
+        assert default == (False, 3)
+        assert agents == [(True, 0), (True, 0), (False, 3)]
+        assert after_release == (False, 3)  # agents still hold the reserved slots
+        stats = controller.stats()
+        assert stats['in_flight'] == 2
+        assert stats['lanes']['agent']['in_flight'] == 1
+        assert stats['routes_in_flight'] == {'api.export_csv': 1, 'api.get_pc_info': 1}
+
+    def test_client_behind_proxy(self, app):
+        """Test that the client address is taken from X-Forwarded-For."""
+        # Arrange
+        controller = AdmissionController()
+        controller.trusted_proxies = 1
+        headers = {'X-Forwarded-For': '1.2.3.4, 10.0.0.7'}
+
+        # Act
+        with app.test_request_context('/', headers=headers,
+                                      environ_base={'REMOTE_ADDR': '127.0.0.1'}):
+            client = controller.client_id()
+
+        # Assert
+        assert client == '10.0.0.7'
+
+
+class TestAdmissionHooks:
+    """Test admission control on requests."""
+
+    def test_heavy_endpoint_shed_while_agents_served(self, client, db_session,
+                                                     create_test_pc, limits):
+        """Test shedding under saturation.
+
+        This test verifies that:
+        1. A heavy endpoint at its concurrency limit answers 429 with Retry-After
+        2. Agent endpoints are still served
+        3. Exempt endpoints are not counted and slots are released after requests
+        """
+        # Arrange
+        limits(rate=0.0, max_concurrent=4, agent_reserved=2, heavy_concurrency=1,
+               retry_after=5)
+        create_test_pc(serial='ADM001', pcname='20251116M')
+        admission.acquire('heavy', 'api.list_images')  # a slow image scan in flight
+
+        try:
+            # Act
+            shed = client.get('/api/images')
+            agent = client.get('/api/pcinfo?serial=ADM001')
+            health = client.get('/health')
+            stats = client.get('/api/admission').get_json()
+        finally:
+            admission.release('heavy', 'api.list_images')
+
+        # Assert
+        assert shed.status_code == 429
+        assert shed.headers['Retry-After'] == '5'
+        assert shed.get_json()['retry_after'] == 5
+        assert agent.status_code == 200
+        assert health.status_code == 200
+        assert stats['lanes']['agent']['admitted'] == 1
+        assert stats['lanes']['heavy']['shed']['concurrency'] == 1
+        assert stats['in_flight'] == 2  # the held heavy slot and this request
+        assert admission.stats()['in_flight'] == 0
+
+    def test_rate_limit_per_client(self, client, db_session, create_test_pc, limits):
+        """Test that a client over its rate limit gets 429 with Retry-After."""
+        # Arrange
+        limits(rate=1 / 60, burst=2)
+        create_test_pc(serial='ADM002', pcname='20251116M')
+
+        # Act
+        responses = [client.get('/api/pcinfo?serial=ADM002') for _ in range(3)]
+        other = client.get('/api/pcinfo?serial=ADM002',
+                           environ_base={'REMOTE_ADDR': '10.0.0.9'})
+
+        # Assert
+        assert [r.status_code for r in responses] == [200, 200, 429]
+        assert int(responses[2].headers['Retry-After']) == 60
+        assert other.status_code == 200
+
+    def test_clients_behind_nginx_get_own_buckets(self, client, db_session,
+                                                  create_test_pc, limits):
+        """Test rate limiting behind the shipped nginx.
+
+        This test verifies that:
+        1. Requests relayed by one proxy address are limited per X-Forwarded-For client
+        2. A client over its limit does not affect the others
+        """
+        # Arrange
+        limits(rate=1 / 60, burst=1)
+        create_test_pc(serial='ADM003', pcname='20251116M')
+        proxy = {'REMOTE_ADDR': '127.0.0.1'}
+
+        def get(address):
+            return client.get('/api/pcinfo?serial=ADM003', environ_base=proxy,
+                              headers={'X-Forwarded-For': address})
+
+        # Act
+        first = [get(f'10.0.1.{n}') for n in range(1, 4)]
+        again = get('10.0.1.1')
+
+        # Assert
+        assert admission.trusted_proxies == 1
+        assert [r.status_code for r in first] == [200, 200, 200]
+        assert again.status_code == 429
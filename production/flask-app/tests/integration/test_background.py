@@ -0,0 +1,87 @@
+"""Integration tests for background service leader election."""
+from flask import Flask
+
+from utils.background import BackgroundServices, WakeSignal
+
+
+def _worker_app(lock_path):
+    """Create a bare app configured like one gunicorn worker."""
+    app = Flask(__name__)
+    app.config.update(BACKGROUND_LOCK_PATH=str(lock_path), BACKGROUND_LEADER_RETRY=0)
+    return app
+
+
+class TestBackgroundServices:
+    """Test that background services run in one process."""
+
+    def test_one_leader_and_takeover(self, tmp_path):
+        """Test leader election between workers.
+
+        This test verifies that:
+        1. Only the first worker starts the services
+        2. The other worker retries on requests and takes over once the
+           leader releases the lock
+        """
+        # Arrange
+        lock_path = tmp_path / 'background.lock'
+        started = []
+        leader, follower = BackgroundServices(), BackgroundServices()
+        follower_app = _worker_app(lock_path)
+
+        # Act
+        leader.init_app(_worker_app(lock_path), lambda app: started.append('leader'))
+        follower.init_app(follower_app, lambda app: started.append('follower'))
+        with follower_app.test_request_context('/'):
+            follower_app.preprocess_request()
+        elected_before_release = follower.leader
+
+        leader._lock_file.close()  # leader process exits
+        with follower_app.test_request_context('/'):
+            follower_app.preprocess_request()
+            follower_app.preprocess_request()
+
+        # Assert
+        assert elected_before_release is False
+        assert started == ['leader', 'follower']
+        assert follower.leader is True
+        assert lock_path.read_text().strip().isdigit()
+
+    def test_without_lock_every_process_leads(self):
+        """Test that services start immediately when no lock is configured."""
+        # Arrange
+        services = BackgroundServices()
+        app = Flask(__name__)
+        started = []
+
+        # Act
+        services.init_app(app, started.append)
+
+        # Assert
+        assert services.leader is True
+        assert started == [app]
+
+
+class TestWakeSignal:
+    """Test waking the leader's threads from other workers."""
+
+    def test_notify_from_another_worker(self, tmp_path):
+        """Test the wake file.
+
+        This test verifies that:
+        1. Without a wake, wait times out
+        2. A notify from another worker's signal wakes the waiter
+        3. The wake is consumed
+        """
+        # Arrange
+        path = tmp_path / 'run' / 'scheduler.wake'
+        leader = WakeSignal(path, poll_interval=0.01)
+        follower = WakeSignal(path, poll_interval=0.01)
+
+        # Act
+        idle = leader.wait(0.05)
+        follower.notify()
+        woken = leader.wait(5)
+        consumed = leader.wait(0.05)
+
+        # Assert
+        assert (idle, woken, consumed) == (False, True, False)
@@ -0,0 +1,160 @@
+"""Integration tests for the deployment progress log follower."""
+from utils.deployment_progress import DeploymentProgress, LogFollower
+
+
+class TestDeploymentProgress:
+    """Test progress line parsing."""
+
+    def test_partclone_line(self):
+        """Test that partclone progress fields are extracted."""
+        # Arrange
+        progress = DeploymentProgress(1)
+
+        # Act
+        progress.apply_line(
+            'Elapsed: 00:01:23, Remaining: 00:05:12, Completed:  21.03%,   5.12GB/min,'
+        )
+
+        # Assert
+        data = progress.to_dict()
+        assert data['percentage'] == 21
+        assert data['rate'] == '5.12GB/min'
+        assert data['elapsed'] == '00:01:23'
+        assert data['remaining'] == '00:05:12'
+
+    def test_per_client_progress(self):
+        """Test per-client state from udpcast and clonezilla-jobs lines.
+
+        This test verifies that:
+        1. udp-sender connections register clients
+        2. Job results mark clients completed/failed with MAC and IP
+        3. Overall percentage is the average of client progress
+        """
+        # Arrange
+        progress = DeploymentProgress(1)
+
+        # Act
+        progress.apply_line('New connection from 192.168.1.101  (#0) 00000009')
+        progress.apply_line('New connection from 192.168.1.102  (#1) 00000009')
+        progress.apply_line(
+            'MAC: 00:11:22:33:44:55, IP: 192.168.1.101, Client 192.168.1.101 '
+            'finished restoring. Image: win11, Device: sda, Success, '
+            'Elapsed: 432 secs, Speed: 5.12 GB/min'
+        )
+        progress.apply_line(
+            '192.168.1.102 Elapsed: 00:02:00, Remaining: 00:02:00, Completed: 50.00%,'
+        )
+
+        # Assert
+        data = progress.to_dict()
+        clients = {c['ip']: c for c in data['clients']}
+        assert data['client_count'] == 2
+        assert data['clients_completed'] == 1
+        assert clients['192.168.1.101']['mac'] == '00:11:22:33:44:55'
+        assert clients['192.168.1.101']['status'] == 'completed'
+        assert clients['192.168.1.101']['rate'] == '5.12 GB/min'
+        assert clients['192.168.1.102']['status'] == 'running'
+        assert data['percentage'] == 75
+
+
+class TestLogFollower:
+    """Test tail-following of log files."""
+
+    def test_only_appended_bytes_are_parsed(self, tmp_path):
+        """Test that offsets are kept between polls.
+
+        This test verifies that:
+        1. Content written before begin() is ignored
+        2. Only newly appended bytes are read on each poll
+        3. Partial lines are completed on the next poll
+        """
+        # Arrange
+        log_file = tmp_path / 'ocs.log'
+        log_file.write_text('old deployment 99%\n')
+        follower = LogFollower(tmp_path, poll_interval=0)
+        follower.begin(1)
+
+        # Act - append a partial partclone line
+        with open(log_file, 'a') as f:
+            f.write('Elapsed: 00:00:10, Remaining: 00:01:30, Completed:  10.00%')
+        follower.poll()
+        bytes_after_first = follower.bytes_read
+
+        # Assert - nothing parsed yet, old content skipped
+        assert follower.snapshot(1)['percentage'] == 0
+
+        # Act - finish the line with a partclone redraw
+        with open(log_file, 'a') as f:
+            f.write(',\rElapsed: 00:00:20, Remaining: 00:01:20, Completed:  20.00%,\n')
+        data = follower.snapshot(1)
+
+        # Assert
+        assert data['percentage'] == 20
+        assert data['elapsed'] == '00:00:20'
+        assert follower.bytes_read - bytes_after_first < 80
+
+    def test_truncated_file_is_reread(self, tmp_path):
+        """Test that a rotated/truncated log is read from the start."""
+        # Arrange
+        log_file = tmp_path / 'ocs.log'
+        log_file.write_text('x' * 200 + '\n')
+        follower = LogFollower(tmp_path, poll_interval=0)
+        follower.begin(1)
+
+        # Act
+        log_file.write_text('Completed 42%\n')
+        data = follower.snapshot(1)
+
+        # Assert
+        assert data['percentage'] == 42
+
+    def test_other_worker_starts_tracking(self, tmp_path):
+        """Test that snapshot() for an untracked deployment begins tracking."""
+        # Arrange
+        (tmp_path / 'ocs.log').write_text('Completed 33%\n')
+        follower = LogFollower(tmp_path, poll_interval=0)
+
+        # Act - deployment started before the log was written
+        data = follower.snapshot(7, since=0)
+
+        # Assert
+        assert data['deployment_id'] == 7
+        assert data['percentage'] == 33
+
+    def test_concurrent_deployments_are_tracked_separately(self, tmp_path):
+        """Test two deployments following the same log directory.
+
+        This test verifies that:
+        1. Alternating snapshots of two deployments do not re-read the logs
+        2. Each deployment only gets the clients of its targets
+        3. Lines are assigned by multicast port when they carry no address
+        """
+        # Arrange
+        line = 'Elapsed: 00:01:00, Remaining: 00:01:00, Completed:  {}.00%,\n'
+        first = tmp_path / '10.0.0.1-restore.log'
+        second = tmp_path / '10.0.0.2-restore.log'
+        first.write_text(''.join(line.format(i % 50) for i in range(10000)))
+        second.write_text(''.join(line.format(i % 30) for i in range(10000)))
+        follower = LogFollower(tmp_path, poll_interval=0)
+        size = first.stat().st_size + second.stat().st_size
+
+        # Act
+        one = follower.snapshot(1, since=0, ips=['10.0.0.1'], port=2232)
+        two = follower.snapshot(2, since=0, ips=['10.0.0.2'], port=2242)
+        for _ in range(3):
+            follower.snapshot(1)
+            follower.snapshot(2)
+        bytes_after_alternating = follower.bytes_read
+        (tmp_path / 'udp-sender-port2242.log').write_text('Completed 77%\n')
+        two = follower.snapshot(2)
+        one = follower.snapshot(1)
+
+        # Assert
+        assert [c['ip'] for c in one['clients']] == ['10.0.0.1']
+        assert [c['ip'] for c in two['clients']] == ['10.0.0.2']
+        assert one['clients'][0]['percentage'] == 49
+        assert two['clients'][0]['percentage'] == 9
+        # the second deployment caught up on the first file once
+        assert bytes_after_alternating <= 2 * size
+        assert two['message'] == 'Completed 77%'
+        assert one['message'] != 'Completed 77%'
@@ -0,0 +1,238 @@
+"""Integration tests for the multi-session deployment scheduler."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from api import deployment as deployment_api
+from models import db, Deployment, DeploymentTarget
+from utils.deployment_progress import LogFollower
+from utils.deployment_scheduler import DeploymentScheduler
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    """Scheduler with two sessions and a recording DRBL start."""
+    scheduler = DeploymentScheduler()
+    scheduler.max_sessions = 2
+    scheduler.register_client(deployment_api.drbl_client)
+    scheduler.starts = []
+
+    def fake_start(**kwargs):
+        scheduler.starts.append(kwargs)
+        return {'status': 'started', 'mcast_port': kwargs.get('mcast_port')}
+
+    monkeypatch.setattr(deployment_api.drbl_client, 'start_multicast_deployment', fake_start)
+    monkeypatch.setattr(deployment_api.drbl_client, 'get_image_info',
+                        lambda name: {'name': name, 'size_bytes': 0})
+    return scheduler
+
+
+def _queue(name, image_name='win11-master-2025', priority=0, serials=()):
+    """Create a queued deployment with optional targets."""
+    deployment = Deployment(
+        name=name,
+        image_name=image_name,
+        mode='multicast',
+        status='queued',
+        priority=priority,
+        queued_at=datetime.utcnow(),
+        target_count=len(serials)
+    )
+    db.session.add(deployment)
+    db.session.flush()
+    for serial in serials:
+        DeploymentTarget.new(deployment.id, serial)
+    db.session.commit()
+    return deployment
+
+
+def _statuses(*deployments):
+    """Reload deployment statuses."""
+    db.session.expire_all()
+    return [db.session.get(Deployment, d.id).status for d in deployments]
+
+
+class TestDeploymentScheduler:
+    """Test admission, session end detection and estimates."""
+
+    def test_runs_waves_up_to_max_sessions(self, app_context, db_session, scheduler):
+        """Test concurrent sessions and the next wave.
+
+        This test verifies that:
+        1. At most max_sessions deployments start, in priority order
+        2. Every multicast session gets its own port
+        3. When a session ends, the next tick starts the next wave
+        """
+        # Arrange
+        first = _queue('Wave 1')
+        second = _queue('Wave 2')
+        urgent = _queue('Urgent', priority=10)
+
+        # Act
+        started = scheduler.tick()['started']
+        statuses = _statuses(first, second, urgent)
+        next_tick = scheduler.tick()
+
+        # Assert
+        assert started == [urgent.id, first.id]
+        assert statuses == ['running', 'queued', 'running']
+        assert sorted(s['mcast_port'] for s in scheduler.starts[:2]) == [2232, 2242]
+        # Jobs finished (no targets): both sessions end, wave 2 starts
+        assert sorted(next_tick['finished']) == sorted([urgent.id, first.id])
+        assert next_tick['started'] == [second.id]
+        assert scheduler.starts[2]['mcast_port'] == 2232
+        assert _statuses(first, second, urgent) == ['completed', 'running', 'completed']
+
+    def test_session_with_targets_ends_when_all_targets_done(self, app_context, db_session,
+                                                             scheduler):
+        """Test that a session runs until every target completed or failed."""
+        # Arrange
+        scheduler.max_sessions = 1
+        session = _queue('Targets', serials=['SCH001', 'SCH002'])
+        waiting = _queue('Waiting')
+        scheduler.tick()
+
+        # Act - one client still imaging
+        targets = DeploymentTarget.query.filter_by(deployment_id=session.id).all()
+        targets[0].state = DeploymentTarget.STATE_COMPLETED
+        db.session.commit()
+        busy = scheduler.tick()
+
+        targets[1].state = DeploymentTarget.STATE_FAILED
+        db.session.commit()
+        done = scheduler.tick()
+
+        # Assert
+        assert (busy['finished'], busy['started']) == ([], [])
+        assert (done['finished'], done['started']) == ([session.id], [waiting.id])
+        assert _statuses(session, waiting) == ['completed', 'running']
+
+    def test_concurrent_sessions_get_their_own_progress(self, app_context, db_session,
+                                                       scheduler, tmp_path, monkeypatch):
+        """Test progress of two sessions sharing the DRBL log directory.
+
+        This test verifies that:
+        1. Each session's targets are updated from its own clients only
+        2. No target rows are created for the other session's clients
+        3. The deployment's overall progress is persisted
+        4. Repeated ticks do not re-read the logs
+        """
+        # Arrange
+        follower = LogFollower(tmp_path, poll_interval=0)
+        monkeypatch.setattr(deployment_api.drbl_client, 'progress', follower)
+        monkeypatch.setattr(deployment_api.drbl_client, 'drbl_installed', True)
+        monkeypatch.setattr(deployment_api.drbl_client, 'stop_deployment',
+                            lambda deployment_id=None: {'status': 'stopped'})
+        first = _queue('Session A', serials=['SCA001'])
+        second = _queue('Session B', serials=['SCB001'])
+        for deployment, mac in ((first, '00:11:22:33:44:01'), (second, '00:11:22:33:44:02')):
+            DeploymentTarget.query.filter_by(deployment_id=deployment.id).one().mac_address = mac
+        db.session.commit()
+        scheduler.tick()
+
+        # Act
+        (tmp_path / 'clonezilla-jobs.log').write_text(
+            'MAC: 00:11:22:33:44:01, IP: 10.0.0.1, Client 10.0.0.1 finished restoring. '
+            'Image: win11, Device: sda, Success, Elapsed: 432 secs, Speed: 5.12 GB/min\n'
+            'MAC: 00:11:22:33:44:02, IP: 10.0.0.2, restoring sda Completed: 40.00%\n'
+        )
+        scheduler.tick()
+        bytes_read = follower.bytes_read
+        scheduler.tick()
+
+        # Assert
+        db.session.expire_all()
+        states = {
+            t.deployment_id: (t.serial, t.state, t.percentage)
+            for t in DeploymentTarget.query.all()
+        }
+        assert DeploymentTarget.query.count() == 2
+        assert states[first.id] == ('SCA001', DeploymentTarget.STATE_COMPLETED, 100.0)
+        assert states[second.id] == ('SCB001', DeploymentTarget.STATE_RUNNING, 40.0)
+        assert db.session.get(Deployment, second.id).progress == 40
+        assert follower.bytes_read == bytes_read
+
+    def test_disk_budget_prefers_running_image(self, app_context, db_session, scheduler):
+        """Test that a second image waits while the disk budget is used up."""
+        # Arrange
+        scheduler.disk_budget_mb = 150  # one image at 100 MB/s
+        a = _queue('Image A', image_name='image-a', serials=['DSK001'])
+        b = _queue('Image B', image_name='image-b', serials=['DSK002'])
+        c = _queue('Image A again', image_name='image-a', serials=['DSK003'])
+
+        # Act
+        started = scheduler.tick()['started']
+
+        # Assert
+        assert started == [a.id, c.id]
+        assert _statuses(a, b, c) == ['running', 'queued', 'running']
+
+    def test_nic_budget_limits_sessions(self, app_context, db_session, scheduler):
+        """Test capacity from the NIC budget."""
+        # Arrange
+        scheduler.max_sessions = 4
+        scheduler.nic_budget_mb = 250
+
+        # Assert
+        assert scheduler.capacity == 2
+
+    def test_status_reports_queue_depth_and_eta(self, app_context, db_session, scheduler):
+        """Test ETA simulation from completed session history."""
+        # Arrange
+        scheduler.max_sessions = 1
+        now = datetime.utcnow()
+        db.session.add(Deployment(
+            name='History',
+            image_name='win11-master-2025',
+            status='completed',
+            started_at=now - timedelta(hours=2),
+            completed_at=now - timedelta(hours=2) + timedelta(seconds=600)
+        ))
+        db.session.commit()
+        _queue('Queued 1', serials=['ETA001', 'ETA002'])
+        _queue('Queued 2', serials=['ETA003'])
+
+        # Act
+        status = scheduler.status()
+
+        # Assert
+        assert status['queue_depth'] == 2
+        assert status['queued_pcs'] == 3
+        assert [q['position'] for q in status['queue']] == [1, 2]
+        assert 1195 <= status['eta_seconds'] <= 1200
+        assert status['estimated_pcs_per_hour'] == pytest.approx(9.0, rel=0.01)
+
+
+class TestSchedulerEndpoints:
+    """Test queueing endpoints."""
+
+    def test_enqueue_dequeue_and_queue(self, client, db_session):
+        """Test POST enqueue/dequeue and GET /api/deployment/queue."""
+        # Arrange
+        deployment = Deployment(
+            name='Endpoint',
+            image_name='win11-master-2025',
+            mode='multicast',
+            status='pending'
+        )
+        db.session.add(deployment)
+        db.session.commit()
+
+        # Act
+        queued = client.post(f'/api/deployment/{deployment.id}/enqueue',
+                             json={'priority': 5})
+        queue = client.get('/api/deployment/queue')
+        again = client.post(f'/api/deployment/{deployment.id}/enqueue')
+        dequeued = client.post(f'/api/deployment/{deployment.id}/dequeue')
+        not_queued = client.post(f'/api/deployment/{deployment.id}/dequeue')
+
+        # Assert
+        assert queued.status_code == 202
+        data = queued.get_json()
+        assert (data['deployment']['status'], data['deployment']['priority']) == ('queued', 5)
+        assert data['queue']['position'] == 1
+        assert queue.get_json()['scheduler']['queue_depth'] == 1
+        assert again.status_code == 400
+        assert dequeued.status_code == 200
+        assert dequeued.get_json()['deployment']['status'] == 'pending'
+        assert not_queued.status_code == 400
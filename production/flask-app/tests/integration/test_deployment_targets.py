@@ -0,0 +1,318 @@
+"""Integration tests for per-client deployment targets."""
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+from api import deployment as deployment_api
+from app import add_missing_columns
+from models import db, Deployment, DeploymentTarget, PCMaster
+
+
+def _create_deployment(serials, status='running', mode='multicast',
+                       started_at=datetime(2025, 11, 16, 9, 0)):
+    """Create a deployment with one target per serial."""
+    deployment = Deployment(
+        name='Target Test Deployment',
+        image_name='win11-master-2025',
+        mode=mode,
+        status=status,
+        target_count=len(serials),
+        started_at=started_at if status != 'pending' else None
+    )
+    db.session.add(deployment)
+    db.session.flush()
+    for serial in serials:
+        pc = PCMaster.find_by_serial(serial)
+        DeploymentTarget.new(deployment.id, serial, pc.mac_address if pc else None)
+    db.session.commit()
+    return deployment
+
+
+def _client(mac, ip, percentage, status='running'):
+    """Build a DRBL progress client dictionary."""
+    return {
+        'mac': mac,
+        'ip': ip,
+        'percentage': percentage,
+        'status': status,
+        'rate': '6.00GB/min',
+        'elapsed': '00:01:00'
+    }
+
+
+class TestDeploymentTargets:
+    """Test the deployment_targets table and its feeds."""
+
+    def test_create_deployment_builds_targets(self, client, db_session,
+                                              create_test_pc, monkeypatch):
+        """Test POST /api/deployment.
+
+        This test verifies that:
+        1. One target row is created per serial, with the PC's MAC
+        2. target_serials in the response comes from the target rows
+        3. Unknown serials are rejected
+        """
+        # Arrange
+        monkeypatch.setattr(deployment_api.drbl_client, 'get_image_info',
+                            lambda name: {'name': name})
+        for i in range(3):
+            pc = create_test_pc(serial=f'TGT{i:03d}', pcname=f'2025111{i}M')
+            pc.mac_address = f'aa:bb:cc:dd:ee:0{i}'
+        db.session.commit()
+        body = {
+            'name': 'Targets',
+            'image_name': 'win11-master-2025',
+            'target_serials': ['TGT000', 'TGT001', 'TGT002', 'TGT001']
+        }
+
+        # Act
+        response = client.post('/api/deployment', json=body)
+        missing = client.post('/api/deployment', json=dict(body, target_serials=['NOPE']))
+
+        # Assert
+        assert response.status_code == 201
+        data = response.get_json()['deployment']
+        assert data['target_serials'] == ['TGT000', 'TGT001', 'TGT002']
+        assert data['target_count'] == 3
+        targets = DeploymentTarget.query.filter_by(deployment_id=data['id']).all()
+        assert [(t.serial, t.mac_address, t.state) for t in targets] == [
+            ('TGT000', 'aa:bb:cc:dd:ee:00', 'pending'),
+            ('TGT001', 'aa:bb:cc:dd:ee:01', 'pending'),
+            ('TGT002', 'aa:bb:cc:dd:ee:02', 'pending')
+        ]
+        assert missing.status_code == 404
+        assert missing.get_json()['invalid_serials'] == ['NOPE']
+
+    def test_sync_progress_and_below_query(self, client, db_session, create_test_pc):
+        """Test DRBL progress feed and the "below X%" query.
+
+        This test verifies that:
+        1. Clients are matched to targets by MAC address
+        2. Clients that are not targets are recorded with serial None
+        3. Unchanged progress writes nothing
+        4. GET /targets?below=80 returns only slower clients
+        """
+        # Arrange
+        for i in range(2):
+            pc = create_test_pc(serial=f'SYNC{i:03d}', pcname=f'2025111{i}M')
+            pc.mac_address = f'aa:bb:cc:00:00:0{i}'
+        db.session.commit()
+        deployment = _create_deployment(['SYNC000', 'SYNC001'])
+        clients = [
+            _client('AA:BB:CC:00:00:00', '192.168.1.10', 95.0),
+            _client('aa:bb:cc:00:00:01', '192.168.1.11', 40.0),
+            _client('aa:bb:cc:00:00:99', '192.168.1.12', 10.0)
+        ]
+
+        # Act
+        changed = DeploymentTarget.sync_progress(deployment.id, clients)
+        unchanged = DeploymentTarget.sync_progress(deployment.id, clients)
+        response = client.get(f'/api/deployment/{deployment.id}/targets?below=80')
+
+        # Assert
+        assert (changed, unchanged) == (3, 0)
+        target = DeploymentTarget.query.filter_by(serial='SYNC000').one()
+        assert (target.ip_address, target.percentage, target.state) == (
+            '192.168.1.10', 95.0, 'running'
+        )
+        assert target.bytes_transferred == 6 * 1024 ** 3
+        assert target.started_at is not None
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [(t['serial'], t['percentage']) for t in data['targets']] == [
+            (None, 10.0), ('SYNC001', 40.0)
+        ]
+        assert DeploymentTarget.state_counts(deployment.id)['running'] == 3
+
+    def test_status_poll_is_read_only(self, client, db_session, create_test_pc,
+                                      monkeypatch):
+        """Test GET /api/deployment/<id>/status.
+
+        This test verifies that:
+        1. The live DRBL percentage is reported
+        2. Neither the deployment nor its targets are written
+        """
+        # Arrange
+        pc = create_test_pc(serial='POLL001', pcname='20251116M')
+        pc.mac_address = 'aa:bb:cc:00:01:00'
+        db.session.commit()
+        deployment = _create_deployment(['POLL001'])
+        drbl_status = {
+            'running': True,
+            'progress': {
+                'percentage': 55,
+                'clients': [_client('aa:bb:cc:00:01:00', '192.168.1.20', 55.0)]
+            }
+        }
+        monkeypatch.setattr(deployment_api.drbl_client, 'get_deployment_status',
+                            lambda **kwargs: drbl_status)
+
+        # Act
+        response = client.get(f'/api/deployment/{deployment.id}/status')
+
+        # Assert
+        assert response.status_code == 200
+        status = response.get_json()['status']
+        assert status['progress'] == 55
+        assert status['target_states']['pending'] == 1
+        db.session.expire_all()
+        assert db.session.get(Deployment, deployment.id).progress == 0
+        target = DeploymentTarget.query.filter_by(deployment_id=deployment.id).one()
+        assert (target.state, target.percentage) == ('pending', 0.0)
+
+    def test_targets_query_rejects_invalid_filters(self, client, db_session):
+        """Test validation of GET /targets filters."""
+        # Arrange
+        deployment = _create_deployment([])
+
+        # Act
+        bad_state = client.get(f'/api/deployment/{deployment.id}/targets?state=bogus')
+        bad_below = client.get(f'/api/deployment/{deployment.id}/targets?below=abc')
+        missing = client.get('/api/deployment/99999/targets')
+
+        # Assert
+        assert bad_state.status_code == 400
+        assert bad_below.status_code == 400
+        assert missing.status_code == 404
+
+    def test_setup_log_completes_target(self, client, db_session, create_test_pc):
+        """Test the /api/log feed.
+
+        This test verifies that:
+        1. A setup log marks the PC's target completed at 100%
+        2. setup_status follows the latest log
+        3. Targets of finished deployments are not touched
+        """
+        # Arrange
+        create_test_pc(serial='LOGT001', pcname='20251116M')
+        active = _create_deployment(['LOGT001'])
+        finished = _create_deployment(['LOGT001'], status='completed')
+
+        # Act
+        response = client.post('/api/log', json={
+            'serial': 'LOGT001',
+            'pcname': '20251116M',
+            'status': 'in_progress',
+            'timestamp': '2025-11-16 12:00:00',
+            'step': 'windows_update'
+        })
+
+        # Assert
+        assert response.status_code == 201
+        target = DeploymentTarget.query.filter_by(deployment_id=active.id).one()
+        assert (target.state, target.percentage, target.setup_status) == (
+            'completed', 100.0, 'in_progress'
+        )
+        assert target.completed_at is not None
+        other = DeploymentTarget.query.filter_by(deployment_id=finished.id).one()
+        assert (other.state, other.setup_status) == ('pending', None)
+
+    def test_logs_before_imaging_do_not_complete_targets(self, client, db_session,
+                                                         create_test_pc):
+        """Test that only logs of running deployments after their start count.
+
+        This test verifies that:
+        1. A queued (pending) deployment's target is not touched
+        2. A log timestamped before the deployment started is ignored
+        """
+        # Arrange
+        create_test_pc(serial='LOGT003', pcname='20251116M')
+        queued = _create_deployment(['LOGT003'], status='pending')
+        later = _create_deployment(['LOGT003'], started_at=datetime(2025, 11, 16, 13, 0))
+
+        # Act
+        response = client.post('/api/log/batch', json=[{
+            'serial': 'LOGT003',
+            'pcname': '20251116M',
+            'status': 'completed',
+            'timestamp': '2025-11-16 12:00:00'
+        }])
+
+        # Assert
+        assert response.status_code == 200
+        for deployment in (queued, later):
+            target = DeploymentTarget.query.filter_by(deployment_id=deployment.id).one()
+            assert (target.state, target.percentage, target.setup_status) == (
+                'pending', 0.0, None
+            )
+
+    def test_batch_logs_feed_targets(self, client, db_session, create_test_pc):
+        """Test the /api/log/batch feed (bulk insert bypasses ORM events)."""
+        # Arrange
+        create_test_pc(serial='LOGT002', pcname='20251116M')
+        deployment = _create_deployment(['LOGT002'])
+        entries = [
+            {'serial': 'LOGT002', 'pcname': '20251116M', 'status': status,
+             'timestamp': f'2025-11-16 12:0{i}:00'}
+            for i, status in enumerate(['in_progress', 'completed'])
+        ]
+
+        # Act
+        response = client.post('/api/log/batch', json=entries)
+
+        # Assert
+        assert response.status_code == 200
+        target = DeploymentTarget.query.filter_by(deployment_id=deployment.id).one()
+        assert (target.state, target.setup_status) == ('completed', 'completed')
+
+    def test_unicast_start_requires_mac(self, client, db_session, create_test_pc):
+        """Test that unicast no longer falls back to 00:00:00:00:00:00."""
+        # Arrange
+        create_test_pc(serial='UNI001', pcname='20251116M')
+        deployment = _create_deployment(['UNI001'], status='pending', mode='unicast')
+
+        # Act
+        response = client.post(f'/api/deployment/{deployment.id}/start')
+
+        # Assert
+        assert response.status_code == 400
+        assert db.session.get(Deployment, deployment.id).status == 'pending'
+
+
+class TestTargetMigration:
+    """Test migration of existing databases."""
+
+    def test_add_missing_columns(self, tmp_path):
+        """Test that a pc_master table without mac_address gets the column."""
+        # Arrange
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            conn.execute(text(
+                'CREATE TABLE pc_master (id INTEGER PRIMARY KEY, serial VARCHAR(100) '
+                'NOT NULL, pcname VARCHAR(50) NOT NULL, odj_path VARCHAR(255), '
+                'created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)'
+            ))
+
+        # Act
+        added = add_missing_columns(engine)
+
+        # Assert
+        assert added == ['pc_master.mac_address']
+        columns = {c['name'] for c in inspect(engine).get_columns('pc_master')}
+        assert 'mac_address' in columns
+        assert add_missing_columns(engine) == []
+
+    def test_backfill_from_target_serials(self, db_session, create_test_pc):
+        """Test conversion of legacy comma-separated targets."""
+        # Arrange
+        pc = create_test_pc(serial='LEG001', pcname='20251116M')
+        pc.mac_address = 'aa:bb:cc:dd:ee:ff'
+        deployment = Deployment(
+            name='Legacy',
+            image_name='win11-master-2025',
+            target_serials='LEG001,LEG002',
+            target_count=2
+        )
+        db.session.add(deployment)
+        db.session.commit()
+
+        # Act
+        created = DeploymentTarget.backfill()
+        again = DeploymentTarget.backfill()
+
+        # Assert
+        assert (created, again) == (2, 0)
+        db.session.expire_all()
+        assert db.session.get(Deployment, deployment.id).serials == ['LEG001', 'LEG002']
+        target = DeploymentTarget.query.filter_by(serial='LEG001').one()
+        assert target.mac_address == 'aa:bb:cc:dd:ee:ff'
@@ -0,0 +1,187 @@
+"""Integration tests for Server-Sent Events fan-out."""
+import json
+
+from models import db, Deployment, DeploymentTarget
+from utils.event_stream import (
+    LOGS_CHANNEL,
+    EventBroker,
+    deployment_channel,
+    event_broker,
+    format_sse
+)
+
+
+def _drain(sub):
+    """Collect all queued events of a subscription."""
+    events = []
+    while not sub.queue.empty():
+        events.append(sub.get(timeout=0))
+    return events
+
+
+class TestEventBroker:
+    """Test the single-producer, many-subscriber broker."""
+
+    def test_one_poll_fans_out_to_all_subscribers(self, app_context, db_session,
+                                                  create_test_log):
+        """Test fan-out of new setup logs.
+
+        This test verifies that:
+        1. Existing logs are not replayed to new subscribers
+        2. One producer tick delivers a new log to every subscriber
+        3. The log cursor advances, so the log is sent once
+        """
+        # Arrange
+        broker = EventBroker()
+        broker.autostart = False
+        create_test_log(serial='SSE000', pcname='20251116M', status='completed')
+        subs = [broker.subscribe(LOGS_CHANNEL) for _ in range(20)]
+        broker.poll_once()
+
+        # Act
+        create_test_log(serial='SSE001', pcname='20251117M', status='in_progress')
+        broker.poll_once()
+        broker.poll_once()
+
+        # Assert
+        for sub in subs:
+            events = _drain(sub)
+            assert [(name, data['serial']) for name, data in events] == [
+                ('log', 'SSE001')
+            ]
+
+    def test_deployment_status_deltas(self, app_context, db_session, create_test_log):
+        """Test deployment channel status and target log events."""
+        # Arrange
+        broker = EventBroker()
+        broker.autostart = False
+        deployment = Deployment(
+            name='SSE Deployment',
+            image_name='win11-master-2025',
+            mode='multicast',
+            status='pending',
+            target_count=2,
+            targets=[DeploymentTarget(serial='SSE100'), DeploymentTarget(serial='SSE101')]
+        )
+        db.session.add(deployment)
+        db.session.commit()
+        sub = broker.subscribe(deployment_channel(deployment.id))
+
+        # Act - first tick publishes the initial status
+        broker.poll_once()
+        first = _drain(sub)
+
+        # Act - unchanged deployment publishes nothing
+        broker.poll_once()
+        unchanged = _drain(sub)
+
+        # Act - target PC reports completion
+        create_test_log(serial='SSE100', pcname='20251118M', status='completed')
+        create_test_log(serial='OTHER01', pcname='20251119M', status='completed')
+        broker.poll_once()
+        changed = _drain(sub)
+
+        # Assert
+        assert [name for name, _ in first] == ['status']
+        assert first[0][1]['summary']['pending'] == 2
+        assert unchanged == []
+        assert [(name, data.get('serial')) for name, data in changed] == [
+            ('log', 'SSE100'), ('status', None)
+        ]
+        assert changed[1][1]['summary']['completed'] == 1
+
+    def test_deployment_snapshot_does_not_write(self, app_context, db_session, monkeypatch):
+        """Test that building a running deployment's state never writes to the DB."""
+        # Arrange
+        deployment = Deployment(
+            name='SSE Read Only',
+            image_name='win11-master-2025',
+            status='running'
+        )
+        db.session.add(deployment)
+        db.session.commit()
+        broker = EventBroker()
+        writes = []
+        monkeypatch.setattr(DeploymentTarget, 'sync_progress',
+                            classmethod(lambda cls, *args: writes.append(args)))
+        monkeypatch.setattr(db.session, 'commit', lambda: writes.append('commit'))
+
+        # Act
+        first = broker.deployment_snapshot(deployment.id)
+        second = broker.deployment_snapshot(deployment.id)
+
+        # Assert
+        assert first['status'] == 'running'
+        assert 'drbl_progress' in first
+        assert second == first
+        assert writes == []
+
+    def test_format_sse(self):
+        """Test SSE message framing."""
+        message = format_sse('log', {'serial': 'SSE200'})
+
+        assert message.startswith('event: log\ndata: ')
+        assert message.endswith('\n\n')
+        assert json.loads(message.split('data: ', 1)[1]) == {'serial': 'SSE200'}
+
+
+class TestEventEndpoints:
+    """Test SSE HTTP endpoints."""
+
+    def test_deployment_events_sends_initial_status(self, client, db_session):
+        """Test GET /api/deployment/<id>/events streams current status."""
+        # Arrange
+        deployment = Deployment(
+            name='SSE Endpoint',
+            image_name='win11-master-2025',
+            status='pending'
+        )
+        db.session.add(deployment)
+        db.session.commit()
+
+        # Act
+        response = client.get(f'/api/deployment/{deployment.id}/events')
+        chunks = response.response
+        retry = next(chunks).decode()
+        initial = next(chunks).decode()
+        response.close()
+
+        # Assert
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert retry.startswith('retry:')
+        assert initial.startswith('event: status')
+        assert f'"deployment_id": {deployment.id}' in initial
+
+    def test_streams_limited_per_worker(self, client, db_session, monkeypatch):
+        """Test EVENT_MAX_STREAMS.
+
+        This test verifies that:
+        1. A stream over the limit is refused with 503 and Retry-After
+        2. The slot is available again once a stream closes
+        """
+        # Arrange
+        monkeypatch.setattr(event_broker, 'max_streams', 1)
+        first = client.get('/api/logs/stream')
+        next(first.response)
+
+        # Act
+        refused = client.get('/api/logs/stream')
+        first.close()
+        again = client.get('/api/logs/stream')
+        next(again.response)
+        again.close()
+
+        # Assert
+        assert first.status_code == 200
+        assert refused.status_code == 503
+        assert int(refused.headers['Retry-After']) > 0
+        assert refused.get_json()['error'] == 'Service Unavailable'
+        assert again.status_code == 200
+        assert event_broker.subscriber_count() == 0
+
+    def test_deployment_events_not_found(self, client, db_session):
+        """Test GET /api/deployment/<id>/events with unknown ID."""
+        response = client.get('/api/deployment/99999/events')
+
+        assert response.status_code == 404
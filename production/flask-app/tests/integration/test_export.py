@@ -0,0 +1,94 @@
+"""Integration tests for streaming PC export."""
+import csv
+import gzip
+import io
+import json
+
+
+class TestStreamingExport:
+    """Test GET /api/pcs/export."""
+
+    def test_csv_column_selection(self, client, create_test_pc):
+        """Test CSV export with selected columns.
+
+        This test verifies that:
+        1. Only the requested columns are exported, in request order
+        2. Rows follow registration order
+        3. The response is streamed with a download file name
+        """
+        # Arrange
+        for i in range(5):
+            create_test_pc(serial=f'STREAM{i:03d}', pcname=f'2025111{i}M')
+
+        # Act
+        response = client.get('/api/pcs/export?columns=pcname,serial')
+
+        # Assert
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert 'attachment' in response.headers['Content-Disposition']
+        rows = list(csv.reader(io.StringIO(response.data.decode('utf-8'))))
+        assert rows[0] == ['pcname', 'serial']
+        assert rows[1:] == [[f'2025111{i}M', f'STREAM{i:03d}'] for i in range(5)]
+
+    def test_ndjson_with_latest_status_filter(self, client, create_test_pc, create_test_log):
+        """Test NDJSON export filtered by the latest setup status.
+
+        This test verifies that:
+        1. Each line is a JSON object
+        2. latest_status reflects the newest log of a PC
+        3. status=failed and status=none select the matching PCs
+        """
+        # Arrange
+        create_test_pc(serial='NDJ001', pcname='20251116M')
+        create_test_pc(serial='NDJ002', pcname='20251117M')
+        create_test_pc(serial='NDJ003', pcname='20251118M')
+        create_test_log(serial='NDJ001', status='completed')
+        create_test_log(serial='NDJ002', status='completed')
+        create_test_log(serial='NDJ002', status='failed')
+
+        # Act
+        failed = client.get('/api/pcs/export?format=ndjson&status=failed'
+                            '&columns=serial,latest_status')
+        lines = [json.loads(line) for line in failed.data.decode('utf-8').splitlines()]
+        no_logs = client.get('/api/pcs/export?format=ndjson&status=none&columns=serial')
+
+        # Assert
+        assert failed.mimetype == 'application/x-ndjson'
+        assert lines == [{'serial': 'NDJ002', 'latest_status': 'failed'}]
+        assert json.loads(no_logs.data) == {'serial': 'NDJ003'}
+
+    def test_odj_missing_filter(self, client, create_test_pc):
+        """Test that odj=missing exports PCs without an ODJ file."""
+        # Arrange
+        create_test_pc(serial='ODJ001', odj_path='/srv/odj/ODJ001.txt')
+        create_test_pc(serial='ODJ002', odj_path=None)
+
+        # Act
+        response = client.get('/api/pcs/export?odj=missing&columns=serial')
+
+        # Assert
+        assert response.data.decode('utf-8').split() == ['serial', 'ODJ002']
+
+    def test_gzip_round_trip(self, app, client, create_test_pc, monkeypatch):
+        """Test gzip-compressed export spanning several chunks."""
+        # Arrange
+        monkeypatch.setitem(app.config, 'EXPORT_CHUNK_SIZE', 2)
+        for i in range(5):
+            create_test_pc(serial=f'GZ{i:03d}')
+
+        # Act
+        response = client.get('/api/pcs/export?compress=gzip&columns=serial')
+
+        # Assert
+        assert response.mimetype == 'application/gzip'
+        assert response.headers['Content-Disposition'].endswith('.csv.gz')
+        text = gzip.decompress(response.data).decode('utf-8')
+        assert text.split() == ['serial'] + [f'GZ{i:03d}' for i in range(5)]
+
+    def test_invalid_column_rejected(self, client, db_session):
+        """Test that an unknown column returns 400."""
+        response = client.get('/api/pcs/export?columns=serial,password')
+
+        assert response.status_code == 400
+        assert 'password' in response.get_json()['details']
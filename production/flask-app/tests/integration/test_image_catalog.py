@@ -0,0 +1,128 @@
+"""Integration tests for the incremental image catalog."""
+import os
+
+from utils.image_catalog import ImageCatalog
+
+
+def _make_image(image_home, name, chunks=3, chunk_size=1024):
+    """Create a fake Clonezilla image directory."""
+    image_dir = image_home / name
+    image_dir.mkdir()
+    (image_dir / 'disk').write_text('sda')
+    (image_dir / 'parts').write_text('sda1 sda2')
+    (image_dir / 'sda-pt.sf').write_text('label: gpt')
+    for i in range(chunks):
+        (image_dir / f'sda2.ntfs-ptcl-img.zst.a{chr(97 + i)}').write_bytes(
+            b'\0' * chunk_size
+        )
+    return image_dir
+
+
+def _touch_dir(path, offset):
+    """Move a directory mtime forward to simulate a change."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + offset))
+
+
+class TestImageCatalog:
+    """Test image metadata caching and incremental refresh."""
+
+    def test_list_images_computes_metadata(self, tmp_path):
+        """Test that sizes and disk counts match the files on disk."""
+        # Arrange
+        _make_image(tmp_path, 'win11-master', chunks=3, chunk_size=1000)
+        (tmp_path / 'not-an-image').mkdir()
+        catalog = ImageCatalog(tmp_path, min_refresh_interval=0)
+
+        # Act
+        images = catalog.list_images()
+
+        # Assert
+        assert [image['name'] for image in images] == ['win11-master']
+        assert images[0]['size_bytes'] == 3000 + len('sda') + len('sda1 sda2') + len('label: gpt')
+        assert images[0]['disk_count'] == 1
+
+    def test_only_changed_images_are_rescanned(self, tmp_path):
+        """Test incremental refresh.
+
+        This test verifies that:
+        1. Unchanged images are not rescanned
+        2. A directory mtime change triggers a rescan of that image only
+        3. Removed images disappear from the listing
+        """
+        # Arrange
+        _make_image(tmp_path, 'image-a')
+        image_b = _make_image(tmp_path, 'image-b')
+        catalog = ImageCatalog(tmp_path, min_refresh_interval=0)
+        catalog.list_images()
+        assert catalog.scan_count == 2
+
+        # Act - nothing changed
+        catalog.list_images()
+
+        # Assert
+        assert catalog.scan_count == 2
+
+        # Act - new chunk written to image-b
+        (image_b / 'sda2.ntfs-ptcl-img.zst.az').write_bytes(b'\0' * 10)
+        _touch_dir(image_b, 1000)
+        info = catalog.get('image-b')
+
+        # Assert
+        assert catalog.scan_count == 3
+        assert info['size_bytes'] == catalog.get('image-a')['size_bytes'] + 10
+
+        # Act - image removed
+        for item in image_b.iterdir():
+            item.unlink()
+        image_b.rmdir()
+
+        # Assert
+        assert catalog.get('image-b') is None
+        assert [image['name'] for image in catalog.list_images()] == ['image-a']
+
+    def test_chunk_growing_in_place_is_rescanned(self, tmp_path):
+        """Test that appending to the last chunk is detected.
+
+        The directory mtime does not change when an existing file grows, so
+        the newest file's mtime and size must be part of the signature.
+        """
+        # Arrange
+        image_dir = _make_image(tmp_path, 'win11-master', chunks=2, chunk_size=100)
+        last_chunk = image_dir / 'sda2.ntfs-ptcl-img.zst.ab'
+        dir_mtime = os.stat(image_dir).st_mtime_ns
+        catalog = ImageCatalog(tmp_path, min_refresh_interval=0)
+        before = catalog.get('win11-master')['size_bytes']
+
+        # Act
+        with open(last_chunk, 'ab') as f:
+            f.write(b'\0' * 50)
+        os.utime(image_dir, ns=(dir_mtime, dir_mtime))
+        after = catalog.get('win11-master')['size_bytes']
+
+        # Assert
+        assert os.stat(image_dir).st_mtime_ns == dir_mtime
+        assert after == before + 50
+        assert catalog.scan_count == 2
+        assert catalog.signature('win11-master')['sda2.ntfs-ptcl-img.zst.ab'][1] == 150
+
+    def test_catalog_is_persisted(self, tmp_path):
+        """Test that a new catalog instance reuses persisted entries."""
+        # Arrange
+        _make_image(tmp_path, 'win11-master')
+        ImageCatalog(tmp_path, min_refresh_interval=0).list_images()
+
+        # Act
+        catalog = ImageCatalog(tmp_path, min_refresh_interval=0)
+        images = catalog.list_images()
+
+        # Assert
+        assert len(images) == 1
+        assert catalog.scan_count == 0
+
+    def test_get_rejects_path_traversal(self, tmp_path):
+        """Test that image names cannot escape the image directory."""
+        catalog = ImageCatalog(tmp_path)
+
+        assert catalog.get('../etc') is None
+        assert catalog.get('.image_catalog.json') is None
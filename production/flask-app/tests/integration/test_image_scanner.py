@@ -0,0 +1,151 @@
+"""Integration tests for the parallel image scanner and verify API."""
+import hashlib
+import os
+
+import pytest
+
+import api.images
+from utils.drbl_client import DRBLClient
+from utils.image_scanner import ImageScanner
+
+
+def _make_image(image_home, name, chunk_size=300000):
+    """Create a fake Clonezilla image with an MD5SUMS list."""
+    image_dir = image_home / name
+    image_dir.mkdir(parents=True)
+    (image_dir / 'disk').write_text('sda')
+    (image_dir / 'parts').write_text('sda1 sda2')
+    chunks = {
+        'sda1.vfat-ptcl-img.zst': os.urandom(1000),
+        'sda2.ntfs-ptcl-img.zst.aa': os.urandom(chunk_size),
+        'sda2.ntfs-ptcl-img.zst.ab': os.urandom(chunk_size),
+        'sda2.ntfs-ptcl-img.zst.ac': os.urandom(chunk_size // 2),
+    }
+    for file_name, data in chunks.items():
+        (image_dir / file_name).write_bytes(data)
+    (image_dir / 'MD5SUMS').write_text(''.join(
+        f'{hashlib.md5(data).hexdigest()}  ./{file_name}\n'
+        for file_name, data in chunks.items()
+    ))
+    return image_dir
+
+
+@pytest.fixture
+def image_client(tmp_path, monkeypatch):
+    """DRBL client of api.images pointed at a temporary image home."""
+    drbl_client = DRBLClient(
+        image_home=str(tmp_path / 'partimag'),
+        odj_home=str(tmp_path / 'odj'),
+        log_dir=str(tmp_path / 'log')
+    )
+    monkeypatch.setattr(api.images, 'drbl_client', drbl_client)
+    return drbl_client
+
+
+class TestImageScanner:
+    """Test ImageScanner.scan."""
+
+    def test_scan_verifies_checksum_list(self, tmp_path):
+        """Test scanning an intact image.
+
+        This test verifies that:
+        1. Every file listed in MD5SUMS is hashed and matches
+        2. Per-partition sizes and chunk counts are reported
+        3. Total size covers all files
+        """
+        # Arrange
+        image_dir = _make_image(tmp_path, 'win11-master')
+
+        # Act
+        result = ImageScanner(workers=3, read_size=64 * 1024).scan(image_dir)
+
+        # Assert
+        assert result['verified'] is True
+        assert result['checksum_files'] == ['MD5SUMS']
+        assert len(result['checksums']) == 4
+        assert result['partitions']['sda1'] == {
+            'filesystem': 'vfat', 'size_bytes': 1000, 'chunk_count': 1
+        }
+        assert result['partitions']['sda2']['chunk_count'] == 3
+        assert result['partitions']['sda2']['size_bytes'] == 750000
+        assert result['size_bytes'] == sum(
+            f.stat().st_size for f in image_dir.iterdir()
+        )
+
+    def test_scan_reports_corrupt_and_missing_chunks(self, tmp_path):
+        """Test that changed and deleted chunks fail verification."""
+        # Arrange
+        image_dir = _make_image(tmp_path, 'win11-master')
+        with open(image_dir / 'sda2.ntfs-ptcl-img.zst.ab', 'r+b') as f:
+            f.seek(1234)
+            f.write(b'\xff')
+        (image_dir / 'sda2.ntfs-ptcl-img.zst.ac').unlink()
+
+        # Act
+        result = ImageScanner(workers=2).scan(image_dir)
+
+        # Assert
+        assert result['verified'] is False
+        assert [m['file'] for m in result['mismatches']] == ['sda2.ntfs-ptcl-img.zst.ab']
+        assert result['missing'] == ['sda2.ntfs-ptcl-img.zst.ac']
+
+    def test_scan_without_checksum_list_records_sha256(self, tmp_path):
+        """Test that chunks are hashed with sha256 when no list exists."""
+        # Arrange
+        image_dir = _make_image(tmp_path, 'win11-master')
+        (image_dir / 'MD5SUMS').unlink()
+        expected = hashlib.sha256(
+            (image_dir / 'sda1.vfat-ptcl-img.zst').read_bytes()
+        ).hexdigest()
+
+        # Act
+        result = ImageScanner().scan(image_dir)
+
+        # Assert
+        assert result['verified'] is None
+        assert result['checksums']['sda1.vfat-ptcl-img.zst'] == {'sha256': expected}
+        assert 'disk' not in result['checksums']
+
+
+class TestImageVerifyAPI:
+    """Test POST/GET /api/images/<name>/verify."""
+
+    def test_verify_job_stores_result_in_catalog(self, client, db_session, image_client):
+        """Test the verification job.
+
+        This test verifies that:
+        1. POST queues an image.verify job (run inline in testing)
+        2. The result is available from GET .../verify and image details
+        3. Rewriting the image drops the stored result
+        """
+        # Arrange
+        image_dir = _make_image(image_client.image_home, 'win11-master')
+
+        # Act
+        response = client.post('/api/images/win11-master/verify')
+
+        # Assert
+        assert response.status_code == 202
+        job = client.get(f"/api/jobs/{response.get_json()['job']['id']}").get_json()['job']
+        assert job['status'] == 'completed'
+        assert job['result']['verified'] is True
+
+        verification = client.get('/api/images/win11-master/verify').get_json()['verification']
+        assert verification['partitions']['sda2']['chunk_count'] == 3
+        details = client.get('/api/images/win11-master').get_json()['image']
+        assert details['verified'] is True
+        assert details['verification']['verified_at'] == verification['verified_at']
+
+        # Act - image rewritten
+        (image_dir / 'sda2.ntfs-ptcl-img.zst.ad').write_bytes(b'\0')
+        st = os.stat(image_dir)
+        os.utime(image_dir, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+
+        # Assert
+        assert client.get('/api/images/win11-master/verify').status_code == 404
+
+    def test_verify_unknown_image(self, client, db_session, image_client):
+        """Test that verifying a missing image returns 404."""
+        response = client.post('/api/images/no-such-image/verify')
+
+        assert response.status_code == 404
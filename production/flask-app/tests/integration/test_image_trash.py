@@ -0,0 +1,119 @@
+"""Integration tests for trash-based image deletion."""
+import pytest
+
+import api.images
+from models import db
+from models.deployment import Deployment
+from utils.drbl_client import DRBLClient
+from utils import image_trash
+from utils.image_trash import ImageTrash
+
+
+def _make_image(image_home, name, chunks=4, chunk_size=1000):
+    """Create a fake Clonezilla image directory."""
+    image_dir = image_home / name
+    (image_dir / 'sub').mkdir(parents=True)
+    (image_dir / 'disk').write_text('sda')
+    (image_dir / 'sub' / 'info').write_text('x')
+    for i in range(chunks):
+        (image_dir / f'sda2.ntfs-ptcl-img.zst.a{chr(97 + i)}').write_bytes(b'\0' * chunk_size)
+    return image_dir
+
+
+@pytest.fixture
+def image_client(tmp_path, monkeypatch):
+    """DRBL client of api.images pointed at a temporary image home."""
+    drbl_client = DRBLClient(
+        image_home=str(tmp_path / 'partimag'),
+        odj_home=str(tmp_path / 'odj'),
+        log_dir=str(tmp_path / 'log')
+    )
+    monkeypatch.setattr(api.images, 'drbl_client', drbl_client)
+    return drbl_client
+
+
+class TestImageTrash:
+    """Test ImageTrash.purge."""
+
+    def test_purge_truncates_large_files_and_defers(self, tmp_path, monkeypatch):
+        """Test throttled reclamation.
+
+        This test verifies that:
+        1. Large files are freed in truncation steps
+        2. Reclamation waits while pause() is true
+        3. Progress is reported and the directory is removed
+        """
+        # Arrange
+        monkeypatch.setattr(image_trash, 'TRUNCATE_STEP', 300)
+        image_dir = _make_image(tmp_path, 'win11-master')
+        trash_path = ImageTrash(tmp_path).move('win11-master')
+        pauses = iter([True, True, False])
+        reports = []
+
+        # Act
+        stats = ImageTrash.purge(
+            trash_path,
+            pause=lambda: next(pauses, False),
+            pause_poll=0,
+            progress=reports.append
+        )
+
+        # Assert
+        assert not image_dir.exists()
+        assert not trash_path.exists()
+        assert stats['bytes_freed'] == stats['bytes_total'] == 4004
+        assert stats['files_removed'] == stats['files_total'] == 6
+        assert reports[-1]['bytes_freed'] == 4004
+
+    def test_purge_is_rate_limited(self, tmp_path):
+        """Test that rate_bytes bounds the reclamation speed."""
+        # Arrange
+        _make_image(tmp_path, 'win11-master', chunks=2, chunk_size=5000)
+        trash_path = ImageTrash(tmp_path).move('win11-master')
+
+        # Act
+        stats = ImageTrash.purge(trash_path, rate_bytes=50000)
+
+        # Assert
+        assert stats['duration_seconds'] >= 0.18
+
+
+class TestDeleteImageAPI:
+    """Test DELETE /api/images/<name>."""
+
+    def test_delete_moves_to_trash_and_purges(self, client, db_session, image_client):
+        """Test asynchronous deletion.
+
+        This test verifies that:
+        1. The response is 202 with a purge job
+        2. The image disappears from the listing
+        3. The purge job (run inline in testing) empties the trash
+        """
+        # Arrange
+        _make_image(image_client.image_home, 'win11-master')
+
+        # Act
+        response = client.delete('/api/images/win11-master')
+
+        # Assert
+        assert response.status_code == 202
+        data = response.get_json()
+        job = client.get(f"/api/jobs/{data['job']['id']}").get_json()['job']
+        assert job['status'] == 'completed'
+        assert job['result']['bytes_freed'] == 4004
+        assert client.get('/api/images/win11-master').status_code == 404
+        assert ImageTrash(image_client.image_home).entries() == []
+
+    def test_delete_refused_while_deployment_uses_image(self, client, db_session, image_client):
+        """Test that an image of an active deployment is not deleted."""
+        # Arrange
+        image_dir = _make_image(image_client.image_home, 'win11-master')
+        db.session.add(Deployment(name='batch-1', image_name='win11-master', status='running'))
+        db.session.commit()
+
+        # Act
+        response = client.delete('/api/images/win11-master')
+
+        # Assert
+        assert response.status_code == 409
+        assert image_dir.exists()
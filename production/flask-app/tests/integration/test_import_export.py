@@ -299,6 +299,185 @@ VALID005,20251119M,/srv/odj/20251119M.txt"""
         assert 'VALID005' in serials
 
 
+class TestStreamingImport:
+    """Test incremental decoding and server-side import staging."""
+
+    def test_csv_import_shift_jis(self, client, db_session):
+        """Test that Shift_JIS (Excel on Japanese Windows) uploads import."""
+        # Arrange
+        csv_content = 'serial,pcname,odj_path\nSJIS001,20251116M,/srv/odj/経理部.txt'
+        data = {
+            'file': (io.BytesIO(csv_content.encode('cp932')), 'test.csv')
+        }
+
+        # Act
+        response = client.post(
+            '/api/pcs',
+            data=data,
+            content_type='multipart/form-data'
+        )
+
+        # Assert
+        assert response.status_code == 201
+        assert response.get_json()['imported'] == 1
+        pc = PCMaster.query.filter_by(serial='SJIS001').first()
+        assert pc.odj_path == '/srv/odj/経理部.txt'
+
+    def test_shift_jis_after_ascii_sample(self, client, db_session):
+        """Test a Shift_JIS row after the first 64KB of ASCII rows.
+
+        This test verifies that:
+        1. Decoding falls back to Shift_JIS when the ASCII sample guessed UTF-8
+        2. Every row is imported, including the non-ASCII one
+        """
+        # Arrange
+        rows = [f'LATE{i:05d},20251116M,/srv/odj/LATE{i:05d}.txt' for i in range(2000)]
+        rows.append('LATESJIS,20251116M,/srv/odj/経理部.txt')
+        content = ('serial,pcname,odj_path\n' + '\n'.join(rows)).encode('cp932')
+        assert content.index('経理部'.encode('cp932')) > 64 * 1024
+
+        # Act
+        response = client.post(
+            '/api/pcs',
+            data={'file': (io.BytesIO(content), 'late.csv')},
+            content_type='multipart/form-data'
+        )
+
+        # Assert
+        assert response.status_code == 201
+        assert response.get_json()['imported'] == 2001
+        assert PCMaster.query.filter_by(serial='LATESJIS').first().odj_path == '/srv/odj/経理部.txt'
+
+    def test_undecodable_row_is_rejected(self, client, db_session):
+        """Test that a row in another encoding answers 400 naming the row.
+
+        This test verifies that:
+        1. Shift_JIS bytes after UTF-8 text (beyond the 64KB sample) give 400
+        2. The response names the row and nothing is imported
+        """
+        # Arrange
+        rows = [f'MIX{i:05d},20251116M,/srv/odj/東京{i:05d}.txt' for i in range(2000)]
+        body = ('serial,pcname,odj_path\n' + '\n'.join(rows) + '\n').encode('utf-8')
+        content = body + 'MIXSJIS,20251116M,/srv/odj/経理部.txt\n'.encode('cp932')
+        assert len(body) > 64 * 1024
+
+        # Act
+        response = client.post(
+            '/api/import/csv',
+            data={'file': (io.BytesIO(content), 'mixed.csv')},
+            content_type='multipart/form-data'
+        )
+
+        # Assert
+        assert response.status_code == 400
+        assert response.get_json()['row'] == 2002
+        assert 'Row 2002' in response.get_json()['error']
+        assert PCMaster.query.count() == 0
+
+    def test_undecodable_row_discards_staged_rows(self, app_context, db_session):
+        """Test that a failed preview leaves no staged batches behind."""
+        from models import ImportStaging
+        from utils.csv_import import CSVEncodingError, stage_upload
+
+        # Arrange
+        rows = [f'STG{i:05d},20251116M,/srv/odj/東京.txt' for i in range(2000)]
+        content = ('serial,pcname,odj_path\n' + '\n'.join(rows) + '\n').encode('utf-8')
+        content += 'STGSJIS,20251116M,/srv/odj/経理部.txt\n'.encode('cp932')
+
+        # Act
+        with pytest.raises(CSVEncodingError) as excinfo:
+            stage_upload(io.BytesIO(content))
+
+        # Assert
+        assert excinfo.value.row == 2002
+        assert ImportStaging.query.count() == 0
+
+    def test_iter_csv_lines_small_chunks(self):
+        """Test that lines and multi-byte chars split across reads survive."""
+        from utils.csv_import import iter_csv_lines
+
+        # Arrange
+        text = 'serial,pcname\r\nA1,東京\r\nA2,"大阪\r\n支社"\r\nA3,名古屋'
+        stream = io.BytesIO(text.encode('utf-8'))
+
+        # Act
+        rows = list(csv.DictReader(iter_csv_lines(stream, chunk_size=3)))
+
+        # Assert
+        assert [row['pcname'] for row in rows] == ['東京', '大阪\r\n支社', '名古屋']
+
+    def test_staged_preview_and_execute(self, app_context, db_session, csv_file_content):
+        """Test preview staging and token based execute.
+
+        This test verifies that:
+        1. Preview returns a token and only the first rows
+        2. Execute imports staged rows without the client resending them
+        3. Staged rows are removed after execute
+        """
+        from models import ImportStaging
+        from utils.csv_import import import_staged, stage_upload
+
+        # Arrange
+        csv_content = csv_file_content(25) + '\n,20251120M,'
+        stream = io.BytesIO(csv_content.encode('utf-8'))
+
+        # Act - preview
+        staged = stage_upload(stream)
+
+        # Assert - preview
+        assert staged['total_rows'] == 26
+        assert staged['invalid_rows'] == 1
+        assert len(staged['preview']) == 10
+        assert 'data' not in staged
+        assert ImportStaging.query.filter_by(token=staged['import_token']).count() == 26
+
+        # Act - execute
+        result = import_staged(staged['import_token'])
+
+        # Assert - execute
+        assert result.success_count == 25
+        assert result.invalid_count == 1
+        assert PCMaster.query.count() == 25
+        assert ImportStaging.query.count() == 0
+
+    def test_web_ui_imports_keep_required_fields_only(self, client, db_session):
+        """Test the acceptance rules of the Web UI import paths.
+
+        This test verifies that:
+        1. The Web UI staging flow and /csv-import/process accept any
+           non-empty serial and pcname, as before the shared engine
+        2. Rows without serial or pcname are still skipped
+        3. The API keeps validating serial and pcname formats
+        """
+        from api.validators import validate_required_csv_row
+        from utils.csv_import import import_staged, stage_upload
+
+        # Arrange
+        long_pcname = 'P' * 60
+        staged_csv = f'serial,pcname\nSN 001,{long_pcname}\nSN002,\n'.encode('utf-8')
+        upload = {'csv_file': (io.BytesIO(b'serial,pcname\nSN.003,20251116M\n,20251116M\n'),
+                               'pcs.csv')}
+        api_upload = {'file': (io.BytesIO(b'serial,pcname\nSN.004,20251116M\n'), 'pcs.csv')}
+
+        # Act
+        staged = stage_upload(io.BytesIO(staged_csv), validator=validate_required_csv_row)
+        result = import_staged(staged['import_token'], validator=validate_required_csv_row)
+        process = client.post('/csv-import/process', data=upload,
+                              content_type='multipart/form-data')
+        api = client.post('/api/import/csv', data=api_upload,
+                          content_type='multipart/form-data')
+
+        # Assert
+        assert (staged['valid_rows'], staged['invalid_rows']) == (1, 1)
+        assert (result.success_count, result.error_count) == (1, 1)
+        assert process.status_code == 302
+        assert PCMaster.find_by_serial('SN 001').pcname == long_pcname
+        assert PCMaster.find_by_serial('SN.003') is not None
+        assert api.get_json()['summary']['success_count'] == 0
+        assert PCMaster.find_by_serial('SN.004') is None
+        assert PCMaster.query.count() == 2
+
+
 class TestCSVExport:
     """Test CSV export functionality (if implemented)."""
 
@@ -0,0 +1,189 @@
+"""Integration tests for the background job runner."""
+import json
+import socket
+import threading
+
+from api import deployment as deployment_api
+from models import db, Deployment, Job
+from utils.drbl_client import DRBLException
+from utils.job_queue import JobRunner, job_runner
+
+
+def _create_deployment(mode='multicast'):
+    """Create a pending deployment record."""
+    deployment = Deployment(
+        name='Job Test Deployment',
+        image_name='win11-master-2025',
+        mode=mode,
+        status='pending'
+    )
+    db.session.add(deployment)
+    db.session.commit()
+    return deployment
+
+
+def _worker_runner(app, monkeypatch, run_dir, handler):
+    """Create a non-eager runner configured like one gunicorn worker."""
+    monkeypatch.setitem(app.config, 'JOB_RUNNER_EAGER', False)
+    monkeypatch.setitem(app.config, 'JOB_POLL_INTERVAL', 60)
+    monkeypatch.setitem(app.config, 'DRBL_RUN_PATH', str(run_dir))
+    runner = JobRunner()
+    runner.init_app(app)
+    runner.register('test.echo', handler)
+    return runner
+
+
+class TestJobRunner:
+    """Test deployment start through the job runner."""
+
+    def test_start_deployment_returns_job(self, client, db_session, monkeypatch):
+        """Test that starting a deployment queues a job.
+
+        This test verifies that:
+        1. POST /api/deployment/<id>/start returns 202 with a job
+        2. The DRBL command runs in the job handler
+        3. GET /api/jobs/<id> reports the handler result
+        """
+        # Arrange
+        deployment = _create_deployment()
+        calls = []
+
+        def fake_start(**kwargs):
+            calls.append(kwargs)
+            return {'success': True, 'stdout': 'dcs started'}
+
+        monkeypatch.setattr(
+            deployment_api.drbl_client, 'start_multicast_deployment', fake_start
+        )
+
+        # Act
+        response = client.post(f'/api/deployment/{deployment.id}/start')
+
+        # Assert
+        assert response.status_code == 202
+        job_data = response.get_json()['job']
+        assert job_data['job_type'] == 'deployment.start'
+        assert job_data['deployment_id'] == deployment.id
+        assert calls[0]['image_name'] == 'win11-master-2025'
+
+        poll = client.get(f"/api/jobs/{job_data['id']}")
+        assert poll.status_code == 200
+        job = poll.get_json()['job']
+        assert job['status'] == 'completed'
+        assert job['result']['stdout'] == 'dcs started'
+
+    def test_drbl_failure_marks_job_and_deployment_failed(self, client, db_session,
+                                                          monkeypatch):
+        """Test that a DRBL error fails both the job and the deployment."""
+        # Arrange
+        deployment = _create_deployment()
+
+        def fake_start(**kwargs):
+            raise DRBLException('dcs not found')
+
+        monkeypatch.setattr(
+            deployment_api.drbl_client, 'start_multicast_deployment', fake_start
+        )
+
+        # Act
+        response = client.post(f'/api/deployment/{deployment.id}/start')
+
+        # Assert
+        job = response.get_json()['job']
+        assert job['status'] == 'failed'
+        assert 'dcs not found' in job['error']
+        assert db.session.get(Deployment, deployment.id).status == 'failed'
+
+    def test_cancel_queued_job(self, client, db_session):
+        """Test that a queued job is cancelled without running."""
+        # Arrange
+        job = Job(job_type='deployment.start', status=Job.STATUS_QUEUED)
+        db.session.add(job)
+        db.session.commit()
+
+        # Act
+        response = client.post(f'/api/jobs/{job.id}/cancel')
+
+        # Assert
+        assert response.status_code == 200
+        assert response.get_json()['job']['status'] == 'cancelled'
+
+        # Cancelled job is never claimed
+        job_runner._execute(job.id)
+        assert db.session.get(Job, job.id).status == 'cancelled'
+
+    def test_cancel_running_job_stops_drbl(self, client, db_session, monkeypatch):
+        """Test that cancelling a running job maps to stop_deployment."""
+        # Arrange
+        job = Job(job_type='deployment.start', status=Job.STATUS_RUNNING)
+        db.session.add(job)
+        db.session.commit()
+        stopped = []
+
+        monkeypatch.setattr(
+            deployment_api.drbl_client, 'stop_deployment',
+            lambda deployment_id=None: stopped.append(True) or {'success': True}
+        )
+
+        # Act
+        response = client.post(f'/api/jobs/{job.id}/cancel')
+
+        # Assert
+        assert response.status_code == 200
+        assert response.get_json()['job']['cancel_requested'] is True
+        assert stopped == [True]
+
+    def test_get_missing_job(self, client, db_session):
+        """Test GET /api/jobs/<id> with unknown ID returns 404."""
+        response = client.get('/api/jobs/99999')
+
+        assert response.status_code == 404
+
+
+class TestLeaderExecution:
+    """Test that jobs run only in the background services leader."""
+
+    def test_follower_jobs_run_in_leader(self, app, db_session, tmp_path, monkeypatch):
+        """Test job hand-off from a follower worker to the leader.
+
+        This test verifies that:
+        1. A job submitted in a follower stays queued there and touches the
+           wake file
+        2. A job left running by an exited process is failed at leader start
+        3. The leader runs the queued job on its own pool
+        """
+        # Arrange
+        ran = []
+        done = threading.Event()
+
+        def handler(job):
+            ran.append(threading.current_thread().name)
+            done.set()
+            return {'echo': job.get_params()}
+
+        orphan = Job(
+            job_type='test.echo',
+            status=Job.STATUS_RUNNING,
+            result=json.dumps({'worker': f'{socket.gethostname()}:{2 ** 31 - 1}'})
+        )
+        db.session.add(orphan)
+        db.session.commit()
+        follower = _worker_runner(app, monkeypatch, tmp_path, handler)
+
+        # Act
+        job = follower.submit('test.echo', {'n': 1})
+        queued_in_follower = (job.status, list(ran))
+        leader = _worker_runner(app, monkeypatch, tmp_path, handler)
+        leader.start()
+        done.wait(10)
+        leader.stop()  # waits for the job (the test database has one connection)
+
+        # Assert
+        assert queued_in_follower == (Job.STATUS_QUEUED, [])
+        assert (tmp_path / 'jobs.wake').exists()
+        assert len(ran) == 1 and ran[0].startswith('job-worker')
+        db.session.expire_all()
+        assert db.session.get(Job, orphan.id).status == Job.STATUS_FAILED
+        finished = db.session.get(Job, job.id)
+        assert finished.status == Job.STATUS_COMPLETED
+        assert finished.get_result() == {'echo': {'n': 1}}
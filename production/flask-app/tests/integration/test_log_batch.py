@@ -0,0 +1,105 @@
+"""Integration tests for batch setup log ingestion."""
+import json
+
+from models import db, PCStatus, SetupLog
+
+
+def _entry(serial='BATCH001', status='in_progress', step=None, key=None,
+           timestamp='2025-11-16 12:00:00'):
+    """Build a log entry."""
+    entry = {
+        'serial': serial,
+        'pcname': '20251116M',
+        'status': status,
+        'timestamp': timestamp,
+        'step': step
+    }
+    if key:
+        entry['idempotency_key'] = key
+    return entry
+
+
+class TestLogBatch:
+    """Test POST /api/log/batch."""
+
+    def test_batch_inserts_and_reports_per_item(self, client, db_session):
+        """Test a mixed batch.
+
+        This test verifies that:
+        1. Valid entries are created and get log IDs
+        2. Invalid entries are reported without failing the batch
+        3. pc_status reflects the newest entry
+        """
+        # Arrange
+        entries = [
+            _entry(step='windows_update', key='agent1-0001'),
+            _entry(status='imaging'),
+            _entry(status='completed', step='done', key='agent1-0002',
+                   timestamp='2025-11-16 12:30:00')
+        ]
+
+        # Act
+        response = client.post('/api/log/batch', json=entries)
+
+        # Assert
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data['created'], data['invalid'], data['duplicates']) == (2, 1, 0)
+        assert [r['status'] for r in data['results']] == ['created', 'invalid', 'created']
+        assert 'Status must be one of' in data['results'][1]['message']
+        assert SetupLog.query.count() == 2
+        assert db.session.get(PCStatus, 'BATCH001').status == 'completed'
+
+    def test_retry_with_same_keys_does_not_duplicate(self, client, db_session):
+        """Test idempotent retries of a batch."""
+        # Arrange
+        entries = [_entry(key=f'agent2-{i:04d}', step=f'step{i}') for i in range(5)]
+        first = client.post('/api/log/batch', json={'logs': entries}).get_json()
+
+        # Act - agent did not receive the response and retries
+        second = client.post('/api/log/batch', json={'logs': entries}).get_json()
+
+        # Assert
+        assert second['created'] == 0
+        assert second['duplicates'] == 5
+        assert [r['log_id'] for r in second['results']] == [
+            r['log_id'] for r in first['results']
+        ]
+        assert SetupLog.query.count() == 5
+
+    def test_ndjson_body_and_batch_header_key(self, client, db_session):
+        """Test NDJSON input with an Idempotency-Key header."""
+        # Arrange
+        body = '\n'.join([
+            json.dumps(_entry(serial='BATCH010')),
+            '{not json',
+            json.dumps(_entry(serial='BATCH011'))
+        ])
+        headers = {'Idempotency-Key': 'upload-42'}
+
+        # Act
+        first = client.post('/api/log/batch', data=body, headers=headers,
+                            content_type='application/x-ndjson').get_json()
+        second = client.post('/api/log/batch', data=body, headers=headers,
+                             content_type='application/x-ndjson').get_json()
+
+        # Assert
+        assert [r['status'] for r in first['results']] == ['created', 'invalid', 'created']
+        assert second['duplicates'] == 2
+        assert SetupLog.query.count() == 2
+
+    def test_duplicate_key_within_batch(self, client, db_session):
+        """Test that a key repeated inside one batch is stored once."""
+        entries = [_entry(key='agent3-0001'), _entry(key='agent3-0001')]
+
+        data = client.post('/api/log/batch', json=entries).get_json()
+
+        assert [r['status'] for r in data['results']] == ['created', 'duplicate']
+        assert data['results'][0]['log_id'] == data['results'][1]['log_id']
+        assert SetupLog.query.count() == 1
+
+    def test_invalid_body(self, client, db_session):
+        """Test that a non-array body is rejected."""
+        response = client.post('/api/log/batch', json={'serial': 'BATCH020'})
+
+        assert response.status_code == 400
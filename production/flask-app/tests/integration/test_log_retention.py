@@ -0,0 +1,99 @@
+"""Integration tests for setup log retention and archival."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, SetupLog, PCStatus, LogArchiveSegment, SearchIndex
+from utils.log_retention import log_retention
+
+
+@pytest.fixture
+def retention(tmp_path, monkeypatch):
+    """Log retention writing to a temporary archive directory."""
+    monkeypatch.setattr(log_retention, 'archive_dir', tmp_path / 'archive')
+    monkeypatch.setattr(log_retention, 'keep', 3)
+    monkeypatch.setattr(log_retention, 'min_age_days', 30)
+    monkeypatch.setattr(log_retention, 'batch_size', 4)
+    return log_retention
+
+
+def _add_logs(serial, count, start, step=timedelta(days=1)):
+    """Insert count logs for a serial starting at start."""
+    for i in range(count):
+        db.session.add(SetupLog(
+            serial=serial,
+            pcname='20251116M',
+            status='completed' if i == count - 1 else 'in_progress',
+            timestamp=start + step * i,
+            logs=f'{serial} step {i} windows update output'
+        ))
+    db.session.commit()
+
+
+class TestLogRetention:
+    """Test archiving of old setup logs."""
+
+    def test_archives_beyond_keep_and_age(self, app, db_session, retention):
+        """Test what is archived.
+
+        This test verifies that:
+        1. The latest N entries per serial stay in the hot table
+        2. Entries younger than min_age_days stay even beyond N
+        3. The latest status per PC is unchanged
+        4. Work is split into batches of batch_size
+        """
+        # Arrange
+        old = datetime.utcnow() - timedelta(days=200)
+        _add_logs('RET001', 10, old)                                    # 7 eligible
+        _add_logs('RET002', 2, old)                                     # under limit
+        _add_logs('RET003', 6, datetime.utcnow() - timedelta(hours=6),
+                  step=timedelta(minutes=1))                            # too young
+
+        # Act
+        stats = retention.run()
+
+        # Assert
+        assert stats['archived'] == 7
+        assert stats['batches'] == 2
+        remaining = {
+            serial: SetupLog.query.filter_by(serial=serial).count()
+            for serial in ('RET001', 'RET002', 'RET003')
+        }
+        assert remaining == {'RET001': 3, 'RET002': 2, 'RET003': 6}
+        assert db.session.get(PCStatus, 'RET001').status == 'completed'
+        assert retention.run()['archived'] == 0
+
+    def test_archived_logs_readable_by_serial(self, client, db_session, retention):
+        """Test retrieval through the archive index.
+
+        This test verifies that:
+        1. Logs spanning several months land in per-month files
+        2. GET /api/log/archive returns them in timestamp order
+        3. Archived rows leave the search index
+        """
+        # Arrange
+        _add_logs('RET010', 8, datetime(2025, 1, 20), step=timedelta(days=7))
+        _add_logs('RET011', 5, datetime(2025, 1, 1))
+
+        # Act
+        retention.run()
+        response = client.get('/api/log/archive?serial=RET010')
+
+        # Assert
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['count'] == 5
+        assert [log['logs'] for log in data['logs']] == [
+            f'RET010 step {i} windows update output' for i in range(5)
+        ]
+        months = {segment.month for segment in LogArchiveSegment.query}
+        assert months == {'2025-01', '2025-02'}
+        assert len(list(retention.archive_dir.glob('setup_logs-2025-0*.ndjson.*'))) == 2
+        hits = SearchIndex.search('RET010 step', kinds=('logs',))['logs']
+        assert len(hits) == 3
+
+    def test_archive_requires_serial(self, client, db_session):
+        """Test that the archive endpoint requires a serial."""
+        response = client.get('/api/log/archive')
+
+        assert response.status_code == 400
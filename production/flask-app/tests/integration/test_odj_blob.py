@@ -0,0 +1,147 @@
+"""Integration tests for ODJ blob delivery."""
+import hashlib
+import os
+
+import pytest
+
+from models import db, OdjFile
+from utils.odj_blob_cache import OdjBlobCache, odj_blob_cache
+
+BLOB = b'offline-domain-join-blob' * 10
+
+
+@pytest.fixture
+def odj_dir(app, tmp_path, monkeypatch):
+    """Point ODJ_FILES_PATH at an empty directory and reset the blob cache."""
+    monkeypatch.setitem(app.config, 'ODJ_FILES_PATH', str(tmp_path))
+    odj_blob_cache.clear()
+    yield tmp_path
+    odj_blob_cache.clear()
+
+
+def _blob_pc(create_test_pc, odj_dir, serial='BLOB001', content=BLOB):
+    """Create a PC with an ODJ file recorded in the inventory."""
+    path = odj_dir / f'{serial}.txt'
+    path.write_bytes(content)
+    create_test_pc(serial=serial, pcname='20251116M', odj_path=str(path))
+    OdjFile.record(path)
+    db.session.commit()
+    return path
+
+
+class TestOdjBlob:
+    """Test GET /api/odj/blob/<serial>."""
+
+    def test_serves_blob_with_strong_etag(self, client, db_session, create_test_pc,
+                                          odj_dir, monkeypatch):
+        """Test blob download, conditional GET and the in-memory cache.
+
+        This test verifies that:
+        1. The blob is returned with the stored SHA-256 as strong ETag
+        2. If-None-Match with that ETag answers 304 without a body
+        3. After the first request the blob is served without opening the file
+        """
+        # Arrange
+        _blob_pc(create_test_pc, odj_dir)
+        etag = f'"{hashlib.sha256(BLOB).hexdigest()}"'
+
+        # Act
+        first = client.get('/api/odj/blob/BLOB001')
+        opened = []
+        real_open = open
+        monkeypatch.setattr('builtins.open',
+                            lambda *args, **kw: opened.append(args[0]) or real_open(*args, **kw))
+        again = client.get('/api/odj/blob/BLOB001')
+        revalidated = client.get('/api/odj/blob/BLOB001', headers={'If-None-Match': etag})
+        stats = client.get('/api/odj/blob/cache').get_json()
+
+        # Assert
+        assert first.status_code == 200
+        assert first.data == BLOB
+        assert first.headers['ETag'] == etag
+        assert first.mimetype == 'application/octet-stream'
+        assert again.data == BLOB
+        assert revalidated.status_code == 304
+        assert revalidated.data == b''
+        assert opened == []
+        assert stats['entries'] == 1
+        assert stats['hits'] == 2
+
+    def test_rewritten_blob_gets_new_etag(self, client, db_session, create_test_pc,
+                                          odj_dir, monkeypatch):
+        """Test that a changed file is re-read and re-hashed after the TTL."""
+        # Arrange
+        path = _blob_pc(create_test_pc, odj_dir)
+        monkeypatch.setattr(odj_blob_cache, 'ttl', 0)
+        client.get('/api/odj/blob/BLOB001')
+
+        # Act
+        path.write_bytes(b'rewritten-blob')
+        os.utime(path, ns=(0, 10 ** 18))
+        response = client.get('/api/odj/blob/BLOB001')
+
+        # Assert
+        assert response.data == b'rewritten-blob'
+        digest = hashlib.sha256(b'rewritten-blob').hexdigest()
+        assert response.headers['ETag'] == f'"{digest}"'
+        assert OdjFile.query.filter_by(path=str(path)).one().sha256 == digest
+
+    def test_large_blob_is_sent_from_file(self, client, db_session, create_test_pc,
+                                          odj_dir, monkeypatch):
+        """Test that blobs above the cache limit use send_file with the stored ETag."""
+        # Arrange
+        content = b'x' * 4096
+        _blob_pc(create_test_pc, odj_dir, serial='BIG001', content=content)
+        monkeypatch.setattr(odj_blob_cache, 'max_blob_bytes', 1024)
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+
+        # Act
+        response = client.get('/api/odj/blob/BIG001')
+        conditional = client.get('/api/odj/blob/BIG001', headers={'If-None-Match': etag})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.data == content
+        assert response.headers['ETag'] == etag
+        assert conditional.status_code == 304
+        assert odj_blob_cache.stats()['entries'] == 0
+
+    def test_errors(self, client, db_session, create_test_pc, odj_dir):
+        """Test invalid serials, unknown PCs and missing files."""
+        # Arrange
+        create_test_pc(serial='NOODJ01', pcname='20251116M')
+        create_test_pc(serial='GONE001', pcname='20251116M',
+                       odj_path=str(odj_dir / 'GONE001.txt'))
+
+        # Act / Assert
+        assert client.get('/api/odj/blob/bad%20serial').status_code == 400
+        assert client.get('/api/odj/blob/UNKNOWN').status_code == 404
+        assert client.get('/api/odj/blob/NOODJ01').status_code == 404
+        assert client.get('/api/odj/blob/GONE001').status_code == 404
+
+
+class TestOdjBlobCache:
+    """Test the byte-bounded LRU."""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test eviction by total bytes and the per-blob size limit."""
+        # Arrange
+        cache = OdjBlobCache(max_bytes=250, max_blob_bytes=120, ttl=60)
+        paths = []
+        for name in ('a', 'b', 'c'):
+            path = tmp_path / name
+            path.write_bytes(b'x' * 100)
+            paths.append(str(path))
+            cache.put(str(path), b'x' * 100, name, os.stat(path))
+            if name == 'b':
+                cache.get(paths[0])  # a is now more recent than b
+
+        # Act
+        cache.put('big', b'x' * 200, 'big', os.stat(paths[0]))
+
+        # Assert
+        assert cache.get(paths[1]) is None
+        assert cache.get(paths[0]).sha256 == 'a'
+        assert cache.get(paths[2]).sha256 == 'c'
+        assert cache.get('big') is None
+        assert cache.stats()['bytes'] == 200
@@ -0,0 +1,188 @@
+"""Integration tests for bulk ODJ archive ingest."""
+import base64
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from models import OdjFile, PCMaster
+from utils.odj_ingest import IngestError, OdjIngest, validate_odj
+
+BLOB = base64.b64encode(b'offline domain join provisioning data' * 20).decode()
+DJOIN = ('\ufeff' + BLOB + '\r\n').encode('utf-16-le')
+
+
+class _Unseekable(io.RawIOBase):
+    """Write-only stream without tell/seek (forces zip data descriptors)."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def _zip(files, seekable=True):
+    """Build a deflated zip archive from {name: bytes}."""
+    target = io.BytesIO() if seekable else _Unseekable()
+    with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return (target if seekable else target.buffer).getvalue()
+
+
+def _tar_gz(files):
+    """Build a gzip-compressed tar archive from {name: bytes}."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def odj_dir(app, tmp_path, monkeypatch):
+    """Point ODJ_FILES_PATH at an empty directory."""
+    monkeypatch.setitem(app.config, 'ODJ_FILES_PATH', str(tmp_path))
+    return tmp_path
+
+
+class TestOdjIngest:
+    """Test archive reading, validation and matching."""
+
+    @pytest.mark.parametrize('seekable', [True, False])
+    def test_zip_entries_are_matched_and_associated(self, app_context, db_session,
+                                                    create_test_pc, tmp_path, seekable):
+        """Test a zip ingest.
+
+        This test verifies that:
+        1. Entries are read with and without zip data descriptors
+        2. File names match PCs by pcname, then serial (case-insensitive)
+        3. A pcname shared by several PCs is reported as ambiguous
+        4. Invalid, unmatched and hidden entries are reported per file
+        """
+        # Arrange
+        create_test_pc(serial='BULK001', pcname='20251201M')
+        create_test_pc(serial='BULK002', pcname='20251202M')
+        create_test_pc(serial='BULK003', pcname='20251203M')
+        create_test_pc(serial='BULK004', pcname='20251203M')
+        archive = _zip({
+            'batch/20251201M.txt': DJOIN,
+            'batch/bulk002.txt': DJOIN,
+            'batch/20251203M.txt': DJOIN,
+            'batch/UNKNOWN.txt': DJOIN,
+            'batch/broken.txt': b'not an odj blob!',
+            'batch/readme.md': b'# notes',
+            '__MACOSX/batch/._20251201M.txt': b'\x00',
+        }, seekable=seekable)
+
+        # Act
+        result = OdjIngest(tmp_path, workers=2).ingest(io.BytesIO(archive))
+
+        # Assert
+        report = {entry['entry']: entry for entry in result['files']}
+        assert report['batch/20251201M.txt']['status'] == 'associated'
+        assert report['batch/20251201M.txt']['matched_by'] == 'pcname'
+        assert report['batch/bulk002.txt']['serial'] == 'BULK002'
+        assert report['batch/bulk002.txt']['matched_by'] == 'serial'
+        assert report['batch/20251203M.txt']['status'] == 'ambiguous'
+        assert report['batch/UNKNOWN.txt']['status'] == 'unmatched'
+        assert report['batch/broken.txt']['status'] == 'invalid'
+        assert 'extensions' in report['batch/readme.md']['error']
+        assert report['__MACOSX/batch/._20251201M.txt']['status'] == 'skipped'
+        assert result['summary']['associated'] == 2
+        assert PCMaster.find_by_serial('BULK001').odj_path == str(tmp_path / '20251201M.txt')
+        assert PCMaster.find_by_serial('BULK003').odj_path is None
+        assert (tmp_path / '20251201M.txt').read_bytes() == DJOIN
+        assert sorted(f.filename for f in OdjFile.query.all()) == [
+            '20251201M.txt', '20251203M.txt', 'UNKNOWN.txt', 'bulk002.txt'
+        ]
+        assert not list(tmp_path.glob('.*.part'))
+
+    def test_corrupt_archive_applies_nothing(self, app_context, db_session,
+                                             create_test_pc, tmp_path):
+        """Test that a truncated archive raises and leaves no files behind."""
+        # Arrange
+        create_test_pc(serial='BULK010', pcname='20251210M')
+        archive = _zip({f'{i:04d}.txt': DJOIN for i in range(20)} | {'20251210M.txt': DJOIN})
+
+        # Act / Assert
+        with pytest.raises(IngestError):
+            OdjIngest(tmp_path).ingest(io.BytesIO(archive[:len(archive) // 2]))
+        assert list(tmp_path.iterdir()) == []
+        assert PCMaster.find_by_serial('BULK010').odj_path is None
+
+    def test_validate_odj(self):
+        """Test recognition of djoin blobs and XML ODJ files."""
+        # Assert
+        assert validate_odj(DJOIN) == 'djoin'
+        assert validate_odj(BLOB.encode()) == 'djoin'
+        assert validate_odj(b'<OfflineDomainJoin><Domain>x</Domain></OfflineDomainJoin>') == 'xml'
+        for data in (b'', b'\xff\xfe', b'<unclosed>', b'plain text!', b'\x80\x81\x82'):
+            with pytest.raises(ValueError):
+                validate_odj(data)
+
+
+class TestOdjBulkEndpoint:
+    """Test POST /api/odj/bulk."""
+
+    def test_tar_stream_upload(self, client, db_session, create_test_pc, odj_dir):
+        """Test a raw tar.gz request body with serial matching."""
+        # Arrange
+        create_test_pc(serial='TAR001', pcname='20251211M')
+        body = _tar_gz({'TAR001.txt': DJOIN, 'nested/TAR002.odj': DJOIN})
+
+        # Act
+        response = client.post('/api/odj/bulk?match=serial', data=body,
+                               content_type='application/gzip')
+
+        # Assert
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['summary']['format'] == 'tar'
+        assert data['summary']['associated'] == 1
+        assert data['summary']['unmatched'] == 1
+        assert PCMaster.find_by_serial('TAR001').odj_path == str(odj_dir / 'TAR001.txt')
+        assert (odj_dir / 'TAR002.odj').exists()
+
+    def test_multipart_dry_run(self, client, db_session, create_test_pc, odj_dir):
+        """Test that a dry run reports matches without writing anything."""
+        # Arrange
+        create_test_pc(serial='DRY001', pcname='20251212M')
+        archive = _zip({'20251212M.txt': DJOIN})
+
+        # Act
+        response = client.post('/api/odj/bulk?dry_run=true', data={
+            'file': (io.BytesIO(archive), 'batch.zip')
+        }, content_type='multipart/form-data')
+
+        # Assert
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['summary']['dry_run'] is True
+        assert data['files'][0]['status'] == 'associated'
+        assert data['files'][0]['sha256']
+        assert list(odj_dir.iterdir()) == []
+        assert PCMaster.find_by_serial('DRY001').odj_path is None
+
+    def test_rejects_bad_requests(self, client, db_session, odj_dir):
+        """Test invalid archives, formats and match rules."""
+        # Act
+        garbage = client.post('/api/odj/bulk', data=b'this is not an archive',
+                              content_type='application/octet-stream')
+        bad_format = client.post('/api/odj/bulk?format=rar', data=b'x')
+        bad_match = client.post('/api/odj/bulk?match=mac_address', data=b'x')
+        empty = client.post('/api/odj/bulk', data=b'')
+
+        # Assert
+        assert garbage.status_code == 400
+        assert garbage.get_json()['error'] == 'Invalid archive'
+        assert bad_format.status_code == 400
+        assert bad_match.status_code == 400
+        assert empty.status_code == 400
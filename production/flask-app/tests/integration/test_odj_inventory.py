@@ -0,0 +1,130 @@
+"""Integration tests for the ODJ file inventory."""
+import hashlib
+import io
+import os
+
+from sqlalchemy import event, inspect
+
+from models import db, OdjFile, PCMaster
+
+
+def _write(directory, name, content):
+    """Write an ODJ file and return its path."""
+    path = directory / name
+    path.write_text(content)
+    return path
+
+
+class TestOdjInventory:
+    """Test syncing the inventory with the ODJ directory."""
+
+    def test_sync_tracks_directory_changes(self, app_context, db_session, tmp_path):
+        """Test OdjFile.sync.
+
+        This test verifies that:
+        1. New files are added with size and SHA-256
+        2. Unchanged files are not re-hashed
+        3. Changed files are updated and vanished files removed
+        4. Files with other extensions are ignored
+        """
+        # Arrange
+        first = _write(tmp_path, '20251116M.txt', 'blob-1')
+        second = _write(tmp_path, '20251117M.txt', 'blob-2')
+        _write(tmp_path, 'notes.md', 'ignored')
+
+        # Act
+        added = OdjFile.sync(tmp_path)
+        unchanged = OdjFile.sync(tmp_path)
+        first.write_text('blob-1-rewritten')
+        os.utime(first, ns=(0, 10 ** 18))
+        second.unlink()
+        changed = OdjFile.sync(tmp_path)
+
+        # Assert
+        assert added == {'added': 2, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        assert unchanged == {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 2}
+        assert changed == {'added': 0, 'updated': 1, 'removed': 1, 'unchanged': 0}
+        row = OdjFile.query.one()
+        assert row.filename == '20251116M.txt'
+        assert row.size_bytes == len('blob-1-rewritten')
+        assert row.sha256 == hashlib.sha256(b'blob-1-rewritten').hexdigest()
+
+    def test_inventory_is_one_join(self, app_context, db_session, tmp_path):
+        """Test that files and their PCs are read with a single query."""
+        # Arrange
+        for i in range(50):
+            path = _write(tmp_path, f'ODJ{i:03d}.txt', f'blob-{i}')
+            if i % 2 == 0:
+                db.session.add(PCMaster(serial=f'ODJ{i:03d}', pcname='20251116M',
+                                        odj_path=str(path)))
+        db.session.commit()
+        OdjFile.sync(tmp_path)
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        # Act
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            inventory = OdjFile.inventory()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        # Assert
+        owners = [(f['filename'], (f['associated_pc'] or {}).get('serial'))
+                  for f in inventory]
+        assert len(statements) == 1
+        assert len(owners) == 50
+        assert owners[0] == ('ODJ000.txt', 'ODJ000')
+        assert owners[1] == ('ODJ001.txt', None)
+
+    def test_odj_path_is_indexed(self, app_context, db_session):
+        """Test the pc_master.odj_path index used by the inventory join."""
+        # Act
+        indexes = inspect(db.engine).get_indexes('pc_master')
+
+        # Assert
+        assert ['odj_path'] in [index['column_names'] for index in indexes]
+
+
+class TestOdjEndpoints:
+    """Test that the ODJ endpoints keep the inventory in sync."""
+
+    def test_upload_list_and_delete(self, app, client, db_session, create_test_pc,
+                                    tmp_path, monkeypatch):
+        """Test POST /api/odj/upload, GET /api/odj/list and DELETE.
+
+        This test verifies that:
+        1. An upload records the file in the inventory
+        2. The listing includes files copied into the directory directly
+        3. Each file is listed with its hash and associated PC
+        4. Deleting a file removes its inventory row and association
+        """
+        # Arrange
+        monkeypatch.setitem(app.config, 'ODJ_FILES_PATH', str(tmp_path))
+        create_test_pc(serial='ODJUP01', pcname='20251116M')
+        _write(tmp_path, 'copied.txt', 'copied-blob')
+
+        # Act
+        upload = client.post('/api/odj/upload', data={
+            'file': (io.BytesIO(b'uploaded-blob'), '20251116M.txt'),
+            'serial': 'ODJUP01'
+        }, content_type='multipart/form-data')
+        recorded = OdjFile.query.filter_by(filename='20251116M.txt').one().sha256
+        listing = client.get('/api/odj/list')
+        deleted = client.delete('/api/odj/delete/20251116M.txt')
+
+        # Assert
+        assert upload.status_code == 201
+        assert recorded == hashlib.sha256(b'uploaded-blob').hexdigest()
+        assert listing.status_code == 200
+        files = {f['filename']: f for f in listing.get_json()['files']}
+        assert sorted(files) == ['20251116M.txt', 'copied.txt']
+        assert files['20251116M.txt']['associated_pc']['serial'] == 'ODJUP01'
+        assert files['copied.txt']['associated_pc'] is None
+        assert files['copied.txt']['size_bytes'] == len('copied-blob')
+        assert deleted.status_code == 200
+        assert deleted.get_json()['removed_associations'] == 1
+        assert [f.filename for f in OdjFile.query.all()] == ['copied.txt']
+        assert PCMaster.find_by_serial('ODJUP01').odj_path is None
@@ -0,0 +1,123 @@
+"""Integration tests for keyset (cursor) pagination."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from models import db, PCMaster, SetupLog
+
+
+def _create_pcs(count, same_timestamp=False):
+    """Insert PCs with distinct (or identical) created_at values."""
+    base = datetime(2025, 11, 16, 12, 0, 0)
+    for i in range(count):
+        db.session.add(PCMaster(
+            serial=f'PAGE{i:04d}',
+            pcname=f'2025111{i % 10}M',
+            created_at=base if same_timestamp else base + timedelta(minutes=i)
+        ))
+    db.session.commit()
+
+
+class TestKeysetPagination:
+    """Test cursor pagination of GET /api/pcs and the log view."""
+
+    def test_cursor_walk_returns_every_pc_once(self, client, db_session):
+        """Test walking all pages with the after cursor.
+
+        This test verifies that:
+        1. Pages follow created_at DESC, id DESC order
+        2. Rows sharing a created_at are neither skipped nor repeated
+        3. The last page has no next_cursor
+        """
+        # Arrange
+        _create_pcs(25, same_timestamp=True)
+
+        # Act
+        seen = []
+        after = None
+        while True:
+            url = '/api/pcs?per_page=10&count=false'
+            if after:
+                url += f'&after={after}'
+            data = client.get(url).get_json()
+            seen.extend(item['id'] for item in data['items'])
+            after = data['next_cursor']
+            if not after:
+                break
+
+        # Assert
+        expected = [pc.id for pc in PCMaster.query.order_by(PCMaster.id.desc())]
+        assert seen == expected
+        assert data['total'] is None
+
+    def test_page_mode_still_supported(self, client, db_session):
+        """Test page/per_page responses keep their fields."""
+        # Arrange
+        _create_pcs(25)
+
+        # Act
+        data = client.get('/api/pcs?page=3&per_page=10').get_json()
+
+        # Assert
+        assert (data['total'], data['pages'], data['page']) == (25, 3, 3)
+        assert [item['serial'] for item in data['items']] == [
+            f'PAGE{i:04d}' for i in range(4, -1, -1)
+        ]
+        assert data['next_cursor'] is None
+
+    def test_prefix_and_exact_match(self, client, db_session):
+        """Test index-friendly filters."""
+        # Arrange
+        _create_pcs(15)
+
+        # Act
+        prefix = client.get('/api/pcs?serial=PAGE001&match=prefix').get_json()
+        exact = client.get('/api/pcs?serial=PAGE0012&match=exact').get_json()
+        invalid = client.get('/api/pcs?serial=PAGE&match=regex')
+
+        # Assert
+        assert prefix['total'] == 5  # PAGE0010 - PAGE0014
+        assert [item['serial'] for item in exact['items']] == ['PAGE0012']
+        assert invalid.status_code == 400
+
+    def test_invalid_cursor_rejected(self, client, db_session):
+        """Test that a tampered cursor is a client error."""
+        response = client.get('/api/pcs?after=not-a-cursor')
+
+        assert response.status_code == 400
+
+    def test_listing_uses_composite_index(self, app, db_session):
+        """Test that a deep cursor page is an index range scan."""
+        # Act
+        plan = db.session.execute(text(
+            'EXPLAIN QUERY PLAN SELECT * FROM pc_master '
+            'WHERE (created_at, id) < (:c, :i) '
+            'ORDER BY created_at DESC, id DESC LIMIT 20'
+        ), {'c': '2025-11-16 12:00:00', 'i': 1}).fetchall()
+
+        # Assert
+        detail = ' '.join(row[-1] for row in plan)
+        assert 'ix_pc_master_created_at_id' in detail
+        assert 'TEMP B-TREE' not in detail
+
+    def test_log_view_next_link(self, client, db_session):
+        """Test the setup log page links to the next page."""
+        # Arrange
+        base = datetime(2025, 11, 16, 12, 0, 0)
+        for i in range(60):
+            db.session.add(SetupLog(
+                serial='LOGPAGE01', pcname='20251116M', status='in_progress',
+                timestamp=base + timedelta(seconds=i), logs=f'entry {i}'
+            ))
+        db.session.commit()
+
+        # Act
+        first = client.get('/logs')
+        html = first.get_data(as_text=True)
+        next_url = html.split('href="/logs?after=', 1)[1].split('"', 1)[0]
+        second = client.get(f'/logs?after={next_url}')
+
+        # Assert
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.get_data(as_text=True).count('LOGPAGE01') == 10
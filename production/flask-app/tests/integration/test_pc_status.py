@@ -0,0 +1,97 @@
+"""Integration tests for the latest-status-per-PC table."""
+from datetime import datetime, timedelta
+
+from models import db, PCStatus, SetupLog
+
+
+class TestPCStatus:
+    """Test pc_status maintenance on setup log inserts."""
+
+    def test_post_log_updates_latest_status(self, client, db_session):
+        """Test that POST /api/log maintains pc_status.
+
+        This test verifies that:
+        1. First log for a serial creates its pc_status row
+        2. Newer logs replace status/step
+        3. Per-status counters count PCs, not log rows
+        """
+        # Arrange
+        payload = {
+            'serial': 'STATUS001',
+            'pcname': '20251116M',
+            'status': 'in_progress',
+            'timestamp': '2025-11-16 10:00:00',
+            'step': 'windows_update'
+        }
+
+        # Act
+        client.post('/api/log', json=payload)
+        client.post('/api/log', json=dict(
+            payload, status='completed', step='done',
+            timestamp='2025-11-16 11:00:00'
+        ))
+        client.post('/api/log', json=dict(
+            payload, serial='STATUS002', status='failed',
+            timestamp='2025-11-16 11:30:00'
+        ))
+
+        # Assert
+        status = db.session.get(PCStatus, 'STATUS001')
+        assert status.status == 'completed'
+        assert status.step == 'done'
+        counts = PCStatus.status_counts()
+        assert counts['completed'] == 1
+        assert counts['failed'] == 1
+        assert counts['in_progress'] == 0
+
+    def test_late_log_does_not_overwrite_newer_status(self, db_session):
+        """Test that an older timestamp arriving late is ignored."""
+        # Arrange
+        now = datetime(2025, 11, 16, 12, 0, 0)
+        db.session.add(SetupLog(serial='STATUS010', pcname='20251116M',
+                                status='completed', timestamp=now))
+        db.session.commit()
+
+        # Act
+        db.session.add(SetupLog(serial='STATUS010', pcname='20251116M',
+                                status='in_progress',
+                                timestamp=now - timedelta(minutes=5)))
+        db.session.commit()
+
+        # Assert
+        assert db.session.get(PCStatus, 'STATUS010').status == 'completed'
+
+    def test_rebuild_matches_incremental(self, db_session):
+        """Test that rebuild() recomputes the same latest status."""
+        # Arrange
+        base = datetime(2025, 11, 16, 9, 0, 0)
+        for i, status in enumerate(['pending', 'in_progress', 'failed']):
+            db.session.add(SetupLog(serial='STATUS020', pcname='20251116M',
+                                    status=status,
+                                    timestamp=base + timedelta(minutes=i)))
+        db.session.add(SetupLog(serial='STATUS021', pcname='20251117M',
+                                status='completed', timestamp=base))
+        db.session.commit()
+        incremental = {s.serial: s.status for s in PCStatus.query.all()}
+
+        # Act
+        count = PCStatus.rebuild()
+
+        # Assert
+        assert count == 2
+        assert {s.serial: s.status for s in PCStatus.query.all()} == incremental
+        assert incremental == {'STATUS020': 'failed', 'STATUS021': 'completed'}
+
+    def test_dashboard_uses_latest_status(self, client, db_session, create_test_log):
+        """Test that the dashboard counts PCs by latest status."""
+        # Arrange
+        create_test_log(serial='STATUS030', status='in_progress')
+        create_test_log(serial='STATUS030', status='completed')
+
+        # Act
+        response = client.get('/')
+
+        # Assert
+        assert response.status_code == 200
+        assert PCStatus.status_counts()['completed'] == 1
+        assert PCStatus.status_counts()['in_progress'] == 0
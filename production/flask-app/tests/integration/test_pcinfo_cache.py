@@ -0,0 +1,185 @@
+"""Integration tests for the PC info lookup cache."""
+from models import db, PCMaster
+from utils import pcinfo_cache as pcinfo_cache_module
+from utils.pcinfo_cache import PCInfoCache, pcinfo_cache
+
+
+class TestPCInfoCache:
+    """Test serial -> PC info cache behaviour."""
+
+    def test_lru_eviction_bounds_memory(self):
+        """Test that the cache never holds more than max_entries."""
+        # Arrange
+        cache = PCInfoCache(max_entries=3, ttl=0)
+
+        # Act
+        for i in range(5):
+            cache.put(f'SN{i}', f'PC{i}', None)
+
+        # Assert
+        stats = cache.stats()
+        assert stats['size'] == 3
+        assert stats['evictions'] == 2
+        assert cache.get('SN0') is None
+        assert cache.get('SN4') == ('PC4', None)
+
+    def test_pcinfo_hit_skips_database(self, client, db_session, create_test_pc,
+                                       monkeypatch):
+        """Test that a cached serial is answered without a DB lookup.
+
+        This test verifies that:
+        1. ORM inserts are written through to the cache on commit
+        2. Lookups on a hit never call PCMaster.find_by_serial
+        3. Hit counter is incremented
+        """
+        # Arrange
+        create_test_pc(serial='CACHE001', pcname='20251116M',
+                       odj_path='/srv/odj/20251116M.txt')
+        hits_before = pcinfo_cache.hits
+
+        def fail_lookup(serial):
+            raise AssertionError('database lookup on cache hit')
+
+        monkeypatch.setattr(PCMaster, 'find_by_serial', fail_lookup)
+
+        # Act
+        response = client.get('/api/pcinfo?serial=CACHE001')
+
+        # Assert
+        assert response.status_code == 200
+        assert response.get_json() == {
+            'pcname': '20251116M',
+            'odj_path': '/srv/odj/20251116M.txt'
+        }
+        assert pcinfo_cache.hits == hits_before + 1
+
+    def test_miss_does_not_cache_invalidated_row(self, client, db_session,
+                                                 create_test_pc, monkeypatch):
+        """Test a change committed while a miss is reading the database.
+
+        This test verifies that:
+        1. The miss still answers with the row it read
+        2. That row is not cached over the invalidation
+        3. A miss without a concurrent change is cached
+        """
+        # Arrange
+        create_test_pc(serial='CACHE003', pcname='20251116M')
+        pcinfo_cache.invalidate('CACHE003')
+        find_by_serial = PCMaster.find_by_serial
+        racing = []
+
+        def find_during_update(serial):
+            pc = find_by_serial(serial)
+            if not racing:
+                racing.append(serial)
+                pcinfo_cache.invalidate(serial)  # committed by another request
+            return pc
+
+        monkeypatch.setattr(PCMaster, 'find_by_serial', find_during_update)
+
+        # Act
+        raced = client.get('/api/pcinfo?serial=CACHE003')
+        cached_after_race = pcinfo_cache.get('CACHE003')
+        client.get('/api/pcinfo?serial=CACHE003')
+
+        # Assert
+        assert raced.get_json()['pcname'] == '20251116M'
+        assert cached_after_race is None
+        assert pcinfo_cache.get('CACHE003') == ('20251116M', None)
+
+    def test_update_and_delete_write_through(self, client, db_session,
+                                             create_test_pc):
+        """Test that PUT/DELETE /api/pcs keep the cache correct."""
+        # Arrange
+        pc = create_test_pc(serial='CACHE002', pcname='20251116M')
+
+        # Act - update
+        response = client.put(f'/api/pcs/{pc.id}', json={
+            'pcname': '20251117M',
+            'odj_path': '/srv/odj/20251117M.txt'
+        })
+
+        # Assert - update visible through the cache
+        assert response.status_code == 200
+        assert pcinfo_cache.get('CACHE002') == (
+            '20251117M', '/srv/odj/20251117M.txt'
+        )
+        assert client.get('/api/pcinfo?serial=CACHE002').get_json()['pcname'] == '20251117M'
+
+        # Act - delete
+        response = client.delete(f'/api/pcs/{pc.id}')
+
+        # Assert - deleted PC is gone
+        assert response.status_code == 200
+        assert pcinfo_cache.get('CACHE002') is None
+        assert client.get('/api/pcinfo?serial=CACHE002').status_code == 404
+
+    def test_changes_reach_other_workers(self, tmp_path):
+        """Test cross-process invalidation through the change journal.
+
+        This test verifies that:
+        1. A change applied by one worker drops the serial in the others
+        2. The writing worker keeps its own write-through value
+        3. A serial another writer changed concurrently is not cached
+        """
+        # Arrange
+        journal = tmp_path / 'pcinfo_cache.journal'
+        worker_a = PCInfoCache(ttl=0, journal_path=str(journal))
+        worker_b = PCInfoCache(ttl=0, journal_path=str(journal))
+        for worker in (worker_a, worker_b):
+            worker.put('SN1', 'PC1', None)
+            worker.put('SN2', 'PC2', None)
+
+        # Act
+        worker_a.apply({'SN1': ('PC1-renamed', None)})
+        with open(journal, 'a') as f:
+            f.write('99999:1 SN2\n')  # committed by another worker
+        worker_a.apply({'SN2': ('PC2-stale', None)})
+
+        # Assert
+        assert worker_a.get('SN1') == ('PC1-renamed', None)
+        assert worker_a.get('SN2') is None
+        assert worker_b.get('SN1') is None
+        assert worker_b.get('SN2') is None
+        assert worker_b.stats()['remote_invalidations'] == 1
+
+    def test_replaced_journal_clears_other_workers(self, tmp_path, monkeypatch):
+        """Test that a worker seeing a new journal file drops all entries."""
+        # Arrange
+        monkeypatch.setattr(pcinfo_cache_module, 'JOURNAL_MAX_BYTES', 10)
+        journal = tmp_path / 'pcinfo_cache.journal'
+        writer = PCInfoCache(ttl=0, journal_path=str(journal))
+        reader = PCInfoCache(ttl=0, journal_path=str(journal))
+        writer.apply({'SN1': ('PC1', None)})
+        reader.put('SN9', 'PC9', None)
+        assert reader.get('SN9') == ('PC9', None)
+
+        # Act
+        writer.apply({'SN2': ('PC2', None)})
+
+        # Assert
+        assert journal.read_text().splitlines()[-1].endswith(' SN2')
+        assert len(journal.read_text().splitlines()) == 1
+        assert reader.get('SN9') is None
+
+    def test_rollback_does_not_touch_cache(self, db_session):
+        """Test that flushed but rolled back changes are discarded."""
+        # Arrange
+        pc = PCMaster(serial='CACHE003', pcname='20251116M')
+        db.session.add(pc)
+
+        # Act
+        db.session.flush()
+        db.session.rollback()
+
+        # Assert
+        assert pcinfo_cache.get('CACHE003') is None
+
+    def test_cache_stats_endpoint(self, client):
+        """Test GET /api/pcinfo/cache returns counters."""
+        response = client.get('/api/pcinfo/cache')
+
+        assert response.status_code == 200
+        json_data = response.get_json()
+        for key in ('size', 'max_entries', 'hits', 'misses', 'hit_ratio'):
+            assert key in json_data
@@ -0,0 +1,181 @@
+"""Integration tests for the DRBL process supervisor."""
+import os
+import sys
+import time
+
+import pytest
+
+from utils.deployment_progress import LogFollower
+from utils.drbl_client import DRBLClient, DRBLCommandError
+from utils.process_supervisor import ProcessSupervisor, deployment_session
+import utils.drbl_client as drbl_module
+
+
+@pytest.fixture
+def supervisor(tmp_path):
+    """Supervisor sharing state through a temporary run directory."""
+    sup = ProcessSupervisor()
+    sup.run_dir = tmp_path / 'run'
+    sup.buffer_lines = 5
+    sup.kill_grace = 1.0
+    return sup
+
+
+def _python(code):
+    """Command running a Python snippet."""
+    return [sys.executable, '-c', code]
+
+
+def _wait_until(predicate, timeout=5.0):
+    """Poll until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestProcessSupervisor:
+    """Test launching, streaming and stopping processes."""
+
+    def test_streams_lines_into_ring_buffer(self, supervisor):
+        """Test output streaming.
+
+        This test verifies that:
+        1. Every line (including '\\r'-redrawn ones) reaches the callback
+        2. Only the last buffer_lines lines are kept
+        3. stdout and stderr are kept apart
+        """
+        # Arrange
+        lines = []
+        code = (
+            "import sys\n"
+            "for i in range(8): print(f'line {i}')\n"
+            "sys.stdout.write('Completed: 10.00%\\rCompleted: 20.00%\\r')\n"
+            "sys.stderr.write('warning\\n')\n"
+        )
+
+        # Act
+        proc = supervisor.run(_python(code), on_line=lines.append)
+
+        # Assert
+        assert proc.returncode == 0
+        assert lines[:8] == [f'line {i}' for i in range(8)]
+        assert 'Completed: 20.00%' in lines
+        assert list(proc.stdout) == ['line 5', 'line 6', 'line 7',
+                                     'Completed: 10.00%', 'Completed: 20.00%']
+        assert proc.stderr_text() == 'warning'
+
+    def test_timeout_kills_process_group(self, supervisor):
+        """Test that a timeout terminates the command and its children."""
+        # Arrange
+        code = (
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            "print(child.pid, flush=True)\n"
+            "time.sleep(60)\n"
+        )
+
+        # Act
+        started = time.monotonic()
+        proc = supervisor.run(_python(code), timeout=0.5)
+        child_pid = int(proc.stdout[0])
+
+        # Assert
+        assert proc.timed_out
+        assert proc.returncode < 0
+        assert time.monotonic() - started < 5
+        assert _wait_until(lambda: not os.path.exists(f'/proc/{child_pid}')
+                           or open(f'/proc/{child_pid}/stat').read().split()[2] == 'Z')
+
+    def test_stop_only_targets_session(self, supervisor):
+        """Test precise stop.
+
+        This test verifies that:
+        1. stop() terminates the processes of the given session only
+        2. A supervisor in another worker finds them via state files
+        """
+        # Arrange
+        sleeper = _python('import time; time.sleep(60)')
+        target = supervisor.start(sleeper, session=deployment_session(1))
+        other = supervisor.start(sleeper, session=deployment_session(2))
+        other_worker = ProcessSupervisor()
+        other_worker.run_dir = supervisor.run_dir
+
+        # Act
+        assert other_worker.is_running(deployment_session(1))
+        signalled = other_worker.stop(deployment_session(1))
+
+        # Assert
+        assert signalled == [target.pid]
+        assert target.wait(5) is not None
+        assert other.running
+        supervisor.stop(deployment_session(2))
+        assert other.wait(5) is not None
+        assert not other_worker.is_running()
+
+
+    def test_state_kept_while_children_outlive_leader(self, supervisor):
+        """Test a leader that exits while its children keep running.
+
+        This test verifies that:
+        1. The state file stays while the process group has members
+        2. Another worker can still find and stop the remaining children
+        3. The state file is removed once the group is empty
+        """
+        # Arrange
+        code = (
+            "import subprocess, sys\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'],\n"
+            "                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)\n"
+            "print(child.pid, flush=True)\n"
+        )
+        proc = supervisor.start(_python(code), session=deployment_session(3))
+        assert proc.wait(5) == 0
+        child_pid = int(proc.stdout[0])
+        other_worker = ProcessSupervisor()
+        other_worker.run_dir = supervisor.run_dir
+
+        # Act
+        running_after_exit = other_worker.is_running(deployment_session(3))
+        signalled = other_worker.stop(deployment_session(3))
+
+        # Assert
+        assert running_after_exit
+        assert signalled == [proc.pid]
+        assert _wait_until(lambda: not ProcessSupervisor._group_alive(proc.pid))
+        assert _wait_until(lambda: not list(supervisor.run_dir.glob('*.json')))
+        assert not supervisor.processes()
+        assert not os.path.exists(f'/proc/{child_pid}') or \
+            open(f'/proc/{child_pid}/stat').read().split()[2] == 'Z'
+
+
+class TestDRBLClientSupervision:
+    """Test DRBLClient on top of the supervisor."""
+
+    def test_run_command_feeds_progress_and_reports_failure(
+            self, tmp_path, supervisor, monkeypatch):
+        """Test _run_command with a deployment session."""
+        # Arrange
+        monkeypatch.setattr(drbl_module, 'process_supervisor', supervisor)
+        client = DRBLClient(
+            image_home=str(tmp_path / 'partimag'),
+            odj_home=str(tmp_path / 'odj'),
+            log_dir=str(tmp_path / 'log')
+        )
+        client.progress = LogFollower(tmp_path / 'log')
+        client.progress.begin(7)
+        code = "print('Elapsed: 00:00:10, Remaining: 00:00:30, Completed:  25.00%,   5.00GB/min,')"
+
+        # Act
+        returncode, stdout, _ = client._run_command(
+            _python(code), **client._session_options(7)
+        )
+
+        # Assert
+        assert returncode == 0
+        assert 'Completed' in stdout
+        assert client.progress.progress_for(7).to_dict()['percentage'] == 25.0
+        with pytest.raises(DRBLCommandError, match='timeout'):
+            client._run_command(_python('import time; time.sleep(5)'), timeout=0.3)
@@ -0,0 +1,145 @@
+"""Integration tests for the provisioning bundle endpoint."""
+import base64
+import hashlib
+import os
+
+import pytest
+
+from models import db, OdjFile, PCMaster
+from utils.odj_blob_cache import odj_blob_cache
+from utils.provision_cache import provision_cache
+
+BLOB = b'offline-domain-join-blob' * 10
+
+
+@pytest.fixture
+def odj_dir(app, tmp_path, monkeypatch):
+    """Point ODJ_FILES_PATH at an empty directory and reset the caches."""
+    monkeypatch.setitem(app.config, 'ODJ_FILES_PATH', str(tmp_path))
+    odj_blob_cache.clear()
+    provision_cache.clear()
+    yield tmp_path
+    odj_blob_cache.clear()
+    provision_cache.clear()
+
+
+def _provision_pc(create_test_pc, odj_dir, serial='PROV001', content=BLOB):
+    """Create a PC with an ODJ file recorded in the inventory."""
+    path = odj_dir / f'{serial}.txt'
+    path.write_bytes(content)
+    create_test_pc(serial=serial, pcname='20251116M', odj_path=str(path))
+    OdjFile.record(path)
+    db.session.commit()
+    return path
+
+
+class TestProvisionBundle:
+    """Test GET /api/provision/<serial>."""
+
+    def test_bundle_contents(self, app, client, db_session, create_test_pc, odj_dir):
+        """Test a complete bundle.
+
+        This test verifies that:
+        1. The bundle carries pcname, ODJ content, domain and Windows Update settings
+        2. The ODJ content is base64 with the file's SHA-256
+        3. The body is compact JSON with the body's SHA-256 as strong ETag
+        """
+        # Arrange
+        _provision_pc(create_test_pc, odj_dir)
+
+        # Act
+        response = client.get('/api/provision/PROV001')
+
+        # Assert
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        data = response.get_json()
+        assert data['version'] == 1
+        assert data['serial'] == 'PROV001'
+        assert data['pcname'] == '20251116M'
+        assert data['odj']['filename'] == 'PROV001.txt'
+        assert data['odj']['sha256'] == hashlib.sha256(BLOB).hexdigest()
+        assert base64.b64decode(data['odj']['content']) == BLOB
+        assert data['domain'] == {'name': app.config['DOMAIN_NAME'],
+                                  'ou': app.config['DOMAIN_OU']}
+        assert data['windows_update'] == {'retry': app.config['WINDOWS_UPDATE_RETRY'],
+                                          'timeout': app.config['WINDOWS_UPDATE_TIMEOUT']}
+        assert b': ' not in response.data and b', ' not in response.data
+        assert response.headers['ETag'] == f'"{hashlib.sha256(response.data).hexdigest()}"'
+
+    def test_served_from_cache_with_etag(self, client, db_session, create_test_pc,
+                                         odj_dir, monkeypatch):
+        """Test that repeated requests reuse the precomputed body."""
+        # Arrange
+        _provision_pc(create_test_pc, odj_dir)
+        first = client.get('/api/provision/PROV001')
+        monkeypatch.setattr('api.provision._build_bundle',
+                            lambda *args: pytest.fail('bundle rebuilt'))
+
+        # Act
+        again = client.get('/api/provision/PROV001')
+        revalidated = client.get('/api/provision/PROV001',
+                                 headers={'If-None-Match': first.headers['ETag']})
+
+        # Assert
+        assert again.data == first.data
+        assert revalidated.status_code == 304
+        assert revalidated.data == b''
+        assert provision_cache.stats()['hits'] >= 2
+
+    def test_rebuilt_on_change(self, app, client, db_session, create_test_pc,
+                               odj_dir, monkeypatch):
+        """Test invalidation.
+
+        This test verifies that:
+        1. Renaming the PC rebuilds the bundle
+        2. Rewriting the ODJ file rebuilds the bundle
+        3. Changed settings rebuild the bundle
+        """
+        # Arrange
+        path = _provision_pc(create_test_pc, odj_dir)
+        monkeypatch.setattr(odj_blob_cache, 'ttl', 0)
+        etags = [client.get('/api/provision/PROV001').headers['ETag']]
+
+        # Act
+        pc = PCMaster.find_by_serial('PROV001')
+        pc.pcname = '20251117M'
+        db.session.commit()
+        renamed = client.get('/api/provision/PROV001')
+        etags.append(renamed.headers['ETag'])
+
+        path.write_bytes(b'rewritten-blob')
+        os.utime(path, ns=(0, 10 ** 18))
+        rewritten = client.get('/api/provision/PROV001')
+        etags.append(rewritten.headers['ETag'])
+
+        monkeypatch.setitem(app.config, 'WINDOWS_UPDATE_RETRY', 5)
+        retuned = client.get('/api/provision/PROV001')
+        etags.append(retuned.headers['ETag'])
+
+        # Assert
+        assert renamed.get_json()['pcname'] == '20251117M'
+        assert base64.b64decode(rewritten.get_json()['odj']['content']) == b'rewritten-blob'
+        assert retuned.get_json()['windows_update']['retry'] == 5
+        assert len(set(etags)) == 4
+        assert provision_cache.stats()['rebuilds'] >= 3
+
+    def test_pc_without_odj_and_errors(self, client, db_session, create_test_pc, odj_dir):
+        """Test bundles without ODJ and invalid or unknown serials."""
+        # Arrange
+        create_test_pc(serial='NOODJ01', pcname='20251116M')
+        create_test_pc(serial='GONE001', pcname='20251116M',
+                       odj_path=str(odj_dir / 'GONE001.txt'))
+
+        # Act
+        no_odj = client.get('/api/provision/NOODJ01')
+        missing = client.get('/api/provision/GONE001')
+
+        # Assert
+        assert no_odj.status_code == 200
+        assert no_odj.get_json()['odj'] is None
+        assert missing.status_code == 200
+        assert missing.get_json()['odj'] is None
+        assert client.get('/api/provision/bad%20serial').status_code == 400
+        assert client.get('/api/provision/UNKNOWN').status_code == 404
+        assert client.get('/api/provision/cache').get_json()['size'] == 2
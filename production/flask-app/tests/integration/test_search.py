@@ -0,0 +1,96 @@
+"""Integration tests for the search API."""
+from sqlalchemy import insert
+
+from models import db, PCMaster, SetupLog, SearchIndex
+
+
+class TestSearch:
+    """Test GET /api/search."""
+
+    def test_partial_serial_and_pcname(self, client, create_test_pc):
+        """Test substring search over PCs.
+
+        This test verifies that:
+        1. The FTS5 index is used
+        2. A middle fragment of a serial matches (case-insensitive)
+        3. Unrelated PCs are not returned
+        """
+        # Arrange
+        create_test_pc(serial='5CG1234XYZ', pcname='20251116M')
+        create_test_pc(serial='PF3ABCDE', pcname='20251117M')
+
+        # Act
+        response = client.get('/api/search?q=234xy&type=pcs')
+
+        # Assert
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['engine'] == 'fts5'
+        assert [hit['serial'] for hit in data['pcs']] == ['5CG1234XYZ']
+        assert data['logs'] == []
+
+    def test_error_string_in_logs_ranked(self, client, create_test_log):
+        """Test that error text is searchable and all terms must match."""
+        # Arrange
+        create_test_log(serial='ERR001', status='failed',
+                        logs='Windows Update failed with 0x80070005 access denied')
+        create_test_log(serial='ERR002', status='failed',
+                        logs='Domain join failed with 0x80070005')
+        create_test_log(serial='OK001', logs='Setup completed')
+
+        # Act
+        data = client.get('/api/search?q=0x80070005 access&type=logs').get_json()
+
+        # Assert
+        assert [hit['serial'] for hit in data['logs']] == ['ERR001']
+        assert '[' in data['logs'][0]['snippet']
+
+    def test_index_follows_updates_deletes_and_bulk_inserts(self, client, db_session):
+        """Test trigger-based synchronisation.
+
+        This test verifies that:
+        1. Core bulk inserts (bypassing ORM events) are indexed
+        2. Updated values replace the old ones
+        3. Deleted rows disappear from results
+        """
+        # Arrange
+        db.session.execute(insert(PCMaster), [
+            {'serial': f'BULKSN{i:03d}', 'pcname': '20251118M'} for i in range(3)
+        ])
+        db.session.commit()
+        pc = PCMaster.query.filter_by(serial='BULKSN001').first()
+
+        # Act
+        pc.pcname = 'RENAMED01M'
+        db.session.delete(PCMaster.query.filter_by(serial='BULKSN002').first())
+        db.session.commit()
+
+        # Assert
+        bulk = client.get('/api/search?q=BULKSN&type=pcs').get_json()
+        renamed = client.get('/api/search?q=RENAMED&type=pcs').get_json()
+        old_name = client.get('/api/search?q=BULKSN001 20251118&type=pcs').get_json()
+        assert sorted(hit['serial'] for hit in bulk['pcs']) == ['BULKSN000', 'BULKSN001']
+        assert [hit['serial'] for hit in renamed['pcs']] == ['BULKSN001']
+        assert old_name['pcs'] == []
+
+    def test_rebuild_indexes_existing_rows(self, app, db_session):
+        """Test that rebuild repopulates a dropped index."""
+        # Arrange
+        db.session.add(SetupLog(serial='REBUILD01', pcname='20251116M',
+                                status='failed', error_message='disk not found'))
+        db.session.commit()
+        SearchIndex.drop(db.session.connection())
+        db.session.commit()
+
+        # Act
+        assert SearchIndex.rebuild() is True
+        result = SearchIndex.search('not found', kinds=('logs',))
+
+        # Assert
+        assert [hit['serial'] for hit in result['logs']] == ['REBUILD01']
+
+    def test_short_query_rejected(self, client, db_session):
+        """Test that queries without a 3+ character term are rejected."""
+        response = client.get('/api/search?q=ab')
+
+        assert response.status_code == 400
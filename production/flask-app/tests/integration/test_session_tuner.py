@@ -0,0 +1,215 @@
+"""Integration tests for session metrics and the multicast session tuner."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from api import deployment as deployment_api
+from models import db, Deployment, DeploymentTarget, SessionMetric
+from utils.session_tuner import SessionTuner, detect_compression
+
+GB = 1024 ** 3
+
+
+def _seed_history(image_name='win11-master-2025'):
+    """Seed completed sessions whose throughput falls by 4 MB/s per client.
+
+    zstd sessions run 5 MB/s faster and gzip sessions 5 MB/s slower than
+    the line 116 - 4n; every session waits 10 s per client and has 60 s
+    of overhead.
+    """
+    start = datetime.utcnow() - timedelta(days=1)
+    for clients in (4, 8, 16):
+        for compression, offset in (('zstd', 5), ('gzip', -5)):
+            rate = 116 - 4 * clients + offset
+            transfer = 10240 / rate
+            wait = 10.0 * clients
+            db.session.add(SessionMetric(
+                image_name=image_name,
+                mode='multicast',
+                compression=compression,
+                image_size_bytes=10 * GB,
+                status=SessionMetric.STATUS_COMPLETED,
+                started_at=start,
+                completed_at=start + timedelta(seconds=60 + wait + transfer),
+                client_count=clients,
+                clients_completed=clients,
+                wait_seconds=wait,
+                transfer_seconds=transfer,
+                duration_seconds=60 + wait + transfer,
+                throughput_mb_s=rate
+            ))
+    db.session.commit()
+
+
+def _create_deployment(serials=(), status='pending'):
+    """Create a multicast deployment with one target per serial."""
+    deployment = Deployment(
+        name='Tuner Test',
+        image_name='win11-master-2025',
+        mode='multicast',
+        status=status,
+        target_count=len(serials)
+    )
+    db.session.add(deployment)
+    db.session.flush()
+    for serial in serials:
+        DeploymentTarget.new(deployment.id, serial)
+    db.session.commit()
+    return deployment
+
+
+class TestSessionMetric:
+    """Test recording of session metrics."""
+
+    def test_finish_measures_session_from_targets(self, app_context, db_session):
+        """Test SessionMetric.begin/finish.
+
+        This test verifies that:
+        1. The wait time runs until the first client started imaging
+        2. The transfer time runs from the first start to the last finish
+        3. Throughput is the mean parsed client rate
+        4. Clients that never joined are not counted
+        """
+        # Arrange
+        deployment = _create_deployment(['MET001', 'MET002', 'MET003'], status='running')
+        start = datetime(2025, 11, 16, 12, 0, 0)
+        deployment.started_at = start
+        SessionMetric.begin(deployment, {
+            'clients_to_wait': 3,
+            'max_wait_time': 300,
+            'image_size_bytes': 10 * GB,
+            'predicted_seconds': 500.0
+        })
+        targets = DeploymentTarget.query.filter_by(deployment_id=deployment.id).all()
+        for target, offset in zip(targets[:2], (30, 60)):
+            target.state = DeploymentTarget.STATE_COMPLETED
+            target.rate = '6.00GB/min'
+            target.started_at = start + timedelta(seconds=offset)
+            target.completed_at = start + timedelta(seconds=offset + 100)
+        deployment.status = 'completed'
+        deployment.completed_at = start + timedelta(seconds=600)
+
+        # Act
+        metric = SessionMetric.finish(deployment)
+        db.session.commit()
+
+        # Assert
+        assert metric.status == SessionMetric.STATUS_COMPLETED
+        assert (metric.client_count, metric.clients_completed) == (2, 2)
+        assert metric.wait_seconds == 30.0
+        assert metric.transfer_seconds == 130.0
+        assert metric.duration_seconds == 600.0
+        assert metric.throughput_mb_s == pytest.approx(102.4)
+        assert metric.prediction_error_pct == 20.0
+        assert SessionMetric.finish(deployment) is None
+
+
+class TestSessionTuner:
+    """Test recommendations from session history."""
+
+    def test_recommends_interior_wave_size(self, app_context, db_session):
+        """Test the wave size, max-wait time and compression recommendation.
+
+        This test verifies that:
+        1. Falling throughput makes a medium wave the fastest per PC
+        2. With targets, clients_to_wait is the target count and the
+           deployment is split into waves of the best size
+        3. The compression with the best throughput is recommended
+        """
+        # Arrange
+        _seed_history()
+        tuner = SessionTuner(default_overhead=300)
+
+        # Act
+        open_session = tuner.recommend(100 * GB, image_name='win11-master-2025')
+        with_targets = tuner.recommend(100 * GB, 45, 'win11-master-2025')
+
+        # Assert
+        assert open_session['basis'] == 'image'
+        assert open_session['model']['rate_slope_mb_s_per_client'] == pytest.approx(-4.0)
+        assert open_session['model']['overhead_seconds'] == pytest.approx(60.0)
+        assert open_session['wave_size'] == 15
+        assert open_session['clients_to_wait'] == 15
+        assert open_session['max_wait_time'] == 180  # 10 s/client * 15 * 1.2
+        assert open_session['compression'] == 'zstd'
+        assert open_session['by_compression']['gzip']['sessions'] == 3
+        assert (with_targets['clients_to_wait'], with_targets['waves']) == (45, 3)
+
+    def test_defaults_without_history(self, app_context, db_session):
+        """Test that the tuner falls back to the configured defaults."""
+        # Arrange
+        tuner = SessionTuner(default_rate_mb=100.0, default_overhead=300)
+
+        # Act
+        recommendation = tuner.recommend(GB, 5)
+
+        # Assert
+        assert recommendation['basis'] == 'defaults'
+        assert recommendation['max_wait_time'] == 300
+        assert recommendation['compression'] is None
+        assert recommendation['predicted_seconds'] == pytest.approx(360.2)
+
+    def test_detect_compression(self, tmp_path):
+        """Test compression detection from Clonezilla chunk names."""
+        # Arrange
+        zstd = tmp_path / 'zstd-image'
+        zstd.mkdir()
+        (zstd / 'disk').write_text('sda')
+        (zstd / 'sda1.ntfs-ptcl-img.zst.aa').write_bytes(b'')
+        plain = tmp_path / 'plain-image'
+        plain.mkdir()
+        (plain / 'sda.dd-img.uncomp.aa').write_bytes(b'')
+
+        # Assert
+        assert detect_compression(zstd) == 'zstd'
+        assert detect_compression(plain) == 'none'
+        assert detect_compression(tmp_path / 'missing') is None
+
+
+class TestTuningEndpoints:
+    """Test auto-tuned starts and the tuning endpoints."""
+
+    def test_auto_tuned_start_and_session_history(self, app, client, db_session, monkeypatch):
+        """Test start with DEPLOYMENT_AUTO_TUNE and the reporting endpoints.
+
+        This test verifies that:
+        1. The recommended max-wait time is passed to DRBL
+        2. A running metric with the prediction is recorded on start
+        3. Completing the deployment completes the metric
+        4. GET /sessions reports predicted vs actual durations
+        5. GET /tuning returns the recommendation
+        """
+        # Arrange
+        _seed_history()
+        calls = []
+        monkeypatch.setitem(app.config, 'DEPLOYMENT_AUTO_TUNE', True)
+        monkeypatch.setattr(deployment_api.drbl_client, 'get_image_info',
+                            lambda name: {'name': name, 'size_bytes': 100 * GB})
+        monkeypatch.setattr(deployment_api.drbl_client, 'start_multicast_deployment',
+                            lambda **kwargs: calls.append(kwargs) or {'success': True})
+        deployment = _create_deployment(['TUN001', 'TUN002'])
+
+        # Act
+        started = client.post(f'/api/deployment/{deployment.id}/start')
+        updated = client.put(f'/api/deployment/{deployment.id}', json={'status': 'completed'})
+        sessions = client.get('/api/deployment/sessions?image_name=win11-master-2025&limit=1')
+        tuning = client.get(f'/api/deployment/{deployment.id}/tuning')
+        bad_limit = client.get('/api/deployment/sessions?limit=abc')
+
+        # Assert
+        assert started.status_code == 202
+        assert calls[0]['clients_to_wait'] == 2
+        assert calls[0]['max_wait_time'] == 60  # minimum
+        assert updated.status_code == 200
+        data = sessions.get_json()['sessions']
+        assert len(data) == 1
+        assert data[0]['deployment_id'] == deployment.id
+        assert data[0]['status'] == 'completed'
+        assert data[0]['auto_tuned'] is True
+        assert data[0]['predicted_seconds'] > 0
+        assert data[0]['actual_seconds'] is not None
+        assert tuning.status_code == 200
+        body = tuning.get_json()
+        assert body['auto_tune'] is True
+        assert (body['recommendation']['wave_size'], body['recommendation']['waves']) == (2, 1)
+        assert bad_limit.status_code == 400
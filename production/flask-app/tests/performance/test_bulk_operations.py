@@ -97,6 +97,61 @@ class TestBulkPerformance:
         # Performance requirements
         assert elapsed_time < 20.0, f"Import took {elapsed_time:.3f}s, expected < 20s"
 
+    def test_10000_pcs_csv_import_time(self, client, db_session, csv_file_content):
+        """Test CSV import time for 10,000 PCs.
+
+        Performance Requirements:
+        - 10,000 PCs should import in < 2 seconds (batched bulk insert)
+        - Existing serials are detected without per-row queries
+        """
+        print("\n[Performance] Testing 10,000 PC CSV import...")
+
+        # Generate CSV with 10,000 PCs
+        csv_content = csv_file_content(10000)
+        csv_data = {
+            'file': (io.BytesIO(csv_content.encode('utf-8')), 'perf_test_10000.csv')
+        }
+
+        # Measure import time
+        start_time = time.time()
+
+        response = client.post(
+            '/api/pcs',
+            data=csv_data,
+            content_type='multipart/form-data'
+        )
+
+        elapsed_time = time.time() - start_time
+
+        # Assertions
+        assert response.status_code == 201
+        json_data = response.get_json()
+        assert json_data['imported'] == 10000
+        assert PCMaster.query.count() == 10000
+
+        print(f"  Total time: {elapsed_time:.3f}s")
+        print(f"  Throughput: {10000/elapsed_time:.1f} PCs/second")
+
+        assert elapsed_time < 2.0, f"Import took {elapsed_time:.3f}s, expected < 2s"
+
+        # Re-import: every row is a duplicate
+        csv_data = {
+            'file': (io.BytesIO(csv_content.encode('utf-8')), 'perf_test_10000.csv')
+        }
+        start_time = time.time()
+        response = client.post(
+            '/api/pcs',
+            data=csv_data,
+            content_type='multipart/form-data'
+        )
+        elapsed_time = time.time() - start_time
+
+        assert response.status_code == 201
+        json_data = response.get_json()
+        assert json_data['imported'] == 0
+        assert json_data['failed'] == 10000
+        assert elapsed_time < 2.0, f"Duplicate check took {elapsed_time:.3f}s, expected < 2s"
+
     def test_concurrent_deployments_performance(self, client, db_session, create_test_pc):
         """Test concurrent deployment creation and updates.
 
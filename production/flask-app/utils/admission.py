@@ -0,0 +1,387 @@
+"""Admission control for boot-storm traffic.
+
+When a room of PCs powers on together, agent calls (``/api/pcinfo``,
+``/api/log``, ODJ and provisioning downloads) compete with admin pages that
+scan image directories or export every PC. Each worker process has a fixed
+number of request threads, so a few slow admin requests can delay every
+agent behind them.
+
+Every request is put in a lane by endpoint:
+
+* ``agent``: first-boot agent endpoints; may use every concurrency slot,
+  including ``agent_reserved`` slots no other lane can take.
+* ``heavy``: expensive admin endpoints; each route is limited to
+  ``heavy_concurrency`` requests in flight.
+* ``default``: everything else.
+
+Streaming endpoints, static files and the health check are exempt.
+
+A request is first charged to a per-client token bucket refilled at
+``API_RATE_LIMIT``. It then needs a free slot in its lane. Requests that
+are not admitted are answered with ``429 Too Many Requests`` and a
+``Retry-After`` header. They never queue, so they never hold a thread an
+agent could use. Limits apply per worker process.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import g, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+AGENT = 'agent'
+HEAVY = 'heavy'
+DEFAULT = 'default'
+LANES = (AGENT, HEAVY, DEFAULT)
+
+_PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+}
+
+
+def parse_rate(value: str) -> float:
+    """Parse a rate limit such as ``'1000 per hour'`` or ``'10/second'``.
+
+    Args:
+        value: Rate limit string (empty: unlimited)
+
+    Returns:
+        Requests per second (0.0 for unlimited)
+
+    Raises:
+        ValueError: If the string is not a valid rate
+    """
+    if not value or not value.strip():
+        return 0.0
+
+    match = re.fullmatch(r'\s*(\d+)\s*(?:per|/)\s*(second|minute|hour|day)s?\s*',
+                         value.lower())
+    if not match:
+        raise ValueError(f'Invalid rate limit: {value!r} (expected e.g. "1000 per hour")')
+    return int(match.group(1)) / _PERIODS[match.group(2)]
+
+
+def _endpoints(value) -> frozenset:
+    """Split a comma-separated endpoint list."""
+    if isinstance(value, str):
+        value = value.split(',')
+    return frozenset(name.strip() for name in value if name.strip())
+
+
+class TokenBucket:
+    """Per-client token bucket.
+
+    Attributes:
+        tokens (float): Tokens left
+        updated (float): Monotonic time of the last refill
+    """
+
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class AdmissionController:
+    """Per-client rate limiting and per-lane concurrency limits.
+
+    Attributes:
+        rate (float): Bucket refill rate per client in requests/second (0: unlimited)
+        burst (int): Bucket capacity
+        max_concurrent (int): Requests in flight per worker process
+        agent_reserved (int): Slots only agent requests may use
+        heavy_concurrency (int): Requests in flight per heavy route
+        retry_after (int): Retry-After seconds when shedding for concurrency
+        trusted_proxies (int): Reverse proxies in front of the app; the
+            client address is taken from X-Forwarded-For accordingly
+    """
+
+    def __init__(self, rate: float = 1000 / 3600, burst: int = 100,
+                 max_concurrent: int = 8, agent_reserved: int = 2,
+                 heavy_concurrency: int = 1, retry_after: int = 2,
+                 max_clients: int = 10000, clock=time.monotonic):
+        """Initialize controller.
+
+        Args:
+            rate: Bucket refill rate per client in requests/second
+            burst: Bucket capacity
+            max_concurrent: Requests in flight per worker process
+            agent_reserved: Slots only agent requests may use
+            heavy_concurrency: Requests in flight per heavy route
+            retry_after: Retry-After seconds when shedding for concurrency
+            max_clients: Buckets kept; the least recently seen are dropped
+            clock: Monotonic time source
+        """
+        self.enabled = True
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.agent_reserved = agent_reserved
+        self.heavy_concurrency = heavy_concurrency
+        self.retry_after = retry_after
+        self.max_clients = max_clients
+        self.trusted_proxies = 0
+        self.agent_endpoints = frozenset()
+        self.heavy_endpoints = frozenset()
+        self.exempt_endpoints = frozenset()
+        self._clock = clock
+        self._buckets = OrderedDict()
+        self._in_flight = 0
+        self._lane_in_flight = dict.fromkeys(LANES, 0)
+        self._route_in_flight = {}
+        self._admitted = dict.fromkeys(LANES, 0)
+        self._shed = {lane: {'rate': 0, 'concurrency': 0} for lane in LANES}
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, burst: int, max_concurrent: int,
+                  agent_reserved: int, heavy_concurrency: int, retry_after: int,
+                  agent_endpoints: Iterable[str], heavy_endpoints: Iterable[str],
+                  exempt_endpoints: Iterable[str], trusted_proxies: int = 0,
+                  enabled: bool = True):
+        """Update limits and lane membership.
+
+        Args:
+            rate: Bucket refill rate per client in requests/second (0: unlimited)
+            burst: Bucket capacity
+            max_concurrent: Requests in flight per worker process
+            agent_reserved: Slots only agent requests may use
+            heavy_concurrency: Requests in flight per heavy route
+            retry_after: Retry-After seconds when shedding for concurrency
+            agent_endpoints: Endpoint names of the agent lane
+            heavy_endpoints: Endpoint names of the heavy lane
+            exempt_endpoints: Endpoint names never limited
+            trusted_proxies: Reverse proxies in front of the app
+            enabled: Whether requests are checked at all
+        """
+        with self._lock:
+            self.rate = rate
+            self.burst = max(burst, 1)
+            self.max_concurrent = max(max_concurrent, 1)
+            self.agent_reserved = min(max(agent_reserved, 0), self.max_concurrent - 1)
+            self.heavy_concurrency = max(heavy_concurrency, 1)
+            self.retry_after = max(retry_after, 1)
+            self.agent_endpoints = _endpoints(agent_endpoints)
+            self.heavy_endpoints = _endpoints(heavy_endpoints)
+            self.exempt_endpoints = _endpoints(exempt_endpoints)
+            self.trusted_proxies = max(trusted_proxies, 0)
+            self.enabled = enabled
+            self._buckets.clear()
+
+    def classify(self, endpoint: Optional[str]) -> Optional[str]:
+        """Get the lane of an endpoint.
+
+        Args:
+            endpoint: Flask endpoint name (None for unmatched URLs)
+
+        Returns:
+            Lane name, or None if the endpoint is exempt
+        """
+        if endpoint is None or endpoint in self.exempt_endpoints:
+            return None
+        if endpoint in self.agent_endpoints:
+            return AGENT
+        if endpoint in self.heavy_endpoints:
+            return HEAVY
+        return DEFAULT
+
+    def take_token(self, client: str, lane: str = DEFAULT) -> Tuple[bool, int]:
+        """Charge one request to a client's bucket.
+
+        Args:
+            client: Client address
+            lane: Lane of the request (for statistics)
+
+        Returns:
+            Tuple of (allowed, retry_after_seconds)
+        """
+        if not self.rate:
+            return True, 0
+
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.burst, now)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return True, 0
+
+            self._shed[lane]['rate'] += 1
+            return False, max(1, math.ceil((1 - bucket.tokens) / self.rate))
+
+    def acquire(self, lane: str, route: str) -> Tuple[bool, int]:
+        """Take a concurrency slot.
+
+        Args:
+            lane: Lane of the request
+            route: Endpoint name (heavy routes are limited individually)
+
+        Returns:
+            Tuple of (admitted, retry_after_seconds); an admitted request
+            must call release() when it finishes
+        """
+        with self._lock:
+            limit = self.max_concurrent
+            if lane != AGENT:
+                limit -= self.agent_reserved
+            admitted = self._in_flight < limit
+            if admitted and lane == HEAVY:
+                admitted = self._route_in_flight.get(route, 0) < self.heavy_concurrency
+
+            if not admitted:
+                self._shed[lane]['concurrency'] += 1
+                return False, self.retry_after
+
+            self._in_flight += 1
+            self._lane_in_flight[lane] += 1
+            self._route_in_flight[route] = self._route_in_flight.get(route, 0) + 1
+            self._admitted[lane] += 1
+            return True, 0
+
+    def release(self, lane: str, route: str):
+        """Return a concurrency slot taken by acquire().
+
+        Args:
+            lane: Lane of the request
+            route: Endpoint name
+        """
+        with self._lock:
+            self._in_flight -= 1
+            self._lane_in_flight[lane] -= 1
+            remaining = self._route_in_flight.get(route, 1) - 1
+            if remaining:
+                self._route_in_flight[route] = remaining
+            else:
+                self._route_in_flight.pop(route, None)
+
+    def client_id(self) -> str:
+        """Get the address of the current request's client."""
+        if self.trusted_proxies:
+            # X-Forwarded-For entries (or just remote_addr without the
+            # header); each trusted proxy appends the address it saw, so
+            # earlier entries may be forged by the client
+            route = request.access_route
+            if len(route) >= self.trusted_proxies:
+                return route[-self.trusted_proxies]
+            return route[0]
+        return request.remote_addr or 'unknown'
+
+    def reset(self):
+        """Drop all buckets and counters (slots in use are kept)."""
+        with self._lock:
+            self._buckets.clear()
+            self._admitted = dict.fromkeys(LANES, 0)
+            self._shed = {lane: {'rate': 0, 'concurrency': 0} for lane in LANES}
+
+    def stats(self) -> Dict[str, any]:
+        """Get admission statistics.
+
+        Returns:
+            Dictionary with limits, slots in use and admitted/shed counters
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'rate_per_second': round(self.rate, 6),
+                'burst': self.burst,
+                'clients': len(self._buckets),
+                'max_concurrent': self.max_concurrent,
+                'agent_reserved': self.agent_reserved,
+                'heavy_concurrency': self.heavy_concurrency,
+                'in_flight': self._in_flight,
+                'lanes': {
+                    lane: {
+                        'in_flight': self._lane_in_flight[lane],
+                        'admitted': self._admitted[lane],
+                        'shed': dict(self._shed[lane])
+                    }
+                    for lane in LANES
+                },
+                'routes_in_flight': dict(self._route_in_flight)
+            }
+
+
+admission = AdmissionController()
+
+
+def _too_many_requests(message, retry_after):
+    """Build a 429 response with Retry-After."""
+    response = jsonify({
+        'error': 'Too Many Requests',
+        'message': message,
+        'retry_after': retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def _before_request():
+    if not admission.enabled:
+        return None
+
+    lane = admission.classify(request.endpoint)
+    if lane is None:
+        return None
+
+    client = admission.client_id()
+    allowed, retry_after = admission.take_token(client, lane)
+    if not allowed:
+        logger.warning(f'Rate limit exceeded - client={client} endpoint={request.endpoint}')
+        return _too_many_requests('Rate limit exceeded', retry_after)
+
+    admitted, retry_after = admission.acquire(lane, request.endpoint)
+    if not admitted:
+        logger.warning(f'Request shed - lane={lane} endpoint={request.endpoint} client={client}')
+        return _too_many_requests('Server busy, please retry later', retry_after)
+
+    g.admission_slot = (lane, request.endpoint)
+    return None
+
+
+def _teardown_request(exc):
+    slot = g.pop('admission_slot', None)
+    if slot is not None:
+        admission.release(*slot)
+
+
+def init_app(app):
+    """Configure admission control and register the request hooks.
+
+    Args:
+        app: Flask application instance
+    """
+    admission.configure(
+        rate=parse_rate(app.config.get('API_RATE_LIMIT', '')),
+        burst=app.config.get('ADMISSION_BURST', 100),
+        max_concurrent=app.config.get('ADMISSION_MAX_CONCURRENT', 8),
+        agent_reserved=app.config.get('ADMISSION_AGENT_RESERVED', 2),
+        heavy_concurrency=app.config.get('ADMISSION_HEAVY_CONCURRENCY', 1),
+        retry_after=app.config.get('ADMISSION_RETRY_AFTER', 2),
+        agent_endpoints=app.config.get('ADMISSION_AGENT_ENDPOINTS', ''),
+        heavy_endpoints=app.config.get('ADMISSION_HEAVY_ENDPOINTS', ''),
+        exempt_endpoints=app.config.get('ADMISSION_EXEMPT_ENDPOINTS', ''),
+        trusted_proxies=app.config.get('ADMISSION_TRUSTED_PROXIES', 1),
+        enabled=app.config.get('ADMISSION_ENABLED', True)
+    )
+    admission.reset()
+
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,194 @@
+"""Run background services in one worker process.
+
+gunicorn loads the app in every worker process (threads do not survive
+fork), so without coordination each worker would recover jobs and start
+its own deployment scheduler, log retention thread and image catalog
+watcher. The first process that takes an exclusive ``flock`` on
+``BACKGROUND_LOCK_PATH`` starts them and holds the lock until it exits.
+The other workers retry from a ``before_request`` hook at most every
+``BACKGROUND_LEADER_RETRY`` seconds, so another worker takes over when the
+leader is recycled (``max_requests``) or dies.
+
+The SSE producer and the DRBL process supervisor loop are not started
+here: they start on first use in the worker that serves the stream or
+launched the process.
+
+Requests served by other workers wake the leader's threads through a
+:class:`WakeSignal`, a file they touch and the leader polls.
+"""
+
+import fcntl
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundServices:
+    """Leader election for the process running background services.
+
+    Attributes:
+        lock_path (Path): Lock file held by the leader (None: every process leads)
+        retry_interval (float): Seconds between election attempts of followers
+        leader (bool): Whether this process runs the background services
+    """
+
+    def __init__(self):
+        """Initialize election state (call :meth:`init_app` before use)."""
+        self.lock_path = None
+        self.retry_interval = 30.0
+        self.leader = False
+
+        self._app = None
+        self._start = None
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._next_attempt = 0.0
+
+    def init_app(self, app, start: Callable):
+        """Start the services now if elected, or retry on later requests.
+
+        Args:
+            app: Flask application instance
+            start: Called with the app once this process is elected
+        """
+        self._app = app
+        self._start = start
+        lock_path = app.config.get('BACKGROUND_LOCK_PATH')
+        self.lock_path = Path(lock_path) if lock_path else None
+        self.retry_interval = app.config.get('BACKGROUND_LEADER_RETRY', self.retry_interval)
+
+        if not self.elect():
+            app.before_request(self._before_request)
+
+    def elect(self) -> bool:
+        """Try to become the leader and start the services.
+
+        Returns:
+            bool: True if this call made the process the leader
+        """
+        with self._lock:
+            if self.leader or not self._acquire():
+                return False
+            self.leader = True
+
+        logger.info(f'Background services started (pid: {os.getpid()})')
+        self._start(self._app)
+        return True
+
+    def _acquire(self) -> bool:
+        """Take the leader lock without blocking (lock held)."""
+        if self.lock_path is None:
+            return True
+
+        now = time.monotonic()
+        if now < self._next_attempt:
+            return False
+        self._next_attempt = now + self.retry_interval
+
+        try:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(self.lock_path, 'a+')
+        except OSError as e:
+            logger.warning(f'Background services lock unavailable - {self.lock_path}: {e}')
+            return False
+
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+
+        # Held (and released by the kernel) with the process
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f'{os.getpid()}\n')
+        lock_file.flush()
+        self._lock_file = lock_file
+        return True
+
+    def _before_request(self) -> Optional[object]:
+        if not self.leader:
+            self.elect()
+        return None
+
+
+class WakeSignal:
+    """Wake a thread of the leader process from any worker process.
+
+    :meth:`notify` sets an event for threads of the same process and
+    touches ``path``. :meth:`wait` also returns when the file's mtime
+    changes, checked every ``poll_interval`` seconds, so a wake from
+    another worker is seen within that delay.
+
+    Attributes:
+        path (Path): File touched by notify (None: in-process only)
+        poll_interval (float): Seconds between checks of the file
+    """
+
+    def __init__(self, path=None, poll_interval: float = 1.0):
+        """Initialize the signal.
+
+        Args:
+            path: File touched by notify (None: in-process only)
+            poll_interval: Seconds between checks of the file
+        """
+        self.path = Path(path) if path else None
+        self.poll_interval = poll_interval
+        self._event = threading.Event()
+        self._mtime = self._read_mtime()
+
+    def set(self):
+        """Wake waiting threads of this process only (e.g. to stop them)."""
+        self._event.set()
+
+    def notify(self):
+        """Wake waiting threads of this process and of the leader."""
+        self._event.set()
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.touch()
+        except OSError as e:
+            logger.warning(f'Wake file unavailable - {self.path}: {e}')
+
+    def wait(self, timeout: float) -> bool:
+        """Wait until woken or until the timeout expires.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            bool: True if woken
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(deadline - time.monotonic(), 0.0)
+            step = remaining if self.path is None else min(remaining, self.poll_interval)
+            if self._event.wait(step):
+                self._event.clear()
+                self._mtime = self._read_mtime()
+                return True
+
+            mtime = self._read_mtime()
+            if mtime != self._mtime:
+                self._mtime = mtime
+                return True
+            if step >= remaining:
+                return False
+
+    def _read_mtime(self) -> Optional[int]:
+        if self.path is None:
+            return None
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+
+background_services = BackgroundServices()
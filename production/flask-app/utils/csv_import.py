@@ -0,0 +1,590 @@
+"""Batched, streaming CSV import engine for PC master data.
+
+All CSV import paths (API and Web UI) share this engine so that a
+5,000-20,000 row asset list is imported with a handful of queries instead
+of one ``find_by_serial()`` round trip per row:
+
+1. The upload is decoded incrementally (UTF-8, UTF-8 BOM or Shift_JIS)
+   so the file is never materialized in memory as one string. The
+   encoding is guessed from the first chunk; an all-ASCII start that turns
+   out not to be UTF-8 is decoded as Shift_JIS from there on, any other
+   undecodable row raises :class:`CSVEncodingError`.
+2. Rows are read in batches of ``batch_size`` and validated in one pass
+   (including duplicate serials inside the file itself).
+3. Existing serials for the batch are prefetched with ``IN`` queries of at
+   most ``prefetch_chunk_size`` parameters (SQLite variable limit).
+4. New rows are written with a single executemany INSERT per batch.
+
+The Web UI preview/execute flow stages rows server-side in
+``import_staging`` keyed by an import token (see :func:`stage_upload`
+and :func:`import_staged`).
+"""
+
+import codecs
+import csv
+import logging
+import secrets
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from api.validators import validate_csv_row
+from models import db, PCMaster, ImportStaging
+from utils.pcinfo_cache import write_through
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+PREFETCH_CHUNK_SIZE = 500
+READ_CHUNK_SIZE = 64 * 1024
+PREVIEW_ROWS = 10
+REQUIRED_COLUMNS = {'serial', 'pcname'}
+
+
+class CSVImportError(Exception):
+    """Exception raised when an upload cannot be parsed as a PC CSV."""
+    pass
+
+
+class CSVEncodingError(CSVImportError):
+    """Exception raised when a row of an upload cannot be decoded.
+
+    Attributes:
+        row: Line number of the undecodable row (1 is the header)
+        encoding: Codec the upload was decoded with
+    """
+
+    def __init__(self, row: int, encoding: str):
+        super().__init__(f'Row {row} is not valid {encoding} text; save the file as UTF-8')
+        self.row = row
+        self.encoding = encoding
+
+
+# ============================================================
+# Streaming decode
+# ============================================================
+
+def detect_encoding(sample: bytes) -> str:
+    """Detect the text encoding of a CSV upload.
+
+    Args:
+        sample: First bytes of the upload
+
+    Returns:
+        Codec name ('utf-8-sig', 'utf-16', 'utf-8' or 'cp932')
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+
+    try:
+        # Incremental decode tolerates a multi-byte char cut at the end
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        # Excel on Japanese Windows saves CSV as Shift_JIS
+        return 'cp932'
+
+
+def iter_csv_lines(stream, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """Decode a binary stream into text lines incrementally.
+
+    Only ``chunk_size`` bytes (plus one partial line) are held in memory.
+    The encoding is detected from the first chunk. If that chunk is ASCII
+    and a later one is not UTF-8, decoding switches to Shift_JIS.
+
+    Args:
+        stream: Binary file-like object (e.g. ``FileStorage.stream``)
+        chunk_size: Bytes read per call
+
+    Yields:
+        Lines including their line terminator
+
+    Raises:
+        CSVEncodingError: If a row cannot be decoded
+    """
+    chunk = stream.read(chunk_size)
+    encoding = detect_encoding(chunk)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    ascii_only = True
+    lines = 0
+    pending = ''
+
+    while chunk:
+        try:
+            decoded = decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            if encoding != 'utf-8' or not ascii_only:
+                row = lines + chunk[:max(e.start, 0)].count(b'\n') + 1
+                raise CSVEncodingError(row, encoding) from e
+            # ASCII so far, so the first chunk could not tell UTF-8 from
+            # Shift_JIS; redecode including bytes the decoder buffered
+            chunk = decoder.getstate()[0] + chunk
+            encoding = 'cp932'
+            decoder = codecs.getincrementaldecoder(encoding)()
+            continue
+
+        ascii_only = ascii_only and decoded.isascii()
+        text = pending + decoded
+        end = text.rfind('\n') + 1
+        pending = text[end:]
+        if end:
+            for line in text[:end].split('\n')[:-1]:
+                lines += 1
+                yield line + '\n'
+        chunk = stream.read(chunk_size)
+
+    try:
+        pending += decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        raise CSVEncodingError(lines + 1, encoding) from e
+    if pending:
+        yield pending
+
+
+def open_csv_reader(stream, required_columns=REQUIRED_COLUMNS) -> csv.DictReader:
+    """Open a streaming ``csv.DictReader`` over an uploaded file.
+
+    Args:
+        stream: Binary file-like object
+        required_columns: Column names that must be present
+
+    Returns:
+        csv.DictReader positioned at the first data row
+
+    Raises:
+        CSVImportError: If required columns are missing
+    """
+    reader = csv.DictReader(iter_csv_lines(stream))
+    headers = set(reader.fieldnames or [])
+
+    if not set(required_columns).issubset(headers):
+        missing = sorted(set(required_columns) - headers)
+        raise CSVImportError(f'Missing required columns: {", ".join(missing)}')
+
+    return reader
+
+
+# ============================================================
+# Import engine
+# ============================================================
+
+class CSVImportResult:
+    """Result of a CSV import.
+
+    Counters always cover every row; detail lists can be capped with
+    ``max_details`` so that memory stays flat for very large files.
+
+    Attributes:
+        imported: List of {'row', 'serial', 'pcname'} for inserted rows
+        errors: List of {'row', 'error', 'data'} for invalid rows
+        duplicates: List of {'row', 'serial', 'existing_pcname',
+            'new_pcname', 'data'} for serials already registered
+    """
+
+    def __init__(self, max_details: Optional[int] = None):
+        """Initialize empty result.
+
+        Args:
+            max_details: Maximum entries kept per detail list (None = all)
+        """
+        self.max_details = max_details
+        self.imported = []
+        self.errors = []
+        self.duplicates = []
+        self.success_count = 0
+        self.invalid_count = 0
+        self.duplicate_count = 0
+
+    @property
+    def error_count(self) -> int:
+        """Number of rejected rows (invalid and duplicate)."""
+        return self.invalid_count + self.duplicate_count
+
+    @property
+    def total_rows(self) -> int:
+        """Number of processed rows."""
+        return self.success_count + self.error_count
+
+    def add_imported(self, entry: Dict[str, any]):
+        """Record an inserted row."""
+        self.success_count += 1
+        self._append(self.imported, entry)
+
+    def add_error(self, entry: Dict[str, any]):
+        """Record an invalid row."""
+        self.invalid_count += 1
+        self._append(self.errors, entry)
+
+    def add_duplicate(self, entry: Dict[str, any]):
+        """Record a row whose serial is already registered."""
+        self.duplicate_count += 1
+        self._append(self.duplicates, entry)
+
+    def _append(self, details, entry):
+        if self.max_details is None or len(details) < self.max_details:
+            details.append(entry)
+
+
+class CSVImporter:
+    """Batched, bulk-insert importer for PC master rows.
+
+    Attributes:
+        batch_size (int): Rows validated and inserted per batch
+        prefetch_chunk_size (int): Maximum serials per ``IN`` query
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        prefetch_chunk_size: int = PREFETCH_CHUNK_SIZE,
+        validator: Callable = validate_csv_row
+    ):
+        """Initialize importer.
+
+        Args:
+            batch_size: Rows validated and inserted per batch
+            prefetch_chunk_size: Maximum serials per ``IN`` query
+            validator: Row validator returning (is_valid, error, data)
+        """
+        self.batch_size = max(1, batch_size)
+        self.prefetch_chunk_size = max(1, prefetch_chunk_size)
+        self.validator = validator
+
+    def import_rows(
+        self,
+        rows: Iterable[Dict[str, any]],
+        start_row: int = 2,
+        **kwargs
+    ) -> CSVImportResult:
+        """Import rows into ``pc_master``.
+
+        Args:
+            rows: Iterable of row dictionaries (e.g. ``csv.DictReader``)
+            start_row: Row number of the first data row (1 is the header)
+            **kwargs: Passed to :meth:`import_numbered_rows`
+
+        Returns:
+            CSVImportResult with per-row outcome
+        """
+        return self.import_numbered_rows(
+            enumerate(rows, start=start_row),
+            **kwargs
+        )
+
+    def import_numbered_rows(
+        self,
+        numbered_rows: Iterable[Tuple[int, Dict[str, any]]],
+        commit: bool = True,
+        commit_each_batch: bool = False,
+        result: Optional[CSVImportResult] = None
+    ) -> CSVImportResult:
+        """Import (row_num, row) pairs into ``pc_master``.
+
+        Args:
+            numbered_rows: Iterable of (row number, row dictionary)
+            commit: Whether to commit the session when done
+            commit_each_batch: Commit after every batch instead of once,
+                so a huge import never holds one long transaction
+            result: Existing result to accumulate into
+
+        Returns:
+            CSVImportResult with per-row outcome
+
+        Raises:
+            Exception: Database errors are propagated; the caller is
+                responsible for rolling back the session.
+        """
+        if result is None:
+            result = CSVImportResult()
+        seen_serials = set()
+        numbered_rows = iter(numbered_rows)
+
+        while True:
+            batch = list(islice(numbered_rows, self.batch_size))
+            if not batch:
+                break
+            self._import_batch(batch, seen_serials, result)
+            if commit_each_batch:
+                db.session.commit()
+
+        if commit:
+            db.session.commit()
+
+        logger.info(
+            f"CSV import engine finished - imported={result.success_count} "
+            f"errors={result.invalid_count} duplicates={result.duplicate_count}"
+        )
+
+        return result
+
+    def _import_batch(self, batch, seen_serials, result):
+        """Validate, dedupe and insert one batch of numbered rows."""
+        # Validation pass
+        candidates = []
+        for row_num, row in batch:
+            row = normalize_row(row)
+            is_valid, error_msg, validated_data = self.validator(row)
+            if not is_valid:
+                result.add_error({
+                    'row': row_num,
+                    'error': error_msg,
+                    'data': row
+                })
+                continue
+
+            serial = validated_data['serial']
+            if serial in seen_serials:
+                result.add_error({
+                    'row': row_num,
+                    'error': f'Duplicate serial "{serial}" in file',
+                    'data': row
+                })
+                continue
+
+            seen_serials.add(serial)
+            candidates.append((row_num, row, validated_data))
+
+        if not candidates:
+            return
+
+        # Prefetch existing serials for the whole batch
+        existing = self._fetch_existing(
+            [data['serial'] for _, _, data in candidates]
+        )
+
+        now = datetime.utcnow()
+        new_rows = []
+        for row_num, row, data in candidates:
+            serial = data['serial']
+            if serial in existing:
+                result.add_duplicate({
+                    'row': row_num,
+                    'serial': serial,
+                    'existing_pcname': existing[serial],
+                    'new_pcname': data['pcname'],
+                    'data': row
+                })
+                continue
+
+            new_rows.append({
+                'serial': serial,
+                'pcname': data['pcname'],
+                'odj_path': data.get('odj_path'),
+                'created_at': now,
+                'updated_at': now
+            })
+            result.add_imported({
+                'row': row_num,
+                'serial': serial,
+                'pcname': data['pcname']
+            })
+
+        if not new_rows:
+            return
+
+        # Single executemany INSERT for the batch
+        db.session.execute(insert(PCMaster), new_rows)
+        for new_row in new_rows:
+            write_through(
+                db.session,
+                new_row['serial'],
+                new_row['pcname'],
+                new_row['odj_path']
+            )
+
+    def _fetch_existing(self, serials: List[str]) -> Dict[str, str]:
+        """Get already registered serials.
+
+        Args:
+            serials: Serial numbers to look up
+
+        Returns:
+            Dictionary of serial -> existing pcname
+        """
+        existing = {}
+        for i in range(0, len(serials), self.prefetch_chunk_size):
+            chunk = serials[i:i + self.prefetch_chunk_size]
+            query = db.session.query(PCMaster.serial, PCMaster.pcname).filter(
+                PCMaster.serial.in_(chunk)
+            )
+            existing.update(dict(query.all()))
+        return existing
+
+
+def normalize_row(row: Optional[Dict[str, any]]) -> Dict[str, str]:
+    """Coerce row values to strings so validators can strip them.
+
+    Args:
+        row: Row dictionary from CSV or JSON
+
+    Returns:
+        Dictionary of column name -> string value
+    """
+    if not isinstance(row, dict):
+        return {}
+    return {
+        key: '' if value is None else str(value)
+        for key, value in row.items()
+        if key is not None
+    }
+
+
+def _get_importer(validator: Callable = validate_csv_row) -> CSVImporter:
+    """Create an importer with the batch size configured for the app."""
+    from flask import current_app
+
+    return CSVImporter(
+        batch_size=current_app.config.get(
+            'CSV_IMPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE
+        ),
+        validator=validator
+    )
+
+
+def import_rows(
+    rows: Iterable[Dict[str, any]],
+    validator: Callable = validate_csv_row,
+    **kwargs
+) -> CSVImportResult:
+    """Import rows using the batch size configured for the current app.
+
+    Args:
+        rows: Iterable of row dictionaries
+        validator: Row validator returning (is_valid, error, data)
+        **kwargs: Passed to :meth:`CSVImporter.import_rows`
+
+    Returns:
+        CSVImportResult with per-row outcome
+    """
+    return _get_importer(validator).import_rows(rows, **kwargs)
+
+
+# ============================================================
+# Server-side staging (preview -> execute)
+# ============================================================
+
+def stage_upload(
+    stream,
+    max_age_hours: int = 24,
+    validator: Callable = validate_csv_row
+) -> Dict[str, any]:
+    """Parse an upload into ``import_staging`` and return a preview.
+
+    Args:
+        stream: Binary file-like object
+        max_age_hours: Staged rows of abandoned imports older than this
+            are purged first
+        validator: Row validator returning (is_valid, error, data)
+
+    Returns:
+        Dictionary with import_token, headers, preview, total_rows,
+        valid_rows and invalid_rows
+
+    Raises:
+        CSVImportError: If required columns are missing
+        CSVEncodingError: If a row cannot be decoded (nothing stays staged)
+    """
+    importer = _get_importer(validator)
+    reader = open_csv_reader(stream)
+    token = secrets.token_urlsafe(24)
+
+    ImportStaging.purge_expired(max_age_hours)
+
+    preview = []
+    total_rows = 0
+    invalid_rows = 0
+    numbered = enumerate(reader, start=2)
+
+    while True:
+        try:
+            batch = list(islice(numbered, importer.batch_size))
+        except CSVEncodingError:
+            db.session.rollback()
+            ImportStaging.query.filter_by(token=token).delete(synchronize_session=False)
+            db.session.commit()
+            raise
+        if not batch:
+            break
+
+        now = datetime.utcnow()
+        staged = []
+        for row_num, row in batch:
+            row = normalize_row(row)
+            is_valid, error_msg, _ = importer.validator(row)
+            if not is_valid:
+                invalid_rows += 1
+            if len(preview) < PREVIEW_ROWS:
+                preview.append(row)
+            staged.append({
+                'token': token,
+                'row_num': row_num,
+                'serial': row.get('serial', '')[:255],
+                'pcname': row.get('pcname', '')[:255],
+                'odj_path': row.get('odj_path', '')[:255],
+                'error': error_msg,
+                'created_at': now
+            })
+
+        total_rows += len(staged)
+        db.session.execute(insert(ImportStaging), staged)
+        db.session.commit()
+
+    logger.info(f"CSV upload staged - token={token} rows={total_rows} invalid={invalid_rows}")
+
+    return {
+        'import_token': token,
+        'headers': reader.fieldnames,
+        'preview': preview,
+        'total_rows': total_rows,
+        'valid_rows': total_rows - invalid_rows,
+        'invalid_rows': invalid_rows
+    }
+
+
+def import_staged(
+    token: str,
+    max_details: int = 100,
+    validator: Callable = validate_csv_row
+) -> CSVImportResult:
+    """Import rows staged by :func:`stage_upload`, one chunk at a time.
+
+    Each chunk is committed separately and the staged rows are removed
+    afterwards.
+
+    Args:
+        token: Import token returned by :func:`stage_upload`
+        max_details: Maximum entries kept per detail list
+        validator: Row validator returning (is_valid, error, data)
+
+    Returns:
+        CSVImportResult with per-row outcome
+
+    Raises:
+        CSVImportError: If nothing is staged for the token
+    """
+    if not ImportStaging.query.filter_by(token=token).first():
+        raise CSVImportError('Import token not found or expired')
+
+    importer = _get_importer(validator)
+    result = CSVImportResult(max_details=max_details)
+
+    def numbered_rows():
+        for chunk in ImportStaging.iter_chunks(token, importer.batch_size):
+            # Detach values before the importer commits (and expires) them
+            yield from [(staged.row_num, staged.to_row()) for staged in chunk]
+
+    importer.import_numbered_rows(
+        numbered_rows(),
+        commit_each_batch=True,
+        result=result
+    )
+
+    ImportStaging.delete_token(token)
+    db.session.commit()
+
+    return result
@@ -0,0 +1,594 @@
+"""Tail-following parser for Clonezilla/DRBL deployment progress.
+
+The follower keeps a byte offset per log file and parses only bytes
+appended since the previous poll, so a status request never re-reads a
+whole log. Parsed lines update an in-memory progress model per deployment
+with overall and per-client (MAC/IP) progress. Several deployments (e.g.
+concurrent multicast sessions) share the same log directory; each line is
+assigned to a deployment by its target addresses or multicast port.
+
+Recognised line formats:
+
+- partclone::
+
+    Elapsed: 00:01:23, Remaining: 00:05:12, Completed:  21.03%,   5.12GB/min,
+
+- udp-sender client connections::
+
+    New connection from 192.168.1.101  (#0) 00000009
+
+- clonezilla-jobs.log results::
+
+    MAC: 00:11:22:33:44:55, IP: 192.168.1.101, Client 192.168.1.101 finished
+    restoring. Image: win11, Device: sda, Success, Elapsed: 432 secs,
+    Speed: 5.12 GB/min
+
+Any other line containing a percentage updates the overall progress (and
+the client's, when the line or the log file name carries an IP/MAC).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PARTCLONE_RE = re.compile(
+    r'Elapsed:\s*(?P<elapsed>[\d:]+),\s*Remaining:\s*(?P<remaining>[\d:]+),\s*'
+    r'Complete(?:d)?:\s*(?P<percentage>[\d.]+)%'
+    r'(?:,\s*(?:Rate:\s*)?(?P<rate>[\d.]+\s*[KMGT]?B/min))?',
+    re.IGNORECASE
+)
+UDP_CONNECT_RE = re.compile(
+    r'New connection from (?P<ip>\d{1,3}(?:\.\d{1,3}){3})',
+    re.IGNORECASE
+)
+JOB_RESULT_RE = re.compile(
+    r'(?P<result>\bSuccess\b|\bFail(?:ed|ure)?\b)',
+    re.IGNORECASE
+)
+JOB_ELAPSED_RE = re.compile(r'Elapsed:\s*(?P<elapsed>\d+)\s*secs', re.IGNORECASE)
+JOB_SPEED_RE = re.compile(r'Speed:\s*(?P<rate>[\d.]+\s*[KMGT]?B/min)', re.IGNORECASE)
+MAC_RE = re.compile(r'(?P<mac>(?:[0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2})')
+IP_RE = re.compile(r'(?P<ip>\b\d{1,3}(?:\.\d{1,3}){3}\b)')
+PERCENT_RE = re.compile(r'(?P<percentage>\d+(?:\.\d+)?)%')
+# "--mcast-port 2232", "portbase 2232", "udp-sender-port2232.log"
+PORT_RE = re.compile(r'(?<![a-z])port(?:base)?[\s:=_-]*(?P<port>\d{4,5})\b', re.IGNORECASE)
+
+
+class DeploymentProgress:
+    """In-memory progress model of one deployment.
+
+    Attributes:
+        deployment_id: Deployment ID (None if untracked)
+        percentage (float): Overall progress
+        rate (str): Last reported transfer rate
+        elapsed (str): Last reported elapsed time
+        remaining (str): Last reported remaining time
+        message (str): Last progress line
+        clients (dict): Per-client progress keyed by IP (or MAC)
+        macs (set): Target MAC addresses of the deployment
+        ips (set): Target IP addresses of the deployment
+        ports (set): Multicast ports of the deployment
+        ended (bool): Whether the deployment has finished
+    """
+
+    def __init__(self, deployment_id: Optional[int] = None):
+        """Initialize an empty progress model.
+
+        Args:
+            deployment_id: Deployment ID
+        """
+        self.deployment_id = deployment_id
+        self.percentage = 0.0
+        self.rate = None
+        self.elapsed = None
+        self.remaining = None
+        self.message = None
+        self.clients = {}
+        self.macs = set()
+        self.ips = set()
+        self.ports = set()
+        self.ended = False
+        self.started_at = datetime.utcnow()
+        self.updated_at = None
+
+    def add_scope(self, macs: Iterable[str] = (), ips: Iterable[str] = (),
+                  port: Optional[int] = None):
+        """Add target addresses and the multicast port of the deployment.
+
+        Args:
+            macs: Target MAC addresses
+            ips: Target IP addresses
+            port: Multicast port
+        """
+        self.macs.update(m.lower().replace('-', ':') for m in macs if m)
+        self.ips.update(ip for ip in ips if ip)
+        if port is not None:
+            self.ports.add(int(port))
+
+    def owns(self, ip: Optional[str] = None, mac: Optional[str] = None,
+             port: Optional[int] = None) -> bool:
+        """Check whether a log line with these identifiers belongs here.
+
+        Clients already seen by this deployment count as its targets, so a
+        target known by MAC is also recognised by the IP it reported.
+
+        Args:
+            ip: IP address in the line (or log file name)
+            mac: MAC address in the line
+            port: Multicast port in the line (or log file name)
+
+        Returns:
+            True if the line belongs to this deployment
+        """
+        if mac:
+            mac = mac.lower().replace('-', ':')
+            if mac in self.macs or any(c['mac'] == mac for c in self.clients.values()):
+                return True
+        if ip and (ip in self.ips or ip in self.clients):
+            return True
+        return port is not None and port in self.ports
+
+    @property
+    def scoped(self) -> bool:
+        """Whether target addresses of the deployment are known."""
+        return bool(self.macs or self.ips)
+
+    def client(self, ip: Optional[str] = None, mac: Optional[str] = None) -> Dict:
+        """Get (or create) a client entry.
+
+        Args:
+            ip: Client IP address
+            mac: Client MAC address
+
+        Returns:
+            Client progress dictionary
+        """
+        mac = mac.lower().replace('-', ':') if mac else None
+
+        entry = self.clients.get(ip) if ip else None
+        if entry is None and mac:
+            entry = next(
+                (c for c in self.clients.values() if c['mac'] == mac),
+                None
+            )
+
+        if entry is None:
+            entry = {
+                'ip': ip,
+                'mac': mac,
+                'status': 'connected',
+                'percentage': 0.0,
+                'rate': None,
+                'elapsed': None,
+                'remaining': None,
+                'updated_at': None
+            }
+            self.clients[ip or mac] = entry
+
+        if ip and not entry['ip']:
+            entry['ip'] = ip
+        if mac and not entry['mac']:
+            entry['mac'] = mac
+
+        return entry
+
+    def to_dict(self) -> Dict[str, any]:
+        """Convert to the status dictionary returned by DRBLClient.
+
+        Returns:
+            Progress dictionary
+        """
+        clients = [dict(c) for c in self.clients.values()]
+
+        percentage = self.percentage
+        if clients:
+            percentage = sum(c['percentage'] for c in clients) / len(clients)
+
+        return {
+            'deployment_id': self.deployment_id,
+            'percentage': int(percentage),
+            'message': self.message or 'Progress parsing in progress',
+            'rate': self.rate,
+            'elapsed': self.elapsed,
+            'remaining': self.remaining,
+            'client_count': len(clients),
+            'clients_completed': sum(1 for c in clients if c['status'] == 'completed'),
+            'clients_failed': sum(1 for c in clients if c['status'] == 'failed'),
+            'clients': clients,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def apply_line(self, line: str, default_ip: Optional[str] = None):
+        """Update the model from one log line.
+
+        Args:
+            line: Log line (without newline)
+            default_ip: Client IP implied by the log file name
+        """
+        line = line.strip()
+        if not line:
+            return
+
+        now = datetime.utcnow()
+
+        match = UDP_CONNECT_RE.search(line)
+        if match:
+            self.client(ip=match.group('ip'))['updated_at'] = now.isoformat()
+            self.updated_at = now
+            return
+
+        mac_match = MAC_RE.search(line)
+        ip_match = IP_RE.search(line)
+        mac = mac_match.group('mac') if mac_match else None
+        ip = ip_match.group('ip') if ip_match else default_ip
+
+        result = JOB_RESULT_RE.search(line)
+        if result and (mac or ip):
+            entry = self.client(ip=ip, mac=mac)
+            succeeded = result.group('result').lower() == 'success'
+            entry['status'] = 'completed' if succeeded else 'failed'
+            if succeeded:
+                entry['percentage'] = 100.0
+            elapsed = JOB_ELAPSED_RE.search(line)
+            if elapsed:
+                entry['elapsed'] = elapsed.group('elapsed')
+            speed = JOB_SPEED_RE.search(line)
+            if speed:
+                entry['rate'] = speed.group('rate')
+            entry['updated_at'] = now.isoformat()
+            self.updated_at = now
+            return
+
+        match = PARTCLONE_RE.search(line)
+        if match:
+            fields = {
+                'percentage': float(match.group('percentage')),
+                'rate': match.group('rate'),
+                'elapsed': match.group('elapsed'),
+                'remaining': match.group('remaining')
+            }
+        else:
+            match = PERCENT_RE.search(line)
+            if not match:
+                return
+            fields = {'percentage': float(match.group('percentage'))}
+
+        fields['percentage'] = min(fields['percentage'], 100.0)
+
+        if mac or ip:
+            entry = self.client(ip=ip, mac=mac)
+            if entry['status'] == 'connected':
+                entry['status'] = 'running'
+            for key, value in fields.items():
+                if value is not None:
+                    entry[key] = value
+            entry['updated_at'] = now.isoformat()
+
+        for key, value in fields.items():
+            if value is not None:
+                setattr(self, key, value)
+        self.message = line
+        self.updated_at = now
+
+
+class LogFollower:
+    """Follow a directory of log files, reading only appended bytes.
+
+    File offsets are shared by all deployments, so every byte is read once
+    however many deployments are tracked. Each deployment has its own
+    progress model; a line is assigned to the deployment whose targets
+    (MAC, IP) or multicast port it mentions, or that the log file name
+    identifies. A line without any owner goes to the only open deployment,
+    if there is exactly one, unless it names a client outside that
+    deployment's targets.
+
+    Attributes:
+        log_dir (Path): Directory containing log files
+        pattern (str): Glob pattern of followed files
+        poll_interval (float): Minimum seconds between directory polls
+        max_tracked (int): Progress models kept (oldest ended ones dropped first)
+        bytes_read (int): Total bytes read (for diagnostics)
+        unassigned (int): Lines that matched no deployment
+    """
+
+    def __init__(
+        self,
+        log_dir='/var/log/clonezilla',
+        pattern: str = '*.log',
+        poll_interval: float = 1.0,
+        max_tracked: int = 32
+    ):
+        """Initialize follower.
+
+        Args:
+            log_dir: Directory containing log files
+            pattern: Glob pattern of followed files
+            poll_interval: Minimum seconds between directory polls
+            max_tracked: Progress models kept
+        """
+        self.log_dir = Path(log_dir)
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        self.max_tracked = max_tracked
+        self.bytes_read = 0
+        self.unassigned = 0
+
+        # path -> [inode, offset, partial line]
+        self._files = {}
+        # deployment_id -> DeploymentProgress, oldest first
+        self._tracked = OrderedDict()
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+
+    def begin(
+        self,
+        deployment_id: int,
+        since: Optional[float] = None,
+        macs: Iterable[str] = (),
+        ips: Iterable[str] = (),
+        port: Optional[int] = None
+    ):
+        """Start tracking a deployment.
+
+        Log content written before the deployment started belongs to earlier
+        deployments. Files not followed yet that were last modified before
+        ``since`` are skipped to their end; followed files modified since
+        then are read again once (from the start up to the current offset)
+        for lines of this deployment only.
+
+        Args:
+            deployment_id: Deployment ID
+            since: Deployment start as a UNIX timestamp (None: now)
+            macs: Target MAC addresses
+            ips: Target IP addresses
+            port: Multicast port of the session
+        """
+        with self._lock:
+            self._begin(deployment_id, since, macs, ips, port)
+
+    def end(self, deployment_id: int):
+        """Mark a deployment finished (its model is kept for snapshots).
+
+        Args:
+            deployment_id: Deployment ID
+        """
+        with self._lock:
+            progress = self._tracked.get(deployment_id)
+            if progress is not None:
+                progress.ended = True
+
+    def snapshot(
+        self,
+        deployment_id: int,
+        since: Optional[float] = None,
+        macs: Iterable[str] = (),
+        ips: Iterable[str] = (),
+        port: Optional[int] = None
+    ) -> Dict[str, any]:
+        """Get current progress of a deployment, polling at most once per interval.
+
+        A process that did not start the deployment itself (e.g. another
+        worker) starts tracking it on the first request for its ID. Targets
+        passed for a tracked deployment are added to its scope.
+
+        Args:
+            deployment_id: Deployment ID
+            since: Deployment start as a UNIX timestamp
+            macs: Target MAC addresses
+            ips: Target IP addresses
+            port: Multicast port of the session
+
+        Returns:
+            Progress dictionary
+        """
+        with self._lock:
+            progress = self._tracked.get(deployment_id)
+            if progress is None:
+                self._begin(deployment_id, since, macs, ips, port)
+                self._poll()
+            else:
+                progress.add_scope(macs, ips, port)
+                if time.monotonic() - self._last_poll >= self.poll_interval:
+                    self._poll()
+
+            if not self.log_dir.exists():
+                return {'percentage': 0, 'message': 'Log directory not found'}
+
+            return self._tracked[deployment_id].to_dict()
+
+    def progress_for(self, deployment_id: int) -> Optional[DeploymentProgress]:
+        """Get the progress model of a tracked deployment.
+
+        Args:
+            deployment_id: Deployment ID
+
+        Returns:
+            DeploymentProgress or None if the deployment is not tracked
+        """
+        with self._lock:
+            return self._tracked.get(deployment_id)
+
+    def feed(self, line: str, deployment_id: Optional[int] = None):
+        """Apply a line of live command output (e.g. dcs stdout).
+
+        Args:
+            line: Output line
+            deployment_id: Deployment the line belongs to; ignored unless
+                it is tracked (None: assign like a log line)
+        """
+        with self._lock:
+            if deployment_id is None:
+                progress = self._route(line.strip(), None, None)
+            else:
+                progress = self._tracked.get(deployment_id)
+            if progress is not None:
+                progress.apply_line(line)
+
+    def poll(self):
+        """Read newly appended bytes of all followed files."""
+        with self._lock:
+            self._poll()
+
+    def _begin(self, deployment_id, since, macs, ips, port):
+        """Begin implementation (lock held)."""
+        progress = self._tracked.get(deployment_id)
+        if progress is not None:
+            progress.add_scope(macs, ips, port)
+            return
+
+        progress = DeploymentProgress(deployment_id)
+        progress.add_scope(macs, ips, port)
+        self._tracked[deployment_id] = progress
+        self._trim()
+
+        for path in self._list_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            state = self._files.get(path)
+            recent = since is not None and st.st_mtime >= since
+            if state is None or state[0] != st.st_ino:
+                if not recent:
+                    self._files[path] = [st.st_ino, st.st_size, b'']
+            elif recent and state[1]:
+                self._catch_up(path, state[1], progress)
+        self._last_poll = time.monotonic()
+
+    def _trim(self):
+        """Drop the oldest models above max_tracked, ended ones first."""
+        while len(self._tracked) > self.max_tracked:
+            victim = next(
+                (key for key, p in self._tracked.items() if p.ended),
+                next(iter(self._tracked))
+            )
+            del self._tracked[victim]
+
+    def _catch_up(self, path: str, offset: int, progress: DeploymentProgress):
+        """Apply lines of a newly tracked deployment already read from a file."""
+        with open(path, 'rb') as f:
+            data = f.read(offset)
+        self.bytes_read += len(data)
+
+        lines = re.split(rb'[\r\n]', data)
+        lines.pop()  # partial line; completed by the next poll
+        default_ip, file_port = _file_identity(path)
+        for raw in lines:
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line and self._route(line, default_ip, file_port) is progress:
+                progress.apply_line(line, default_ip=default_ip)
+
+    def _route(self, line: str, default_ip: Optional[str],
+               file_port: Optional[int]) -> Optional[DeploymentProgress]:
+        """Find the deployment a log line belongs to."""
+        mac_match = MAC_RE.search(line)
+        ip_match = UDP_CONNECT_RE.search(line) or IP_RE.search(line)
+        port_match = PORT_RE.search(line)
+        mac = mac_match.group('mac') if mac_match else None
+        ip = ip_match.group('ip') if ip_match else default_ip
+        port = int(port_match.group('port')) if port_match else file_port
+
+        # Newest open deployments first: a PC imaged again belongs to the new one
+        newest = list(reversed(self._tracked.values()))
+        open_ = [p for p in newest if not p.ended]
+        for progress in open_ + [p for p in newest if p.ended]:
+            if progress.owns(ip=ip, mac=mac, port=port):
+                return progress
+
+        # The only running deployment takes lines without an address, and
+        # any line if it has no targets to tell them apart
+        if len(open_) == 1 and (not (ip or mac) or not open_[0].scoped):
+            return open_[0]
+        return None
+
+    def _list_files(self):
+        """List followed files."""
+        if not self.log_dir.exists():
+            return []
+        return [str(p) for p in self.log_dir.glob(self.pattern) if p.is_file()]
+
+    def _poll(self):
+        """Poll implementation (lock held)."""
+        self._last_poll = time.monotonic()
+        if not self._tracked:
+            return
+
+        for path in self._list_files():
+            try:
+                self._read_new(path)
+            except OSError as e:
+                logger.warning(f"Error following log {path}: {e}")
+
+    def _read_new(self, path: str):
+        """Parse bytes appended to one file since the last read."""
+        st = os.stat(path)
+        state = self._files.get(path)
+
+        # New file, rotated (inode changed) or truncated: start over
+        if state is None or state[0] != st.st_ino or st.st_size < state[1]:
+            state = [st.st_ino, 0, b'']
+            self._files[path] = state
+
+        if st.st_size == state[1]:
+            return
+
+        with open(path, 'rb') as f:
+            f.seek(state[1])
+            data = f.read(st.st_size - state[1])
+
+        state[1] += len(data)
+        self.bytes_read += len(data)
+
+        # partclone redraws its progress line with '\r'
+        lines = re.split(rb'[\r\n]', state[2] + data)
+        state[2] = lines.pop()
+
+        default_ip, file_port = _file_identity(path)
+        for raw in lines:
+            line = raw.decode('utf-8', errors='replace').strip()
+            if not line:
+                continue
+            progress = self._route(line, default_ip, file_port)
+            if progress is None:
+                self.unassigned += 1
+            else:
+                progress.apply_line(line, default_ip=default_ip)
+
+
+def _file_identity(path: str) -> Tuple[Optional[str], Optional[int]]:
+    """Get the client IP and multicast port named by a log file, if any."""
+    stem = Path(path).stem
+    ip_match = IP_RE.search(stem)
+    port_match = PORT_RE.search(stem)
+    return (
+        ip_match.group('ip') if ip_match else None,
+        int(port_match.group('port')) if port_match else None
+    )
+
+
+_followers = {}
+_followers_lock = threading.Lock()
+
+
+def get_follower(log_dir='/var/log/clonezilla') -> LogFollower:
+    """Get the shared log follower for a log directory.
+
+    Args:
+        log_dir: Directory containing log files
+
+    Returns:
+        LogFollower instance
+    """
+    key = str(Path(log_dir))
+    with _followers_lock:
+        if key not in _followers:
+            _followers[key] = LogFollower(key)
+        return _followers[key]
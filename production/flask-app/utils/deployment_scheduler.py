@@ -0,0 +1,506 @@
+"""Multi-session deployment scheduler.
+
+One multicast session images only the clients that joined it, at the
+speed of its slowest client. To image more PCs per hour than one session
+can take, deployments are queued and the scheduler runs several sessions
+(waves) side by side, each with its own image and multicast port range,
+as long as the server can feed them:
+
+- at most ``max_sessions`` sessions run at once,
+- every session sends about ``session_rate_mb`` MB/s, and their sum stays
+  within the NIC budget,
+- every distinct image being deployed is read at about ``session_rate_mb``
+  MB/s, and their sum stays within the disk budget (sessions of the same
+  image are served from the page cache).
+
+Queued deployments start in (priority, queue time) order. When the head of
+the queue needs an image the disk cannot feed yet, a later deployment of
+an image that is already being read may start ahead of it, so free NIC
+capacity is not left idle.
+
+A scheduled session is finished when all its targets have completed or
+failed, or, for deployments without targets, when its start job and its
+DRBL processes have ended. Every tick first copies each running
+deployment's own DRBL progress (tracked per deployment by the log
+follower) into its targets, then finishes ended sessions and starts the
+next wave. The tick is the only writer of DRBL progress to the targets
+and to the deployments.
+
+The state lives in the database, so any worker process may tick; a lock
+file serializes them. The background thread runs in the background
+services leader; :meth:`DeploymentScheduler.wake` from another worker
+touches a wake file the leader polls every second.
+"""
+
+import fcntl
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models import db
+from models.deployment import Deployment
+from models.deployment_target import DeploymentTarget
+from models.job import Job
+from models.session_metric import SessionMetric
+from utils.background import WakeSignal
+from utils.job_queue import job_runner
+from utils.process_supervisor import deployment_session, process_supervisor
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Completed sessions of an image averaged for duration estimates
+HISTORY_SIZE = 5
+
+
+class DeploymentScheduler:
+    """Run queued deployments as concurrent sessions under resource budgets.
+
+    Attributes:
+        max_sessions (int): Sessions running at once
+        session_rate_mb (float): Send/read rate of one session (MB/s)
+        nic_budget_mb (float): NIC throughput for sessions (MB/s, 0: unlimited)
+        disk_budget_mb (float): Image disk read throughput (MB/s, 0: unlimited)
+        port_base (int): Multicast port of the first session slot
+        port_step (int): Port distance between session slots
+        session_overhead (int): Seconds per session besides data transfer
+            (client wait, partitioning, reboot), for estimates
+        session_timeout (int): Seconds after which a session is stopped and
+            marked failed (0: never)
+        interval (int): Seconds between background ticks (0: disabled)
+        lock_path (Path): Lock file serializing ticks (None: no lock)
+    """
+
+    def __init__(self):
+        """Initialize scheduler (call :meth:`init_app` before use)."""
+        self.max_sessions = 2
+        self.session_rate_mb = 100.0
+        self.nic_budget_mb = 0.0
+        self.disk_budget_mb = 0.0
+        self.port_base = 2232
+        self.port_step = 10
+        self.session_overhead = 300
+        self.session_timeout = 0
+        self.interval = 0
+        self.lock_path = None
+
+        self._app = None
+        self._drbl_client = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake = WakeSignal()
+
+    def init_app(self, app):
+        """Configure from the Flask app.
+
+        Args:
+            app: Flask application instance
+        """
+        self._app = app
+        self.max_sessions = max(1, app.config.get('DEPLOYMENT_MAX_SESSIONS', self.max_sessions))
+        self.session_rate_mb = app.config.get('DEPLOYMENT_SESSION_RATE_MB', self.session_rate_mb)
+        self.nic_budget_mb = app.config.get('DEPLOYMENT_NIC_BUDGET_MB', self.nic_budget_mb)
+        self.disk_budget_mb = app.config.get('DEPLOYMENT_DISK_BUDGET_MB', self.disk_budget_mb)
+        self.port_base = app.config.get('DEPLOYMENT_MCAST_PORT_BASE', self.port_base)
+        self.port_step = app.config.get('DEPLOYMENT_MCAST_PORT_STEP', self.port_step)
+        self.session_overhead = app.config.get('DEPLOYMENT_SESSION_OVERHEAD', self.session_overhead)
+        self.session_timeout = app.config.get('DEPLOYMENT_SESSION_TIMEOUT', self.session_timeout)
+        self.interval = app.config.get('DEPLOYMENT_SCHEDULER_INTERVAL', 0)
+
+        run_dir = app.config.get('DRBL_RUN_PATH')
+        self.lock_path = Path(run_dir) / 'scheduler.lock' if run_dir else None
+        self._wake = WakeSignal(Path(run_dir) / 'scheduler.wake' if run_dir else None)
+
+    def start(self):
+        """Start the background thread if DEPLOYMENT_SCHEDULER_INTERVAL is set."""
+        if self.interval and self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='deployment-scheduler',
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(f'Deployment scheduler started (every {self.interval}s)')
+
+    def register_client(self, drbl_client):
+        """Set the DRBL client used for image sizes, progress and stopping.
+
+        Args:
+            drbl_client: DRBLClient instance
+        """
+        self._drbl_client = drbl_client
+
+    # ============================================================
+    # Capacity
+    # ============================================================
+
+    @property
+    def capacity(self) -> int:
+        """Sessions the session limit and NIC budget allow at once."""
+        sessions = self.max_sessions
+        if self.nic_budget_mb and self.session_rate_mb:
+            sessions = min(sessions, int(self.nic_budget_mb // self.session_rate_mb))
+        return max(1, sessions)
+
+    @property
+    def image_capacity(self) -> int:
+        """Distinct images the disk budget can feed at once."""
+        if self.disk_budget_mb and self.session_rate_mb:
+            return max(1, int(self.disk_budget_mb // self.session_rate_mb))
+        return self.capacity
+
+    def port_for_slot(self, slot: int) -> int:
+        """Multicast port base of a session slot."""
+        return self.port_base + slot * self.port_step
+
+    # ============================================================
+    # Scheduling
+    # ============================================================
+
+    def tick(self) -> Dict[str, any]:
+        """Finish ended sessions and start queued ones (requires an app context).
+
+        Returns:
+            Dictionary with finished and started deployment IDs
+            (skipped=True if another process holds the lock)
+        """
+        if self.lock_path is None:
+            return self._tick()
+
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return {'finished': [], 'started': [], 'skipped': True}
+            return self._tick()
+
+    def _tick(self) -> Dict[str, any]:
+        """Tick body (lock held)."""
+        self._sync_progress()
+        finished = self._finish_sessions()
+        started = self._start_sessions()
+        return {'finished': finished, 'started': started, 'skipped': False}
+
+    def _finish_sessions(self) -> List[int]:
+        """Mark scheduled sessions whose clients are all done as finished."""
+        now = datetime.utcnow()
+        finished = []
+
+        running = Deployment.query.filter(
+            Deployment.status == 'running',
+            Deployment.queued_at.isnot(None)
+        ).all()
+
+        for deployment in running:
+            outcome = self._session_outcome(deployment, now)
+            if outcome is None:
+                continue
+
+            # Leftover processes of the session (e.g. udp-sender) end with it
+            if self._drbl_client is not None:
+                try:
+                    self._drbl_client.stop_deployment(deployment_id=deployment.id)
+                except Exception as e:
+                    logger.warning(f'Could not stop session of deployment {deployment.id}: {e}')
+                self._drbl_client.progress.end(deployment.id)
+
+            deployment.status = outcome
+            deployment.completed_at = now
+            if outcome == 'completed':
+                deployment.progress = 100
+            SessionMetric.finish(deployment)
+            db.session.commit()
+            finished.append(deployment.id)
+            logger.info(f'Scheduled deployment finished: {deployment.name} '
+                        f'(ID: {deployment.id}, {outcome})')
+
+        return finished
+
+    def _sync_progress(self):
+        """Feed each running deployment's DRBL progress into its targets."""
+        client = self._drbl_client
+        if client is None or not client.drbl_installed:
+            return
+
+        for deployment in Deployment.query.filter_by(status='running').all():
+            since = None
+            if deployment.started_at:
+                since = deployment.started_at.replace(tzinfo=timezone.utc).timestamp()
+            snapshot = client.progress.snapshot(
+                deployment.id,
+                since=since,
+                **deployment.progress_scope()
+            )
+            if 'percentage' in snapshot:
+                deployment.progress = snapshot['percentage']
+                db.session.commit()
+            DeploymentTarget.sync_progress(deployment.id, snapshot.get('clients'))
+
+    def _session_outcome(self, deployment, now) -> Optional[str]:
+        """Get 'completed'/'failed' for a finished session, else None."""
+        counts = DeploymentTarget.state_counts(deployment.id)
+        total = sum(counts.values())
+        done = counts[DeploymentTarget.STATE_COMPLETED] + counts[DeploymentTarget.STATE_FAILED]
+
+        if total and done == total:
+            return 'completed' if counts[DeploymentTarget.STATE_COMPLETED] else 'failed'
+
+        if not total and not Job.get_active_for_deployment(deployment.id) \
+                and not process_supervisor.is_running(deployment_session(deployment.id)):
+            return 'completed'
+
+        if self.session_timeout and deployment.started_at:
+            if (now - deployment.started_at).total_seconds() > self.session_timeout:
+                logger.warning(f'Deployment {deployment.id} exceeded the session timeout')
+                return 'failed'
+
+        return None
+
+    def _queued(self) -> List[Deployment]:
+        """Queued deployments in start order."""
+        return Deployment.query.filter_by(status='queued').order_by(
+            db.func.coalesce(Deployment.priority, 0).desc(),
+            Deployment.queued_at,
+            Deployment.id
+        ).all()
+
+    def _start_sessions(self) -> List[int]:
+        """Start queued deployments while the budgets allow."""
+        running = Deployment.query.filter_by(status='running').all()
+        free = self.capacity - len(running)
+        if free <= 0:
+            return []
+
+        images = {d.image_name for d in running}
+        ports = {d.mcast_port for d in running if d.mcast_port is not None}
+        started = []
+
+        for deployment in self._queued():
+            if free <= 0:
+                break
+            if deployment.image_name not in images and len(images) >= self.image_capacity:
+                # Disk cannot feed another image; a running image may still go
+                continue
+
+            port = None
+            if deployment.mode == 'multicast':
+                slot = 0
+                while self.port_for_slot(slot) in ports:
+                    slot += 1
+                port = self.port_for_slot(slot)
+
+            if not self._claim(deployment, port):
+                continue
+
+            logger.info(f'Scheduler starting deployment: {deployment.name} '
+                        f'(ID: {deployment.id}, port {port})')
+            job_runner.submit(
+                'deployment.start',
+                params={
+                    'mode': deployment.mode,
+                    'image_name': deployment.image_name,
+                    'mcast_port': port,
+                    'scheduled': True
+                },
+                deployment_id=deployment.id
+            )
+
+            images.add(deployment.image_name)
+            if port is not None:
+                ports.add(port)
+            free -= 1
+            started.append(deployment.id)
+
+        return started
+
+    @staticmethod
+    def _claim(deployment, port) -> bool:
+        """Atomically move a deployment from queued to running."""
+        claimed = Deployment.query.filter_by(
+            id=deployment.id,
+            status='queued'
+        ).update({
+            'status': 'running',
+            'started_at': datetime.utcnow(),
+            'completed_at': None,
+            'progress': 0,
+            'mcast_port': port
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed:
+            db.session.refresh(deployment)
+        return bool(claimed)
+
+    # ============================================================
+    # Estimates
+    # ============================================================
+
+    def estimate_duration(self, image_name: str) -> int:
+        """Estimate the session duration of an image in seconds.
+
+        The average of the last completed sessions of the image is used;
+        without history, the image size at the session rate plus the fixed
+        session overhead.
+
+        Args:
+            image_name: Clonezilla image name
+
+        Returns:
+            Estimated seconds
+        """
+        rows = db.session.query(Deployment.started_at, Deployment.completed_at).filter(
+            Deployment.image_name == image_name,
+            Deployment.status == 'completed',
+            Deployment.started_at.isnot(None),
+            Deployment.completed_at.isnot(None)
+        ).order_by(Deployment.completed_at.desc()).limit(HISTORY_SIZE).all()
+        if rows:
+            return int(sum((end - start).total_seconds() for start, end in rows) / len(rows))
+
+        size = 0
+        if self._drbl_client is not None:
+            info = self._drbl_client.get_image_info(image_name)
+            size = info['size_bytes'] if info else 0
+        rate = self.session_rate_mb * MB
+        return int(self.session_overhead + (size / rate if rate else 0))
+
+    def status(self) -> Dict[str, any]:
+        """Get queue depth, budget usage and ETA (requires an app context).
+
+        Queued deployments are simulated onto ``capacity`` session slots in
+        start order, with durations from :meth:`estimate_duration`.
+
+        Returns:
+            Scheduler status dictionary
+        """
+        now = datetime.utcnow()
+        running = Deployment.query.filter_by(status='running').order_by(
+            Deployment.started_at
+        ).all()
+        queued = self._queued()
+
+        durations = {}
+
+        def duration(image_name):
+            if image_name not in durations:
+                durations[image_name] = self.estimate_duration(image_name)
+            return durations[image_name]
+
+        sessions = []
+        slots = []
+        for deployment in running:
+            elapsed = (now - deployment.started_at).total_seconds() if deployment.started_at else 0
+            remaining = max(0, duration(deployment.image_name) - elapsed)
+            end = now + timedelta(seconds=remaining)
+            slots.append(end)
+            sessions.append({
+                'deployment_id': deployment.id,
+                'name': deployment.name,
+                'image_name': deployment.image_name,
+                'mode': deployment.mode,
+                'mcast_port': deployment.mcast_port,
+                'target_count': deployment.target_count or 0,
+                'started_at': deployment.started_at.isoformat() if deployment.started_at else None,
+                'estimated_completion': end.isoformat()
+            })
+
+        # Sessions beyond capacity (started manually) must end first
+        heapq.heapify(slots)
+        while len(slots) > self.capacity:
+            heapq.heappop(slots)
+        slots += [now] * (self.capacity - len(slots))
+        heapq.heapify(slots)
+
+        queue = []
+        finish = max([now] + slots)
+        for position, deployment in enumerate(queued, 1):
+            start = max(now, heapq.heappop(slots))
+            end = start + timedelta(seconds=duration(deployment.image_name))
+            heapq.heappush(slots, end)
+            finish = max(finish, end)
+            queue.append({
+                'position': position,
+                'deployment_id': deployment.id,
+                'name': deployment.name,
+                'image_name': deployment.image_name,
+                'mode': deployment.mode,
+                'priority': deployment.priority or 0,
+                'target_count': deployment.target_count or 0,
+                'queued_at': deployment.queued_at.isoformat() if deployment.queued_at else None,
+                'estimated_start': start.isoformat(),
+                'estimated_completion': end.isoformat()
+            })
+
+        eta_seconds = int((finish - now).total_seconds())
+        pcs_pending = sum(d.target_count or 0 for d in running + queued)
+        images = {d.image_name for d in running}
+        completed_last_hour = DeploymentTarget.query.filter(
+            DeploymentTarget.state == DeploymentTarget.STATE_COMPLETED,
+            DeploymentTarget.completed_at >= now - timedelta(hours=1)
+        ).count()
+
+        return {
+            'queue_depth': len(queued),
+            'queued_pcs': sum(d.target_count or 0 for d in queued),
+            'running_sessions': len(running),
+            'capacity': {
+                'sessions': self.capacity,
+                'images': self.image_capacity,
+                'session_rate_mb': self.session_rate_mb,
+                'nic_budget_mb': self.nic_budget_mb,
+                'disk_budget_mb': self.disk_budget_mb,
+                'nic_used_mb': len(running) * self.session_rate_mb,
+                'disk_used_mb': len(images) * self.session_rate_mb
+            },
+            'eta_seconds': eta_seconds,
+            'eta': finish.isoformat() if running or queued else None,
+            'estimated_pcs_per_hour': (
+                round(pcs_pending / (eta_seconds / 3600), 1) if eta_seconds else None
+            ),
+            'pcs_completed_last_hour': completed_last_hour,
+            'sessions': sessions,
+            'queue': queue
+        }
+
+    # ============================================================
+    # Background thread
+    # ============================================================
+
+    def wake(self):
+        """Run the next background tick now (e.g. after queueing).
+
+        Works from any worker process: the leader running the background
+        thread sees the wake file within a second.
+        """
+        self._wake.notify()
+
+    def _run(self):
+        """Background thread body."""
+        while not self._stop_event.is_set():
+            self._wake.wait(self.interval)
+            if self._stop_event.is_set():
+                break
+            try:
+                with self._app.app_context():
+                    self.tick()
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f'Deployment scheduler tick failed: {e}')
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+deployment_scheduler = DeploymentScheduler()
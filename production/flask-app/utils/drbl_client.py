@@ -10,11 +10,21 @@ import logging
 import json
 import time
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 
+from utils.deployment_progress import get_follower
+from utils.image_catalog import get_catalog
+from utils.process_supervisor import deployment_session, process_supervisor
+
 logger = logging.getLogger(__name__)
 
+# pgrep/pkill pattern of DRBL deployment commands (executable name only)
+DRBL_PROCESS_PATTERN = r'(^|/)(dcs|drbl-ocs)( |$)'
+
+# Seconds dcs may take beyond its client wait before it is considered hung
+START_TIMEOUT_MARGIN = 120
+
 
 class DRBLException(Exception):
     """Base exception for DRBL-related errors."""
@@ -40,6 +50,8 @@ class DRBLClient:
     Attributes:
         drbl_installed (bool): Whether DRBL is installed on this system
         image_home (str): Path to Clonezilla image directory
+        catalog (ImageCatalog): Cached image metadata for image_home
+        progress (LogFollower): Deployment progress log follower
         odj_home (str): Path to ODJ files directory
     """
 
@@ -47,7 +59,8 @@ class DRBLClient:
         self,
         image_home: str = "/home/partimag",
         odj_home: str = "/srv/odj",
-        drbl_bin: str = "/opt/drbl/sbin"
+        drbl_bin: str = "/opt/drbl/sbin",
+        log_dir: str = "/var/log/clonezilla"
     ):
         """Initialize DRBL client.
 
@@ -55,11 +68,16 @@ class DRBLClient:
             image_home: Directory containing Clonezilla images
             odj_home: Directory containing ODJ files
             drbl_bin: Directory containing DRBL binaries
+            log_dir: Directory containing Clonezilla deployment logs
         """
         self.image_home = Path(image_home)
         self.odj_home = Path(odj_home)
         self.drbl_bin = Path(drbl_bin)
         self.drbl_installed = self._check_drbl_installation()
+        self.catalog = get_catalog(self.image_home)
+        self.progress = get_follower(log_dir)
+        self._running = False
+        self._running_checked_at = float('-inf')
 
         # Create directories if they don't exist and we have permissions
         try:
@@ -96,48 +114,63 @@ class DRBLClient:
         self,
         command: List[str],
         timeout: int = 300,
-        check: bool = True
+        check: bool = True,
+        session: Optional[str] = None,
+        on_line=None
     ) -> Tuple[int, str, str]:
-        """Execute a shell command and return results.
+        """Execute a command under the process supervisor and return results.
+
+        Output is streamed line by line into bounded buffers (and on_line)
+        instead of being collected in memory until exit.
 
         Args:
             command: Command and arguments as list
             timeout: Maximum execution time in seconds
             check: Whether to raise exception on non-zero exit code
+            session: Session key the process can be stopped by
+            on_line: Called with every output line
 
         Returns:
-            Tuple of (return_code, stdout, stderr)
+            Tuple of (return_code, stdout, stderr); output holds the last
+            DRBL_OUTPUT_LINES lines of each stream
 
         Raises:
             DRBLCommandError: If command fails and check=True
         """
-        logger.info(f"Executing command: {' '.join(command)}")
-
         try:
-            result = subprocess.run(
+            proc = process_supervisor.run(
                 command,
-                capture_output=True,
-                text=True,
+                session=session,
                 timeout=timeout,
-                check=False
+                on_line=on_line
             )
-
-            if check and result.returncode != 0:
-                error_msg = f"Command failed: {' '.join(command)}\n{result.stderr}"
-                logger.error(error_msg)
-                raise DRBLCommandError(error_msg)
-
-            return result.returncode, result.stdout, result.stderr
-
-        except subprocess.TimeoutExpired as e:
-            error_msg = f"Command timeout after {timeout}s: {' '.join(command)}"
-            logger.error(error_msg)
-            raise DRBLCommandError(error_msg) from e
         except Exception as e:
             error_msg = f"Command execution error: {str(e)}"
             logger.error(error_msg)
             raise DRBLCommandError(error_msg) from e
 
+        if proc.timed_out:
+            error_msg = f"Command timeout after {timeout}s: {' '.join(command)}"
+            logger.error(error_msg)
+            raise DRBLCommandError(error_msg)
+
+        if check and proc.returncode != 0:
+            reason = 'stopped' if proc.stopped else 'failed'
+            error_msg = f"Command {reason}: {' '.join(command)}\n{proc.stderr_text()}"
+            logger.error(error_msg)
+            raise DRBLCommandError(error_msg)
+
+        return proc.returncode, proc.stdout_text(), proc.stderr_text()
+
+    def _session_options(self, deployment_id: Optional[int]) -> Dict[str, any]:
+        """Session key and progress feed for a deployment's command."""
+        if deployment_id is None:
+            return {}
+        return {
+            'session': deployment_session(deployment_id),
+            'on_line': lambda line: self.progress.feed(line, deployment_id)
+        }
+
     # ============================================================
     # Image Management
     # ============================================================
@@ -156,46 +189,16 @@ class DRBLClient:
                     'size_bytes': 15728640000,
                     'size_human': '14.6 GB',
                     'created': '2025-11-16 10:30:00',
-                    'disk_count': 1
+                    'disk_count': 1,
+                    'verified': True,
+                    'verified_at': '2025-11-16T11:02:13'
                 }
             ]
         """
-        images = []
-
-        if not self.image_home.exists():
-            logger.warning(f"Image directory not found: {self.image_home}")
-            return images
-
-        for image_dir in self.image_home.iterdir():
-            if not image_dir.is_dir():
-                continue
-
-            # Check if directory contains Clonezilla image files
-            if not (image_dir / 'disk').exists() and not (image_dir / 'parts').exists():
-                continue
-
-            # Calculate directory size
-            size_bytes = sum(
-                f.stat().st_size
-                for f in image_dir.rglob('*')
-                if f.is_file()
-            )
-
-            # Get creation time
-            created_timestamp = image_dir.stat().st_ctime
-            created = datetime.fromtimestamp(created_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-
-            # Count disk images
-            disk_count = len(list(image_dir.glob('*-pt.sf')))
-
-            images.append({
-                'name': image_dir.name,
-                'path': str(image_dir),
-                'size_bytes': size_bytes,
-                'size_human': self._format_bytes(size_bytes),
-                'created': created,
-                'disk_count': disk_count
-            })
+        images = [
+            self._format_image(entry)
+            for entry in self.catalog.list_images()
+        ]
 
         return sorted(images, key=lambda x: x['name'], reverse=True)
 
@@ -208,11 +211,30 @@ class DRBLClient:
         Returns:
             Image metadata dictionary or None if not found
         """
-        images = self.list_images()
-        for image in images:
-            if image['name'] == image_name:
-                return image
-        return None
+        entry = self.catalog.get(image_name)
+        return self._format_image(entry) if entry else None
+
+    def _format_image(self, entry: Dict[str, any]) -> Dict[str, any]:
+        """Convert a catalog entry to the image dictionary format.
+
+        Args:
+            entry: Image catalog entry
+
+        Returns:
+            Image metadata dictionary
+        """
+        created = datetime.fromtimestamp(entry['created']).strftime('%Y-%m-%d %H:%M:%S')
+
+        return {
+            'name': entry['name'],
+            'path': entry['path'],
+            'size_bytes': entry['size_bytes'],
+            'size_human': self._format_bytes(entry['size_bytes']),
+            'created': created,
+            'disk_count': entry['disk_count'],
+            'verified': entry.get('verified'),
+            'verified_at': entry.get('verified_at')
+        }
 
     # ============================================================
     # Deployment Operations
@@ -223,15 +245,22 @@ class DRBLClient:
         image_name: str,
         clients_to_wait: int = 10,
         max_wait_time: int = 300,
-        compression: str = "zstd"
+        compression: Optional[str] = None,
+        deployment_id: Optional[int] = None,
+        mcast_port: Optional[int] = None
     ) -> Dict[str, any]:
         """Start a multicast deployment session.
 
         Args:
             image_name: Name of the Clonezilla image to deploy
             clients_to_wait: Number of clients to wait for before starting
-            max_wait_time: Maximum time to wait for clients (seconds)
-            compression: Compression algorithm (zstd, gzip, lz4)
+            max_wait_time: Seconds after the first client joined to start
+                with the clients present
+            compression: Compression of the image (reported only: partclone
+                detects it on restore)
+            deployment_id: Deployment the session belongs to (for stop/progress)
+            mcast_port: UDP port base of the session (None: DRBL default);
+                concurrent sessions need distinct ports
 
         Returns:
             Deployment session information
@@ -251,6 +280,9 @@ class DRBLClient:
                 'status': 'simulated',
                 'image_name': image_name,
                 'clients_to_wait': clients_to_wait,
+                'max_wait_time': max_wait_time,
+                'compression': compression,
+                'mcast_port': mcast_port,
                 'start_time': datetime.now().isoformat(),
                 'message': 'DRBL not installed, deployment simulated'
             }
@@ -269,15 +301,19 @@ class DRBLClient:
             '-k1',  # Create partition table
             '-icds',  # Skip checking destination
             '-t', str(clients_to_wait),  # Clients to wait
-            image_name
+            '--max-time-to-wait', str(max_wait_time),  # Then start anyway
         ]
+        if mcast_port is not None:
+            command += ['--mcast-port', str(mcast_port)]  # Session UDP ports
+        command.append(image_name)
 
         try:
             # Start deployment in background
             returncode, stdout, stderr = self._run_command(
                 command,
-                timeout=max_wait_time,
-                check=True
+                timeout=max_wait_time + START_TIMEOUT_MARGIN,
+                check=True,
+                **self._session_options(deployment_id)
             )
 
             logger.info(f"Multicast deployment started: {image_name}")
@@ -286,6 +322,9 @@ class DRBLClient:
                 'status': 'started',
                 'image_name': image_name,
                 'clients_to_wait': clients_to_wait,
+                'max_wait_time': max_wait_time,
+                'compression': compression,
+                'mcast_port': mcast_port,
                 'start_time': datetime.now().isoformat(),
                 'stdout': stdout,
                 'stderr': stderr
@@ -298,13 +337,15 @@ class DRBLClient:
     def start_unicast_deployment(
         self,
         image_name: str,
-        target_mac: str
+        target_mac: str,
+        deployment_id: Optional[int] = None
     ) -> Dict[str, any]:
         """Start a unicast deployment to a specific client.
 
         Args:
             image_name: Name of the Clonezilla image to deploy
             target_mac: MAC address of target client
+            deployment_id: Deployment the session belongs to (for stop/progress)
 
         Returns:
             Deployment session information
@@ -344,7 +385,8 @@ class DRBLClient:
             returncode, stdout, stderr = self._run_command(
                 command,
                 timeout=600,
-                check=True
+                check=True,
+                **self._session_options(deployment_id)
             )
 
             logger.info(f"Unicast deployment started: {image_name} -> {target_mac}")
@@ -362,8 +404,15 @@ class DRBLClient:
             logger.error(f"Failed to start unicast deployment: {str(e)}")
             raise
 
-    def stop_deployment(self) -> Dict[str, any]:
-        """Stop the current deployment session.
+    def stop_deployment(self, deployment_id: Optional[int] = None) -> Dict[str, any]:
+        """Stop a deployment session.
+
+        With a deployment ID only the process groups started for that
+        deployment are terminated. Without one, every dcs/drbl-ocs process
+        is stopped (sessions started outside this application).
+
+        Args:
+            deployment_id: Deployment to stop (None: all DRBL sessions)
 
         Returns:
             Stop operation result
@@ -376,9 +425,19 @@ class DRBLClient:
             }
 
         try:
-            # Kill dcs processes
-            self._run_command(['pkill', '-f', 'dcs'], check=False)
-            self._run_command(['pkill', '-f', 'drbl-ocs'], check=False)
+            if deployment_id is not None:
+                self.progress.end(deployment_id)
+                pids = process_supervisor.stop(deployment_session(deployment_id))
+                logger.info(f"Deployment {deployment_id} stopped (process groups: {pids})")
+                return {
+                    'status': 'stopped' if pids else 'not_running',
+                    'deployment_id': deployment_id,
+                    'pids': pids,
+                    'stop_time': datetime.now().isoformat()
+                }
+
+            # Match the dcs/drbl-ocs executables only, not any command line containing "dcs"
+            self._run_command(['pkill', '-f', DRBL_PROCESS_PATTERN], check=False, timeout=30)
 
             logger.info("Deployment stopped")
 
@@ -391,9 +450,23 @@ class DRBLClient:
             logger.error(f"Error stopping deployment: {str(e)}")
             raise DRBLCommandError(f"Failed to stop deployment: {str(e)}")
 
-    def get_deployment_status(self) -> Dict[str, any]:
+    def get_deployment_status(
+        self,
+        deployment_id: Optional[int] = None,
+        started_at: Optional[datetime] = None,
+        scope: Optional[Dict[str, any]] = None
+    ) -> Dict[str, any]:
         """Get current deployment status.
 
+        Progress is read from the deployment's in-memory model maintained
+        by the log follower, which only parses bytes appended since the
+        last poll.
+
+        Args:
+            deployment_id: Deployment ID to report progress for (optional)
+            started_at: Deployment start time in UTC (optional)
+            scope: Deployment.progress_scope() of the deployment (optional)
+
         Returns:
             Deployment status information including progress
         """
@@ -405,17 +478,11 @@ class DRBLClient:
 
         # Check if dcs or drbl-ocs is running
         try:
-            result = subprocess.run(
-                ['pgrep', '-f', 'dcs|drbl-ocs'],
-                capture_output=True,
-                text=True
-            )
-
-            is_running = result.returncode == 0
+            is_running = self._is_deployment_running()
 
             if is_running:
-                # Try to get progress from log files
-                progress = self._parse_deployment_logs()
+                # Get progress from followed log files
+                progress = self._parse_deployment_logs(deployment_id, started_at, scope)
 
                 return {
                     'running': True,
@@ -437,44 +504,53 @@ class DRBLClient:
                 'check_time': datetime.now().isoformat()
             }
 
-    def _parse_deployment_logs(self) -> Dict[str, any]:
-        """Parse DRBL deployment logs for progress information.
+    def _is_deployment_running(self) -> bool:
+        """Check for a running dcs/drbl-ocs process (cached briefly).
 
         Returns:
-            Progress information dictionary
+            True if a deployment process is running
         """
-        # DRBL logs are typically in /var/log/clonezilla/
-        log_dir = Path('/var/log/clonezilla')
+        now = time.monotonic()
+        if now - self._running_checked_at < self.progress.poll_interval:
+            return self._running
+
+        if process_supervisor.is_running():
+            self._running = True
+        else:
+            result = subprocess.run(
+                ['pgrep', '-f', DRBL_PROCESS_PATTERN],
+                capture_output=True,
+                text=True
+            )
+            self._running = result.returncode == 0
+        self._running_checked_at = now
+        return self._running
 
-        if not log_dir.exists():
-            return {'percentage': 0, 'message': 'Log directory not found'}
+    def _parse_deployment_logs(
+        self,
+        deployment_id: Optional[int] = None,
+        started_at: Optional[datetime] = None,
+        scope: Optional[Dict[str, any]] = None
+    ) -> Dict[str, any]:
+        """Get deployment progress from the log follower.
 
-        # Look for latest log file
-        log_files = sorted(log_dir.glob('*.log'), key=lambda x: x.stat().st_mtime, reverse=True)
+        Args:
+            deployment_id: Deployment ID (optional)
+            started_at: Deployment start time in UTC (optional)
+            scope: Target addresses and multicast port (optional)
 
-        if not log_files:
-            return {'percentage': 0, 'message': 'No log files found'}
+        Returns:
+            Progress information dictionary
+        """
+        if deployment_id is None:
+            return {'percentage': 0, 'message': 'No deployment specified'}
 
-        try:
-            with open(log_files[0], 'r') as f:
-                lines = f.readlines()
-
-            # Parse for progress indicators (this is simplified)
-            # Real implementation would parse actual Clonezilla progress format
-            for line in reversed(lines):
-                if '%' in line:
-                    # Extract percentage
-                    import re
-                    match = re.search(r'(\d+)%', line)
-                    if match:
-                        percentage = int(match.group(1))
-                        return {
-                            'percentage': percentage,
-                            'message': line.strip()
-                        }
-
-            return {'percentage': 0, 'message': 'Progress parsing in progress'}
+        since = None
+        if started_at is not None:
+            since = started_at.replace(tzinfo=timezone.utc).timestamp()
 
+        try:
+            return self.progress.snapshot(deployment_id, since=since, **(scope or {}))
         except Exception as e:
             logger.error(f"Error parsing logs: {str(e)}")
             return {'percentage': 0, 'error': str(e)}
@@ -0,0 +1,353 @@
+"""Server-Sent Events fan-out for setup-log and deployment progress.
+
+A single producer thread per process polls for new ``SetupLog`` rows (by
+id cursor) and for changes of subscribed deployments, then pushes deltas
+to every subscriber queue. N dashboards therefore cost one query loop per
+process instead of N independent polling loops, and the loop only runs
+while at least one browser is subscribed.
+
+Channels:
+    ``logs``: every new setup log entry
+    ``deployment:<id>``: status/progress changes of one deployment and the
+    setup logs of its target PCs
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import timezone
+from typing import Dict, Optional
+
+from models import db
+from models.deployment import Deployment
+from models.pc_status import PCStatus
+from models.setup_log import SetupLog
+from utils.deployment_progress import get_follower
+
+logger = logging.getLogger(__name__)
+
+LOGS_CHANNEL = 'logs'
+LOG_BATCH_SIZE = 1000
+
+
+def deployment_channel(deployment_id: int) -> str:
+    """Get the channel name of a deployment."""
+    return f'deployment:{deployment_id}'
+
+
+class Subscription:
+    """One subscriber (browser connection) of a channel.
+
+    Attributes:
+        channel (str): Subscribed channel
+        queue (queue.Queue): Pending events (name, data)
+    """
+
+    def __init__(self, channel: str, max_queue: int):
+        """Initialize subscription.
+
+        Args:
+            channel: Channel name
+            max_queue: Maximum number of pending events
+        """
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=max_queue)
+
+    def put(self, event: str, data: Dict[str, any]):
+        """Queue an event; a slow client gets a 'resync' instead of a backlog."""
+        try:
+            self.queue.put_nowait((event, data))
+        except queue.Full:
+            with self.queue.mutex:
+                self.queue.queue.clear()
+            self.queue.put_nowait(('resync', {'reason': 'client too slow'}))
+
+    def get(self, timeout: Optional[float] = None):
+        """Wait for the next event.
+
+        Raises:
+            queue.Empty: If no event arrived within timeout
+        """
+        return self.queue.get(timeout=timeout)
+
+
+class EventBroker:
+    """Poll once, fan out to all subscribers.
+
+    Attributes:
+        poll_interval (float): Seconds between producer ticks
+        heartbeat (float): Seconds between SSE keep-alive comments
+        max_streams (int): Subscriptions open at once in this process
+            (each holds a request thread; 0: unlimited)
+        autostart (bool): Start the producer thread on first subscription
+        ticks (int): Number of producer ticks run
+    """
+
+    def __init__(self):
+        """Initialize broker (call :meth:`init_app` before use)."""
+        self.poll_interval = 1.0
+        self.heartbeat = 15.0
+        self.max_queue = 1000
+        self.max_streams = 0
+        self.autostart = True
+        self.ticks = 0
+
+        self._app = None
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_log_id = None
+        self._deployments = {}
+
+    def init_app(self, app):
+        """Configure from the Flask app.
+
+        Args:
+            app: Flask application instance
+        """
+        self._app = app
+        self.poll_interval = app.config.get('EVENT_POLL_INTERVAL', 1.0)
+        self.heartbeat = app.config.get('EVENT_HEARTBEAT', 15.0)
+        self.max_queue = app.config.get('EVENT_MAX_QUEUE', 1000)
+        self.max_streams = app.config.get('EVENT_MAX_STREAMS', 0)
+        self.autostart = app.config.get('EVENT_PRODUCER_ENABLED', True)
+
+    # ============================================================
+    # Subscriptions
+    # ============================================================
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Subscribe to a channel and make sure the producer runs.
+
+        Args:
+            channel: Channel name
+
+        Returns:
+            Subscription object, or None if max_streams are already open
+        """
+        sub = Subscription(channel, self.max_queue)
+
+        with self._lock:
+            if self.max_streams and sum(
+                len(subs) for subs in self._subscribers.values()
+            ) >= self.max_streams:
+                return None
+            self._subscribers.setdefault(channel, set()).add(sub)
+            if self.autostart and self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='event-producer',
+                    daemon=True
+                )
+                self._thread.start()
+
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        """Remove a subscription.
+
+        Args:
+            sub: Subscription object
+        """
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+    def subscriber_count(self) -> int:
+        """Get total number of subscribers."""
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def publish(self, channel: str, event: str, data: Dict[str, any]):
+        """Send an event to all subscribers of a channel.
+
+        Args:
+            channel: Channel name
+            event: Event name
+            data: JSON serializable event data
+        """
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for sub in subs:
+            sub.put(event, data)
+
+    # ============================================================
+    # Producer
+    # ============================================================
+
+    def poll_once(self):
+        """Run one producer tick (requires an app context)."""
+        self.ticks += 1
+
+        with self._lock:
+            channels = set(self._subscribers)
+
+        deployment_ids = {
+            int(channel.split(':', 1)[1])
+            for channel in channels
+            if channel.startswith('deployment:')
+        }
+
+        # Forget deployments nobody watches any more
+        for deployment_id in list(self._deployments):
+            if deployment_id not in deployment_ids:
+                del self._deployments[deployment_id]
+
+        self._poll_logs(channels)
+        self._poll_deployments(deployment_ids)
+
+    def deployment_snapshot(self, deployment_id: int) -> Optional[Dict[str, any]]:
+        """Build the current state of a deployment (requires an app context).
+
+        Args:
+            deployment_id: Deployment ID
+
+        Returns:
+            Deployment state dictionary or None if not found
+        """
+        deployment = db.session.get(Deployment, deployment_id)
+        if deployment is None:
+            return None
+
+        # Read-only for request threads: the producer owns self._deployments
+        state = self._deployments.get(deployment_id) or self._load_targets(deployment)
+
+        return self._deployment_payload(deployment, state)
+
+    def _run(self):
+        """Producer thread body; exits when the last subscriber leaves."""
+        logger.info('Event producer started')
+
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    # Next producer starts from "now" again
+                    self._thread = None
+                    self._last_log_id = None
+                    self._deployments = {}
+                    break
+            try:
+                with self._app.app_context():
+                    self.poll_once()
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f'Event producer error: {e}')
+            time.sleep(self.poll_interval)
+
+        logger.info('Event producer stopped')
+
+    def _poll_logs(self, channels):
+        """Publish setup logs inserted since the last tick."""
+        if self._last_log_id is None:
+            # Start from "now": subscribers get deltas, not history
+            self._last_log_id = db.session.query(db.func.max(SetupLog.id)).scalar() or 0
+            return
+
+        new_logs = SetupLog.query.filter(
+            SetupLog.id > self._last_log_id
+        ).order_by(SetupLog.id).limit(LOG_BATCH_SIZE).all()
+
+        if not new_logs:
+            return
+
+        self._last_log_id = new_logs[-1].id
+
+        for log in new_logs:
+            data = log.to_dict()
+
+            if LOGS_CHANNEL in channels:
+                self.publish(LOGS_CHANNEL, 'log', data)
+
+            for deployment_id, state in self._deployments.items():
+                if log.serial in state['targets']:
+                    state['targets'][log.serial] = log.status
+                    self.publish(deployment_channel(deployment_id), 'log', data)
+
+    def _poll_deployments(self, deployment_ids):
+        """Publish status/progress of watched deployments when it changed."""
+        if not deployment_ids:
+            return
+
+        deployments = Deployment.query.filter(
+            Deployment.id.in_(deployment_ids)
+        ).all()
+
+        for deployment in deployments:
+            state = self._deployments.get(deployment.id)
+            if state is None:
+                state = self._load_targets(deployment)
+                self._deployments[deployment.id] = state
+
+            payload = self._deployment_payload(deployment, state)
+            if payload != state['last']:
+                state['last'] = payload
+                self.publish(deployment_channel(deployment.id), 'status', payload)
+
+    @staticmethod
+    def _load_targets(deployment) -> Dict[str, any]:
+        """Load the latest setup status of a deployment's target PCs once."""
+        serials = deployment.serials
+        targets = dict.fromkeys(serials, None)
+
+        if serials:
+            rows = db.session.query(PCStatus.serial, PCStatus.status).filter(
+                PCStatus.serial.in_(serials)
+            ).all()
+            for serial, status in rows:
+                targets[serial] = status
+
+        return {'targets': targets, 'last': None}
+
+    def _deployment_payload(self, deployment, state) -> Dict[str, any]:
+        """Build the deployment status event data."""
+        statuses = list(state['targets'].values())
+        payload = {
+            'deployment_id': deployment.id,
+            'status': deployment.status,
+            'progress': deployment.progress,
+            'started_at': deployment.started_at.isoformat() if deployment.started_at else None,
+            'completed_at': deployment.completed_at.isoformat() if deployment.completed_at else None,
+            'summary': {
+                'total': len(statuses),
+                'pending': sum(1 for s in statuses if s in (None, SetupLog.STATUS_PENDING)),
+                'in_progress': statuses.count(SetupLog.STATUS_IN_PROGRESS),
+                'completed': statuses.count(SetupLog.STATUS_COMPLETED),
+                'failed': statuses.count(SetupLog.STATUS_FAILED)
+            }
+        }
+
+        if deployment.status == 'running':
+            since = None
+            if deployment.started_at:
+                since = deployment.started_at.replace(tzinfo=timezone.utc).timestamp()
+            # Read only: the deployment scheduler tick writes progress to targets
+            drbl_progress = get_follower().snapshot(
+                deployment.id,
+                since=since,
+                **deployment.progress_scope()
+            )
+            drbl_progress.pop('updated_at', None)
+            payload['drbl_progress'] = drbl_progress
+
+        return payload
+
+
+def format_sse(event: str, data: Dict[str, any]) -> str:
+    """Format one Server-Sent Event.
+
+    Args:
+        event: Event name
+        data: JSON serializable event data
+
+    Returns:
+        SSE message string
+    """
+    return f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+event_broker = EventBroker()
@@ -0,0 +1,224 @@
+"""Streaming export of PC master data.
+
+Rows are read through a server-side cursor (``yield_per``) and encoded in
+chunks by a generator, so exporting 100k PCs keeps memory constant and the
+first bytes reach the client as soon as the first chunk is encoded.
+Output can be CSV or NDJSON, optionally gzip-compressed on the fly.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from models import db
+from models.pc_master import PCMaster
+from models.pc_status import PCStatus
+from models.setup_log import SetupLog
+from utils.pagination import prefix_filter
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+DEFAULT_COLUMNS = ('serial', 'pcname', 'odj_path', 'created_at')
+
+# Export column name -> selectable (latest_* come from pc_status)
+EXPORT_COLUMNS = {
+    'id': PCMaster.id,
+    'serial': PCMaster.serial,
+    'pcname': PCMaster.pcname,
+    'odj_path': PCMaster.odj_path,
+    'mac_address': PCMaster.mac_address,
+    'created_at': PCMaster.created_at,
+    'updated_at': PCMaster.updated_at,
+    'latest_status': PCStatus.status,
+    'latest_step': PCStatus.step,
+    'latest_timestamp': PCStatus.timestamp,
+    'latest_error': PCStatus.error_message,
+}
+
+# Latest setup status filter values besides the SetupLog statuses
+STATUS_NONE = 'none'
+
+
+class ExportOptions:
+    """Validated export options.
+
+    Attributes:
+        format (str): 'csv' or 'ndjson'
+        columns (list): Exported column names
+        compress (bool): gzip the output
+        odj (str): 'missing', 'present' or None
+        status (str): Latest setup status, 'none' (no logs) or None
+        serial (str): Serial prefix filter
+        pcname (str): PC name prefix filter
+        order (str): 'asc' or 'desc' by registration
+    """
+
+    def __init__(self, args: Dict[str, str]):
+        """Parse options from request query arguments.
+
+        Args:
+            args: Query arguments mapping
+
+        Raises:
+            ValueError: If an option is invalid
+        """
+        self.format = args.get('format', 'csv').lower()
+        if self.format not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+        # Repeated ?columns=a&columns=b (HTML form checkboxes) or "a,b"
+        columns = ','.join(args.getlist('columns')) if hasattr(args, 'getlist') \
+            else args.get('columns')
+        self.columns = [c.strip() for c in columns.split(',') if c.strip()] if columns \
+            else list(DEFAULT_COLUMNS)
+        unknown = [c for c in self.columns if c not in EXPORT_COLUMNS]
+        if unknown or not self.columns:
+            raise ValueError(
+                f"Unknown columns: {', '.join(unknown) or '(none)'}. "
+                f"Available: {', '.join(EXPORT_COLUMNS)}"
+            )
+
+        compress = args.get('compress', '').lower()
+        if compress not in ('', 'gzip'):
+            raise ValueError('compress must be gzip')
+        self.compress = compress == 'gzip'
+
+        self.odj = args.get('odj') or None
+        if self.odj not in (None, 'missing', 'present'):
+            raise ValueError('odj must be missing or present')
+
+        self.status = args.get('status') or None
+        statuses = (
+            SetupLog.STATUS_PENDING, SetupLog.STATUS_IN_PROGRESS,
+            SetupLog.STATUS_COMPLETED, SetupLog.STATUS_FAILED, STATUS_NONE
+        )
+        if self.status not in (None,) + statuses:
+            raise ValueError(f"status must be one of: {', '.join(statuses)}")
+
+        self.serial = args.get('serial') or None
+        self.pcname = args.get('pcname') or None
+
+        self.order = args.get('order', 'asc').lower()
+        if self.order not in ('asc', 'desc'):
+            raise ValueError('order must be asc or desc')
+
+    @property
+    def mimetype(self) -> str:
+        """Content type of the response."""
+        if self.compress:
+            return 'application/gzip'
+        return 'text/csv' if self.format == 'csv' else 'application/x-ndjson'
+
+    def filename(self, now: Optional[datetime] = None) -> str:
+        """Download file name."""
+        now = now or datetime.now()
+        name = f'pc_master_export_{now.strftime("%Y%m%d_%H%M%S")}.{self.format}'
+        return name + '.gz' if self.compress else name
+
+
+def build_export_query(options: ExportOptions):
+    """Build the SELECT of an export.
+
+    Args:
+        options: Export options
+
+    Returns:
+        SQLAlchemy Select
+    """
+    stmt = select(*[EXPORT_COLUMNS[c].label(c) for c in options.columns])
+    stmt = stmt.select_from(PCMaster)
+
+    needs_status = options.status is not None or any(
+        c.startswith('latest_') for c in options.columns
+    )
+    if needs_status:
+        stmt = stmt.outerjoin(PCStatus, PCStatus.serial == PCMaster.serial)
+
+    if options.odj == 'missing':
+        stmt = stmt.where((PCMaster.odj_path.is_(None)) | (PCMaster.odj_path == ''))
+    elif options.odj == 'present':
+        stmt = stmt.where(PCMaster.odj_path.isnot(None), PCMaster.odj_path != '')
+
+    if options.status == STATUS_NONE:
+        stmt = stmt.where(PCStatus.serial.is_(None))
+    elif options.status:
+        stmt = stmt.where(PCStatus.status == options.status)
+
+    if options.serial:
+        stmt = stmt.where(prefix_filter(PCMaster.serial, options.serial))
+    if options.pcname:
+        stmt = stmt.where(prefix_filter(PCMaster.pcname, options.pcname))
+
+    order = PCMaster.id.asc() if options.order == 'asc' else PCMaster.id.desc()
+    return stmt.order_by(order)
+
+
+def _format_value(value, csv_mode: bool):
+    """Convert a column value for output."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None and csv_mode:
+        return ''
+    return value
+
+
+def iter_export(options: ExportOptions, chunk_size: int = 1000) -> Iterator[bytes]:
+    """Yield encoded export chunks (requires an app context).
+
+    Args:
+        options: Export options
+        chunk_size: Rows fetched from the cursor and encoded per chunk
+
+    Yields:
+        Encoded (and optionally compressed) bytes
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if options.compress else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode('utf-8')
+        if compressor is None:
+            return data
+        # Sync flush: every chunk leaves the server now, not when zlib's
+        # buffer fills
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    csv_mode = options.format == 'csv'
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if csv_mode else None
+
+    if csv_mode:
+        writer.writerow(options.columns)
+        yield emit(buffer.getvalue())
+
+    result = db.session.execute(
+        build_export_query(options).execution_options(yield_per=chunk_size)
+    )
+
+    for rows in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            values = [_format_value(v, csv_mode) for v in row]
+            if csv_mode:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(options.columns, values)),
+                                        ensure_ascii=False))
+                buffer.write('\n')
+        chunk = emit(buffer.getvalue())
+        if chunk:
+            yield chunk
+
+    result.close()
+
+    if compressor:
+        yield compressor.flush()
+
+
+def export_columns() -> List[str]:
+    """Get available export column names."""
+    return list(EXPORT_COLUMNS)
@@ -0,0 +1,466 @@
+"""Incremental catalog of Clonezilla images.
+
+Walking every partclone chunk of every image to compute sizes takes seconds
+on a busy ``/home/partimag``. The catalog caches per-image metadata keyed on
+a signature of directory mtimes plus the mtime and size of the newest file:
+an unchanged image costs a few ``stat()`` calls per refresh and only images
+whose signature changed are rescanned. Creating a chunk file changes its
+directory's mtime, but Clonezilla grows the chunk it is writing in place,
+which only changes that file; being the newest file of the image, it is the
+one whose mtime and size are checked.
+
+The catalog is persisted as JSON so a restarted worker does not rescan all
+images, and an optional watcher thread keeps it warm (watchdog events when
+the package is installed, periodic polling otherwise).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    HAS_WATCHDOG = True
+except ImportError:  # pragma: no cover - optional dependency
+    FileSystemEventHandler = object
+    Observer = None
+    HAS_WATCHDOG = False
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 2
+CATALOG_FILENAME = '.image_catalog.json'
+
+
+class ImageCatalog:
+    """Cached, incrementally refreshed image metadata for one image home.
+
+    Attributes:
+        image_home (Path): Directory containing Clonezilla images
+        catalog_file (Path): JSON file the catalog is persisted to
+        min_refresh_interval (float): Seconds a full listing stays fresh
+        scan_count (int): Number of image directories rescanned
+    """
+
+    def __init__(
+        self,
+        image_home,
+        catalog_file=None,
+        min_refresh_interval: float = 2.0
+    ):
+        """Initialize catalog and load persisted entries.
+
+        Args:
+            image_home: Directory containing Clonezilla images
+            catalog_file: Persistence file (default: image_home/.image_catalog.json)
+            min_refresh_interval: Seconds a full listing stays fresh
+        """
+        self.image_home = Path(image_home)
+        self.catalog_file = Path(catalog_file) if catalog_file else (
+            self.image_home / CATALOG_FILENAME
+        )
+        self.min_refresh_interval = min_refresh_interval
+        self.scan_count = 0
+
+        self._entries = {}
+        self._last_refresh = 0.0
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._observer = None
+        self._stop_event = threading.Event()
+        self._pending = set()
+
+        self._load()
+
+    # ============================================================
+    # Lookup
+    # ============================================================
+
+    def list_images(self) -> List[Dict[str, Any]]:
+        """List all images, refreshing changed ones if the listing is stale.
+
+        Returns:
+            List of image entry dictionaries (copies)
+        """
+        with self._lock:
+            if time.monotonic() - self._last_refresh >= self.min_refresh_interval:
+                self.refresh()
+            return [dict(entry['info']) for entry in self._entries.values()]
+
+    def get(self, image_name: str) -> Optional[Dict[str, Any]]:
+        """Get a single image entry.
+
+        Only the requested image directory is checked, so this costs one
+        ``stat()`` when the image is unchanged.
+
+        Args:
+            image_name: Name of the Clonezilla image
+
+        Returns:
+            Image entry dictionary (copy) or None if not found
+        """
+        if not image_name or '/' in image_name or image_name.startswith('.'):
+            return None
+
+        with self._lock:
+            entry = self._refresh_image(self.image_home / image_name)
+            self._save()
+            return dict(entry['info']) if entry else None
+
+    def signature(self, image_name: str) -> Optional[Dict[str, Any]]:
+        """Get the signature of an up-to-date image entry.
+
+        Maps each directory (relative path) to its mtime and the newest file
+        to ``[mtime, size]`` (nanoseconds, bytes).
+
+        Args:
+            image_name: Name of the Clonezilla image
+
+        Returns:
+            Signature dictionary (copy) or None if not found
+        """
+        if not image_name or '/' in image_name or image_name.startswith('.'):
+            return None
+
+        with self._lock:
+            entry = self._refresh_image(self.image_home / image_name)
+            self._save()
+            return dict(entry['signature']) if entry else None
+
+    def get_verification(self, image_name: str) -> Optional[Dict[str, Any]]:
+        """Get the last verification result of an image.
+
+        The result is dropped whenever the image is rescanned, so a
+        returned result always describes the current image contents.
+
+        Args:
+            image_name: Name of the Clonezilla image
+
+        Returns:
+            Verification result dictionary or None if never verified
+        """
+        if not image_name or '/' in image_name or image_name.startswith('.'):
+            return None
+
+        with self._lock:
+            entry = self._refresh_image(self.image_home / image_name)
+            self._save()
+            return entry.get('verification') if entry else None
+
+    def set_verification(
+        self,
+        image_name: str,
+        result: Dict[str, Any],
+        signature: Dict[str, Any]
+    ) -> bool:
+        """Store a verification result.
+
+        Args:
+            image_name: Name of the Clonezilla image
+            result: Scan result (see ImageScanner.scan)
+            signature: Image signature taken before the scan started
+
+        Returns:
+            False if the image changed during the scan (result discarded)
+        """
+        with self._lock:
+            entry = self._refresh_image(self.image_home / image_name)
+            if entry is None or entry['signature'] != signature:
+                return False
+            entry['verification'] = result
+            entry['info']['verified_at'] = result.get('verified_at')
+            entry['info']['verified'] = result.get('verified')
+            self._dirty = True
+            self._save()
+            return True
+
+    def invalidate(self, image_name: Optional[str] = None):
+        """Drop cached entries so they are rescanned on next access.
+
+        Args:
+            image_name: Image to drop (None drops all)
+        """
+        with self._lock:
+            if image_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(image_name, None)
+            self._last_refresh = 0.0
+            self._dirty = True
+
+    # ============================================================
+    # Refresh
+    # ============================================================
+
+    def refresh(self, force: bool = False):
+        """Refresh the catalog from disk.
+
+        Args:
+            force: Rescan every image even if its directories are unchanged
+        """
+        with self._lock:
+            seen = set()
+
+            if self.image_home.exists():
+                for image_dir in self.image_home.iterdir():
+                    if image_dir.name.startswith('.'):
+                        continue
+                    entry = self._refresh_image(image_dir, force=force)
+                    if entry:
+                        seen.add(image_dir.name)
+            else:
+                logger.warning(f"Image directory not found: {self.image_home}")
+
+            for name in list(self._entries):
+                if name not in seen:
+                    del self._entries[name]
+                    self._dirty = True
+
+            self._last_refresh = time.monotonic()
+            self._save()
+
+    def _refresh_image(self, image_dir: Path, force: bool = False) -> Optional[Dict]:
+        """Return an up-to-date entry for one image directory."""
+        name = image_dir.name
+
+        try:
+            dir_stat = image_dir.stat()
+        except OSError:
+            if self._entries.pop(name, None) is not None:
+                self._dirty = True
+            return None
+
+        if not image_dir.is_dir():
+            return None
+
+        entry = self._entries.get(name)
+        if entry and not force and self._unchanged(image_dir, entry['signature']):
+            entry['info']['created'] = dir_stat.st_ctime
+            return entry
+
+        entry = self._scan(image_dir)
+        if entry is None:
+            self._entries.pop(name, None)
+        else:
+            self._entries[name] = entry
+        self._dirty = True
+        return entry
+
+    @staticmethod
+    def _unchanged(image_dir: Path, signature: Dict[str, Any]) -> bool:
+        """Check whether an image's directories and newest file are unchanged."""
+        for rel_path, stamp in signature.items():
+            try:
+                st = os.stat(image_dir / rel_path)
+            except OSError:
+                return False
+            if isinstance(stamp, list):
+                # Newest file: [mtime_ns, size]
+                if [st.st_mtime_ns, st.st_size] != stamp:
+                    return False
+            elif st.st_mtime_ns != stamp:
+                return False
+        return True
+
+    def _scan(self, image_dir: Path) -> Optional[Dict]:
+        """Walk an image directory and compute its metadata."""
+        # Check if directory contains Clonezilla image files
+        if not (image_dir / 'disk').exists() and not (image_dir / 'parts').exists():
+            return None
+
+        self.scan_count += 1
+
+        signature = {}
+        size_bytes = 0
+        disk_count = 0
+        newest = None
+        stack = ['']
+
+        while stack:
+            rel_path = stack.pop()
+            dir_path = image_dir / rel_path
+            try:
+                signature[rel_path] = os.stat(dir_path).st_mtime_ns
+                with os.scandir(dir_path) as entries:
+                    for item in entries:
+                        if item.is_dir():
+                            stack.append(os.path.join(rel_path, item.name))
+                        elif item.is_file():
+                            st = item.stat()
+                            size_bytes += st.st_size
+                            # Ties (coarse mtimes) go to the later chunk name
+                            file_path = os.path.join(rel_path, item.name)
+                            if newest is None or (st.st_mtime_ns, file_path) > (newest[1][0], newest[0]):
+                                newest = (file_path, [st.st_mtime_ns, st.st_size])
+                            if not rel_path and item.name.endswith('-pt.sf'):
+                                disk_count += 1
+            except OSError as e:
+                logger.warning(f"Error scanning image directory {dir_path}: {e}")
+
+        if newest is not None:
+            signature[newest[0]] = newest[1]
+
+        return {
+            'signature': signature,
+            'info': {
+                'name': image_dir.name,
+                'path': str(image_dir),
+                'size_bytes': size_bytes,
+                'created': image_dir.stat().st_ctime,
+                'disk_count': disk_count
+            }
+        }
+
+    # ============================================================
+    # Persistence
+    # ============================================================
+
+    def _load(self):
+        """Load persisted entries (missing or corrupt file is ignored)."""
+        try:
+            with open(self.catalog_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') != CATALOG_VERSION:
+            return
+
+        if data.get('image_home') != str(self.image_home):
+            return
+
+        self._entries = data.get('images', {})
+        logger.info(f"Image catalog loaded: {len(self._entries)} images")
+
+    def _save(self):
+        """Persist entries atomically if anything changed."""
+        if not self._dirty:
+            return
+
+        data = {
+            'version': CATALOG_VERSION,
+            'image_home': str(self.image_home),
+            'images': self._entries
+        }
+        tmp_file = self.catalog_file.with_name(f'{self.catalog_file.name}.tmp')
+
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.catalog_file)
+            self._dirty = False
+        except OSError as e:
+            logger.debug(f"Image catalog not persisted: {e}")
+
+    # ============================================================
+    # Watcher
+    # ============================================================
+
+    def start_watcher(self, interval: float = 30.0):
+        """Keep the catalog warm in a background thread.
+
+        With watchdog installed, filesystem events mark images for rescan
+        (this also catches chunk files growing in place); otherwise the
+        catalog is refreshed by polling every ``interval`` seconds.
+
+        Args:
+            interval: Seconds between refreshes
+        """
+        if self._watcher is not None:
+            return
+
+        self._stop_event.clear()
+
+        if HAS_WATCHDOG and self.image_home.exists():
+            self._observer = Observer()
+            self._observer.schedule(
+                _CatalogEventHandler(self), str(self.image_home), recursive=True
+            )
+            self._observer.daemon = True
+            self._observer.start()
+
+        self._watcher = threading.Thread(
+            target=self._watch_loop,
+            args=(interval,),
+            name='image-catalog-watcher',
+            daemon=True
+        )
+        self._watcher.start()
+
+        logger.info(
+            f"Image catalog watcher started "
+            f"({'watchdog' if self._observer else 'polling'}, {interval}s)"
+        )
+
+    def stop_watcher(self):
+        """Stop the background watcher."""
+        self._stop_event.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _mark_pending(self, path: str):
+        """Record the image containing a changed path."""
+        try:
+            rel = Path(path).relative_to(self.image_home)
+        except ValueError:
+            return
+        if rel.parts and not rel.parts[0].startswith('.'):
+            with self._lock:
+                self._pending.add(rel.parts[0])
+
+    def _watch_loop(self, interval: float):
+        """Watcher thread body."""
+        while not self._stop_event.wait(interval):
+            try:
+                if self._observer is not None:
+                    with self._lock:
+                        pending, self._pending = self._pending, set()
+                        for name in pending:
+                            self._refresh_image(self.image_home / name, force=True)
+                        self._save()
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Image catalog refresh failed: {e}")
+
+
+class _CatalogEventHandler(FileSystemEventHandler):
+    """Forward watchdog events to the catalog."""
+
+    def __init__(self, catalog: ImageCatalog):
+        self.catalog = catalog
+
+    def on_any_event(self, event):
+        self.catalog._mark_pending(event.src_path)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(image_home) -> ImageCatalog:
+    """Get the shared catalog for an image directory.
+
+    DRBLClient is instantiated by several API modules; sharing one catalog
+    per directory avoids scanning the same images once per module.
+
+    Args:
+        image_home: Directory containing Clonezilla images
+
+    Returns:
+        ImageCatalog instance
+    """
+    key = str(Path(image_home))
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = ImageCatalog(key)
+        return _catalogs[key]
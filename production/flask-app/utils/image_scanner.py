@@ -0,0 +1,248 @@
+"""Parallel size and checksum scanner for Clonezilla images.
+
+A Clonezilla image is a directory of partclone chunk files such as
+``sda2.ntfs-ptcl-img.zst.aa`` plus small metadata files, optionally with
+checksum lists (``MD5SUMS``, ``SHA1SUMS``, ``SHA512SUMS``, ``B2SUMS``)
+written by ``ocs-sr -gm/-gs/-gb``. Verifying a 40GB image file by file on
+one thread leaves the disk mostly idle, so the scanner hashes files on a
+thread pool: ``hashlib`` releases the GIL while digesting, so several
+readers keep the disk busy while the digests run on separate cores.
+
+The pool size bounds the number of files read concurrently; every reader
+streams its file through one reusable buffer, so memory stays at
+``workers * read_size`` regardless of the image size.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1024 * 1024
+DEFAULT_ALGORITHM = 'sha256'
+
+# Checksum list file name -> hashlib algorithm
+CHECKSUM_FILES = {
+    'MD5SUMS': 'md5',
+    'SHA1SUMS': 'sha1',
+    'SHA512SUMS': 'sha512',
+    'B2SUMS': 'blake2b',
+}
+
+# Files rewritten after the image is taken (not part of the image data)
+IGNORED_FILES = {'image_metadata.txt'}
+
+# <partition>.<filesystem>-ptcl-img.<codec>.<chunk> or <partition>.dd-img.<chunk>
+CHUNK_PATTERN = re.compile(r'^(?P<partition>[^.]+)\.(?P<filesystem>[^.]+?)-(?:ptcl-)?img(?:\.|$)')
+
+
+class ScanCancelled(Exception):
+    """Exception raised when a scan is cancelled."""
+    pass
+
+
+def parse_checksum_file(path: Path) -> Dict[str, str]:
+    """Parse a ``md5sum``-style checksum list.
+
+    Args:
+        path: Checksum list file
+
+    Returns:
+        Dictionary of relative file name -> lowercase hex digest
+    """
+    checksums = {}
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            parts = line.strip().split(None, 1)
+            if len(parts) != 2:
+                continue
+            digest, name = parts
+            name = name.lstrip('*')
+            if name.startswith('./'):
+                name = name[2:]
+            checksums[name] = digest.lower()
+    return checksums
+
+
+class ImageScanner:
+    """Walk an image directory and hash its chunk files in parallel.
+
+    Attributes:
+        workers (int): Files hashed concurrently
+        read_size (int): Bytes read per call
+    """
+
+    def __init__(self, workers: int = 4, read_size: int = READ_SIZE):
+        """Initialize scanner.
+
+        Args:
+            workers: Files hashed concurrently (bounds concurrent disk reads)
+            read_size: Bytes read per call
+        """
+        self.workers = max(1, workers)
+        self.read_size = read_size
+
+    def scan(
+        self,
+        image_dir,
+        cancel_event: Optional[threading.Event] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """Compute sizes and checksums of an image.
+
+        Files listed in checksum lists are verified against them; without
+        checksum lists the chunk files are hashed with ``sha256`` and the
+        digests are recorded for later comparison.
+
+        Args:
+            image_dir: Clonezilla image directory
+            cancel_event: Set to stop the scan (raises ScanCancelled)
+            progress: Called with (bytes_hashed, bytes_total) as files complete
+
+        Returns:
+            Scan result dictionary
+
+        Raises:
+            ScanCancelled: If cancel_event was set
+        """
+        image_dir = Path(image_dir)
+        started = time.monotonic()
+
+        files = self._walk(image_dir)
+        references = {}
+        for name, algorithm in CHECKSUM_FILES.items():
+            if name in files:
+                references[algorithm] = parse_checksum_file(image_dir / name)
+
+        partitions = {}
+        for rel_path, size in files.items():
+            match = CHUNK_PATTERN.match(os.path.basename(rel_path))
+            if not match:
+                continue
+            partition = partitions.setdefault(match.group('partition'), {
+                'filesystem': match.group('filesystem'),
+                'size_bytes': 0,
+                'chunk_count': 0
+            })
+            partition['size_bytes'] += size
+            partition['chunk_count'] += 1
+
+        # Files to hash, with the algorithms each one needs
+        targets = {}
+        for algorithm, checksums in references.items():
+            for name in checksums:
+                if name in files:
+                    targets.setdefault(name, set()).add(algorithm)
+        if not references:
+            for rel_path in files:
+                if CHUNK_PATTERN.match(os.path.basename(rel_path)):
+                    targets[rel_path] = {DEFAULT_ALGORITHM}
+
+        digests = self._hash_files(image_dir, targets, files, cancel_event, progress)
+
+        mismatches = []
+        missing = []
+        for algorithm, checksums in references.items():
+            for name, expected in sorted(checksums.items()):
+                if name not in files:
+                    missing.append(name)
+                elif digests[name][algorithm] != expected:
+                    mismatches.append({
+                        'file': name,
+                        'algorithm': algorithm,
+                        'expected': expected,
+                        'actual': digests[name][algorithm]
+                    })
+
+        hashed_bytes = sum(files[name] for name in targets)
+        duration = time.monotonic() - started
+
+        return {
+            'size_bytes': sum(files.values()),
+            'file_count': len(files),
+            'partitions': partitions,
+            'checksums': {name: digests[name] for name in sorted(digests)},
+            'checksum_files': sorted(n for n in CHECKSUM_FILES if n in files),
+            'verified': (not mismatches and not missing) if references else None,
+            'mismatches': mismatches,
+            'missing': missing,
+            'hashed_bytes': hashed_bytes,
+            'duration_seconds': round(duration, 3),
+            'throughput_mb_s': round(hashed_bytes / 1024 / 1024 / duration, 1) if duration else None,
+            'workers': self.workers,
+            'verified_at': datetime.utcnow().isoformat()
+        }
+
+    @staticmethod
+    def _walk(image_dir: Path) -> Dict[str, int]:
+        """Collect relative path -> size of every data file of an image."""
+        files = {}
+        stack = ['']
+        while stack:
+            rel_path = stack.pop()
+            with os.scandir(image_dir / rel_path) as entries:
+                for item in entries:
+                    item_rel = os.path.join(rel_path, item.name)
+                    if item.is_dir(follow_symlinks=False):
+                        stack.append(item_rel)
+                    elif item.is_file() and item_rel not in IGNORED_FILES:
+                        files[item_rel] = item.stat().st_size
+        return files
+
+    def _hash_files(self, image_dir, targets, files, cancel_event, progress):
+        """Hash target files on the worker pool."""
+        total = sum(files[name] for name in targets)
+        done = 0
+        digests = {}
+
+        # Largest first so one big chunk does not finish last on its own
+        order = sorted(targets, key=lambda name: files[name], reverse=True)
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix='image-scan') as executor:
+            futures = {
+                executor.submit(self._hash_file, image_dir / name,
+                                targets[name], cancel_event): name
+                for name in order
+            }
+            try:
+                for future in as_completed(futures):
+                    name = futures[future]
+                    digests[name] = future.result()
+                    done += files[name]
+                    if progress:
+                        progress(done, total)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return digests
+
+    def _hash_file(self, path: Path, algorithms, cancel_event) -> Dict[str, str]:
+        """Hash one file with one or more algorithms in a single pass."""
+        hashers = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+        buffer = bytearray(self.read_size)
+        view = memoryview(buffer)
+
+        with open(path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ScanCancelled(f'Scan cancelled: {path.name}')
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                for hasher in hashers.values():
+                    hasher.update(view[:n])
+
+        return {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
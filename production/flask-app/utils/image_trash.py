@@ -0,0 +1,192 @@
+"""Trash area and throttled space reclamation for deleted images.
+
+Removing a multi-GB image with ``shutil.rmtree`` inside a request blocks
+the worker for a long time, and the burst of metadata and extent-freeing
+I/O competes with a multicast session reading from the same disk.
+Deletion is therefore split in two:
+
+1. ``move``: the image directory is renamed into ``<image_home>/.trash``.
+   The rename is atomic on the same filesystem, so the image disappears
+   from the catalog at once and the request returns immediately.
+2. ``purge``: a background job unlinks the files at a limited rate.
+   Large chunk files are truncated in steps before unlinking so freeing
+   their extents is spread out too. While ``pause`` reports that a
+   deployment is running, reclamation waits.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRASH_DIRNAME = '.trash'
+TRUNCATE_STEP = 256 * 1024 * 1024
+PROGRESS_INTERVAL = 1.0
+
+
+class PurgeCancelled(Exception):
+    """Exception raised when a purge is cancelled."""
+    pass
+
+
+class ImageTrash:
+    """Trash directory of one image home.
+
+    Attributes:
+        image_home (Path): Directory containing Clonezilla images
+        trash_dir (Path): Directory deleted images are moved to
+    """
+
+    def __init__(self, image_home):
+        """Initialize trash.
+
+        Args:
+            image_home: Directory containing Clonezilla images
+        """
+        self.image_home = Path(image_home)
+        self.trash_dir = self.image_home / TRASH_DIRNAME
+
+    def move(self, image_name: str) -> Path:
+        """Move an image directory into the trash.
+
+        Args:
+            image_name: Name of the image directory
+
+        Returns:
+            Path of the image in the trash
+
+        Raises:
+            FileNotFoundError: If the image does not exist
+        """
+        self.trash_dir.mkdir(exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        target = self.trash_dir / f'{image_name}.{stamp}'
+        os.rename(self.image_home / image_name, target)
+        return target
+
+    def entries(self) -> List[Path]:
+        """List images waiting in the trash."""
+        if not self.trash_dir.exists():
+            return []
+        return sorted(p for p in self.trash_dir.iterdir() if p.is_dir())
+
+    def resolve(self, trash_name: str) -> Optional[Path]:
+        """Get the path of a trash entry (None if invalid or gone)."""
+        if not trash_name or '/' in trash_name or trash_name.startswith('.'):
+            return None
+        path = self.trash_dir / trash_name
+        return path if path.is_dir() else None
+
+    @staticmethod
+    def purge(
+        path: Path,
+        rate_bytes: int = 0,
+        cancel_event: Optional[threading.Event] = None,
+        progress: Optional[Callable[[Dict[str, any]], None]] = None,
+        pause: Optional[Callable[[], bool]] = None,
+        pause_poll: float = 10.0
+    ) -> Dict[str, any]:
+        """Delete a trashed image directory at a limited rate.
+
+        Args:
+            path: Trashed image directory
+            rate_bytes: Bytes freed per second (0: unlimited)
+            cancel_event: Set to stop the purge (raises PurgeCancelled)
+            progress: Called about once a second with progress counters
+            pause: Returns True while reclamation must wait
+            pause_poll: Seconds between pause checks while waiting
+
+        Returns:
+            Dictionary with bytes_total, bytes_freed, files_total,
+            files_removed, paused_seconds and duration_seconds
+
+        Raises:
+            PurgeCancelled: If cancel_event was set
+        """
+        files = []
+        dirs = []
+        for root, dir_names, file_names in os.walk(path):
+            dirs.append(root)
+            for name in file_names:
+                file_path = os.path.join(root, name)
+                try:
+                    files.append((file_path, os.lstat(file_path).st_size))
+                except OSError:
+                    continue
+
+        stats = {
+            'bytes_total': sum(size for _, size in files),
+            'bytes_freed': 0,
+            'files_total': len(files),
+            'files_removed': 0,
+            'paused_seconds': 0.0,
+            'duration_seconds': 0.0
+        }
+        started = time.monotonic()
+        last_report = 0.0
+
+        def checkpoint(freed: int):
+            """Account freed bytes, then wait for the rate, pause and cancel."""
+            nonlocal last_report
+            stats['bytes_freed'] += freed
+
+            if cancel_event is not None and cancel_event.is_set():
+                raise PurgeCancelled(f'Purge cancelled: {path.name}')
+
+            if pause is not None and pause():
+                logger.info(f'Image purge deferred while a deployment is running: {path.name}')
+                paused_at = time.monotonic()
+                while pause():
+                    if cancel_event is not None and cancel_event.wait(pause_poll):
+                        raise PurgeCancelled(f'Purge cancelled: {path.name}')
+                    if cancel_event is None:
+                        time.sleep(pause_poll)
+                stats['paused_seconds'] += time.monotonic() - paused_at
+
+            if rate_bytes:
+                active = time.monotonic() - started - stats['paused_seconds']
+                ahead = stats['bytes_freed'] / rate_bytes - active
+                if ahead > 0:
+                    time.sleep(ahead)
+
+            now = time.monotonic()
+            if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                progress(dict(stats))
+
+        checkpoint(0)
+
+        for file_path, size in files:
+            # Shrink big chunks in steps so their extents are freed gradually
+            remaining = size
+            while remaining > TRUNCATE_STEP:
+                try:
+                    os.truncate(file_path, remaining - TRUNCATE_STEP)
+                except OSError:
+                    break
+                remaining -= TRUNCATE_STEP
+                checkpoint(TRUNCATE_STEP)
+
+            try:
+                os.unlink(file_path)
+            except FileNotFoundError:
+                pass
+            stats['files_removed'] += 1
+            checkpoint(remaining)
+
+        for dir_path in reversed(dirs):
+            try:
+                os.rmdir(dir_path)
+            except OSError as e:
+                logger.warning(f'Could not remove trash directory {dir_path}: {e}')
+
+        stats['duration_seconds'] = round(time.monotonic() - started, 3)
+        stats['paused_seconds'] = round(stats['paused_seconds'], 3)
+        if progress is not None:
+            progress(dict(stats))
+        return stats
@@ -0,0 +1,391 @@
+"""Local background job runner for long-running operations.
+
+DRBL/Clonezilla commands such as ``dcs`` can run for several minutes. The
+job runner executes them on a worker thread pool so that request threads
+return immediately and keep serving ``/api/pcinfo`` and ``/api/log``.
+
+Jobs are persisted in the ``jobs`` table, so their state can be polled
+from any worker process via ``GET /api/jobs/<id>``. A job is claimed with
+an atomic ``UPDATE ... WHERE status='queued'`` so it runs at most once
+even when several processes share the database.
+
+Only the background services leader (see utils.background) runs jobs.
+Other workers persist the job and wake the leader through a wake file,
+so a job is not killed when gunicorn recycles the worker that received
+the request. At startup the leader fails jobs left running by a process
+that exited.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from models import db
+from models.job import Job
+from utils.background import WakeSignal
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Exception raised by a handler when it stops because of cancellation."""
+    pass
+
+
+class JobRunner:
+    """Persistent job queue executed by a local thread pool.
+
+    Attributes:
+        max_workers (int): Number of worker threads
+        eager (bool): Run jobs inline in the submitting thread (testing)
+        poll_interval (float): Seconds between checks for queued jobs
+        worker_id (str): Identifier of this process ('host:pid')
+    """
+
+    def __init__(self):
+        """Initialize runner (call :meth:`init_app` before use)."""
+        self.max_workers = 4
+        self.eager = False
+        self.poll_interval = 5.0
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._app = None
+        self._executor = None
+        self._handlers = {}
+        self._cancel_handlers = {}
+        self._lock = threading.Lock()
+        self._dispatched = set()
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake = WakeSignal()
+
+    def init_app(self, app):
+        """Configure the runner.
+
+        The worker pool is created by :meth:`start`, which only the
+        background services process calls.
+
+        Args:
+            app: Flask application instance
+        """
+        self._app = app
+        self.eager = app.config.get('JOB_RUNNER_EAGER', False)
+        self.max_workers = app.config.get('JOB_WORKERS', 4)
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', self.poll_interval)
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+        run_dir = app.config.get('DRBL_RUN_PATH')
+        self._wake = WakeSignal(Path(run_dir) / 'jobs.wake' if run_dir else None)
+
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            self._dispatched.clear()
+
+    def start(self):
+        """Recover jobs and run queued jobs in this process from now on."""
+        if not self.eager:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='job-worker'
+                    )
+
+        self.recover()
+
+        if not self.eager and self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='job-dispatcher',
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(f'Job runner started ({self.max_workers} workers)')
+
+    def recover(self):
+        """Re-queue queued jobs and fail running jobs of dead processes."""
+        with self._app.app_context():
+            self._recover()
+            db.session.remove()
+
+    def stop(self):
+        """Stop the dispatcher thread and wait for running jobs."""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def register(
+        self,
+        job_type: str,
+        handler: Callable[[Job], Optional[Dict[str, any]]],
+        cancel: Optional[Callable[[Job], None]] = None
+    ):
+        """Register a handler for a job type.
+
+        Args:
+            job_type: Job type name
+            handler: Callable receiving the Job and returning a JSON
+                serializable result
+            cancel: Callable invoked when a running job is cancelled
+        """
+        self._handlers[job_type] = handler
+        if cancel is not None:
+            self._cancel_handlers[job_type] = cancel
+
+    def submit(
+        self,
+        job_type: str,
+        params: Optional[Dict[str, any]] = None,
+        deployment_id: Optional[int] = None
+    ) -> Job:
+        """Persist a job and queue it for execution.
+
+        Args:
+            job_type: Registered job type name
+            params: JSON serializable handler parameters
+            deployment_id: Related deployment ID
+
+        Returns:
+            Job object (status 'queued', or final status in eager mode)
+
+        Raises:
+            ValueError: If no handler is registered for job_type
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f'Unknown job type: {job_type}')
+
+        job = Job(
+            job_type=job_type,
+            status=Job.STATUS_QUEUED,
+            deployment_id=deployment_id,
+            params=json.dumps(params or {})
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        logger.info(f'Job queued - job_id={job.id} type={job_type}')
+
+        self._dispatch(job.id)
+        return job
+
+    def cancel(self, job_id: int, invoke_handler: bool = True) -> Optional[Job]:
+        """Request cancellation of a job.
+
+        Queued jobs are cancelled immediately; running jobs are flagged and
+        their cancel handler (e.g. stop the DRBL session) is invoked.
+
+        Args:
+            job_id: Job ID
+            invoke_handler: Whether to call the registered cancel handler
+
+        Returns:
+            Updated Job object or None if not found
+        """
+        job = db.session.get(Job, job_id)
+        if job is None or not job.is_active:
+            return job
+
+        job.cancel_requested = True
+        if job.status == Job.STATUS_QUEUED:
+            job.status = Job.STATUS_CANCELLED
+            job.completed_at = datetime.utcnow()
+        db.session.commit()
+
+        logger.warning(f'Job cancel requested - job_id={job.id} status={job.status}')
+
+        cancel_handler = self._cancel_handlers.get(job.job_type)
+        if invoke_handler and job.status == Job.STATUS_RUNNING and cancel_handler:
+            cancel_handler(job)
+
+        return job
+
+    def report_progress(self, job_id: int, progress: Dict[str, any]):
+        """Publish progress of a running job (call from its handler).
+
+        Progress is stored in the job result next to the owning worker, so
+        it can be polled with ``GET /api/jobs/<id>`` from any process. The
+        handler's return value replaces it when the job finishes.
+
+        Args:
+            job_id: Job ID
+            progress: JSON serializable progress counters
+        """
+        Job.query.filter_by(id=job_id, status=Job.STATUS_RUNNING).update({
+            'result': json.dumps(
+                {'worker': self.worker_id, 'progress': progress},
+                default=str
+            )
+        }, synchronize_session=False)
+        db.session.commit()
+
+    def stats(self) -> Dict[str, any]:
+        """Get queue statistics.
+
+        Returns:
+            Dictionary with job counts per status and pool size
+        """
+        counts = dict(
+            db.session.query(Job.status, db.func.count(Job.id))
+            .group_by(Job.status)
+            .all()
+        )
+        return {
+            'workers': self.max_workers,
+            'eager': self.eager,
+            'queued': counts.get(Job.STATUS_QUEUED, 0),
+            'running': counts.get(Job.STATUS_RUNNING, 0),
+            'counts': counts
+        }
+
+    def _dispatch(self, job_id: int):
+        """Run a job inline (eager), hand it to the pool, or wake the leader."""
+        if self.eager:
+            self._execute(job_id)
+            return
+
+        with self._lock:
+            executor = self._executor
+            duplicate = job_id in self._dispatched
+            if executor is not None and not duplicate:
+                self._dispatched.add(job_id)
+
+        if executor is None:
+            # Not the leader: its dispatcher picks the job up
+            self._wake.notify()
+        elif not duplicate:
+            executor.submit(self._run_in_context, job_id)
+
+    def _dispatch_queued(self):
+        """Hand queued jobs of registered types to the pool."""
+        queued = [
+            job_id for job_id, job_type in
+            db.session.query(Job.id, Job.job_type)
+            .filter(Job.status == Job.STATUS_QUEUED)
+            .order_by(Job.id)
+            .all()
+            if job_type in self._handlers
+        ]
+        for job_id in queued:
+            self._dispatch(job_id)
+
+    def _run(self):
+        """Dispatcher thread body (leader only)."""
+        while not self._stop_event.is_set():
+            self._wake.wait(self.poll_interval)
+            if self._stop_event.is_set():
+                break
+            try:
+                with self._app.app_context():
+                    self._dispatch_queued()
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f'Job dispatch failed: {e}')
+
+    def _run_in_context(self, job_id: int):
+        """Pool entry point: execute a job inside an app context."""
+        with self._app.app_context():
+            try:
+                self._execute(job_id)
+            except Exception as e:
+                logger.error(f'Job runner error - job_id={job_id} error={e}', exc_info=True)
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._dispatched.discard(job_id)
+
+    def _execute(self, job_id: int):
+        """Claim and run a job, recording its outcome."""
+        # Atomic claim: only one worker/process can move queued -> running
+        claimed = Job.query.filter_by(
+            id=job_id,
+            status=Job.STATUS_QUEUED,
+            cancel_requested=False
+        ).update({
+            'status': Job.STATUS_RUNNING,
+            'started_at': datetime.utcnow(),
+            'error': None,
+            'result': json.dumps({'worker': self.worker_id})
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if not claimed:
+            return
+
+        job = db.session.get(Job, job_id)
+        db.session.refresh(job)
+        handler = self._handlers.get(job.job_type)
+
+        logger.info(f'Job started - job_id={job.id} type={job.job_type}')
+
+        try:
+            if handler is None:
+                raise ValueError(f'No handler registered for {job.job_type}')
+            result = handler(job)
+            db.session.refresh(job)
+            job.status = (
+                Job.STATUS_CANCELLED if job.cancel_requested
+                else Job.STATUS_COMPLETED
+            )
+            job.result = json.dumps(result, default=str) if result is not None else None
+        except JobCancelled as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = Job.STATUS_CANCELLED
+            job.error = str(e) or None
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = Job.STATUS_FAILED
+            job.error = str(e)
+            logger.error(f'Job failed - job_id={job_id} error={e}')
+
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+
+        logger.info(f'Job finished - job_id={job.id} status={job.status}')
+
+    def _recover(self):
+        """Re-queue queued jobs and fail running jobs of dead processes."""
+        hostname = socket.gethostname()
+
+        for job in Job.query.filter_by(status=Job.STATUS_RUNNING).all():
+            owner = (job.get_result() or {}).get('worker', '')
+            owner_host, _, owner_pid = owner.rpartition(':')
+            if owner_host == hostname and _pid_alive(owner_pid):
+                continue
+            job.status = Job.STATUS_FAILED
+            job.error = 'Interrupted by server restart'
+            job.completed_at = datetime.utcnow()
+            logger.warning(f'Job interrupted - job_id={job.id} type={job.job_type}')
+        db.session.commit()
+
+        self._dispatch_queued()
+
+
+def _pid_alive(pid: str) -> bool:
+    """Check whether a local process is still running."""
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+job_runner = JobRunner()
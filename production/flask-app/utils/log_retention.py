@@ -0,0 +1,337 @@
+"""Retention and archival of setup logs.
+
+Every agent step inserts a ``SetupLog`` row, so ``setup_logs`` grows
+without bound. Retention keeps the latest ``keep`` entries per serial (and
+anything younger than ``min_age_days``) in the hot table and moves older
+rows into monthly archive files under ``LOG_ARCHIVE_PATH``::
+
+    setup_logs-2025-11.ndjson.zst   (zstandard installed)
+    setup_logs-2025-11.ndjson.gz    (otherwise)
+
+Each batch appends one independently compressed NDJSON frame per month;
+concatenated frames are valid zstd/gzip streams, so the files can also be
+read with ``zstdcat``/``zcat``. The frame's byte range and the serials it
+contains are recorded in ``log_archive_segments``/``log_archive_entries``,
+and the archived rows are deleted in the same transaction. A crash after
+writing a frame but before the commit leaves unreferenced bytes, never
+lost or duplicated logs.
+"""
+
+import fcntl
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, text
+
+from models import db
+from models.log_archive import LogArchiveEntry, LogArchiveSegment
+from models.log_idempotency import LogIdempotencyKey
+from models.setup_log import SetupLog
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+SERIAL_CHUNK_SIZE = 200
+DELETE_CHUNK_SIZE = 500
+
+
+def _compress(data: bytes, suffix: str) -> bytes:
+    """Compress one frame."""
+    if suffix == '.zst':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(frame: bytes, suffix: str) -> bytes:
+    """Decompress one frame."""
+    if suffix == '.zst':
+        if not HAS_ZSTD:
+            raise RuntimeError('zstandard is required to read .zst archives')
+        return zstandard.ZstdDecompressor().decompress(frame)
+    return gzip.decompress(frame)
+
+
+class LogRetention:
+    """Archive old setup logs in batches.
+
+    Attributes:
+        archive_dir (Path): Directory of archive files
+        keep (int): Entries kept per serial in the hot table
+        min_age_days (int): Entries younger than this are never archived
+        batch_size (int): Maximum rows archived per transaction
+        interval (int): Seconds between background runs (0: disabled)
+    """
+
+    def __init__(self):
+        """Initialize retention (call :meth:`init_app` before use)."""
+        self.archive_dir = Path('archive/setup_logs')
+        self.keep = 200
+        self.min_age_days = 30
+        self.batch_size = 5000
+        self.interval = 0
+        self.idempotency_max_age_hours = 168
+
+        self._app = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def init_app(self, app):
+        """Configure from the Flask app.
+
+        Args:
+            app: Flask application instance
+        """
+        self._app = app
+        self.archive_dir = Path(app.config.get('LOG_ARCHIVE_PATH', self.archive_dir))
+        self.keep = max(1, app.config.get('LOG_RETENTION_KEEP', self.keep))
+        self.min_age_days = app.config.get('LOG_RETENTION_MIN_AGE_DAYS', self.min_age_days)
+        self.batch_size = app.config.get('LOG_RETENTION_BATCH_SIZE', self.batch_size)
+        self.interval = app.config.get('LOG_RETENTION_INTERVAL', 0)
+
+    def start(self):
+        """Start the background thread if LOG_RETENTION_INTERVAL is set."""
+        if self.interval and self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='log-retention',
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(f'Log retention started (every {self.interval}s)')
+
+    @property
+    def suffix(self) -> str:
+        """Compression suffix of new archive frames."""
+        return '.zst' if HAS_ZSTD else '.gz'
+
+    # ============================================================
+    # Archiving
+    # ============================================================
+
+    def run(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Archive eligible logs (requires an app context).
+
+        Only one process archives at a time; others return immediately.
+
+        Args:
+            max_batches: Stop after this many batches (None: until done)
+
+        Returns:
+            Dictionary with archived, batches and keys_purged counts
+            (skipped=1 if another process holds the lock)
+        """
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        stats = {'archived': 0, 'batches': 0, 'keys_purged': 0, 'skipped': 0}
+
+        with open(self.archive_dir / '.lock', 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                stats['skipped'] = 1
+                return stats
+
+            cutoff = datetime.utcnow() - timedelta(days=self.min_age_days)
+
+            while max_batches is None or stats['batches'] < max_batches:
+                ids = self._select_batch(cutoff)
+                if not ids:
+                    break
+                stats['archived'] += self._archive_batch(ids)
+                stats['batches'] += 1
+
+            stats['keys_purged'] = LogIdempotencyKey.purge_expired(
+                self.idempotency_max_age_hours
+            )
+            db.session.commit()
+
+        if stats['archived']:
+            logger.info(
+                f"Setup logs archived - rows={stats['archived']} "
+                f"batches={stats['batches']}"
+            )
+        return stats
+
+    def _select_batch(self, cutoff: datetime) -> List[int]:
+        """Pick IDs of up to batch_size archivable logs."""
+        # Only serials over the limit need ranking (index-only GROUP BY)
+        serials = [
+            row[0] for row in db.session.query(SetupLog.serial)
+            .group_by(SetupLog.serial)
+            .having(func.count(SetupLog.id) > self.keep)
+        ]
+
+        ids = []
+        for start in range(0, len(serials), SERIAL_CHUNK_SIZE):
+            ranked = select(
+                SetupLog.id,
+                SetupLog.timestamp,
+                func.row_number().over(
+                    partition_by=SetupLog.serial,
+                    order_by=(SetupLog.timestamp.desc(), SetupLog.id.desc())
+                ).label('rn')
+            ).where(
+                SetupLog.serial.in_(serials[start:start + SERIAL_CHUNK_SIZE])
+            ).subquery()
+
+            ids.extend(db.session.execute(
+                select(ranked.c.id)
+                .where(ranked.c.rn > self.keep, ranked.c.timestamp < cutoff)
+                .order_by(ranked.c.id)
+                .limit(self.batch_size - len(ids))
+            ).scalars())
+
+            if len(ids) >= self.batch_size:
+                break
+
+        return ids
+
+    def _archive_batch(self, ids: List[int]) -> int:
+        """Write one frame per month and delete the rows in one transaction."""
+        logs = SetupLog.query.filter(SetupLog.id.in_(ids)).order_by(SetupLog.id).all()
+
+        by_month = defaultdict(list)
+        for log in logs:
+            by_month[log.timestamp.strftime('%Y-%m')].append(log)
+
+        try:
+            for month, month_logs in sorted(by_month.items()):
+                file_name = f'setup_logs-{month}.ndjson{self.suffix}'
+                payload = ''.join(
+                    json.dumps(log.to_dict(), ensure_ascii=False) + '\n'
+                    for log in month_logs
+                ).encode('utf-8')
+                offset, length = self._append_frame(
+                    self.archive_dir / file_name,
+                    _compress(payload, self.suffix)
+                )
+
+                segment = LogArchiveSegment(
+                    month=month,
+                    file_name=file_name,
+                    offset=offset,
+                    length=length,
+                    record_count=len(month_logs),
+                    first_log_id=month_logs[0].id,
+                    last_log_id=month_logs[-1].id
+                )
+                db.session.add(segment)
+                db.session.flush()
+
+                per_serial = defaultdict(int)
+                for log in month_logs:
+                    per_serial[log.serial] += 1
+                db.session.add_all(
+                    LogArchiveEntry(serial=serial, segment_id=segment.id, record_count=count)
+                    for serial, count in per_serial.items()
+                )
+
+            for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+                SetupLog.query.filter(
+                    SetupLog.id.in_(ids[start:start + DELETE_CHUNK_SIZE])
+                ).delete(synchronize_session=False)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return len(logs)
+
+    @staticmethod
+    def _append_frame(path: Path, frame: bytes):
+        """Append a compressed frame durably and return its byte range."""
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+        return offset, len(frame)
+
+    # ============================================================
+    # Retrieval
+    # ============================================================
+
+    def read(self, serial: str, limit: Optional[int] = None) -> List[Dict[str, any]]:
+        """Read archived logs of a serial (requires an app context).
+
+        Only the frames listed in the archive index for this serial are
+        read and decompressed.
+
+        Args:
+            serial: PC serial number
+            limit: Return only the newest entries
+
+        Returns:
+            List of log dictionaries ordered by timestamp
+        """
+        segments = LogArchiveSegment.query.join(
+            LogArchiveEntry, LogArchiveEntry.segment_id == LogArchiveSegment.id
+        ).filter(LogArchiveEntry.serial == serial).order_by(LogArchiveSegment.id).all()
+
+        entries = []
+        for segment in segments:
+            path = self.archive_dir / segment.file_name
+            with open(path, 'rb') as f:
+                f.seek(segment.offset)
+                frame = f.read(segment.length)
+            for line in _decompress(frame, path.suffix).decode('utf-8').splitlines():
+                entry = json.loads(line)
+                if entry['serial'] == serial:
+                    entries.append(entry)
+
+        entries.sort(key=lambda e: (e['timestamp'] or '', e['id']))
+        if limit is not None:
+            entries = entries[-limit:]
+        return entries
+
+    # ============================================================
+    # Maintenance
+    # ============================================================
+
+    @staticmethod
+    def compact():
+        """Return free pages to the filesystem (requires an app context).
+
+        Rows deleted by archiving leave free pages in the SQLite file; VACUUM
+        rewrites the file so backups stay small. Blocks writers while running.
+        """
+        if db.engine.dialect.name != 'sqlite':
+            return
+        db.session.remove()
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('VACUUM'))
+            conn.execute(text('PRAGMA wal_checkpoint(TRUNCATE)'))
+
+    def _run(self):
+        """Background thread body."""
+        while not self._stop_event.wait(self.interval):
+            try:
+                with self._app.app_context():
+                    self.run()
+                    db.session.remove()
+            except Exception as e:
+                logger.error(f'Log retention failed: {e}')
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+log_retention = LogRetention()
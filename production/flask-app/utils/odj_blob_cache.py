@@ -0,0 +1,314 @@
+"""In-process cache of hot ODJ blobs.
+
+Hundreds of PCs booting at once each download their ODJ blob from
+``GET /api/odj/blob/<serial>``. Blobs are a few kilobytes, so the hot set
+fits in memory: this module keeps a byte-bounded LRU of
+``path -> (contents, sha256)`` and answers hits without touching the disk.
+
+Within ``ttl`` seconds of the last check an entry is served as is; after
+that a single ``stat()`` revalidates it (size and mtime unchanged keeps the
+entry), so a blob rewritten on disk is picked up by every worker process
+within ``ttl`` seconds. Blobs larger than ``max_blob_bytes`` are not cached
+and are served with ``send_file`` (sendfile) instead.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from models import db
+from models.odj_file import OdjFile, file_sha256
+
+logger = logging.getLogger(__name__)
+
+
+class CachedBlob:
+    """One cached ODJ blob.
+
+    Attributes:
+        data (bytes): File contents
+        sha256 (str): SHA-256 of the contents (strong ETag)
+        size (int): File size when cached
+        mtime_ns (int): File mtime when cached
+        checked_at (float): Monotonic time of the last revalidation
+    """
+
+    __slots__ = ('data', 'sha256', 'size', 'mtime_ns', 'checked_at')
+
+    def __init__(self, data: bytes, sha256: str, size: int, mtime_ns: int):
+        self.data = data
+        self.sha256 = sha256
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.checked_at = time.monotonic()
+
+
+class OdjBlobCache:
+    """Thread-safe LRU cache of ODJ path -> blob, bounded by total bytes.
+
+    Attributes:
+        max_bytes (int): Maximum total size of cached blobs
+        max_blob_bytes (int): Largest blob that is cached
+        ttl (int): Seconds between revalidations of an entry (0: every hit)
+        hits (int): Number of lookups answered from memory
+        misses (int): Number of lookups that fell through to the disk
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024,
+                 max_blob_bytes: int = 256 * 1024, ttl: int = 30):
+        """Initialize cache.
+
+        Args:
+            max_bytes: Maximum total size of cached blobs
+            max_blob_bytes: Largest blob that is cached
+            ttl: Seconds between revalidations of an entry
+        """
+        self.max_bytes = max_bytes
+        self.max_blob_bytes = max_blob_bytes
+        self.ttl = ttl
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_bytes: int, max_blob_bytes: int, ttl: int,
+                  enabled: bool = True):
+        """Update cache limits and trim existing entries.
+
+        Args:
+            max_bytes: Maximum total size of cached blobs
+            max_blob_bytes: Largest blob that is cached
+            ttl: Seconds between revalidations of an entry
+            enabled: Whether lookups should use the cache
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.max_blob_bytes = max_blob_bytes
+            self.ttl = ttl
+            self.enabled = enabled
+            if not enabled:
+                self._entries.clear()
+                self._size = 0
+            self._trim()
+
+    def cacheable(self, size: int) -> bool:
+        """Check whether a blob of this size would be cached."""
+        return self.enabled and size <= min(self.max_blob_bytes, self.max_bytes)
+
+    def get(self, path: str) -> Optional[CachedBlob]:
+        """Look up a blob, revalidating it against the file after ttl.
+
+        Args:
+            path: ODJ file path
+
+        Returns:
+            CachedBlob or None on a miss (or if the file changed)
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                self.misses += 1
+                return None
+            stale = time.monotonic() - entry.checked_at >= self.ttl
+
+        if stale:
+            try:
+                st = os.stat(path)
+                changed = (st.st_size, st.st_mtime_ns) != (entry.size, entry.mtime_ns)
+            except OSError:
+                changed = True
+            if changed:
+                self.invalidate(path)
+                with self._lock:
+                    self.misses += 1
+                return None
+            entry.checked_at = time.monotonic()
+
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+            self.hits += 1
+        return entry
+
+    def put(self, path: str, data: bytes, sha256: str, st: os.stat_result):
+        """Insert or replace a blob.
+
+        Args:
+            path: ODJ file path
+            data: File contents
+            sha256: SHA-256 of the contents
+            st: stat() result of the file the contents were read from
+        """
+        if not self.cacheable(len(data)):
+            return
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._size -= len(old.data)
+            self._entries[path] = CachedBlob(data, sha256, st.st_size, st.st_mtime_ns)
+            self._size += len(data)
+            self._trim()
+
+    def invalidate(self, path: str):
+        """Remove a blob from the cache.
+
+        Args:
+            path: ODJ file path
+        """
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._size -= len(entry.data)
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with size, limits and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'max_blob_bytes': self.max_blob_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _trim(self):
+        """Evict least recently used blobs above the byte limit.
+
+        Must be called with the lock held.
+        """
+        while self._size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= len(entry.data)
+            self.evictions += 1
+
+
+odj_blob_cache = OdjBlobCache()
+
+
+def stored_hash(odj_path: str, st: os.stat_result) -> Optional[str]:
+    """Get the inventory SHA-256 of a file if it is up to date with st.
+
+    Args:
+        odj_path: ODJ file path
+        st: Current stat() result of the file
+
+    Returns:
+        Hex digest or None if the file has no current inventory row
+    """
+    row = db.session.query(
+        OdjFile.sha256, OdjFile.size_bytes, OdjFile.mtime_ns
+    ).filter(OdjFile.path == odj_path).first()
+    if row and row.sha256 and (row.size_bytes, row.mtime_ns) == (st.st_size, st.st_mtime_ns):
+        return row.sha256
+    return None
+
+
+def refresh_hash(odj_path: str, odj_dir) -> str:
+    """Hash a changed file, updating its inventory row (committed).
+
+    Files outside the ODJ directory (associated by path) are hashed without
+    being recorded, as their names may clash with inventory files.
+
+    Args:
+        odj_path: ODJ file path
+        odj_dir: ODJ files directory (ODJ_FILES_PATH)
+
+    Returns:
+        Hex digest
+    """
+    if Path(odj_path).parent.resolve() == Path(odj_dir).resolve():
+        odj_file = OdjFile.record(odj_path)
+        db.session.commit()
+        if odj_file is not None:
+            return odj_file.sha256
+    return file_sha256(odj_path)
+
+
+def read_blob(odj_path: str, odj_dir) -> Optional[CachedBlob]:
+    """Read a blob from disk, record its hash and cache it.
+
+    Args:
+        odj_path: ODJ file path
+        odj_dir: ODJ files directory (ODJ_FILES_PATH)
+
+    Returns:
+        CachedBlob (not cached if larger than max_blob_bytes) or None if
+        the file does not exist
+    """
+    try:
+        st = os.stat(odj_path)
+        # The only disk read for this blob until it changes
+        with open(odj_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != stored_hash(odj_path, st):
+        # Inventory row missing or stale: record the current hash
+        if refresh_hash(odj_path, odj_dir) != digest:
+            # Rewritten while reading; serve it, but do not cache it
+            return CachedBlob(data, digest, st.st_size, st.st_mtime_ns)
+
+    odj_blob_cache.put(odj_path, data, digest, st)
+    logger.info(f'ODJ blob cached - file={os.path.basename(odj_path)} size={len(data)}')
+    return CachedBlob(data, digest, st.st_size, st.st_mtime_ns)
+
+
+def load_blob(odj_path: str, odj_dir) -> Optional[CachedBlob]:
+    """Get a blob from the cache, reading it from disk on a miss.
+
+    Args:
+        odj_path: ODJ file path
+        odj_dir: ODJ files directory (ODJ_FILES_PATH)
+
+    Returns:
+        CachedBlob or None if the file does not exist
+    """
+    blob = odj_blob_cache.get(odj_path)
+    if blob is not None:
+        return blob
+    return read_blob(odj_path, odj_dir)
+
+
+def init_app(app):
+    """Configure the blob cache from the application config.
+
+    Args:
+        app: Flask application instance
+    """
+    odj_blob_cache.configure(
+        max_bytes=app.config.get('ODJ_BLOB_CACHE_MB', 16) * 1024 * 1024,
+        max_blob_bytes=app.config.get('ODJ_BLOB_CACHE_MAX_BLOB_KB', 256) * 1024,
+        ttl=app.config.get('ODJ_BLOB_CACHE_TTL', 30),
+        enabled=app.config.get('ODJ_BLOB_CACHE_ENABLED', True)
+    )
+    odj_blob_cache.clear()
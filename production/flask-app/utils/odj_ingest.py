@@ -0,0 +1,550 @@
+"""Bulk ingest of ODJ files from a zip or tar archive.
+
+The AD team hands over ``djoin /provision /savefile`` output for a whole
+batch as one archive. The archive is read straight from the request stream:
+zip entries are parsed from their local headers (the central directory at
+the end is never needed) and tar archives are read with ``tarfile``'s
+stream mode, so neither is buffered. Entries are validated, hashed and
+written to temporary files on a thread pool while the next entries are
+read; at most ``2 * workers`` entries are in memory at a time.
+
+Valid files are matched to ``PCMaster`` rows by their file name (without
+extension) using ordered rules, ``pcname`` and/or ``serial``. Once the
+whole archive was read, the files are moved into place and every
+association is applied in one transaction. A corrupt archive applies
+nothing.
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import struct
+import tarfile
+import uuid
+import xml.etree.ElementTree as ET
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from werkzeug.utils import secure_filename
+
+from models import db
+from models.odj_file import OdjFile
+from models.pc_master import PCMaster
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+MAX_ODJ_SIZE = 10 * 1024 * 1024
+ODJ_EXTENSIONS = {'txt', 'odj'}
+MATCH_RULES = ('pcname', 'serial')
+
+ZIP_LOCAL_HEADER = b'PK\x03\x04'
+ZIP_CENTRAL_HEADER = b'PK\x01\x02'
+ZIP_END_RECORD = b'PK\x05\x06'
+ZIP_DATA_DESCRIPTOR = b'PK\x07\x08'
+ZIP_LOCAL_FORMAT = struct.Struct('<HHHHHIIIHH')
+ZIP64_MARKER = 0xFFFFFFFF
+ZIP64_EXTRA_ID = 0x0001
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# djoin writes a base64 blob; hand-written test files are XML
+BASE64_PATTERN = re.compile(r'^[A-Za-z0-9+/]+={0,2}$')
+
+
+class IngestError(Exception):
+    """Exception raised when an archive cannot be read."""
+    pass
+
+
+class _StreamReader:
+    """Forward-only reader with push-back over a non-seekable stream."""
+
+    def __init__(self, stream):
+        """Initialize reader.
+
+        Args:
+            stream: Binary file-like object with read()
+        """
+        self._stream = stream
+        self._buffer = b''
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes (all remaining bytes if size < 0)."""
+        if size is None or size < 0:
+            data = self._buffer + self._stream.read()
+            self._buffer = b''
+            return data
+        if self._buffer:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+        return self._stream.read(size)
+
+    def read_exact(self, size: int) -> bytes:
+        """Read exactly size bytes.
+
+        Raises:
+            IngestError: If the stream ends first
+        """
+        parts = []
+        remaining = size
+        while remaining > 0:
+            data = self.read(min(remaining, READ_SIZE))
+            if not data:
+                raise IngestError('Archive is truncated')
+            parts.append(data)
+            remaining -= len(data)
+        return b''.join(parts)
+
+    def skip(self, size: int):
+        """Discard exactly size bytes."""
+        while size > 0:
+            data = self.read(min(size, READ_SIZE))
+            if not data:
+                raise IngestError('Archive is truncated')
+            size -= len(data)
+
+    def peek(self, size: int) -> bytes:
+        """Return up to size bytes without consuming them."""
+        while len(self._buffer) < size:
+            data = self._stream.read(size - len(self._buffer))
+            if not data:
+                break
+            self._buffer += data
+        return self._buffer[:size]
+
+    def push(self, data: bytes):
+        """Put bytes back in front of the stream."""
+        if data:
+            self._buffer = data + self._buffer
+
+
+def iter_zip_entries(reader: _StreamReader,
+                     max_size: int) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Read the file entries of a zip archive from its local headers.
+
+    Args:
+        reader: Stream positioned at the first local header
+        max_size: Largest entry kept in memory
+
+    Yields:
+        Tuples of (entry name, contents or None, error or None)
+
+    Raises:
+        IngestError: If the archive is corrupt or cannot be streamed
+    """
+    while True:
+        signature = reader.peek(4)
+        if signature in (ZIP_CENTRAL_HEADER, ZIP_END_RECORD) or not signature:
+            return
+        if signature != ZIP_LOCAL_HEADER:
+            raise IngestError('Not a zip archive or corrupt local header')
+        reader.skip(4)
+
+        (_, flags, method, _, _, crc, csize, usize,
+         name_length, extra_length) = ZIP_LOCAL_FORMAT.unpack(
+            reader.read_exact(ZIP_LOCAL_FORMAT.size)
+        )
+        raw_name = reader.read_exact(name_length)
+        extra = reader.read_exact(extra_length)
+        name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437', errors='replace')
+
+        zip64 = False
+        if ZIP64_MARKER in (csize, usize):
+            zip64 = True
+            usize, csize = _zip64_sizes(extra, usize, csize)
+
+        has_descriptor = bool(flags & 0x08)
+        if flags & 0x01:
+            if has_descriptor:
+                raise IngestError(f'Encrypted entry cannot be streamed: {name}')
+            reader.skip(csize)
+            yield name, None, 'Encrypted entries are not supported'
+            continue
+
+        if method == ZIP_STORED:
+            if has_descriptor:
+                raise IngestError(f'Stored entry with data descriptor cannot be streamed: {name}')
+            if csize > max_size:
+                reader.skip(csize)
+                data, error = None, 'File too large'
+            else:
+                data, error = reader.read_exact(csize), None
+        elif method == ZIP_DEFLATED:
+            data, error = _inflate(reader, max_size)
+        elif has_descriptor:
+            raise IngestError(f'Unsupported compression method {method}: {name}')
+        else:
+            reader.skip(csize)
+            data, error = None, f'Unsupported compression method {method}'
+
+        if has_descriptor:
+            if reader.peek(4) == ZIP_DATA_DESCRIPTOR:
+                reader.skip(4)
+            crc = struct.unpack('<I', reader.read_exact(4))[0]
+            reader.skip(16 if zip64 else 8)
+
+        if data is not None and zlib.crc32(data) != crc:
+            data, error = None, 'CRC mismatch'
+
+        if name.endswith('/'):
+            continue
+        yield name, data, error
+
+
+def _zip64_sizes(extra: bytes, usize: int, csize: int) -> Tuple[int, int]:
+    """Read the 64-bit sizes of a zip64 local header."""
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, length = struct.unpack_from('<HH', extra, offset)
+        if header_id == ZIP64_EXTRA_ID:
+            field = offset + 4
+            if usize == ZIP64_MARKER:
+                usize = struct.unpack_from('<Q', extra, field)[0]
+                field += 8
+            if csize == ZIP64_MARKER:
+                csize = struct.unpack_from('<Q', extra, field)[0]
+            return usize, csize
+        offset += 4 + length
+    raise IngestError('Zip64 entry without zip64 extra field')
+
+
+def _inflate(reader: _StreamReader, max_size: int) -> Tuple[Optional[bytes], Optional[str]]:
+    """Inflate one deflated zip entry, stopping at the end of its stream.
+
+    Output beyond max_size is discarded (the stream is still consumed), so
+    a compression bomb does not grow memory.
+    """
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    parts = []
+    size = 0
+    try:
+        while not decompressor.eof:
+            chunk = reader.read(READ_SIZE)
+            if not chunk:
+                raise IngestError('Archive is truncated')
+            while True:
+                data = decompressor.decompress(chunk, READ_SIZE)
+                chunk = decompressor.unconsumed_tail
+                size += len(data)
+                if size <= max_size:
+                    parts.append(data)
+                if decompressor.eof or (not chunk and len(data) < READ_SIZE):
+                    break
+    except zlib.error as e:
+        raise IngestError(f'Corrupt deflate data: {e}') from e
+
+    reader.push(decompressor.unused_data)
+    if size > max_size:
+        return None, 'File too large'
+    return b''.join(parts), None
+
+
+def iter_tar_entries(reader: _StreamReader,
+                     max_size: int) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Read the file entries of a (compressed) tar archive in stream mode.
+
+    Args:
+        reader: Stream positioned at the start of the archive
+        max_size: Largest entry kept in memory
+
+    Yields:
+        Tuples of (entry name, contents or None, error or None)
+
+    Raises:
+        IngestError: If the archive is corrupt
+    """
+    try:
+        with tarfile.open(fileobj=reader, mode='r|*') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                if member.size > max_size:
+                    yield member.name, None, 'File too large'
+                    continue
+                yield member.name, archive.extractfile(member).read(), None
+    except (tarfile.TarError, EOFError, zlib.error, OSError) as e:
+        raise IngestError(f'Corrupt tar archive: {e}') from e
+
+
+def validate_odj(data: bytes) -> str:
+    """Check that a file looks like ODJ provisioning data.
+
+    Args:
+        data: File contents
+
+    Returns:
+        'djoin' for a base64 blob, 'xml' for an XML document
+
+    Raises:
+        ValueError: If the file is not ODJ data
+    """
+    if not data:
+        raise ValueError('File is empty')
+
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        encoding = 'utf-16'
+    elif data.startswith(b'\xef\xbb\xbf'):
+        encoding = 'utf-8-sig'
+    elif len(data) > 1 and data[1] == 0:
+        encoding = 'utf-16-le'
+    else:
+        encoding = 'utf-8'
+    try:
+        text = data.decode(encoding).strip().strip('\x00')
+    except UnicodeDecodeError:
+        raise ValueError('File is not text')
+
+    if not text:
+        raise ValueError('File is empty')
+
+    if text.startswith('<'):
+        try:
+            ET.fromstring(text.encode('utf-8'))
+        except ET.ParseError as e:
+            raise ValueError(f'Invalid XML: {e}')
+        return 'xml'
+
+    blob = ''.join(text.split())
+    if not BASE64_PATTERN.match(blob):
+        raise ValueError('File is neither a djoin blob nor XML')
+    try:
+        base64.b64decode(blob, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError('Invalid base64 blob')
+    return 'djoin'
+
+
+class OdjIngest:
+    """Ingest an archive of ODJ files into the ODJ directory.
+
+    Attributes:
+        odj_dir (Path): ODJ files directory
+        workers (int): Entries validated and written concurrently
+        rules (tuple): PCMaster fields matched against file names, in order
+        max_size (int): Largest accepted ODJ file
+        max_entries (int): Largest accepted number of archive entries
+    """
+
+    def __init__(self, odj_dir, workers: int = 4, rules=MATCH_RULES,
+                 max_size: int = MAX_ODJ_SIZE, max_entries: int = 5000):
+        """Initialize ingest.
+
+        Args:
+            odj_dir: ODJ files directory
+            workers: Entries validated and written concurrently
+            rules: PCMaster fields matched against file names, in order
+            max_size: Largest accepted ODJ file
+            max_entries: Largest accepted number of archive entries
+
+        Raises:
+            ValueError: If a rule is not pcname or serial
+        """
+        invalid = [rule for rule in rules if rule not in MATCH_RULES]
+        if invalid or not rules:
+            raise ValueError(f'Match rules must be among {", ".join(MATCH_RULES)}')
+        self.odj_dir = Path(odj_dir)
+        self.workers = max(1, workers)
+        self.rules = tuple(rules)
+        self.max_size = max_size
+        self.max_entries = max_entries
+
+    def ingest(self, stream, archive_format: Optional[str] = None,
+               dry_run: bool = False) -> Dict[str, any]:
+        """Read an archive, store valid files and associate them with PCs.
+
+        Args:
+            stream: Binary stream of a zip or (compressed) tar archive
+            archive_format: 'zip' or 'tar' (None: detect)
+            dry_run: Validate and match only, write nothing
+
+        Returns:
+            Dictionary with a summary and a report entry per archive file
+
+        Raises:
+            IngestError: If the archive is corrupt; nothing is applied
+        """
+        reader = _StreamReader(stream)
+        if archive_format is None:
+            head = reader.peek(4)
+            if not head:
+                raise IngestError('Archive is empty')
+            archive_format = 'zip' if head in (ZIP_LOCAL_HEADER, ZIP_END_RECORD) else 'tar'
+        if archive_format == 'zip':
+            entries = iter_zip_entries(reader, self.max_size)
+        elif archive_format == 'tar':
+            entries = iter_tar_entries(reader, self.max_size)
+        else:
+            raise IngestError(f'Unsupported archive format: {archive_format}')
+
+        if not dry_run:
+            self.odj_dir.mkdir(parents=True, exist_ok=True)
+
+        report = self._stage_entries(entries, dry_run)
+        staged = [entry for entry in report if entry['status'] == 'valid']
+        self._match(staged)
+        if not dry_run:
+            self._apply(staged)
+
+        summary = {'entries': len(report), 'format': archive_format, 'dry_run': dry_run}
+        for entry in report:
+            summary[entry['status']] = summary.get(entry['status'], 0) + 1
+            entry.pop('_temp', None)
+            entry.pop('_pc', None)
+        return {'summary': summary, 'files': report}
+
+    def _stage_entries(self, entries, dry_run: bool) -> List[Dict[str, any]]:
+        """Validate, hash and write entries to temporary files on the pool."""
+        report = []
+        seen = set()
+        inflight = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix='odj-ingest') as executor:
+            try:
+                for name, data, error in entries:
+                    if len(report) >= self.max_entries:
+                        raise IngestError(f'Archive has more than {self.max_entries} entries')
+
+                    basename = name.replace('\\', '/').rsplit('/', 1)[-1]
+                    entry = {
+                        'entry': name,
+                        'filename': secure_filename(basename),
+                        'status': 'valid',
+                        'error': None
+                    }
+                    report.append(entry)
+
+                    if '__MACOSX/' in name or basename.startswith('.'):
+                        entry['status'] = 'skipped'
+                        continue
+                    if error is None:
+                        error = self._check_name(entry['filename'], seen)
+                    if error is not None:
+                        entry['status'] = 'invalid'
+                        entry['error'] = error
+                        continue
+                    seen.add(entry['filename'].lower())
+
+                    if len(inflight) >= 2 * self.workers:
+                        done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    inflight.add(executor.submit(self._stage, entry, data, dry_run))
+
+                for future in wait(inflight).done:
+                    future.result()
+            except BaseException:
+                for future in inflight:
+                    future.cancel()
+                wait(inflight)
+                self._discard(report)
+                raise
+
+        return report
+
+    @staticmethod
+    def _check_name(filename: str, seen) -> Optional[str]:
+        """Check the sanitized name of an entry."""
+        if not filename or '.' not in filename:
+            return 'Invalid file name'
+        if filename.rsplit('.', 1)[1].lower() not in ODJ_EXTENSIONS:
+            return f'Invalid file format. Allowed extensions: {", ".join(sorted(ODJ_EXTENSIONS))}'
+        if filename.lower() in seen:
+            return 'Duplicate file name in archive'
+        return None
+
+    def _stage(self, entry: Dict[str, any], data: bytes, dry_run: bool):
+        """Validate, hash and write one entry (runs on the pool)."""
+        entry['size_bytes'] = len(data)
+        try:
+            entry['kind'] = validate_odj(data)
+        except ValueError as e:
+            entry['status'] = 'invalid'
+            entry['error'] = str(e)
+            return
+        entry['sha256'] = hashlib.sha256(data).hexdigest()
+
+        if dry_run:
+            return
+        temp = self.odj_dir / f".{entry['filename']}.{uuid.uuid4().hex}.part"
+        try:
+            with open(temp, 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            entry['status'] = 'error'
+            entry['error'] = f'Could not write file: {e}'
+            return
+        entry['_temp'] = temp
+
+    @staticmethod
+    def _discard(report: List[Dict[str, any]]):
+        """Remove temporary files of staged entries."""
+        for entry in report:
+            temp = entry.pop('_temp', None)
+            if temp is not None:
+                try:
+                    temp.unlink()
+                except OSError:
+                    pass
+
+    def _match(self, staged: List[Dict[str, any]]):
+        """Match staged entries to PCs by their file name (case-insensitive)."""
+        keys = {entry['filename'].rsplit('.', 1)[0].upper() for entry in staged}
+        candidates = {}
+        for rule in self.rules:
+            column = getattr(PCMaster, rule)
+            by_key = {}
+            for pc in PCMaster.query.filter(func.upper(column).in_(keys)).all():
+                by_key.setdefault(getattr(pc, rule).upper(), []).append(pc)
+            candidates[rule] = by_key
+
+        claimed = {}
+        for entry in staged:
+            key = entry['filename'].rsplit('.', 1)[0].upper()
+            entry['status'] = 'unmatched'
+            for rule in self.rules:
+                pcs = candidates[rule].get(key, [])
+                if len(pcs) > 1:
+                    entry['status'] = 'ambiguous'
+                    entry['error'] = f'{len(pcs)} PCs have this {rule}'
+                    continue
+                if len(pcs) == 1:
+                    pc = pcs[0]
+                    if pc.id in claimed:
+                        entry['status'] = 'ambiguous'
+                        entry['error'] = f"PC {pc.serial} already matched by {claimed[pc.id]}"
+                        break
+                    claimed[pc.id] = entry['filename']
+                    entry.update(status='associated', error=None, matched_by=rule,
+                                 serial=pc.serial, pcname=pc.pcname)
+                    entry['_pc'] = pc
+                    break
+
+    def _apply(self, staged: List[Dict[str, any]]):
+        """Move staged files into place and apply associations in one transaction."""
+        try:
+            for entry in staged:
+                path = self.odj_dir / entry['filename']
+                os.replace(entry.pop('_temp'), path)
+                entry['path'] = str(path)
+                OdjFile.record(path)
+                pc = entry.pop('_pc', None)
+                if pc is not None:
+                    pc.odj_path = str(path)
+            db.session.commit()
+        except BaseException:
+            db.session.rollback()
+            self._discard(staged)
+            raise
+
+        logger.info(
+            f'ODJ archive ingested: {len(staged)} files, '
+            f"{sum(1 for e in staged if e['status'] == 'associated')} associated"
+        )
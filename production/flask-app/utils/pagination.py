@@ -0,0 +1,127 @@
+"""Keyset (cursor) pagination helpers.
+
+``query.paginate()`` issues ``OFFSET n`` plus a ``COUNT(*)`` for every page,
+so page 1000 of a 50k-PC fleet reads and discards 50k rows. Keyset
+pagination instead continues *after* the last row of the previous page::
+
+    WHERE (created_at, id) < (:last_created_at, :last_id)
+    ORDER BY created_at DESC, id DESC LIMIT :per_page
+
+which is a range scan on a matching composite index and costs the same
+on every page. The position is passed to clients as an opaque ``after``
+token.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode sort key values as an opaque cursor token.
+
+    Args:
+        values: Sort key values of the last row (datetime, int, str)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = [
+        {'dt': v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, size: int) -> Tuple:
+    """Decode a cursor token.
+
+    Args:
+        token: Cursor string from :func:`encode_cursor`
+        size: Expected number of sort key values
+
+    Returns:
+        Tuple of sort key values
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw.decode('utf-8'))
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(v['dt']) if isinstance(v, dict) else v
+            for v in payload
+        )
+    except (ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def prefix_filter(column, prefix: str):
+    """Build an index-friendly prefix match.
+
+    ``LIKE 'abc%'`` only uses an index under specific collation settings;
+    the equivalent range ``column >= 'abc' AND column < 'abd'`` always can.
+    The match is case-sensitive.
+
+    Args:
+        column: String column
+        prefix: Prefix to match
+
+    Returns:
+        SQLAlchemy filter expression
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (column >= prefix) & (column < upper)
+
+
+def keyset_page(
+    query,
+    order_columns: Sequence,
+    per_page: int,
+    after: Optional[str] = None,
+    offset: int = 0
+) -> Tuple[List, Optional[str]]:
+    """Fetch one page ordered descending by the given columns.
+
+    The last order column must be unique (usually the primary key) so the
+    order is total.
+
+    Args:
+        query: Filtered SQLAlchemy query (without ordering)
+        order_columns: Columns of the descending sort key
+        per_page: Page size
+        after: Cursor of the previous page's last row
+        offset: Row offset (page-number compatibility; ignored with after)
+
+    Returns:
+        tuple: (items, next_cursor) - next_cursor is None on the last page
+
+    Raises:
+        ValueError: If after is malformed
+    """
+    if after:
+        values = decode_cursor(after, len(order_columns))
+        query = query.filter(tuple_(*order_columns) < tuple_(*values))
+        offset = 0
+
+    query = query.order_by(*[column.desc() for column in order_columns])
+    if offset:
+        query = query.offset(offset)
+
+    # One extra row tells whether a next page exists without a COUNT(*)
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in order_columns])
+
+    return items, next_cursor
@@ -0,0 +1,443 @@
+"""In-process serial -> PC info lookup cache.
+
+This module keeps a bounded, in-memory index of ``serial -> (pcname, odj_path)``
+so that ``GET /api/pcinfo`` can answer boot-storm traffic without touching
+the database on a hit.
+
+The index is warmed when the application starts and is kept correct by
+write-through updates: ORM inserts/updates/deletes of ``PCMaster`` are
+collected at flush time and applied to the cache once the transaction
+commits (and discarded on rollback). Bulk paths that bypass the ORM queue
+their changes with :func:`write_through`.
+
+Every worker process holds its own cache. The serials changed by a commit
+are appended to a journal file shared by the workers
+(``PCINFO_CACHE_JOURNAL``); each lookup stats the journal and, when it has
+grown, drops the serials appended since the last lookup. A change committed
+by one worker is therefore visible to all of them on their next lookup. The
+journal is replaced by an empty file when it gets large; a worker that sees
+a new file clears its whole cache. The TTL only bounds staleness when the
+journal is disabled or cannot be written.
+
+A miss is filled from the database with :meth:`PCInfoCache.put`. Callers
+pass the :attr:`PCInfoCache.generation` read before their query, so a row
+read before an invalidation that lands during the query is not cached.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# session.info key holding pending cache changes for the current transaction
+_PENDING_KEY = 'pcinfo_cache_pending'
+
+# Journal size at which it is replaced by an empty file
+JOURNAL_MAX_BYTES = 1024 * 1024
+
+
+class PCInfoCache:
+    """Thread-safe LRU cache of serial -> (pcname, odj_path).
+
+    Attributes:
+        max_entries (int): Maximum number of cached serials
+        ttl (int): Entry lifetime in seconds (0 disables expiry)
+        journal_path (str): Change journal shared by the worker processes
+            (None: changes are only applied to this process)
+        hits (int): Number of lookups answered from the cache
+        misses (int): Number of lookups that fell through to the database
+        remote_invalidations (int): Serials dropped because another process
+            (or thread) changed them
+        generation (int): Incremented whenever entries may have been
+            invalidated
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: int = 300,
+                 journal_path: Optional[str] = None):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached serials
+            ttl: Entry lifetime in seconds (0 disables expiry)
+            journal_path: Change journal shared by the worker processes
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = True
+        self.journal_path = journal_path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.remote_invalidations = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # (inode, offset) of the journal read so far
+        self._journal = self._journal_end()
+
+    def configure(self, max_entries: int, ttl: int, enabled: bool = True,
+                  journal_path: Optional[str] = None):
+        """Update cache limits and trim existing entries.
+
+        Changes journaled before this call are skipped; callers warm or
+        clear the cache afterwards.
+
+        Args:
+            max_entries: Maximum number of cached serials
+            ttl: Entry lifetime in seconds
+            enabled: Whether lookups should use the cache
+            journal_path: Change journal shared by the worker processes
+        """
+        if journal_path:
+            try:
+                os.makedirs(os.path.dirname(journal_path) or '.', exist_ok=True)
+            except OSError as e:
+                logger.warning(f"PC info cache journal disabled - {journal_path}: {e}")
+                journal_path = None
+
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self.enabled = enabled
+            self.journal_path = journal_path
+            self._journal = self._journal_end()
+            self.generation += 1
+            self._trim()
+
+    def get(self, serial: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Look up a serial number.
+
+        Args:
+            serial: PC serial number
+
+        Returns:
+            Tuple of (pcname, odj_path) or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._read_journal()
+            entry = self._entries.get(serial)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[serial]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(serial)
+            self.hits += 1
+            return value
+
+    def put(self, serial: str, pcname: str, odj_path: Optional[str],
+            generation: Optional[int] = None):
+        """Insert or replace a cache entry.
+
+        Args:
+            serial: PC serial number
+            pcname: PC name
+            odj_path: ODJ file path (may be None)
+            generation: :attr:`generation` read before the value was
+                queried; the entry is not stored if it has changed since
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[serial] = ((pcname, odj_path), time.monotonic())
+            self._entries.move_to_end(serial)
+            self._trim()
+
+    def apply(self, changes: Dict[str, Optional[Tuple[str, Optional[str]]]]):
+        """Apply committed changes and publish them to the other processes.
+
+        Args:
+            changes: Mapping of serial -> (pcname, odj_path), or None for a
+                deleted serial
+        """
+        self._append_journal(changes)
+
+        now = time.monotonic()
+        with self._lock:
+            # Also reads our own lines; a serial another writer changed in
+            # the meantime is left to the database
+            foreign = self._read_journal()
+            self.generation += 1
+            for serial, value in changes.items():
+                self._entries.pop(serial, None)
+                if value is not None and self.enabled and serial not in foreign:
+                    self._entries[serial] = (value, now)
+            self._trim()
+
+    def invalidate(self, serial: str):
+        """Remove a serial from the cache.
+
+        Args:
+            serial: PC serial number
+        """
+        with self._lock:
+            self._entries.pop(serial, None)
+            self.generation += 1
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def warm(self, rows: Iterable[Tuple[str, str, Optional[str]]]) -> int:
+        """Bulk-load entries.
+
+        Args:
+            rows: Iterable of (serial, pcname, odj_path) tuples
+
+        Returns:
+            int: Number of entries loaded
+        """
+        if not self.enabled:
+            return 0
+
+        now = time.monotonic()
+        loaded = 0
+        with self._lock:
+            for serial, pcname, odj_path in rows:
+                if loaded >= self.max_entries:
+                    break
+                self._entries[serial] = ((pcname, odj_path), now)
+                loaded += 1
+            self._trim()
+        return loaded
+
+    def stats(self) -> Dict[str, any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with size, limits and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'journal': self.journal_path,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'remote_invalidations': self.remote_invalidations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _trim(self):
+        """Evict least recently used entries above the size limit.
+
+        Must be called with the lock held.
+        """
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ============================================================
+    # Change journal
+    # ============================================================
+
+    def _journal_end(self) -> Optional[Tuple[int, int]]:
+        """Get the (inode, size) of the journal, None if there is none."""
+        if not self.journal_path:
+            return None
+        try:
+            st = os.stat(self.journal_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size)
+
+    def _append_journal(self, changes: Dict[str, object]):
+        """Append changed serials to the journal.
+
+        Each line is "<writer> <serial>". Lines are written with one
+        O_APPEND write, so concurrent writers do not interleave.
+        """
+        if not self.journal_path or not changes:
+            return
+
+        writer = _writer_id()
+        data = ''.join(f'{writer} {serial}\n' for serial in changes).encode('utf-8')
+        try:
+            end = self._journal_end()
+            if end is not None and end[1] > JOURNAL_MAX_BYTES:
+                # New inode: every process clears its cache once
+                tmp_path = f'{self.journal_path}.{os.getpid()}.tmp'
+                open(tmp_path, 'wb').close()
+                os.replace(tmp_path, self.journal_path)
+
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"PC info cache journal write failed - {self.journal_path}: {e}")
+
+    def _read_journal(self) -> set:
+        """Drop the serials other processes changed since the last read.
+
+        Must be called with the lock held.
+
+        Returns:
+            Serials journaled by other writers in this read
+        """
+        end = self._journal_end()
+        if end is None or end == self._journal:
+            return set()
+
+        inode, size = end
+        offset = 0
+        if self._journal is not None:
+            if self._journal[0] != inode or size < self._journal[1]:
+                # Replaced: the lines we have not read are gone
+                self.remote_invalidations += len(self._entries)
+                self._entries.clear()
+                self.generation += 1
+            else:
+                offset = self._journal[1]
+
+        try:
+            with open(self.journal_path, 'rb') as journal:
+                journal.seek(offset)
+                data = journal.read(size - offset)
+        except OSError:
+            return set()
+
+        # A line still being written is read next time
+        complete = data.rfind(b'\n') + 1
+        self._journal = (inode, offset + complete)
+        if complete:
+            self.generation += 1
+
+        own = _writer_id()
+        foreign = set()
+        for line in data[:complete].decode('utf-8', 'replace').splitlines():
+            writer, _, serial = line.partition(' ')
+            if writer != own:
+                foreign.add(serial)
+            if self._entries.pop(serial, None) is not None and writer != own:
+                self.remote_invalidations += 1
+        return foreign
+
+
+def _writer_id() -> str:
+    """Identify the journal writer (process and thread)."""
+    return f'{os.getpid()}:{threading.get_ident()}'
+
+
+pcinfo_cache = PCInfoCache()
+
+
+# ============================================================
+# Write-through hooks
+# ============================================================
+
+def _record_change(session, serial, value):
+    """Queue a cache change until the session commits."""
+    session.info.setdefault(_PENDING_KEY, {})[serial] = value
+
+
+def write_through(session, serial: str, pcname: str, odj_path: Optional[str]):
+    """Queue a cache update for a write that bypasses ORM events.
+
+    Bulk INSERT/UPDATE statements do not fire mapper events; callers use
+    this so the change is applied when ``session`` commits.
+
+    Args:
+        session: SQLAlchemy session performing the write
+        serial: PC serial number
+        pcname: PC name
+        odj_path: ODJ file path (may be None)
+    """
+    _record_change(session, serial, (pcname, odj_path))
+
+
+def _after_insert(mapper, connection, target):
+    _record_change(
+        Session.object_session(target),
+        target.serial,
+        (target.pcname, target.odj_path)
+    )
+
+
+def _after_update(mapper, connection, target):
+    session = Session.object_session(target)
+    # Serial renamed: drop the old key as well
+    for old_serial in inspect(target).attrs.serial.history.deleted or ():
+        _record_change(session, old_serial, None)
+    _record_change(session, target.serial, (target.pcname, target.odj_path))
+
+
+def _after_delete(mapper, connection, target):
+    _record_change(Session.object_session(target), target.serial, None)
+
+
+def _after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    pcinfo_cache.apply(pending)
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _after_drop(target, connection, **kw):
+    pcinfo_cache.clear()
+
+
+def init_app(app):
+    """Configure the cache, register write-through hooks and warm it.
+
+    Must be called after the database tables exist.
+
+    Args:
+        app: Flask application instance
+    """
+    from models import db, PCMaster
+
+    pcinfo_cache.configure(
+        max_entries=app.config.get('PCINFO_CACHE_SIZE', 10000),
+        ttl=app.config.get('PCINFO_CACHE_TTL', 300),
+        enabled=app.config.get('PCINFO_CACHE_ENABLED', True),
+        journal_path=app.config.get('PCINFO_CACHE_JOURNAL')
+    )
+
+    if not event.contains(PCMaster, 'after_insert', _after_insert):
+        event.listen(PCMaster, 'after_insert', _after_insert)
+        event.listen(PCMaster, 'after_update', _after_update)
+        event.listen(PCMaster, 'after_delete', _after_delete)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+        event.listen(db.metadata, 'after_drop', _after_drop)
+
+    with app.app_context():
+        pcinfo_cache.clear()
+        rows = db.session.query(
+            PCMaster.serial, PCMaster.pcname, PCMaster.odj_path
+        ).order_by(PCMaster.updated_at.desc()).limit(pcinfo_cache.max_entries)
+        loaded = pcinfo_cache.warm(rows)
+        db.session.remove()
+
+    logger.info(f"PC info cache warmed - entries={loaded}")
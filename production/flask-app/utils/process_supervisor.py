@@ -0,0 +1,537 @@
+"""Asyncio supervisor for DRBL/Clonezilla processes.
+
+``dcs``/``drbl-ocs`` run for minutes and print progress continuously.
+Running them with ``subprocess.run(capture_output=True)`` buffers all
+output until exit and pins a thread per command, and the only way to stop
+one was ``pkill -f dcs``, which also hits unrelated processes.
+
+The supervisor runs one asyncio event loop in a daemon thread:
+
+- every command starts in its own session, so it leads a process group
+  that also contains the udp-sender/partclone children it spawns;
+- stdout/stderr are read line by line (``\\r``-redrawn progress lines
+  included) into bounded ring buffers and an optional line callback such
+  as the deployment progress parser;
+- timeouts are loop timers that terminate the process group (SIGTERM, then
+  SIGKILL after a grace period), so waiting costs no thread;
+- processes are tagged with a session key (``deployment-<id>``) and
+  recorded in ``<run_dir>/<pid>.json``, so any worker process can stop
+  exactly the process groups of one deployment. The record is kept until
+  the whole process group is gone, not just its leader: ``dcs`` may exit
+  while the udp-sender it started keeps sending. The recorded kernel start
+  time guards against signalling a recycled PID.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+PIPE_DRAIN_TIMEOUT = 5.0
+GROUP_POLL_INTERVAL = 1.0  # seconds between checks for remaining group members
+LINE_SPLIT_RE = re.compile(rb'[\r\n]')
+
+
+def deployment_session(deployment_id: int) -> str:
+    """Session key of the processes of a deployment."""
+    return f'deployment-{deployment_id}'
+
+
+def _pid_reused(pid: int, start_ticks: Optional[int]) -> bool:
+    """Whether a PID now belongs to a different process.
+
+    An exited group leader is not a reuse: the kernel does not hand out a
+    PID while a process group with that ID still exists.
+    """
+    if start_ticks is None:
+        return False
+    ticks = _start_ticks(pid)
+    return ticks is not None and ticks != start_ticks
+
+
+def _start_ticks(pid: int) -> Optional[int]:
+    """Kernel start time of a process (None if gone or unknown)."""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Field 22 (starttime), counted after the parenthesised command name
+    return int(stat.rsplit(')', 1)[1].split()[19])
+
+
+class ManagedProcess:
+    """A process launched by the supervisor.
+
+    Attributes:
+        command (list): Command and arguments
+        session (str): Session key (e.g. 'deployment-12') or None
+        pid (int): Process ID (also the process group ID)
+        returncode (int): Exit code (negative: killed by signal), None while running
+        timed_out (bool): Whether the timeout terminated the process
+        stopped (bool): Whether :meth:`ProcessSupervisor.stop` terminated it
+        started_at (datetime): Start timestamp (UTC)
+        finished_at (datetime): Exit timestamp (UTC)
+    """
+
+    def __init__(self, command: List[str], session: Optional[str], buffer_lines: int):
+        """Initialize process record.
+
+        Args:
+            command: Command and arguments
+            session: Session key
+            buffer_lines: Lines kept per stream
+        """
+        self.command = list(command)
+        self.session = session
+        self.pid = None
+        self.returncode = None
+        self.timed_out = False
+        self.stopped = False
+        self.started_at = datetime.utcnow()
+        self.finished_at = None
+        self.stdout = deque(maxlen=buffer_lines)
+        self.stderr = deque(maxlen=buffer_lines)
+        self.done = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Whether the process has not exited yet."""
+        return not self.done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Block until the process exits.
+
+        Args:
+            timeout: Seconds to wait (None: forever)
+
+        Returns:
+            Exit code, or None if still running
+        """
+        self.done.wait(timeout)
+        return self.returncode
+
+    def stdout_text(self) -> str:
+        """Buffered stdout (the last buffer_lines lines)."""
+        return '\n'.join(self.stdout)
+
+    def stderr_text(self) -> str:
+        """Buffered stderr (the last buffer_lines lines)."""
+        return '\n'.join(self.stderr)
+
+    def to_dict(self, tail: int = 20) -> Dict[str, any]:
+        """Convert to dictionary.
+
+        Args:
+            tail: Number of trailing output lines per stream
+        """
+        return {
+            'pid': self.pid,
+            'command': ' '.join(self.command),
+            'session': self.session,
+            'running': self.running,
+            'returncode': self.returncode,
+            'timed_out': self.timed_out,
+            'stopped': self.stopped,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'stdout_tail': list(self.stdout)[-tail:],
+            'stderr_tail': list(self.stderr)[-tail:]
+        }
+
+
+class ProcessSupervisor:
+    """Launch, stream and stop external processes on an asyncio loop.
+
+    Attributes:
+        run_dir (Path): Directory of per-process state files (None: not shared)
+        buffer_lines (int): Output lines kept per stream
+        kill_grace (float): Seconds between SIGTERM and SIGKILL
+    """
+
+    def __init__(self):
+        """Initialize supervisor (call :meth:`init_app` to configure)."""
+        self.run_dir = None
+        self.buffer_lines = 1000
+        self.kill_grace = 10.0
+
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._processes = {}
+
+    def init_app(self, app):
+        """Configure from the Flask app.
+
+        Args:
+            app: Flask application instance
+        """
+        run_dir = app.config.get('DRBL_RUN_PATH')
+        self.run_dir = Path(run_dir) if run_dir else None
+        self.buffer_lines = app.config.get('DRBL_OUTPUT_LINES', self.buffer_lines)
+        self.kill_grace = app.config.get('DRBL_KILL_GRACE', self.kill_grace)
+
+    # ============================================================
+    # Launching
+    # ============================================================
+
+    def start(
+        self,
+        command: List[str],
+        session: Optional[str] = None,
+        timeout: Optional[float] = None,
+        on_line: Optional[Callable[[str], None]] = None
+    ) -> ManagedProcess:
+        """Launch a process and return without waiting for it.
+
+        Args:
+            command: Command and arguments
+            session: Session key used by :meth:`stop`
+            timeout: Seconds until the process group is terminated (None: no limit)
+            on_line: Called on the loop thread with every output line
+
+        Returns:
+            ManagedProcess
+
+        Raises:
+            OSError: If the command cannot be executed
+        """
+        proc = ManagedProcess(command, session, self.buffer_lines)
+        asyncio.run_coroutine_threadsafe(
+            self._launch(proc, timeout, on_line), self._ensure_loop()
+        ).result()
+        return proc
+
+    def run(
+        self,
+        command: List[str],
+        session: Optional[str] = None,
+        timeout: Optional[float] = None,
+        on_line: Optional[Callable[[str], None]] = None
+    ) -> ManagedProcess:
+        """Launch a process and wait for it to exit.
+
+        Args:
+            command: Command and arguments
+            session: Session key used by :meth:`stop`
+            timeout: Seconds until the process group is terminated
+            on_line: Called on the loop thread with every output line
+
+        Returns:
+            Finished ManagedProcess
+
+        Raises:
+            OSError: If the command cannot be executed
+        """
+        proc = self.start(command, session=session, timeout=timeout, on_line=on_line)
+        proc.wait()
+        return proc
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the event loop thread on first use."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='process-supervisor',
+                    daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def _launch(self, proc: ManagedProcess, timeout, on_line):
+        """Spawn the process and schedule its supervision (loop thread)."""
+        logger.info(f"Executing command: {' '.join(proc.command)}")
+
+        process = await asyncio.create_subprocess_exec(
+            *proc.command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+        proc.pid = process.pid
+
+        with self._lock:
+            self._processes[proc.pid] = proc
+        self._write_state(proc)
+
+        asyncio.get_running_loop().create_task(
+            self._supervise(proc, process, timeout, on_line)
+        )
+
+    async def _supervise(self, proc: ManagedProcess, process, timeout, on_line):
+        """Stream output until exit, enforcing the timeout (loop thread)."""
+        loop = asyncio.get_running_loop()
+        timer = None
+        if timeout:
+            timer = loop.call_later(timeout, self._on_timeout, proc)
+
+        pumps = asyncio.gather(
+            self._pump(process.stdout, proc.stdout, on_line),
+            self._pump(process.stderr, proc.stderr, on_line)
+        )
+        try:
+            await process.wait()
+            # A daemonised child may keep the pipes open: drain briefly only
+            try:
+                await asyncio.wait_for(pumps, PIPE_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f'Output of pid {proc.pid} still open after exit, detached')
+        except Exception as e:
+            logger.error(f'Supervising pid {proc.pid} failed: {e}')
+            self._signal(proc.pid, signal.SIGKILL)
+            await process.wait()
+        finally:
+            proc.returncode = process.returncode
+            proc.finished_at = datetime.utcnow()
+            lingering = self._group_alive(proc.pid)
+            if not lingering:
+                self._forget(proc, timer)
+            proc.done.set()
+
+        logger.info(
+            f'Process exited: pid={proc.pid} returncode={proc.returncode} '
+            f'session={proc.session}'
+        )
+
+        if lingering:
+            # Children outlive the leader: stay stoppable (and subject to
+            # the timeout) until the group is empty
+            logger.info(f'Process group {proc.pid} still running after leader exit')
+            while self._group_alive(proc.pid):
+                await asyncio.sleep(GROUP_POLL_INTERVAL)
+            self._forget(proc, timer)
+            logger.info(f'Process group {proc.pid} exited')
+
+    def _forget(self, proc: ManagedProcess, timer):
+        """Drop a process whose group is empty (loop thread)."""
+        if timer is not None:
+            timer.cancel()
+        with self._lock:
+            self._processes.pop(proc.pid, None)
+        self._remove_state(proc.pid)
+
+    @staticmethod
+    async def _pump(stream, buffer: deque, on_line):
+        """Read a pipe in chunks and emit complete lines."""
+        partial = b''
+        while True:
+            data = await stream.read(READ_SIZE)
+            if not data:
+                break
+            lines = LINE_SPLIT_RE.split(partial + data)
+            partial = lines.pop()
+            for raw in lines:
+                if raw:
+                    ProcessSupervisor._emit(raw, buffer, on_line)
+        if partial:
+            ProcessSupervisor._emit(partial, buffer, on_line)
+
+    @staticmethod
+    def _emit(raw: bytes, buffer: deque, on_line):
+        """Store one output line and pass it to the callback."""
+        line = raw.decode('utf-8', errors='replace')
+        buffer.append(line)
+        if on_line is not None:
+            try:
+                on_line(line)
+            except Exception as e:
+                logger.warning(f'Output line handler failed: {e}')
+
+    def _on_timeout(self, proc: ManagedProcess):
+        """Timer callback: terminate a process group that ran too long."""
+        if proc.running or self._group_alive(proc.pid):
+            logger.error(f"Command timeout: {' '.join(proc.command)} (pid {proc.pid})")
+            proc.timed_out = True
+            self._terminate(proc.pid, _start_ticks(proc.pid))
+
+    # ============================================================
+    # Stopping
+    # ============================================================
+
+    def stop(self, session: str) -> List[int]:
+        """Terminate every process group of a session.
+
+        Processes started by other worker processes are found through the
+        state files in run_dir.
+
+        Args:
+            session: Session key (e.g. deployment_session(12))
+
+        Returns:
+            PIDs (process group IDs) that were signalled
+        """
+        signalled = []
+
+        with self._lock:
+            # Includes leaders that exited while their group still runs
+            local = [
+                proc for proc in self._processes.values()
+                if proc.session == session
+            ]
+        for proc in local:
+            proc.stopped = True
+            if self._terminate(proc.pid, _start_ticks(proc.pid)):
+                signalled.append(proc.pid)
+
+        for state in self._read_states():
+            if state['session'] != session or state['pid'] in signalled:
+                continue
+            if self._terminate(state['pid'], state.get('start_ticks')):
+                signalled.append(state['pid'])
+
+        if signalled:
+            logger.warning(f'Stopped session {session}: process groups {signalled}')
+        return signalled
+
+    def _terminate(self, pid: int, start_ticks: Optional[int]) -> bool:
+        """SIGTERM a process group now and SIGKILL it after the grace period."""
+        if _pid_reused(pid, start_ticks):
+            return False
+        if not self._signal(pid, signal.SIGTERM):
+            return False
+
+        def escalate():
+            if not _pid_reused(pid, start_ticks):
+                self._signal(pid, signal.SIGKILL)
+
+        self._ensure_loop().call_soon_threadsafe(
+            lambda: self._loop.call_later(self.kill_grace, escalate)
+        )
+        return True
+
+    @staticmethod
+    def _group_alive(pgid: int) -> bool:
+        """Whether a process group still has members other than zombies."""
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        # Killed children nobody has reaped yet still count for killpg()
+        try:
+            pids = [name for name in os.listdir('/proc') if name.isdigit()]
+        except OSError:
+            return True
+        for pid in pids:
+            try:
+                with open(f'/proc/{pid}/stat', 'r') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            if int(fields[2]) == pgid and fields[0] != 'Z':
+                return True
+        return False
+
+    @staticmethod
+    def _signal(pgid: int, sig: int) -> bool:
+        """Send a signal to a process group."""
+        try:
+            os.killpg(pgid, sig)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError as e:
+            logger.error(f'Cannot signal process group {pgid}: {e}')
+            return False
+
+    # ============================================================
+    # Status
+    # ============================================================
+
+    def processes(self, session: Optional[str] = None) -> List[ManagedProcess]:
+        """List running processes started by this worker process.
+
+        Args:
+            session: Only processes of this session (None: all)
+        """
+        with self._lock:
+            return [
+                proc for proc in self._processes.values()
+                if session is None or proc.session == session
+            ]
+
+    def is_running(self, session: Optional[str] = None) -> bool:
+        """Whether a supervised process (of any worker process) is running.
+
+        Args:
+            session: Only processes of this session (None: any)
+        """
+        if self.processes(session):
+            return True
+        return any(
+            session is None or state['session'] == session
+            for state in self._read_states()
+        )
+
+    # ============================================================
+    # State files
+    # ============================================================
+
+    def _write_state(self, proc: ManagedProcess):
+        """Record a process so other worker processes can find it."""
+        if self.run_dir is None:
+            return
+        try:
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.run_dir / f'.{proc.pid}.json.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump({
+                    'pid': proc.pid,
+                    'session': proc.session,
+                    'command': proc.command,
+                    'start_ticks': _start_ticks(proc.pid),
+                    'started_at': proc.started_at.isoformat()
+                }, f)
+            os.replace(tmp_file, self.run_dir / f'{proc.pid}.json')
+        except OSError as e:
+            logger.warning(f'Process state not recorded: {e}')
+
+    def _remove_state(self, pid: int):
+        """Delete the state file of an exited process."""
+        if self.run_dir is None:
+            return
+        try:
+            os.unlink(self.run_dir / f'{pid}.json')
+        except FileNotFoundError:
+            pass
+
+    def _read_states(self) -> List[Dict[str, any]]:
+        """Read state files of live processes, dropping stale ones."""
+        if self.run_dir is None or not self.run_dir.exists():
+            return []
+
+        states = []
+        for path in self.run_dir.glob('*.json'):
+            try:
+                with open(path, 'r') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if (_pid_reused(state['pid'], state.get('start_ticks'))
+                    or not self._group_alive(state['pid'])):
+                # Group gone (or PID reused) without cleanup, e.g. worker crash
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                continue
+            states.append(state)
+        return states
+
+
+process_supervisor = ProcessSupervisor()
@@ -0,0 +1,183 @@
+"""In-process cache of precomputed provisioning bundles.
+
+A PC on first boot fetches everything it needs from
+``GET /api/provision/<serial>`` in one round trip: its name, the ODJ blob
+and the domain and Windows Update settings. The JSON body is serialized
+once per PC and kept here as ready-to-send bytes with a strong ETag.
+
+Each bundle remembers the inputs it was built from (pcname, ODJ path and
+SHA-256, and the settings it embeds). A lookup passes the current inputs,
+resolved through the PC info cache (updated in every worker process through
+its change journal) and the ODJ blob cache (revalidated with stat() after
+its TTL), and a bundle whose
+inputs differ is dropped and rebuilt. Renaming a PC, re-associating its
+ODJ file or rewriting the file therefore invalidates the bundle without
+any extra hooks.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProvisionBundle:
+    """One serialized provisioning bundle.
+
+    Attributes:
+        body (bytes): Compact JSON response body
+        etag (str): SHA-256 of the body (strong ETag)
+        key (tuple): Inputs the body was built from
+    """
+
+    __slots__ = ('body', 'etag', 'key')
+
+    def __init__(self, body: bytes, etag: str, key: Tuple):
+        self.body = body
+        self.etag = etag
+        self.key = key
+
+
+class ProvisionCache:
+    """Thread-safe LRU cache of serial -> ProvisionBundle.
+
+    Attributes:
+        max_entries (int): Maximum number of cached bundles
+        hits (int): Number of lookups answered with a current bundle
+        misses (int): Number of lookups without a bundle
+        rebuilds (int): Number of bundles dropped because their inputs changed
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached bundles
+        """
+        self.max_entries = max_entries
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_entries: int, enabled: bool = True):
+        """Update cache limits and trim existing entries.
+
+        Args:
+            max_entries: Maximum number of cached bundles
+            enabled: Whether lookups should use the cache
+        """
+        with self._lock:
+            self.max_entries = max_entries
+            self.enabled = enabled
+            if not enabled:
+                self._entries.clear()
+            self._trim()
+
+    def get(self, serial: str, key: Tuple) -> Optional[ProvisionBundle]:
+        """Look up the bundle of a PC built from the given inputs.
+
+        Args:
+            serial: PC serial number
+            key: Current inputs of the bundle (see ProvisionBundle.key)
+
+        Returns:
+            ProvisionBundle or None on a miss (a stale bundle is dropped)
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            bundle = self._entries.get(serial)
+            if bundle is None:
+                self.misses += 1
+                return None
+
+            if bundle.key != key:
+                del self._entries[serial]
+                self.rebuilds += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(serial)
+            self.hits += 1
+            return bundle
+
+    def put(self, serial: str, bundle: ProvisionBundle):
+        """Insert or replace the bundle of a PC.
+
+        Args:
+            serial: PC serial number
+            bundle: Serialized bundle
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[serial] = bundle
+            self._entries.move_to_end(serial)
+            self._trim()
+
+    def invalidate(self, serial: str):
+        """Remove the bundle of a PC.
+
+        Args:
+            serial: PC serial number
+        """
+        with self._lock:
+            self._entries.pop(serial, None)
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with size, limits and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'bytes': sum(len(bundle.body) for bundle in self._entries.values()),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'rebuilds': self.rebuilds,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _trim(self):
+        """Evict least recently used bundles above the size limit.
+
+        Must be called with the lock held.
+        """
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+provision_cache = ProvisionCache()
+
+
+def init_app(app):
+    """Configure the bundle cache from the application config.
+
+    Args:
+        app: Flask application instance
+    """
+    provision_cache.configure(
+        max_entries=app.config.get('PROVISION_CACHE_SIZE', 5000),
+        enabled=app.config.get('PROVISION_CACHE_ENABLED', True)
+    )
+    provision_cache.clear()
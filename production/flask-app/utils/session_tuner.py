@@ -0,0 +1,303 @@
+"""Multicast session parameter tuner.
+
+Learns the fastest ``dcs`` settings for the local switch topology from the
+recorded session metrics (``deployment_session_metrics``). A session of
+``n`` clients is modelled as::
+
+    wave_seconds(n) = overhead + min(arrival * n, max_wait) + image_size / rate(n)
+
+- ``rate(n)``: sender throughput with ``n`` clients. Multicast runs at the
+  pace of the slowest receiver, and packets lost on a busy switch are
+  resent to every client, so throughput usually falls as clients are
+  added. It is fitted as a least-squares line over the history's
+  (client count, throughput) pairs, or is the mean throughput when the
+  history has a single client count.
+- ``arrival``: seconds between client arrivals, from the time sessions
+  waited for their clients.
+- ``overhead``: session time besides waiting and transferring
+  (partitioning, reboot).
+
+From the model the tuner recommends the wave size with the most PCs per
+hour, the max-wait time that lets 90% of the arrivals join, and the image
+compression with the best measured throughput. Compression is a property
+of the image (partclone detects it on restore), so it applies to the next
+image created with ``ocs-sr``; the compression of deployed images is
+detected from their chunk file names.
+"""
+
+import math
+import os
+import re
+from typing import Dict, List, Optional
+
+from models.session_metric import SessionMetric
+
+MB = 1024 * 1024
+
+# Sessions needed before the history of one image is used on its own
+MIN_SESSIONS = 3
+
+DEFAULT_CLIENTS = 10
+DEFAULT_MAX_WAIT = 300
+DEFAULT_ARRIVAL = 10.0  # seconds between client arrivals
+MIN_MAX_WAIT = 60
+MAX_MAX_WAIT = 1800
+MAX_WAIT_MARGIN = 1.2
+
+# <partition>.<fs>-ptcl-img.<codec>.<chunk> / <disk>.dd-img.<codec>.<chunk>
+CODEC_PATTERN = re.compile(r'-img\.(?P<codec>[a-z0-9]+)(?:\.|$)')
+CODECS = {
+    'zst': 'zstd',
+    'gz': 'gzip',
+    'lz4': 'lz4',
+    'xz': 'xz',
+    'bz2': 'bzip2',
+    'lzo': 'lzop',
+    'uncomp': 'none',
+}
+
+
+def detect_compression(image_path) -> Optional[str]:
+    """Detect the compression of a Clonezilla image from its chunk names.
+
+    Args:
+        image_path: Clonezilla image directory
+
+    Returns:
+        Compression name (zstd, gzip, ...) or None if unknown
+    """
+    try:
+        with os.scandir(image_path) as entries:
+            for entry in entries:
+                match = CODEC_PATTERN.search(entry.name)
+                if match and match.group('codec') in CODECS:
+                    return CODECS[match.group('codec')]
+    except OSError:
+        return None
+    return None
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class SessionModel:
+    """Session duration model fitted from session metrics.
+
+    Attributes:
+        sessions (int): Sessions the model was fitted from
+        rate_intercept (float): Throughput at zero clients (MB/s)
+        rate_slope (float): Throughput change per client (MB/s)
+        rate_floor (float): Lowest throughput the model predicts (MB/s)
+        arrival (float): Mean seconds between client arrivals
+        arrival_p90 (float): 90th percentile of seconds between arrivals
+        overhead (float): Seconds per session besides wait and transfer
+        max_clients (int): Largest client count in the history
+    """
+
+    def __init__(self, metrics: List[SessionMetric], default_rate_mb: float,
+                 default_overhead: float):
+        """Fit the model.
+
+        Args:
+            metrics: Completed session metrics with throughput
+            default_rate_mb: Throughput without history (MB/s)
+            default_overhead: Session overhead without history (seconds)
+        """
+        self.sessions = len(metrics)
+
+        points = [(m.client_count or 1, m.throughput_mb_s) for m in metrics]
+        if points:
+            mean_n = sum(n for n, _ in points) / len(points)
+            mean_r = sum(r for _, r in points) / len(points)
+            spread = sum((n - mean_n) ** 2 for n, _ in points)
+            self.rate_slope = (
+                sum((n - mean_n) * (r - mean_r) for n, r in points) / spread
+                if spread else 0.0
+            )
+            self.rate_intercept = mean_r - self.rate_slope * mean_n
+            self.rate_floor = max(0.5 * min(r for _, r in points), 0.1)
+            self.max_clients = max(n for n, _ in points)
+        else:
+            self.rate_slope = 0.0
+            self.rate_intercept = default_rate_mb
+            self.rate_floor = default_rate_mb
+            self.max_clients = 0
+
+        intervals = [
+            m.wait_seconds / m.client_count for m in metrics
+            if m.wait_seconds is not None and m.client_count
+        ]
+        self.arrival = sum(intervals) / len(intervals) if intervals else DEFAULT_ARRIVAL
+        self.arrival_p90 = _percentile(intervals, 0.9) if intervals else DEFAULT_ARRIVAL
+
+        overheads = [
+            m.duration_seconds - (m.wait_seconds or 0) - m.transfer_seconds
+            for m in metrics
+            if m.duration_seconds is not None and m.transfer_seconds is not None
+        ]
+        overheads = [o for o in overheads if o >= 0]
+        self.overhead = sum(overheads) / len(overheads) if overheads else default_overhead
+
+    def rate(self, clients: int) -> float:
+        """Predicted sender throughput with a number of clients (MB/s)."""
+        return max(self.rate_intercept + self.rate_slope * clients, self.rate_floor)
+
+    def wave_seconds(self, image_size_bytes: int, clients: int,
+                     max_wait: Optional[int] = None) -> float:
+        """Predicted duration of a session.
+
+        Args:
+            image_size_bytes: Image size
+            clients: Clients in the session
+            max_wait: Seconds DRBL waits for clients at most (None: no limit)
+
+        Returns:
+            Seconds
+        """
+        wait = self.arrival * clients
+        if max_wait is not None:
+            wait = min(wait, max_wait)
+        return self.overhead + wait + image_size_bytes / MB / self.rate(clients)
+
+    def to_dict(self) -> Dict[str, any]:
+        """Model parameters."""
+        return {
+            'sessions': self.sessions,
+            'rate_intercept_mb_s': round(self.rate_intercept, 2),
+            'rate_slope_mb_s_per_client': round(self.rate_slope, 3),
+            'arrival_seconds': round(self.arrival, 1),
+            'arrival_p90_seconds': round(self.arrival_p90, 1),
+            'overhead_seconds': round(self.overhead, 1)
+        }
+
+
+class SessionTuner:
+    """Recommend dcs settings from session history.
+
+    Attributes:
+        history_size (int): Sessions considered
+        default_rate_mb (float): Throughput without history (MB/s)
+        default_overhead (float): Session overhead without history (seconds)
+    """
+
+    def __init__(self, history_size: int = 50, default_rate_mb: float = 100.0,
+                 default_overhead: float = 300):
+        """Initialize tuner.
+
+        Args:
+            history_size: Sessions considered
+            default_rate_mb: Throughput without history (MB/s)
+            default_overhead: Session overhead without history (seconds)
+        """
+        self.history_size = history_size
+        self.default_rate_mb = default_rate_mb
+        self.default_overhead = default_overhead
+
+    @classmethod
+    def from_config(cls, config) -> 'SessionTuner':
+        """Create a tuner from the Flask configuration."""
+        return cls(
+            history_size=config.get('DEPLOYMENT_TUNING_HISTORY', 50),
+            default_rate_mb=config.get('DEPLOYMENT_SESSION_RATE_MB', 100.0),
+            default_overhead=config.get('DEPLOYMENT_SESSION_OVERHEAD', 300)
+        )
+
+    def history(self, image_name: Optional[str] = None, mode: str = 'multicast'):
+        """Get the sessions to learn from and their basis.
+
+        The image's own sessions are used once there are enough of them;
+        otherwise sessions of all images (same server and switches).
+
+        Returns:
+            Tuple of (metrics, basis) with basis 'image', 'all_images' or
+            'defaults'
+        """
+        if image_name:
+            metrics = SessionMetric.history(mode, image_name, self.history_size)
+            if len(metrics) >= MIN_SESSIONS:
+                return metrics, 'image'
+        metrics = SessionMetric.history(mode, limit=self.history_size)
+        return metrics, 'all_images' if metrics else 'defaults'
+
+    def fit(self, image_name: Optional[str] = None, mode: str = 'multicast') -> SessionModel:
+        """Fit the session model (requires an app context)."""
+        metrics, _ = self.history(image_name, mode)
+        return SessionModel(metrics, self.default_rate_mb, self.default_overhead)
+
+    def recommend(self, image_size_bytes: int, target_count: int = 0,
+                  image_name: Optional[str] = None) -> Dict[str, any]:
+        """Recommend settings for the next multicast session.
+
+        With known targets every target must join the session, so
+        clients_to_wait is the target count and wave_size tells how large
+        deployments should be split for the most PCs per hour. Without
+        targets clients_to_wait is the wave size.
+
+        Args:
+            image_size_bytes: Size of the image to deploy
+            target_count: Number of target PCs (0: unknown)
+            image_name: Image to prefer the history of
+
+        Returns:
+            Recommendation dictionary
+        """
+        metrics, basis = self.history(image_name)
+        model = SessionModel(metrics, self.default_rate_mb, self.default_overhead)
+
+        # Wave sizes beyond the measured client counts would extrapolate the rate
+        limit = model.max_clients or DEFAULT_CLIENTS
+        if target_count:
+            limit = min(limit, target_count)
+        best = max(
+            range(1, limit + 1),
+            key=lambda n: (n / model.wave_seconds(image_size_bytes, n), n)
+        )
+        clients = target_count or best
+
+        if metrics:
+            max_wait = math.ceil(model.arrival_p90 * clients * MAX_WAIT_MARGIN)
+            max_wait = min(max(max_wait, MIN_MAX_WAIT), MAX_MAX_WAIT)
+        else:
+            max_wait = DEFAULT_MAX_WAIT
+
+        predicted = model.wave_seconds(image_size_bytes, clients, max_wait)
+
+        return {
+            'clients_to_wait': clients,
+            'max_wait_time': max_wait,
+            'compression': self._best_compression(metrics),
+            'wave_size': best,
+            'waves': math.ceil(target_count / best) if target_count else None,
+            'predicted_seconds': round(predicted, 1),
+            'predicted_pcs_per_hour': round(clients / predicted * 3600, 1) if predicted else None,
+            'predicted_rate_mb_s': round(model.rate(clients), 2),
+            'basis': basis,
+            'model': model.to_dict(),
+            'by_compression': self._by_compression(metrics)
+        }
+
+    @staticmethod
+    def _by_compression(metrics) -> Dict[str, Dict[str, any]]:
+        """Mean throughput per image compression."""
+        groups = {}
+        for metric in metrics:
+            if metric.compression:
+                groups.setdefault(metric.compression, []).append(metric.throughput_mb_s)
+        return {
+            name: {'sessions': len(rates), 'throughput_mb_s': round(sum(rates) / len(rates), 2)}
+            for name, rates in sorted(groups.items())
+        }
+
+    def _best_compression(self, metrics) -> Optional[str]:
+        """Compression with the best mean throughput over enough sessions."""
+        candidates = {
+            name: stats for name, stats in self._by_compression(metrics).items()
+            if stats['sessions'] >= MIN_SESSIONS
+        }
+        if not candidates:
+            return None
+        return max(candidates, key=lambda name: candidates[name]['throughput_mb_s'])
@@ -0,0 +1,95 @@
+"""SQLite connection tuning for multi-worker serving.
+
+With several gunicorn workers (and their job/event threads) sharing one
+SQLite file, the default rollback journal blocks every reader while a
+setup log is being written. WAL lets readers run concurrently with the
+single writer, ``busy_timeout`` makes a second writer wait instead of
+failing with "database is locked", and ``synchronous=NORMAL`` is durable
+in WAL mode while avoiding an fsync per commit.
+
+PRAGMAs are applied on every new DB-API connection of the engine, driven
+by ``SQLITE_*`` config values (None leaves SQLite's default).
+"""
+
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def sqlite_pragmas(config) -> Dict[str, str]:
+    """Build the PRAGMA statements for a configuration.
+
+    Args:
+        config: Flask config (or any mapping with SQLITE_* keys)
+
+    Returns:
+        Dictionary of {pragma: value}
+
+    Raises:
+        ValueError: If a journal mode or synchronous level is invalid
+    """
+    pragmas = {}
+
+    journal_mode = config.get('SQLITE_JOURNAL_MODE')
+    if journal_mode:
+        journal_mode = journal_mode.upper()
+        if journal_mode not in JOURNAL_MODES:
+            raise ValueError(f'Invalid SQLITE_JOURNAL_MODE: {journal_mode}')
+        pragmas['journal_mode'] = journal_mode
+
+    synchronous = config.get('SQLITE_SYNCHRONOUS')
+    if synchronous:
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f'Invalid SQLITE_SYNCHRONOUS: {synchronous}')
+        pragmas['synchronous'] = synchronous
+
+    busy_timeout = config.get('SQLITE_BUSY_TIMEOUT')
+    if busy_timeout is not None:
+        pragmas['busy_timeout'] = str(int(busy_timeout))
+
+    cache_size = config.get('SQLITE_CACHE_SIZE')
+    if cache_size is not None:
+        pragmas['cache_size'] = str(int(cache_size))
+
+    return pragmas
+
+
+def configure_sqlite(engine, config) -> Optional[Dict[str, str]]:
+    """Apply configured PRAGMAs to every connection of a SQLite engine.
+
+    Must be called before the engine hands out its first connection.
+
+    Args:
+        engine: SQLAlchemy engine
+        config: Flask config
+
+    Returns:
+        Applied PRAGMAs, or None if the engine is not SQLite
+    """
+    if engine.dialect.name != 'sqlite':
+        return None
+
+    pragmas = sqlite_pragmas(config)
+    if not pragmas:
+        return pragmas
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    logger.info(
+        'SQLite tuning: ' + ', '.join(f'{k}={v}' for k, v in pragmas.items())
+    )
+    return pragmas
@@ -94,13 +94,12 @@ def deployment_detail(deployment_id):
             return redirect(url_for('views.deployment_list'))
 
         # Get target PCs
-        target_pcs = []
-        if deployment.target_serials:
-            serials = deployment.target_serials.split(',')
-            for serial in serials:
-                pc = PCMaster.find_by_serial(serial)
-                if pc:
-                    target_pcs.append(pc)
+        serials = deployment.serials
+        pcs = {
+            pc.serial: pc for pc in
+            PCMaster.query.filter(PCMaster.serial.in_(serials)).all()
+        } if serials else {}
+        target_pcs = [pcs[serial] for serial in serials if serial in pcs]
 
         return render_template(
             'deployment/detail.html',
@@ -123,36 +122,31 @@ def deploy_status():
     Displays real-time status of all active deployments.
     """
     try:
-        # Mock data for demonstration
-        from models.setup_log import SetupLog
+        from models.pc_status import PCStatus
 
-        # Get all logs grouped by PC
-        logs = SetupLog.query.order_by(SetupLog.timestamp.desc()).all()
+        # Latest status per PC (one row per PC, not per log)
+        statuses = PCStatus.query.order_by(PCStatus.timestamp.desc()).all()
 
-        # Create deployment items from logs
+        # Create deployment items from latest statuses
         deploy_items = []
-        seen_serials = set()
-
-        for log in logs:
-            if log.serial not in seen_serials:
-                seen_serials.add(log.serial)
-
-                # Calculate progress based on status
-                progress = 0
-                if log.status == 'completed':
-                    progress = 100
-                elif log.status == 'in_progress':
-                    progress = 50
-                elif log.status == 'failed':
-                    progress = 25
-
-                deploy_items.append({
-                    'pcname': log.pcname,
-                    'serial': log.serial,
-                    'status': log.status,
-                    'progress': progress,
-                    'timestamp': log.timestamp
-                })
+
+        for pc_status in statuses:
+            # Calculate progress based on status
+            progress = 0
+            if pc_status.status == 'completed':
+                progress = 100
+            elif pc_status.status == 'in_progress':
+                progress = 50
+            elif pc_status.status == 'failed':
+                progress = 25
+
+            deploy_items.append({
+                'pcname': pc_status.pcname,
+                'serial': pc_status.serial,
+                'status': pc_status.status,
+                'progress': progress,
+                'timestamp': pc_status.timestamp
+            })
 
         # Calculate counts
         total_deploys = len(deploy_items)
@@ -7,6 +7,10 @@ import csv
 from . import views_bp
 from models import db
 from models.pc_master import PCMaster
+from models.pc_status import PCStatus
+from api.validators import validate_required_csv_row
+from utils.csv_import import import_rows, iter_csv_lines
+from utils.export import DEFAULT_COLUMNS, export_columns
 
 logger = logging.getLogger(__name__)
 
@@ -42,38 +46,14 @@ def csv_import_process():
         return redirect(url_for('views.csv_import'))
 
     try:
-        # Read CSV file
-        csv_content = file.read().decode('utf-8')
-        csv_reader = csv.DictReader(csv_content.splitlines())
-
-        imported_count = 0
-        skipped_count = 0
-
-        for row in csv_reader:
-            serial = row.get('serial', '').strip()
-            pcname = row.get('pcname', '').strip()
-            odj_path = row.get('odj_path', '').strip()
-
-            if not serial or not pcname:
-                skipped_count += 1
-                continue
-
-            # Check for duplicates
-            existing = PCMaster.query.filter_by(serial=serial).first()
-            if existing:
-                skipped_count += 1
-                continue
-
-            # Create new PC entry
-            pc = PCMaster(
-                serial=serial,
-                pcname=pcname,
-                odj_path=odj_path if odj_path else None
-            )
-            db.session.add(pc)
-            imported_count += 1
+        # Decode CSV file incrementally
+        csv_reader = csv.DictReader(iter_csv_lines(file.stream))
 
-        db.session.commit()
+        # Bulk insert in batches; like before, only serial and pcname are required
+        result = import_rows(csv_reader, validator=validate_required_csv_row)
+
+        imported_count = result.success_count
+        skipped_count = result.error_count
 
         flash(f'CSV一括登録完了: {imported_count}件登録, {skipped_count}件スキップ', 'success')
         return redirect(url_for('views.list_pcs'))
@@ -106,13 +86,19 @@ def export_page():
     Displays current PC data and provides export functionality.
     """
     try:
-        # Get all PCs
-        pcs = PCMaster.query.order_by(PCMaster.created_at.desc()).all()
+        # Counts only: the export itself is streamed by /api/pcs/export
+        total_count = PCMaster.query.count()
+        odj_missing_count = PCMaster.query.filter(
+            (PCMaster.odj_path.is_(None)) | (PCMaster.odj_path == '')
+        ).count()
 
         return render_template(
             'import_export/export.html',
-            pcs=pcs,
-            total_count=len(pcs)
+            total_count=total_count,
+            odj_missing_count=odj_missing_count,
+            status_counts=PCStatus.status_counts(),
+            columns=export_columns(),
+            default_columns=DEFAULT_COLUMNS
         )
 
     except Exception as e:
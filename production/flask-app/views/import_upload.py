@@ -1,7 +1,5 @@
 """Import and Upload views."""
 import os
-import csv
-from io import StringIO
 from datetime import datetime
 from werkzeug.utils import secure_filename
 from flask import (
@@ -9,7 +7,16 @@ from flask import (
     flash, jsonify, current_app
 )
 from . import views_bp
+from api.validators import validate_required_csv_row
 from models import db, PCMaster
+from utils.csv_import import (
+    CSVEncodingError,
+    CSVImportError,
+    REQUIRED_COLUMNS,
+    import_rows,
+    import_staged,
+    stage_upload
+)
 
 
 ALLOWED_CSV_EXTENSIONS = {'csv'}
@@ -59,37 +66,33 @@ def import_upload():
         return jsonify({'error': 'CSVファイルのみアップロード可能です'}), 400
 
     try:
-        # Read CSV file
-        stream = StringIO(file.stream.read().decode('utf-8'))
-        csv_reader = csv.DictReader(stream)
-
-        # Get headers
-        headers = csv_reader.fieldnames
-
-        # Validate required columns
-        required_columns = {'serial', 'pcname'}
-        if not required_columns.issubset(set(headers)):
-            return jsonify({
-                'error': f'必須列が不足しています: {", ".join(required_columns)}'
-            }), 400
-
-        # Read rows (preview first 10)
-        rows = []
-        all_rows = []
-        for i, row in enumerate(csv_reader):
-            all_rows.append(row)
-            if i < 10:
-                rows.append(row)
+        # Decode, validate and stage rows server-side in chunks
+        staged = stage_upload(
+            file.stream,
+            max_age_hours=current_app.config.get('IMPORT_STAGING_MAX_AGE_HOURS', 24),
+            validator=validate_required_csv_row
+        )
 
         return jsonify({
             'success': True,
-            'headers': headers,
-            'preview': rows,
-            'total_rows': len(all_rows),
-            'data': all_rows  # Store for actual import
+            **staged
         })
 
+    except CSVEncodingError as e:
+        return jsonify({
+            'error': f'行 {e.row} の文字コードを読み取れません。UTF-8で保存してください',
+            'details': str(e),
+            'row': e.row
+        }), 400
+
+    except CSVImportError as e:
+        return jsonify({
+            'error': f'必須列が不足しています: {", ".join(sorted(REQUIRED_COLUMNS))}',
+            'details': str(e)
+        }), 400
+
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f'CSV parse error: {str(e)}')
         return jsonify({'error': f'CSVファイルの解析に失敗しました: {str(e)}'}), 400
 
@@ -98,54 +101,38 @@ def import_upload():
 def import_execute():
     """Execute CSV import to database.
 
+    Request JSON:
+        - import_token: Token returned by /import/upload (preferred)
+        - rows: Row list (legacy clients)
+
     Returns:
         JSON response with import results
     """
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
+        import_token = data.get('import_token')
         rows = data.get('rows', [])
 
-        if not rows:
+        if not import_token and not rows:
             return jsonify({'error': 'インポートするデータがありません'}), 400
 
-        success_count = 0
-        error_count = 0
-        errors = []
-
-        for row in rows:
-            serial = row.get('serial', '').strip()
-            pcname = row.get('pcname', '').strip()
-            odj_path = row.get('odj_path', '').strip()
-
-            # Validation
-            if not serial or not pcname:
-                errors.append(f'行をスキップ: Serial={serial}, PCName={pcname} (必須項目が空)')
-                error_count += 1
-                continue
-
-            # Check for duplicate
-            existing = PCMaster.find_by_serial(serial)
-            if existing:
-                errors.append(f'Serial番号 {serial} は既に登録されています (スキップ)')
-                error_count += 1
-                continue
-
-            # Create new PC record
-            try:
-                pc = PCMaster(
-                    serial=serial,
-                    pcname=pcname,
-                    odj_path=odj_path if odj_path else None
-                )
-                db.session.add(pc)
-                success_count += 1
-            except Exception as e:
-                errors.append(f'Serial={serial}: {str(e)}')
-                error_count += 1
-
-        # Commit all records
+        # Bulk insert in batches; like before, only serial and pcname are required
         try:
-            db.session.commit()
+            if import_token:
+                # Rows staged by /import/upload
+                result = import_staged(import_token, validator=validate_required_csv_row)
+            else:
+                # Legacy clients posting the rows back
+                result = import_rows(rows, validator=validate_required_csv_row)
+            success_count = result.success_count
+            error_count = result.error_count
+            errors = [
+                f'行 {error["row"]}: {error["error"]} (スキップ)'
+                for error in result.errors
+            ] + [
+                f'Serial番号 {duplicate["serial"]} は既に登録されています (スキップ)'
+                for duplicate in result.duplicates
+            ]
 
             return jsonify({
                 'success': True,
@@ -153,6 +140,8 @@ def import_execute():
                 'error_count': error_count,
                 'errors': errors
             })
+        except CSVImportError as e:
+            return jsonify({'error': f'インポートデータが見つかりません: {str(e)}'}), 404
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f'Import commit error: {str(e)}')
@@ -1,7 +1,7 @@
 """Main views."""
 from flask import render_template, current_app
 from . import views_bp
-from models import PCMaster, SetupLog
+from models import PCMaster, SetupLog, PCStatus
 
 
 @views_bp.route('/')
@@ -13,9 +13,12 @@ def index():
     """
     # Get statistics
     total_pcs = PCMaster.query.count()
-    completed_logs = SetupLog.query.filter_by(status='completed').count()
-    in_progress_logs = SetupLog.query.filter_by(status='in_progress').count()
-    failed_logs = SetupLog.query.filter_by(status='failed').count()
+
+    # Latest status per PC (one grouped query on pc_status)
+    status_counts = PCStatus.status_counts()
+    completed_logs = status_counts['completed']
+    in_progress_logs = status_counts['in_progress']
+    failed_logs = status_counts['failed']
 
     # Get latest logs
     latest_logs = SetupLog.query.order_by(
@@ -1,7 +1,8 @@
 """PC Management views."""
-from flask import render_template, request, redirect, url_for, flash
+from flask import abort, render_template, request, redirect, url_for, flash
 from . import views_bp
 from models import db, PCMaster, SetupLog
+from utils.pagination import keyset_page
 
 
 @views_bp.route('/pcs')
@@ -11,19 +12,24 @@ def list_pcs():
     Returns:
         Rendered PC list template
     """
-    page = request.args.get('page', 1, type=int)
     per_page = 20
-
-    pagination = PCMaster.query.order_by(
-        PCMaster.created_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
-
-    pcs = pagination.items
+    after = request.args.get('after')
+
+    try:
+        pcs, next_cursor = keyset_page(
+            PCMaster.query,
+            (PCMaster.created_at, PCMaster.id),
+            per_page,
+            after=after
+        )
+    except ValueError:
+        abort(400)
 
     return render_template(
         'pcs.html',
         pcs=pcs,
-        pagination=pagination
+        next_cursor=next_cursor,
+        is_first_page=not after
     )
 
 
@@ -113,8 +119,8 @@ def list_logs():
     Returns:
         Rendered logs list template
     """
-    page = request.args.get('page', 1, type=int)
     per_page = 50
+    after = request.args.get('after')
     status_filter = request.args.get('status')
 
     query = SetupLog.query
@@ -123,15 +129,20 @@ def list_logs():
     if status_filter:
         query = query.filter_by(status=status_filter)
 
-    pagination = query.order_by(
-        SetupLog.timestamp.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
-
-    logs = pagination.items
+    try:
+        logs, next_cursor = keyset_page(
+            query,
+            (SetupLog.timestamp, SetupLog.id),
+            per_page,
+            after=after
+        )
+    except ValueError:
+        abort(400)
 
     return render_template(
         'logs.html',
         logs=logs,
-        pagination=pagination,
+        next_cursor=next_cursor,
+        is_first_page=not after,
         status_filter=status_filter
     )